@@ -1,8 +1,27 @@
 from fastapi import APIRouter
 
+from ai.core.gemini import get_gemini_client
+from ai.core.image_fetch import get_image_fetcher
+from ai.core.jobs import get_job_manager
+from ai.core.price_search import get_price_search_engine
+from ai.core.result_cache import get_result_cache
+from ai.core.workers import get_worker_pool
+
 router = APIRouter()
 
 
 @router.get("/", summary="Health check")
 def health_check():
 	return {"status": "ok"}
+
+
+@router.get("/metrics", summary="Runtime metrics")
+def metrics():
+	return {
+		"image_fetch": get_image_fetcher().stats(),
+		"result_cache": get_result_cache().stats(),
+		"gemini": get_gemini_client().stats(),
+		"price_search": get_price_search_engine().stats(),
+		"worker_pool": get_worker_pool().stats(),
+		"jobs": get_job_manager().stats(),
+	}
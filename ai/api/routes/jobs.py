@@ -0,0 +1,49 @@
+from typing import Any, AsyncIterator, Dict, Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from ai.core.config import get_settings
+from ai.core.jobs import get_job_manager
+from ai.core.streaming import SSE_KEEPALIVE, SSE_MEDIA_TYPE, STREAM_HEADERS, sse_message
+
+router = APIRouter()
+
+
+@router.get("/{job_id}", summary="Status, progress and result of a background job")
+async def get_job(job_id: str) -> Dict[str, Any]:
+    job = await run_in_threadpool(get_job_manager().get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+def _sse(event: Optional[Dict[str, Any]]) -> str:
+    if event is None:
+        return SSE_KEEPALIVE
+    return sse_message(event["event"], event["data"], event["seq"])
+
+
+@router.get("/{job_id}/events", summary="Follow a background job over server-sent events")
+async def job_events(
+    job_id: str,
+    after: int = Query(0, ge=0, description="Only events after this sequence number"),
+    last_event_id: Optional[str] = Header(None, description="Set by EventSource when reconnecting"),
+) -> StreamingResponse:
+    """
+    Streams the job's events (``stage``, ``vision``, ``parts``, ``price``...) as they happen,
+    earlier ones first, and ends with a ``result`` or ``error`` event. Reconnecting with
+    ``Last-Event-ID`` resumes after the last event received.
+    """
+    manager = get_job_manager()
+    if await run_in_threadpool(manager.get, job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if last_event_id and last_event_id.isdigit():
+        after = max(after, int(last_event_id))
+
+    async def stream() -> AsyncIterator[str]:
+        async for event in manager.follow(job_id, after, keepalive_seconds=get_settings().job_sse_keepalive_seconds):
+            yield _sse(event)
+
+    return StreamingResponse(stream(), media_type=SSE_MEDIA_TYPE, headers=STREAM_HEADERS)
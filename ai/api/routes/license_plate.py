@@ -1,170 +1,185 @@
 from fastapi import APIRouter, File, UploadFile, HTTPException, Query
-from typing import Dict, Any, List, Optional
-from PIL import Image
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
 import cv2
 import numpy as np
-import io
+import asyncio
+import functools
+import json
 import os
-import easyocr
-from ultralytics import YOLO
-import torch
+import tempfile
+import threading
+from ai.core.batching import MicroBatcher
+from ai.core.box_suppression import OVERLAP_MIN, suppress_detections
+from ai.core.config import get_settings
+from ai.core.image_fetch import ImageFetchError, ImageTooLarge, get_image_fetcher
+from ai.core.image_ingest import decode_bgr
+from ai.core.inference import Detector, load_detector
+from ai.core.model_registry import ModelLoadError, get_model_registry, resolve_weights
+from ai.core.plate_ocr import get_ocr_reader, recognize_plate_crops
+from ai.core.plate_tracking import PlateTracker, crop, iter_sampled_frames
+from ai.core.result_cache import cached, content_digest
+from ai.core.workers import WorkerPoolBusy, get_worker_pool
 
 router = APIRouter()
 
 # Global variables for model caching
-_yolo_model = None
-_ocr_reader = None
-def _get_yolo_model():
-    """Get or initialize YOLO model for license plate detection"""
-    global _yolo_model
-    if _yolo_model is None:
-        try:
-            # Try to load from pre-downloaded model first
-            model_path = os.path.join('/app/models', 'yolov8n.pt')
-            if os.path.exists(model_path):
-                _yolo_model = YOLO(model_path)
-                print("YOLO model loaded from pre-downloaded file")
-            else:
-                # Fallback: download model (this will work if we have write permissions)
-                _yolo_model = YOLO('yolov8n.pt')
-                print("YOLO model downloaded and loaded")
-        except Exception as e:
-            print(f"Failed to load YOLO model: {e}")
-            raise Exception(f"Could not load YOLO model: {str(e)}")
-    return _yolo_model
-
-def _get_ocr_reader():
-    """Get or initialize EasyOCR reader"""
-    global _ocr_reader
-    if _ocr_reader is None:
-        try:
-            # Set environment variables for EasyOCR
-            os.environ['HOME'] = '/app'
-            os.environ['EASYOCR_HOME'] = '/app/cache'
-            
-            # Initialize EasyOCR with English and Arabic support
-            # Always use CPU in Docker for better compatibility
-            _ocr_reader = easyocr.Reader(['en', 'ar'], gpu=False)
-            print("EasyOCR reader initialized (CPU mode)")
-        except Exception as e:
-            print(f"Failed to initialize EasyOCR: {e}")
-            # Try with minimal configuration
-            try:
-                _ocr_reader = easyocr.Reader(['en'], gpu=False)
-                print("EasyOCR reader initialized with English only")
-            except Exception as e2:
-                print(f"EasyOCR initialization completely failed: {e2}")
-                # Try with even more minimal setup
-                try:
-                    import tempfile
-                    with tempfile.TemporaryDirectory() as temp_dir:
-                        os.environ['HOME'] = temp_dir
-                        _ocr_reader = easyocr.Reader(['en'], gpu=False)
-                        print("EasyOCR reader initialized with temporary directory")
-                except Exception as e3:
-                    print(f"All EasyOCR initialization attempts failed: {e3}")
-                    raise e3
-    return _ocr_reader
+_yolo_batcher = None
+_ocr_batcher = None
+def _get_yolo_model() -> Detector:
+    """Get or initialize the YOLO detector (ONNX Runtime or PyTorch, see ai.core.inference)"""
+    settings = get_settings()
+    registry = get_model_registry()
+    # Loads once per process; only the batcher thread calls it, so no lease is needed
+    registry.register(YOLO_MODEL, resolve_weights('yolov8n.pt'), loader=functools.partial(
+        load_detector,
+        backend=settings.inference_backend,
+        int8=settings.inference_int8,
+        intra_op_threads=settings.inference_intra_op_threads or (settings.cv_worker_threads if settings.cv_workers > 0 else 0),
+        inter_op_threads=settings.inference_inter_op_threads,
+        providers=settings.inference_onnx_providers,
+    ))
+    try:
+        return registry.get(YOLO_MODEL)
+    except ModelLoadError as e:
+        raise Exception(f"Could not load YOLO model: {str(e)}")
+
+def preload_models() -> None:
+    """Load YOLO and EasyOCR up front (runs once in every CV worker process)"""
+    _get_yolo_model()
+    get_ocr_reader()
+
+YOLO_MODEL = 'yolov8n'
+VEHICLE_CLASSES = ('car', 'truck', 'bus', 'motorcycle')
+
+
+def _get_yolo_batcher() -> MicroBatcher:
+    """Get or initialize the micro-batcher that merges concurrent YOLO calls"""
+    global _yolo_batcher
+    if _yolo_batcher is None:
+        settings = get_settings()
+        _yolo_batcher = MicroBatcher(
+            _run_yolo_batch_on_pool,
+            max_batch_size=settings.yolo_max_batch_size,
+            max_wait_ms=settings.yolo_max_batch_wait_ms,
+            name="yolo-license-plate",
+        )
+    return _yolo_batcher
+
+
+def _plate_regions_from_boxes(data: np.ndarray, names: Dict[int, str], image_shape) -> List[Dict[str, Any]]:
+    """Turn an (n, 6) [x1, y1, x2, y2, conf, cls] box array into plate candidates"""
+    if data.size == 0:
+        return []
+
+    confidence = data[:, 4]
+    class_ids = data[:, 5].astype(np.int64)
+    vehicle_ids = [class_id for class_id, name in names.items() if name in VEHICLE_CLASSES]
+
+    # YOLO doesn't have a specific license plate class, so we keep vehicles and
+    # look at the lower 30% of each one, where plates usually sit
+    keep = np.isin(class_ids, vehicle_ids) & (confidence > 0.6)
+    if not keep.any():
+        return []
+
+    boxes = data[keep, :4]
+    height = (boxes[:, 3] - boxes[:, 1]).astype(np.float64)
+    x1, y1, x2, y2 = (boxes[:, i].astype(np.float64) for i in range(4))
+
+    plate_x1 = np.maximum(0, np.trunc(x1)).astype(np.int64)
+    plate_y1 = np.maximum(0, np.trunc(y1 + height * 0.7)).astype(np.int64)
+    plate_x2 = np.minimum(image_shape[1], np.trunc(x2)).astype(np.int64)
+    plate_y2 = np.minimum(image_shape[0], np.trunc(y2)).astype(np.int64)
+    valid = (plate_y2 > plate_y1) & (plate_x2 > plate_x1)
+
+    plate_boxes = np.stack([plate_x1, plate_y1, plate_x2, plate_y2], axis=1)[valid].tolist()
+    vehicle_boxes = np.trunc(boxes[valid]).astype(np.int64).tolist()
+    confidences = confidence[keep][valid].tolist()
+    vehicle_types = [names[int(class_id)] for class_id in class_ids[keep][valid]]
+
+    return [
+        {
+            'bbox': plate_bbox,
+            'confidence': conf,
+            'vehicle_type': vehicle_type,
+            'vehicle_bbox': vehicle_bbox
+        }
+        for plate_bbox, conf, vehicle_type, vehicle_bbox in zip(plate_boxes, confidences, vehicle_types, vehicle_boxes)
+    ]
+
+
+def _detect_license_plates_yolo_batch(images: List[np.ndarray]) -> List[List[Dict[str, Any]]]:
+    """Detect license plates in several images with a single YOLO forward pass"""
+    if not images:
+        return []
+    detector = _get_yolo_model()
+
+    # Run YOLO inference on the whole batch
+    batch_boxes = detector.detect(images, conf=0.5)  # confidence threshold
+
+    return [
+        _plate_regions_from_boxes(data, detector.names, image.shape)
+        for image, data in zip(images, batch_boxes)
+    ]
+
+
+async def _run_yolo_batch_on_pool(images: List[np.ndarray]) -> List[List[Dict[str, Any]]]:
+    """Send a merged YOLO batch to the CV worker pool"""
+    return await get_worker_pool().run(_detect_license_plates_yolo_batch, list(images))
+
 
 def _detect_license_plates_yolo(image: np.ndarray) -> List[Dict[str, Any]]:
     """Detect license plates using YOLO model"""
-    model = _get_yolo_model()
-    
-    # Run YOLO inference
-    results = model(image, conf=0.5)  # confidence threshold
-    
-    license_plates = []
-    
-    for result in results:
-        boxes = result.boxes
-        if boxes is not None:
-            for box in boxes:
-                # Get class name
-                class_id = int(box.cls[0])
-                class_name = model.names[class_id]
-                confidence = float(box.conf[0])
-                
-                # Filter for objects that might be license plates
-                # YOLO doesn't have a specific license plate class, so we'll look for:
-                # - cars (class 2) and extract regions that might contain license plates
-                # - or use a more general approach
-                if class_name in ['car', 'truck', 'bus', 'motorcycle'] and confidence > 0.6:
-                    # Get bounding box coordinates
-                    x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                    
-                    # Extract the region that might contain license plate
-                    # License plates are typically in the lower portion of vehicles
-                    height = y2 - y1
-                    width = x2 - x1
-                    
-                    # Focus on lower 30% of the vehicle for license plate detection
-                    license_plate_y1 = int(y1 + height * 0.7)
-                    license_plate_y2 = int(y2)
-                    license_plate_x1 = int(x1)
-                    license_plate_x2 = int(x2)
-                    
-                    # Ensure coordinates are within image bounds
-                    license_plate_y1 = max(0, license_plate_y1)
-                    license_plate_y2 = min(image.shape[0], license_plate_y2)
-                    license_plate_x1 = max(0, license_plate_x1)
-                    license_plate_x2 = min(image.shape[1], license_plate_x2)
-                    
-                    if license_plate_y2 > license_plate_y1 and license_plate_x2 > license_plate_x1:
-                        license_plates.append({
-                            'bbox': [license_plate_x1, license_plate_y1, license_plate_x2, license_plate_y2],
-                            'confidence': confidence,
-                            'vehicle_type': class_name,
-                            'vehicle_bbox': [int(x1), int(y1), int(x2), int(y2)]
-                        })
-    
-    return license_plates
+    return _detect_license_plates_yolo_batch([image])[0]
+
+def _get_ocr_batcher() -> MicroBatcher:
+    """Get or initialize the micro-batcher that merges plate crops across requests"""
+    global _ocr_batcher
+    if _ocr_batcher is None:
+        settings = get_settings()
+        _ocr_batcher = MicroBatcher(
+            _run_ocr_batch_on_pool,
+            max_batch_size=settings.ocr_max_batch_size,
+            max_wait_ms=settings.ocr_max_batch_wait_ms,
+            name="easyocr-plates",
+        )
+    return _ocr_batcher
+
+
+async def _run_ocr_batch_on_pool(items: List[Tuple[np.ndarray, bool]]) -> List[Tuple[str, float]]:
+    """Send merged plate crops to the CV worker pool"""
+    crops = [plate_crop for plate_crop, _ in items]
+    plate_regions = [plate_region for _, plate_region in items]
+    return await get_worker_pool().run(recognize_plate_crops, crops, plate_regions)
+
 
 def _extract_text_from_license_plate(image: np.ndarray, bbox: List[int]) -> str:
     """Extract text from license plate region using OCR"""
     x1, y1, x2, y2 = bbox
-    
-    # Extract the license plate region
-    plate_region = image[y1:y2, x1:x2]
-    
-    if plate_region.size == 0:
-        return ""
-    
-    # Convert to PIL Image for better OCR processing
-    plate_pil = Image.fromarray(cv2.cvtColor(plate_region, cv2.COLOR_BGR2RGB))
-    
-    # Preprocess the image for better OCR
-    # Convert to grayscale
-    gray = cv2.cvtColor(plate_region, cv2.COLOR_BGR2GRAY)
-    
-    # Apply threshold to get better contrast
-    _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-    
-    # Apply morphological operations to clean up the image
-    kernel = np.ones((2, 2), np.uint8)
-    cleaned = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, kernel)
-    
-    # Use EasyOCR to extract text
-    reader = _get_ocr_reader()
-    
-    try:
-        # Run OCR on the cleaned image
-        results = reader.readtext(cleaned)
-        
-        # Combine all detected text
-        extracted_text = ""
-        for (bbox, text, confidence) in results:
-            if confidence > 0.5:  # Only include high-confidence detections
-                extracted_text += text + " "
-        
-        return extracted_text.strip()
-    
-    except Exception as e:
-        print(f"OCR error: {str(e)}")
-        return ""
+    return recognize_plate_crops([image[y1:y2, x1:x2]])[0][0]
+
 
-def _detect_license_plates_advanced(image: np.ndarray) -> List[Dict[str, Any]]:
-    """Advanced license plate detection using computer vision techniques"""
+def _detect_license_plates_advanced(
+    image: np.ndarray,
+    pyramid_levels: Optional[int] = None,
+    integral_min_coverage: float = 1.0
+) -> List[Dict[str, Any]]:
+    """Advanced license plate detection using computer vision techniques
+    
+    Contours are screened on their bounding box before the polygon fit, and when
+    many candidates survive, edge density comes from one integral image instead
+    of a Canny pass per candidate.
+    With ``pyramid_levels`` > 0 the search runs on a copy halved that many times
+    and boxes are scaled back to the full image.
+    """
+    if pyramid_levels is None:
+        pyramid_levels = get_settings().plate_cv_pyramid_levels
     gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    scale = 1
+    for _ in range(pyramid_levels):
+        gray = cv2.pyrDown(gray)
+        scale *= 2
     
     # Apply Gaussian blur to reduce noise
     blurred = cv2.GaussianBlur(gray, (5, 5), 0)
@@ -175,39 +190,95 @@ def _detect_license_plates_advanced(image: np.ndarray) -> List[Dict[str, Any]]:
     # Find contours
     contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
     
-    license_plates = []
-    
+    # Plate-sized boxes only: most contours are rejected before approxPolyDP
+    min_width, min_height = 100 / scale, 30 / scale
+    candidates = []
     for contour in contours:
-        # Approximate the contour
-        epsilon = 0.02 * cv2.arcLength(contour, True)
-        approx = cv2.approxPolyDP(contour, epsilon, True)
+        # License plates typically have aspect ratios between 2:1 and 5:1
+        x, y, w, h = cv2.boundingRect(contour)
+        aspect_ratio = w / h
+        if not (2.0 <= aspect_ratio <= 5.0 and w > min_width and h > min_height):
+            continue
         
         # Check if the contour is roughly rectangular (license plate shape)
+        epsilon = 0.02 * cv2.arcLength(contour, True)
+        approx = cv2.approxPolyDP(contour, epsilon, True)
         if len(approx) == 4:
-            x, y, w, h = cv2.boundingRect(contour)
-            aspect_ratio = w / h
-            
-            # License plates typically have aspect ratios between 2:1 and 5:1
-            if 2.0 <= aspect_ratio <= 5.0 and w > 100 and h > 30:
-                # Check if the region contains text-like features
-                roi = gray[y:y+h, x:x+w]
-                
-                # Calculate the density of edges in the region
-                roi_edges = cv2.Canny(roi, 50, 150)
-                edge_density = np.sum(roi_edges > 0) / (w * h)
-                
-                # License plates should have high edge density due to text
-                if edge_density > 0.1:
-                    license_plates.append({
-                        'bbox': [x, y, x + w, y + h],
-                        'confidence': min(edge_density * 2, 1.0),
-                        'detection_method': 'cv_contours',
-                        'aspect_ratio': aspect_ratio
-                    })
+            candidates.append((x, y, w, h, aspect_ratio))
+    
+    # Edge density counts Canny edges of the unblurred region. Once the candidates
+    # cover more pixels than the frame (integral_min_coverage), one Canny plus an
+    # integral image (O(1) per box) is cheaper than a Canny per region
+    edge_counts = None
+    if candidates and sum(w * h for _, _, w, h, _ in candidates) >= integral_min_coverage * gray.size:
+        edge_counts = cv2.integral((cv2.Canny(gray, 50, 150) > 0).view(np.uint8))
+    
+    license_plates = []
+    for x, y, w, h, aspect_ratio in candidates:
+        # Calculate the density of edges in the region
+        if edge_counts is not None:
+            edge_count = edge_counts[y + h, x + w] - edge_counts[y, x + w] - edge_counts[y + h, x] + edge_counts[y, x]
+        else:
+            edge_count = cv2.countNonZero(cv2.Canny(gray[y:y + h, x:x + w], 50, 150))
+        edge_density = edge_count / (w * h)
+        
+        # License plates should have high edge density due to text
+        if edge_density > 0.1:
+            license_plates.append({
+                'bbox': [x * scale, y * scale, (x + w) * scale, (y + h) * scale],
+                'confidence': min(edge_density * 2, 1.0),
+                'detection_method': 'cv_contours',
+                'aspect_ratio': aspect_ratio
+            })
     
     return license_plates
 
 
+async def _detect_and_read_license_plates(image_data: bytearray) -> List[Dict[str, Any]]:
+    """Run detection, de-duplication and OCR on encoded image bytes"""
+    # Decode straight to BGR, off the event loop
+    opencv_image = await asyncio.to_thread(decode_bgr, image_data)
+    
+    # YOLO (micro-batched) and the contour detector run off the event loop, in parallel
+    pool = get_worker_pool()
+    yolo_plates, cv_plates = await asyncio.gather(
+        _get_yolo_batcher().submit(opencv_image),
+        pool.run(_detect_license_plates_advanced, opencv_image),
+    )
+    
+    all_plates = yolo_plates + cv_plates
+    
+    # Filter duplicates: overlap over the smaller box above 50% keeps the more confident one
+    filtered_plates = suppress_detections(all_plates, threshold=0.5, mode=OVERLAP_MIN)
+    
+    # Extract text from each plate; contour detections are already tight plate
+    # regions, so they skip EasyOCR's detector and go straight to recognition
+    ocr_batcher = _get_ocr_batcher()
+    ocr_results = await asyncio.gather(*(
+        ocr_batcher.submit((
+            opencv_image[plate['bbox'][1]:plate['bbox'][3], plate['bbox'][0]:plate['bbox'][2]],
+            plate.get('detection_method') == 'cv_contours'
+        ))
+        for plate in filtered_plates
+    ))
+    
+    results = []
+    for i, (plate, (extracted_text, text_confidence)) in enumerate(zip(filtered_plates, ocr_results)):
+        bbox = plate['bbox']
+        
+        results.append({
+            'plate_id': i + 1,
+            'bbox': bbox,
+            'confidence': plate['confidence'],
+            'extracted_text': extracted_text,
+            'text_confidence': round(text_confidence, 4),
+            'detection_method': plate.get('detection_method', 'yolo'),
+            'vehicle_type': plate.get('vehicle_type', 'unknown')
+        })
+    
+    return results
+
+
 @router.get("/detect-license-plates-url", summary="Detect license plates from image URL")
 async def detect_license_plates_from_url(
     image_url: str = Query(..., description="URL of the image containing license plates")
@@ -215,70 +286,15 @@ async def detect_license_plates_from_url(
     """
     Detect license plates from an image URL and extract text
     """
-    import requests
-    
     try:
         # Fetch the image from URL
-        response = requests.get(image_url, timeout=30)
-        response.raise_for_status()
-        
-        # Process the image
-        pil_image = Image.open(io.BytesIO(response.content))
-        pil_image = pil_image.convert("RGB")
-        
-        # Convert to OpenCV format
-        opencv_image = cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
+        fetched = await get_image_fetcher().fetch(image_url)
         
-        # Use the same detection logic as the file upload endpoint
-        yolo_plates = _detect_license_plates_yolo(opencv_image)
-        cv_plates = _detect_license_plates_advanced(opencv_image)
-        
-        all_plates = yolo_plates + cv_plates
-        
-        # Filter duplicates (same logic as above)
-        filtered_plates = []
-        for plate in all_plates:
-            is_duplicate = False
-            for existing_plate in filtered_plates:
-                bbox1 = plate['bbox']
-                bbox2 = existing_plate['bbox']
-                
-                x1 = max(bbox1[0], bbox2[0])
-                y1 = max(bbox1[1], bbox2[1])
-                x2 = min(bbox1[2], bbox2[2])
-                y2 = min(bbox1[3], bbox2[3])
-                
-                if x1 < x2 and y1 < y2:
-                    overlap_area = (x2 - x1) * (y2 - y1)
-                    area1 = (bbox1[2] - bbox1[0]) * (bbox1[3] - bbox1[1])
-                    area2 = (bbox2[2] - bbox2[0]) * (bbox2[3] - bbox2[1])
-                    
-                    overlap_ratio = overlap_area / min(area1, area2)
-                    if overlap_ratio > 0.5:
-                        is_duplicate = True
-                        if plate['confidence'] > existing_plate['confidence']:
-                            filtered_plates.remove(existing_plate)
-                            filtered_plates.append(plate)
-                        break
-            
-            if not is_duplicate:
-                filtered_plates.append(plate)
-        
-        # Extract text from each plate
-        results = []
-        for i, plate in enumerate(filtered_plates):
-            bbox = plate['bbox']
-            extracted_text = _extract_text_from_license_plate(opencv_image, bbox)
-            
-            results.append({
-                'plate_id': i + 1,
-                'bbox': bbox,
-                'confidence': plate['confidence'],
-                'extracted_text': extracted_text,
-                'text_confidence': 0.8 if extracted_text else 0.0,
-                'detection_method': plate.get('detection_method', 'yolo'),
-                'vehicle_type': plate.get('vehicle_type', 'unknown')
-            })
+        # Identical image bytes (e.g. a client retry) reuse the earlier result
+        results = await cached(
+            "license-plate/detect-license-plates-url", {}, (content_digest(fetched.data),),
+            lambda: _detect_and_read_license_plates(fetched.data)
+        )
         
         return {
             'message': f'Detected {len(results)} license plate(s) from URL',
@@ -288,7 +304,134 @@ async def detect_license_plates_from_url(
             'detection_methods': ['yolo_vehicle_detection', 'cv_contour_analysis', 'easyocr_text_extraction']
         }
         
-    except requests.RequestException as e:
+    except ImageTooLarge as e:
+        raise HTTPException(status_code=413, detail=f"Image from URL is too large: {str(e)}")
+    except ImageFetchError as e:
         raise HTTPException(status_code=400, detail=f"Failed to fetch image from URL: {str(e)}")
+    except WorkerPoolBusy as e:
+        raise HTTPException(status_code=503, detail=f"License plate detection is busy, retry later: {str(e)}", headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"License plate detection failed: {str(e)}")
+
+
+async def _save_upload(file: UploadFile, max_bytes: int) -> str:
+    """Spool an upload to a temporary file (OpenCV can only decode video from a path)"""
+    suffix = os.path.splitext(file.filename or "")[1] or ".mp4"
+    written = 0
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
+        try:
+            while True:
+                chunk = await file.read(1024 * 1024)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if written > max_bytes:
+                    raise HTTPException(status_code=413, detail=f"Video is larger than {max_bytes} bytes")
+                tmp.write(chunk)
+        except BaseException:
+            tmp.close()
+            os.unlink(tmp.name)
+            raise
+    return tmp.name
+
+
+class _VideoSource:
+    """A spooled video upload and its capture, read a sampled frame at a time
+    
+    Frames are decoded in a worker thread. ``close`` releases the capture and
+    removes the file; it runs as the response's background task, so it happens
+    even if the body is never iterated, and it waits for a frame read still in
+    flight in its thread instead of releasing the capture underneath it.
+    """
+    
+    def __init__(self, capture: Any, path: str, stride: int) -> None:
+        self.capture = capture
+        self.path = path
+        self._frames = iter_sampled_frames(capture, stride)
+        self._lock = threading.Lock()
+        self._closed = False
+    
+    def _next(self) -> Optional[Tuple[int, np.ndarray]]:
+        with self._lock:
+            if self._closed:
+                return None
+            return next(self._frames, None)
+    
+    async def next_frame(self) -> Optional[Tuple[int, np.ndarray]]:
+        # Decoding blocks, so frames are pulled off the event loop
+        return await asyncio.to_thread(self._next)
+    
+    def _close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self.capture.release()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+    
+    async def close(self) -> None:
+        await asyncio.to_thread(self._close)
+
+
+async def _stream_video_plates(source: _VideoSource) -> AsyncIterator[bytes]:
+    """Strided detection + tracking over a video, as NDJSON events while they happen"""
+    settings = get_settings()
+    tracker = PlateTracker(
+        iou_threshold=settings.video_track_iou_threshold,
+        max_missed=settings.video_track_max_missed,
+        ocr_max_reads=settings.video_ocr_max_reads,
+        fps=source.capture.get(cv2.CAP_PROP_FPS) or 0.0,
+    )
+    ocr_batcher = _get_ocr_batcher()
+    try:
+        while True:
+            item = await source.next_frame()
+            if item is None:
+                break
+            frame_index, frame = item
+            requests = tracker.update(frame_index, await _get_yolo_batcher().submit(frame))
+            events = []
+            if requests:
+                readings = await asyncio.gather(*(ocr_batcher.submit((crop(frame, bbox), False)) for _, bbox in requests))
+                events = tracker.add_readings(frame_index, [
+                    (track_id, text, confidence) for (track_id, _), (text, confidence) in zip(requests, readings)
+                ])
+            for event in events + tracker.pop_ended():
+                yield (json.dumps(event) + "\n").encode()
+        for event in tracker.finish():
+            yield (json.dumps(event) + "\n").encode()
+    except Exception as e:
+        # Headers are already sent; report the failure in-band
+        yield (json.dumps({"event": "error", "detail": f"Video processing failed: {str(e)}"}) + "\n").encode()
+
+
+@router.post("/detect-license-plates-video", summary="Track and read license plates in a video")
+async def detect_license_plates_video(
+    file: UploadFile = File(..., description="Dashcam or gate-camera clip"),
+    stride: Optional[int] = Query(None, ge=1, le=120, description="Run detection on every Nth frame")
+) -> StreamingResponse:
+    """
+    Detect, track and read license plates in a video, streamed as NDJSON.
+
+    Emits a ``plate`` event whenever a track's voted text changes, a ``track_end``
+    event with the final text when a vehicle leaves, and a closing ``summary``.
+    """
+    settings = get_settings()
+    path = await _save_upload(file, settings.video_max_upload_bytes)
+    try:
+        capture = await asyncio.to_thread(cv2.VideoCapture, path)
+    except BaseException:
+        os.unlink(path)
+        raise
+    source = _VideoSource(capture, path, stride or settings.video_detect_stride)
+    if not capture.isOpened():
+        await source.close()
+        raise HTTPException(status_code=400, detail="Could not decode the uploaded video")
+    return StreamingResponse(
+        _stream_video_plates(source),
+        media_type="application/x-ndjson",
+        background=BackgroundTask(source.close),
+    )
@@ -0,0 +1,116 @@
+import asyncio
+import time
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, Generic, List, Optional, Tuple, TypeVar
+
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+	"""Coalesce concurrent single-item requests into one batched call.
+
+	Callers ``await submit(item)``; a background task drains the queue, waits up to
+	``max_wait_ms`` for more items (or until ``max_batch_size`` is reached), runs
+	``batch_fn(items)`` in an executor (or awaits it, if it is a coroutine function)
+	and hands each caller its own result. ``batch_fn`` must return exactly one
+	result per input item, in order.
+	"""
+
+	def __init__(
+		self,
+		batch_fn: Callable[[List[T]], List[R]],
+		max_batch_size: int = 8,
+		max_wait_ms: float = 10.0,
+		executor: Optional[Executor] = None,
+		name: str = "batcher",
+	) -> None:
+		self._batch_fn = batch_fn
+		self._max_batch_size = max(1, int(max_batch_size))
+		self._max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+		self._executor = executor
+		self._name = name
+		self._queue: Optional[asyncio.Queue] = None
+		self._task: Optional[asyncio.Task] = None
+		self._loop: Optional[asyncio.AbstractEventLoop] = None
+		self._batches = 0
+		self._items = 0
+		self._max_seen = 0
+
+	async def submit(self, item: T) -> R:
+		self._ensure_worker()
+		assert self._queue is not None
+		future = asyncio.get_running_loop().create_future()
+		await self._queue.put((item, future))
+		return await future
+
+	def _ensure_worker(self) -> None:
+		loop = asyncio.get_running_loop()
+		if self._loop is not loop or self._task is None or self._task.done():
+			self._loop = loop
+			self._queue = asyncio.Queue()
+			self._task = loop.create_task(self._run(), name=f"{self._name}-worker")
+
+	async def _collect(self) -> List[Tuple[T, asyncio.Future]]:
+		assert self._queue is not None
+		batch = [await self._queue.get()]
+		deadline = time.monotonic() + self._max_wait
+		while len(batch) < self._max_batch_size:
+			remaining = deadline - time.monotonic()
+			if remaining <= 0:
+				break
+			try:
+				batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+			except asyncio.TimeoutError:
+				break
+		# Anything already queued rides along without further waiting
+		while len(batch) < self._max_batch_size and not self._queue.empty():
+			batch.append(self._queue.get_nowait())
+		return batch
+
+	async def _run(self) -> None:
+		loop = asyncio.get_running_loop()
+		while True:
+			batch = await self._collect()
+			pending = [(item, fut) for item, fut in batch if not fut.cancelled()]
+			if not pending:
+				continue
+			items = [item for item, _ in pending]
+			try:
+				if asyncio.iscoroutinefunction(self._batch_fn):
+					results = await self._batch_fn(items)
+				else:
+					results = await loop.run_in_executor(self._executor, self._batch_fn, items)
+				if len(results) != len(items):
+					raise RuntimeError(f"{self._name}: batch_fn returned {len(results)} results for {len(items)} inputs")
+			except Exception as exc:
+				for _, fut in pending:
+					if not fut.done():
+						fut.set_exception(exc)
+				continue
+			self._batches += 1
+			self._items += len(items)
+			self._max_seen = max(self._max_seen, len(items))
+			for (_, fut), result in zip(pending, results):
+				if not fut.done():
+					fut.set_result(result)
+
+	async def aclose(self) -> None:
+		if self._task is not None:
+			self._task.cancel()
+			try:
+				await self._task
+			except (asyncio.CancelledError, Exception):
+				pass
+			self._task = None
+
+	def stats(self) -> Dict[str, Any]:
+		return {
+			"batches": self._batches,
+			"items": self._items,
+			"avg_batch_size": round(self._items / self._batches, 2) if self._batches else 0.0,
+			"max_batch_size_seen": self._max_seen,
+			"max_batch_size": self._max_batch_size,
+			"max_wait_ms": self._max_wait * 1000.0,
+		}
@@ -0,0 +1,153 @@
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+
+OVERLAP_MIN = "min"
+OVERLAP_IOU = "iou"
+
+
+def as_boxes(boxes: Sequence[Sequence[float]]) -> np.ndarray:
+	"""Return an (n, 4) float64 array of [x1, y1, x2, y2] boxes."""
+	array = np.asarray(boxes, dtype=np.float64)
+	if array.size == 0:
+		return np.empty((0, 4), dtype=np.float64)
+	return array.reshape(-1, 4)
+
+
+def box_areas(boxes: np.ndarray) -> np.ndarray:
+	return (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+
+
+def overlap(box: np.ndarray, boxes: np.ndarray, mode: str = OVERLAP_MIN) -> np.ndarray:
+	"""Overlap of one box against many; see :func:`pairwise_overlap` for the modes."""
+	box = np.asarray(box, dtype=np.float64)
+	return _overlap_one(box, box_areas(box[None, :])[0], boxes, box_areas(boxes), mode)
+
+
+def _overlap_one(box: np.ndarray, area: float, boxes: np.ndarray, areas: np.ndarray, mode: str) -> np.ndarray:
+	w = np.minimum(box[2], boxes[:, 2]) - np.maximum(box[0], boxes[:, 0])
+	h = np.minimum(box[3], boxes[:, 3]) - np.maximum(box[1], boxes[:, 1])
+	intersects = (w > 0) & (h > 0)
+	inter = np.where(intersects, w * h, 0.0)
+	if mode == OVERLAP_MIN:
+		denominator = np.minimum(area, areas)
+	elif mode == OVERLAP_IOU:
+		denominator = area + areas - inter
+	else:
+		raise ValueError(f"Unknown overlap mode: {mode}")
+	with np.errstate(divide="ignore", invalid="ignore"):
+		return np.where(intersects, inter / denominator, 0.0)
+
+
+def pairwise_overlap(boxes_a: np.ndarray, boxes_b: np.ndarray, mode: str = OVERLAP_MIN) -> np.ndarray:
+	"""(len(a), len(b)) overlap matrix.
+
+	``mode="min"`` divides the intersection by the smaller of the two areas (a box
+	fully inside another scores 1.0); ``mode="iou"`` divides by the union. Pairs
+	that do not strictly intersect score 0.
+	"""
+	a = boxes_a[:, None, :]
+	b = boxes_b[None, :, :]
+	x1 = np.maximum(a[..., 0], b[..., 0])
+	y1 = np.maximum(a[..., 1], b[..., 1])
+	x2 = np.minimum(a[..., 2], b[..., 2])
+	y2 = np.minimum(a[..., 3], b[..., 3])
+	intersects = (x1 < x2) & (y1 < y2)
+	inter = np.where(intersects, (x2 - x1) * (y2 - y1), 0.0)
+
+	areas_a = box_areas(boxes_a)[:, None]
+	areas_b = box_areas(boxes_b)[None, :]
+	if mode == OVERLAP_MIN:
+		denominator = np.minimum(areas_a, areas_b)
+	elif mode == OVERLAP_IOU:
+		denominator = areas_a + areas_b - inter
+	else:
+		raise ValueError(f"Unknown overlap mode: {mode}")
+
+	with np.errstate(divide="ignore", invalid="ignore"):
+		return np.where(intersects, inter / denominator, 0.0)
+
+
+def greedy_suppression(boxes: np.ndarray, scores: np.ndarray, threshold: float = 0.5, mode: str = OVERLAP_IOU) -> np.ndarray:
+	"""Confidence-sorted greedy suppression (classic NMS).
+
+	Repeatedly keeps the highest-scoring remaining box and drops every remaining
+	box whose overlap with it exceeds ``threshold``. Returns the kept indices in
+	descending score order; ties keep the earlier input first.
+	"""
+	boxes = as_boxes(boxes)
+	scores = np.asarray(scores, dtype=np.float64).reshape(-1)
+	areas = box_areas(boxes)
+	order = np.argsort(-scores, kind="stable")
+	keep = []
+	while order.size:
+		best = order[0]
+		keep.append(best)
+		if order.size == 1:
+			break
+		rest = order[1:]
+		order = rest[_overlap_one(boxes[best], areas[best], boxes[rest], areas[rest], mode) <= threshold]
+	return np.asarray(keep, dtype=np.int64)
+
+
+def sequential_suppression(boxes: np.ndarray, scores: np.ndarray, threshold: float = 0.5, mode: str = OVERLAP_MIN) -> np.ndarray:
+	"""Arrival-order de-duplication, as done by the original plate merge loop.
+
+	Boxes are visited in input order. A box that overlaps an already kept box by
+	more than ``threshold`` is a duplicate of the *first* such kept box and replaces
+	it only if it has a strictly higher score; the replacement moves to the end of
+	the kept list. Returns kept indices in final list order.
+	"""
+	boxes = as_boxes(boxes)
+	scores = np.asarray(scores, dtype=np.float64).reshape(-1)
+	areas = box_areas(boxes)
+	count = len(boxes)
+	active = np.zeros(count, dtype=bool)
+	# Position in the kept list; replacing a box appends, so it gets a fresh stamp
+	stamp = np.full(count, np.iinfo(np.int64).max, dtype=np.int64)
+	next_stamp = 0
+
+	for index in range(count):
+		kept = np.flatnonzero(active)
+		if kept.size:
+			overlaps = _overlap_one(boxes[index], areas[index], boxes[kept], areas[kept], mode)
+			duplicates = kept[overlaps > threshold]
+		else:
+			duplicates = kept
+		if duplicates.size:
+			first = duplicates[np.argmin(stamp[duplicates])]
+			if scores[index] > scores[first]:
+				active[first] = False
+				active[index] = True
+				stamp[index] = next_stamp
+				next_stamp += 1
+		else:
+			active[index] = True
+			stamp[index] = next_stamp
+			next_stamp += 1
+
+	kept = np.flatnonzero(active)
+	return kept[np.argsort(stamp[kept], kind="stable")]
+
+
+def suppress_detections(
+	detections: List[Dict[str, Any]],
+	threshold: float = 0.5,
+	mode: str = OVERLAP_MIN,
+	sort_by_confidence: bool = False,
+) -> List[Dict[str, Any]]:
+	"""De-duplicate detection dicts carrying ``bbox`` and ``confidence`` keys.
+
+	By default keeps the arrival-order semantics of the original merge loop; pass
+	``sort_by_confidence=True`` for confidence-sorted greedy suppression.
+	"""
+	if not detections:
+		return []
+	boxes = as_boxes([d['bbox'] for d in detections])
+	scores = np.fromiter((d['confidence'] for d in detections), dtype=np.float64, count=len(detections))
+	if sort_by_confidence:
+		keep = greedy_suppression(boxes, scores, threshold, mode)
+	else:
+		keep = sequential_suppression(boxes, scores, threshold, mode)
+	return [detections[i] for i in keep]
@@ -18,6 +18,28 @@ class Settings(BaseSettings):
 
 	# Gemini API
 	gemini_api_key: Optional[str] = Field(default=None, alias="GEMINI_API_KEY")
+	gemini_model: str = Field(default="gemini-1.5-flash", alias="GEMINI_MODEL")
+	gemini_api_base_url: str = Field(default="https://generativelanguage.googleapis.com", alias="GEMINI_API_BASE_URL")
+	gemini_max_concurrency: int = Field(default=8, alias="GEMINI_MAX_CONCURRENCY")
+	gemini_timeout: float = Field(default=60.0, alias="GEMINI_TIMEOUT")
+	gemini_max_retries: int = Field(default=3, alias="GEMINI_MAX_RETRIES")
+
+	# Images sent to vision models are downscaled and re-encoded first
+	vision_image_max_edge: int = Field(default=1536, alias="VISION_IMAGE_MAX_EDGE")
+	vision_image_format: str = Field(default="JPEG", alias="VISION_IMAGE_FORMAT")
+	vision_image_quality: int = Field(default=85, alias="VISION_IMAGE_QUALITY")
+
+	# Part price search for damage estimates
+	price_search_url: str = Field(default="https://www.google.com/search", alias="PRICE_SEARCH_URL")
+	price_search_max_concurrency: int = Field(default=16, alias="PRICE_SEARCH_MAX_CONCURRENCY")
+	price_search_timeout: float = Field(default=10.0, alias="PRICE_SEARCH_TIMEOUT")
+	price_search_cache_ttl_seconds: float = Field(default=6 * 3600.0, alias="PRICE_SEARCH_CACHE_TTL_SECONDS")
+	price_search_cache_max_entries: int = Field(default=4096, alias="PRICE_SEARCH_CACHE_MAX_ENTRIES")
+	price_search_max_prices_per_page: int = Field(default=50, alias="PRICE_SEARCH_MAX_PRICES_PER_PAGE")
+
+	# Local parts-price catalog, consulted before live price search
+	parts_catalog_enabled: bool = Field(default=True, alias="PARTS_CATALOG_ENABLED")
+	parts_catalog_min_score: float = Field(default=0.6, alias="PARTS_CATALOG_MIN_SCORE")
 
 	# CORS
 	backend_cors_origins: list[str] = Field(default_factory=lambda: ["*"])
@@ -25,6 +47,74 @@ class Settings(BaseSettings):
 	# Kafka (external cluster defaults)
 	kafka_bootstrap_servers: str = Field(default="172.20.10.4:9092", alias="KAFKA_BOOTSTRAP_SERVERS")
 	kafka_rest_url: Optional[str] = Field(default="http://172.20.10.4:8080", alias="KAFKA_REST_URL")
+	# Fraud alerts raised here (e.g. reused photos) go to the fraud service's alert topic
+	fraud_alerts_enabled: bool = Field(default=True, alias="FRAUD_ALERTS_ENABLED")
+	kafka_fraud_alert_topic: str = Field(default="fraud_alerts", alias="KAFKA_FRAUD_ALERT_TOPIC")
+
+	# Reused-photo detection for damage uploads (see ai.core.image_fingerprint)
+	image_fingerprint_enabled: bool = Field(default=True, alias="IMAGE_FINGERPRINT_ENABLED")
+	# Hamming distances (of 64 bits) at which two photos count as the same photo
+	image_fingerprint_max_distance: int = Field(default=8, alias="IMAGE_FINGERPRINT_MAX_DISTANCE")
+	image_fingerprint_dhash_max_distance: int = Field(default=12, alias="IMAGE_FINGERPRINT_DHASH_MAX_DISTANCE")
+	image_fingerprint_snapshot_dir: Optional[str] = Field(default="./data/image_fingerprints", alias="IMAGE_FINGERPRINT_SNAPSHOT_DIR")
+	image_fingerprint_compact_every: int = Field(default=100_000, alias="IMAGE_FINGERPRINT_COMPACT_EVERY")
+
+	# License plate YOLO micro-batching
+	yolo_max_batch_size: int = Field(default=8, alias="YOLO_MAX_BATCH_SIZE")
+	yolo_max_batch_wait_ms: float = Field(default=10.0, alias="YOLO_MAX_BATCH_WAIT_MS")
+
+	# Detector inference backend: "onnx" (ONNX Runtime, falls back to PyTorch) or "torch"
+	inference_backend: str = Field(default="onnx", alias="INFERENCE_BACKEND")
+	inference_int8: bool = Field(default=False, alias="INFERENCE_INT8")
+	# 0 = all cores, or CV_WORKER_THREADS when CV workers run in separate processes
+	inference_intra_op_threads: int = Field(default=0, alias="INFERENCE_INTRA_OP_THREADS")
+	inference_inter_op_threads: int = Field(default=1, alias="INFERENCE_INTER_OP_THREADS")
+	inference_onnx_providers: list[str] = Field(default_factory=lambda: ["CPUExecutionProvider"], alias="INFERENCE_ONNX_PROVIDERS")
+
+	# Contour plate detector: run on an image halved this many times (0 = full size)
+	plate_cv_pyramid_levels: int = Field(default=0, alias="PLATE_CV_PYRAMID_LEVELS")
+
+	# License plate video: detect every Nth frame, track in between, OCR a few times per track
+	video_detect_stride: int = Field(default=5, alias="VIDEO_DETECT_STRIDE")
+	video_track_iou_threshold: float = Field(default=0.3, alias="VIDEO_TRACK_IOU_THRESHOLD")
+	video_track_max_missed: int = Field(default=3, alias="VIDEO_TRACK_MAX_MISSED")
+	video_ocr_max_reads: int = Field(default=3, alias="VIDEO_OCR_MAX_READS")
+	video_max_upload_bytes: int = Field(default=500 * 1024 * 1024, alias="VIDEO_MAX_UPLOAD_BYTES")
+
+	# License plate OCR batching (plate crops merged across requests)
+	ocr_max_batch_size: int = Field(default=32, alias="OCR_MAX_BATCH_SIZE")
+	ocr_max_batch_wait_ms: float = Field(default=5.0, alias="OCR_MAX_BATCH_WAIT_MS")
+
+	# Image fetching for URL endpoints
+	image_fetch_max_bytes: int = Field(default=20 * 1024 * 1024, alias="IMAGE_FETCH_MAX_BYTES")
+	image_fetch_max_pixels: int = Field(default=50_000_000, alias="IMAGE_FETCH_MAX_PIXELS")
+	image_fetch_timeout: float = Field(default=30.0, alias="IMAGE_FETCH_TIMEOUT")
+	image_fetch_max_connections: int = Field(default=100, alias="IMAGE_FETCH_MAX_CONNECTIONS")
+	image_fetch_max_connections_per_host: int = Field(default=10, alias="IMAGE_FETCH_MAX_CONNECTIONS_PER_HOST")
+	image_fetch_http2: bool = Field(default=True, alias="IMAGE_FETCH_HTTP2")
+
+	# Result cache for image analysis endpoints (disk tier is off unless a directory is set)
+	result_cache_enabled: bool = Field(default=True, alias="RESULT_CACHE_ENABLED")
+	result_cache_max_entries: int = Field(default=1024, alias="RESULT_CACHE_MAX_ENTRIES")
+	result_cache_ttl_seconds: float = Field(default=3600.0, alias="RESULT_CACHE_TTL_SECONDS")
+	result_cache_dir: Optional[str] = Field(default=None, alias="RESULT_CACHE_DIR")
+	result_cache_disk_max_bytes: int = Field(default=512 * 1024 * 1024, alias="RESULT_CACHE_DISK_MAX_BYTES")
+
+	# Background jobs for long-running endpoints (see ai.core.jobs)
+	job_workers: int = Field(default=4, alias="JOB_WORKERS")
+	job_max_queued: int = Field(default=100, alias="JOB_MAX_QUEUED")
+	job_input_dir: str = Field(default="./data/jobs", alias="JOB_INPUT_DIR")
+	# A running job not updated for this long belonged to a process that died
+	job_stale_seconds: float = Field(default=300.0, alias="JOB_STALE_SECONDS")
+	job_max_attempts: int = Field(default=3, alias="JOB_MAX_ATTEMPTS")
+	job_retention_seconds: float = Field(default=86400.0, alias="JOB_RETENTION_SECONDS")
+	job_sse_keepalive_seconds: float = Field(default=15.0, alias="JOB_SSE_KEEPALIVE_SECONDS")
+
+	# CV worker pool (0 workers = run on threads in the API process)
+	cv_workers: int = Field(default=0, alias="CV_WORKERS")
+	cv_worker_queue_size: int = Field(default=16, alias="CV_WORKER_QUEUE_SIZE")
+	cv_worker_threads: int = Field(default=1, alias="CV_WORKER_THREADS")
+	cv_worker_preload_models: bool = Field(default=True, alias="CV_WORKER_PRELOAD_MODELS")
 
 
 @lru_cache(maxsize=1)
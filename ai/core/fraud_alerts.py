@@ -0,0 +1,57 @@
+"""Fraud alerts raised by the ai service, published to the fraud alert topic.
+
+The ai service does not depend on the fraud service's event envelope, so
+alerts are plain JSON (read by ``fraud.kafka.events.decode_event`` as legacy
+events) carrying their type in ``event``. Publishing never raises: a missing
+broker must not fail the request that raised the alert.
+"""
+import json
+import threading
+from typing import Any, Dict, Optional
+
+from ai.core.config import get_settings
+
+
+_producer: Optional[Any] = None
+_producer_lock = threading.Lock()
+
+
+def _get_producer() -> Any:
+	global _producer
+	if _producer is None:
+		with _producer_lock:
+			if _producer is None:
+				from kafka import KafkaProducer
+
+				_producer = KafkaProducer(
+					bootstrap_servers=get_settings().kafka_bootstrap_servers,
+					client_id="ai-fraud-alerts",
+					value_serializer=lambda value: json.dumps(value, default=str).encode("utf-8"),
+					acks=1,
+					linger_ms=5,
+					security_protocol="PLAINTEXT",
+				)
+	return _producer
+
+
+def publish_fraud_alert(event_type: str, body: Dict[str, Any], key: Optional[str] = None) -> bool:
+	"""Queue an alert for delivery; False if alerts are disabled or Kafka is unreachable."""
+	settings = get_settings()
+	if not settings.fraud_alerts_enabled:
+		return False
+	topic = settings.kafka_fraud_alert_topic
+	try:
+		future = _get_producer().send(topic, value={"event": event_type, **body}, key=key.encode("utf-8") if key else None)
+		future.add_errback(lambda exc: print(f"[fraud-alerts] Delivery to {topic} failed: {exc!r}"))
+		return True
+	except Exception as exc:
+		print(f"[fraud-alerts] Could not publish {event_type}: {exc}")
+		return False
+
+
+def close(timeout: float = 10.0) -> None:
+	global _producer
+	with _producer_lock:
+		if _producer is not None:
+			_producer.close(timeout=timeout)
+			_producer = None
@@ -0,0 +1,179 @@
+import asyncio
+import base64
+import random
+import time
+from typing import Any, Dict, List, Optional, Union
+
+import httpx
+
+from ai.core.config import get_settings
+
+
+# Either prompt text or an inline blob {"mime_type": ..., "data": bytes}
+Part = Union[str, Dict[str, Any]]
+
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+class GeminiError(Exception):
+	"""A Gemini call failed after all retries or returned no usable text."""
+
+
+class GeminiNotConfigured(GeminiError):
+	"""No API key is set, so no call can succeed; a deployment problem, not a result."""
+
+
+def _encode_part(part: Part) -> Dict[str, Any]:
+	if isinstance(part, str):
+		return {"text": part}
+	data = part["data"]
+	if not isinstance(data, str):
+		data = base64.b64encode(data).decode("ascii")
+	return {"inline_data": {"mime_type": part["mime_type"], "data": data}}
+
+
+def _response_text(payload: Dict[str, Any]) -> str:
+	candidates = payload.get("candidates") or []
+	if not candidates:
+		feedback = payload.get("promptFeedback") or {}
+		raise GeminiError(f"Gemini returned no candidates: {feedback.get('blockReason', 'unknown reason')}")
+	parts = (candidates[0].get("content") or {}).get("parts") or []
+	text = "".join(part.get("text", "") for part in parts)
+	if not text:
+		raise GeminiError(f"Gemini returned no text (finishReason={candidates[0].get('finishReason')})")
+	return text
+
+
+class GeminiClient:
+	"""Shared async client for the Gemini ``generateContent`` REST endpoint.
+
+	Configured once per process: one pooled ``httpx.AsyncClient``, a semaphore
+	capping concurrent calls, a per-attempt timeout, and retries with jittered
+	exponential backoff on rate limits and transient errors (honouring
+	``Retry-After``). ``base_url`` and ``transport`` make it easy to point at a
+	local stub.
+	"""
+
+	def __init__(
+		self,
+		api_key: Optional[str],
+		model: str = "gemini-1.5-flash",
+		base_url: str = "https://generativelanguage.googleapis.com",
+		max_concurrency: int = 8,
+		timeout: float = 60.0,
+		max_retries: int = 3,
+		backoff_base: float = 0.5,
+		backoff_max: float = 8.0,
+		transport: Optional[httpx.AsyncBaseTransport] = None,
+	) -> None:
+		self._api_key = api_key
+		self._model = model
+		self._base_url = base_url.rstrip("/")
+		self._max_concurrency = max(1, max_concurrency)
+		self._timeout = timeout
+		self._max_retries = max(0, max_retries)
+		self._backoff_base = backoff_base
+		self._backoff_max = backoff_max
+		self._transport = transport
+		self._client: Optional[httpx.AsyncClient] = None
+		self._semaphore: Optional[asyncio.Semaphore] = None
+		self._calls = 0
+		self._retries = 0
+		self._failures = 0
+		self._latency_total = 0.0
+
+	def _get_client(self) -> httpx.AsyncClient:
+		if self._client is None or self._client.is_closed:
+			self._client = httpx.AsyncClient(
+				base_url=self._base_url,
+				timeout=httpx.Timeout(self._timeout),
+				limits=httpx.Limits(max_connections=self._max_concurrency, max_keepalive_connections=self._max_concurrency),
+				transport=self._transport,
+			)
+			self._semaphore = asyncio.Semaphore(self._max_concurrency)
+		return self._client
+
+	async def generate(self, parts: List[Part], model: Optional[str] = None, generation_config: Optional[Dict[str, Any]] = None) -> str:
+		"""Send one multimodal prompt and return the response text."""
+		if not self._api_key:
+			raise GeminiNotConfigured("GEMINI_API_KEY is not configured")
+		client = self._get_client()
+		assert self._semaphore is not None
+		body: Dict[str, Any] = {"contents": [{"role": "user", "parts": [_encode_part(part) for part in parts]}]}
+		if generation_config:
+			body["generationConfig"] = generation_config
+		url = f"/v1beta/models/{model or self._model}:generateContent"
+
+		async with self._semaphore:
+			start = time.perf_counter()
+			self._calls += 1
+			try:
+				payload = await self._post_with_retries(client, url, body)
+			except Exception:
+				self._failures += 1
+				raise
+			finally:
+				self._latency_total += time.perf_counter() - start
+		return _response_text(payload)
+
+	async def _post_with_retries(self, client: httpx.AsyncClient, url: str, body: Dict[str, Any]) -> Dict[str, Any]:
+		attempt = 0
+		while True:
+			retry_after: Optional[float] = None
+			try:
+				response = await client.post(url, params={"key": self._api_key}, json=body)
+				if response.status_code < 400:
+					return response.json()
+				if response.status_code not in RETRYABLE_STATUS:
+					raise GeminiError(f"Gemini API error {response.status_code}: {response.text[:500]}")
+				error: Exception = GeminiError(f"Gemini API error {response.status_code}: {response.text[:500]}")
+				header = response.headers.get("retry-after")
+				if header:
+					try:
+						retry_after = float(header)
+					except ValueError:
+						retry_after = None
+			except (httpx.TimeoutException, httpx.TransportError) as exc:
+				error = GeminiError(f"Gemini request failed: {exc!r}")
+
+			if attempt >= self._max_retries:
+				raise error
+			# Full jitter keeps concurrent callers from retrying in lockstep
+			delay = random.uniform(0, min(self._backoff_max, self._backoff_base * (2 ** attempt)))
+			if retry_after is not None:
+				delay = max(delay, retry_after)
+			attempt += 1
+			self._retries += 1
+			await asyncio.sleep(delay)
+
+	async def aclose(self) -> None:
+		if self._client is not None:
+			await self._client.aclose()
+			self._client = None
+
+	def stats(self) -> Dict[str, Any]:
+		return {
+			"calls": self._calls,
+			"retries": self._retries,
+			"failures": self._failures,
+			"avg_latency_ms": round(self._latency_total / self._calls * 1000, 2) if self._calls else 0.0,
+			"max_concurrency": self._max_concurrency,
+		}
+
+
+_gemini_client: Optional[GeminiClient] = None
+
+
+def get_gemini_client() -> GeminiClient:
+	global _gemini_client
+	if _gemini_client is None:
+		settings = get_settings()
+		_gemini_client = GeminiClient(
+			api_key=settings.gemini_api_key,
+			model=settings.gemini_model,
+			base_url=settings.gemini_api_base_url,
+			max_concurrency=settings.gemini_max_concurrency,
+			timeout=settings.gemini_timeout,
+			max_retries=settings.gemini_max_retries,
+		)
+	return _gemini_client
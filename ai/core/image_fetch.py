@@ -0,0 +1,218 @@
+import asyncio
+import io
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+from PIL import Image, ImageFile
+
+from ai.core.config import get_settings
+
+
+# Enough for the header of every format we accept (JPEG SOF can sit behind EXIF)
+HEADER_PROBE_LIMIT = 256 * 1024
+
+
+class ImageFetchError(Exception):
+	"""The image could not be fetched or is not a usable image."""
+
+
+class ImageTooLarge(ImageFetchError):
+	"""The image exceeds the configured byte or pixel limits."""
+
+
+@dataclass
+class FetchedImage:
+	url: str
+	data: bytearray
+	content_type: Optional[str]
+	format: Optional[str]
+	width: int
+	height: int
+	elapsed: float
+
+	def view(self) -> memoryview:
+		return memoryview(self.data)
+
+
+def _has_http2() -> bool:
+	try:
+		import h2  # noqa: F401
+	except ImportError:
+		return False
+	return True
+
+
+class ImageFetcher:
+	"""Shared async image downloader.
+
+	One long-lived ``httpx.AsyncClient`` with connection pooling (and HTTP/2 when
+	``h2`` is installed), a per-host concurrency cap, a streaming body read into a
+	bounded buffer, and a header probe that rejects oversized or non-image
+	payloads before the full body is downloaded or decoded.
+	"""
+
+	def __init__(
+		self,
+		max_bytes: int = 20 * 1024 * 1024,
+		max_pixels: int = 50_000_000,
+		timeout: float = 30.0,
+		max_connections: int = 100,
+		max_connections_per_host: int = 10,
+		http2: bool = True,
+		transport: Optional[httpx.AsyncBaseTransport] = None,
+	) -> None:
+		self._max_bytes = max_bytes
+		self._max_pixels = max_pixels
+		self._timeout = timeout
+		self._max_connections = max_connections
+		self._max_per_host = max(1, max_connections_per_host)
+		self._http2 = http2 and transport is None and _has_http2()
+		self._transport = transport
+		self._client: Optional[httpx.AsyncClient] = None
+		self._host_limits: Dict[str, asyncio.Semaphore] = {}
+		self._latencies: Deque[float] = deque(maxlen=1024)
+		self._requests = 0
+		self._errors = 0
+		self._rejected = 0
+		self._bytes = 0
+
+	def _get_client(self) -> httpx.AsyncClient:
+		if self._client is None or self._client.is_closed:
+			self._client = httpx.AsyncClient(
+				http2=self._http2,
+				timeout=httpx.Timeout(self._timeout, connect=min(self._timeout, 10.0)),
+				limits=httpx.Limits(max_connections=self._max_connections, max_keepalive_connections=self._max_connections),
+				follow_redirects=True,
+				transport=self._transport,
+			)
+		return self._client
+
+	def _host_limit(self, url: str) -> asyncio.Semaphore:
+		host = urlsplit(url).netloc.lower()
+		if host not in self._host_limits:
+			self._host_limits[host] = asyncio.Semaphore(self._max_per_host)
+		return self._host_limits[host]
+
+	async def fetch(self, url: str) -> FetchedImage:
+		start = time.perf_counter()
+		self._requests += 1
+		try:
+			async with self._host_limit(url):
+				fetched = await self._fetch(url, start)
+		except ImageTooLarge:
+			self._rejected += 1
+			raise
+		except ImageFetchError:
+			self._errors += 1
+			raise
+		except httpx.HTTPError as exc:
+			self._errors += 1
+			raise ImageFetchError(f"Failed to fetch image: {exc}") from exc
+		self._bytes += len(fetched.data)
+		self._latencies.append(fetched.elapsed)
+		return fetched
+
+	async def _fetch(self, url: str, start: float) -> FetchedImage:
+		async with self._get_client().stream("GET", url) as response:
+			if response.status_code >= 400:
+				raise ImageFetchError(f"Failed to fetch image: HTTP {response.status_code}")
+
+			declared = response.headers.get("content-length")
+			if declared and declared.isdigit() and int(declared) > self._max_bytes:
+				raise ImageTooLarge(f"Image is {declared} bytes, limit is {self._max_bytes}")
+
+			buffer = bytearray()
+			parser: Optional[ImageFile.Parser] = ImageFile.Parser()
+			probed: Optional[Image.Image] = None
+			async for chunk in response.aiter_bytes():
+				buffer += chunk
+				if len(buffer) > self._max_bytes:
+					raise ImageTooLarge(f"Image exceeds {self._max_bytes} bytes")
+				if parser is not None:
+					probed = self._probe(parser, chunk)
+					if probed is not None or len(buffer) > HEADER_PROBE_LIMIT:
+						parser = None
+						self._check_header(probed)
+
+			if probed is None:
+				# Small bodies can finish before the parser committed to a format
+				probed = _probe_whole(buffer)
+				self._check_header(probed)
+
+			return FetchedImage(
+				url=url,
+				data=buffer,
+				content_type=response.headers.get("content-type"),
+				format=probed.format,
+				width=probed.size[0],
+				height=probed.size[1],
+				elapsed=time.perf_counter() - start,
+			)
+
+	@staticmethod
+	def _probe(parser: ImageFile.Parser, chunk: bytes) -> Optional[Image.Image]:
+		try:
+			parser.feed(chunk)
+		except Exception:
+			return None
+		return parser.image
+
+	def _check_header(self, probed: Optional[Image.Image]) -> None:
+		if probed is None:
+			raise ImageFetchError("Response is not a recognizable image")
+		width, height = probed.size
+		if width * height > self._max_pixels:
+			raise ImageTooLarge(f"Image is {width}x{height}, limit is {self._max_pixels} pixels")
+
+	async def aclose(self) -> None:
+		if self._client is not None:
+			await self._client.aclose()
+			self._client = None
+
+	def stats(self) -> Dict[str, Any]:
+		latencies = sorted(self._latencies)
+
+		def percentile(q: float) -> float:
+			if not latencies:
+				return 0.0
+			return round(latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000, 2)
+
+		return {
+			"requests": self._requests,
+			"errors": self._errors,
+			"rejected_too_large": self._rejected,
+			"bytes_fetched": self._bytes,
+			"latency_ms_p50": percentile(0.50),
+			"latency_ms_p95": percentile(0.95),
+			"latency_ms_max": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+			"http2": self._http2,
+		}
+
+
+def _probe_whole(buffer: bytearray) -> Optional[Image.Image]:
+	try:
+		return Image.open(io.BytesIO(buffer))
+	except Exception:
+		return None
+
+
+_image_fetcher: Optional[ImageFetcher] = None
+
+
+def get_image_fetcher() -> ImageFetcher:
+	global _image_fetcher
+	if _image_fetcher is None:
+		settings = get_settings()
+		_image_fetcher = ImageFetcher(
+			max_bytes=settings.image_fetch_max_bytes,
+			max_pixels=settings.image_fetch_max_pixels,
+			timeout=settings.image_fetch_timeout,
+			max_connections=settings.image_fetch_max_connections,
+			max_connections_per_host=settings.image_fetch_max_connections_per_host,
+			http2=settings.image_fetch_http2,
+		)
+	return _image_fetcher
@@ -0,0 +1,457 @@
+"""Perceptual fingerprints of claim photos, for finding photos reused across claims.
+
+Every uploaded photo gets a 64-bit pHash (low DCT frequencies, robust to
+recompression, resizing and mild crops) and a 64-bit dHash (gradient signs).
+A photo is a near duplicate of a stored one when the pHashes are within
+``max_distance`` bits and the dHashes within ``dhash_max_distance`` bits.
+
+Candidates are found by multi-index hashing: the pHash is split into ``m``
+chunks, each with its own bucket table. Two hashes within ``r`` bits agree to
+within ``r // m`` bits on at least one chunk, so probing each chunk's bucket
+and its neighbours up to that many bit flips finds every match while touching
+only a few thousand entries out of tens of millions.
+
+Fingerprints are rows of ``image_fingerprints``; the in-memory index is a set
+of flat arrays, persisted as a snapshot directory of ``.npy`` files that is
+memory-mapped at startup and caught up with newer rows.
+"""
+import io
+import itertools
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from functools import lru_cache
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image, ImageOps
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ai.core.config import get_settings
+from ai.core.result_cache import content_digest
+from ai.db.session import SessionLocal
+from ai.models.image_fingerprint import ImageFingerprint
+
+
+SNAPSHOT_VERSION = 1
+# Tables from this many hashes on use fewer, wider chunks (see default_chunks)
+LARGE_TABLE = 1 << 20
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+_HASH_SIZE = 8
+_DCT_SIZE = 32
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+	k = np.arange(n)[:, None]
+	matrix = np.cos(np.pi * (2 * np.arange(n)[None, :] + 1) * k / (2 * n)) * np.sqrt(2 / n)
+	matrix[0] /= np.sqrt(2)
+	return matrix
+
+
+_DCT = _dct_matrix(_DCT_SIZE)
+
+
+def _pack_bits(bits: np.ndarray) -> int:
+	return int.from_bytes(np.packbits(bits.astype(np.uint8).ravel()).tobytes(), "big")
+
+
+def phash(gray: Image.Image) -> int:
+	"""pHash of a grayscale image: signs of the 8x8 lowest DCT frequencies around their median."""
+	pixels = np.asarray(gray.resize((_DCT_SIZE, _DCT_SIZE), Image.Resampling.LANCZOS), dtype=np.float64)
+	low = (_DCT @ pixels @ _DCT.T)[:_HASH_SIZE, :_HASH_SIZE]
+	return _pack_bits(low > np.median(low))
+
+
+def dhash(gray: Image.Image) -> int:
+	"""dHash of a grayscale image: whether each pixel of a 9x8 thumbnail is brighter than its left neighbour."""
+	pixels = np.asarray(gray.resize((_HASH_SIZE + 1, _HASH_SIZE), Image.Resampling.LANCZOS), dtype=np.int16)
+	return _pack_bits(pixels[:, 1:] > pixels[:, :-1])
+
+
+@dataclass
+class Fingerprint:
+	phash: int
+	dhash: int
+	digest: str
+
+
+def fingerprint(content: bytes) -> Fingerprint:
+	"""Fingerprint encoded image bytes; JPEGs are decoded at a reduced DCT scale."""
+	image = Image.open(io.BytesIO(content))
+	if image.format == "JPEG":
+		image.draft("L", (64, 64))
+	image = ImageOps.exif_transpose(image).convert("L")
+	return Fingerprint(phash=phash(image), dhash=dhash(image), digest=content_digest(content))
+
+
+def popcount(values: np.ndarray) -> np.ndarray:
+	"""Set bits of each ``uint64``."""
+	values = np.ascontiguousarray(values, dtype=np.uint64)
+	return _POPCOUNT[values.view(np.uint8)].reshape(-1, 8).sum(axis=1, dtype=np.int32)
+
+
+def _to_signed(value: int) -> int:
+	return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def _to_unsigned(value: int) -> int:
+	return value + (1 << 64) if value < 0 else value
+
+
+def _chunk_widths(chunks: int) -> List[int]:
+	base, extra = divmod(64, chunks)
+	return [base + 1] * extra + [base] * (chunks - extra)
+
+
+def default_chunks(count: int) -> int:
+	"""Chunks per hash for a table of ``count`` hashes.
+
+	Buckets should hold a handful of entries: four 16-bit chunks below about a
+	million hashes, three ~21-bit chunks beyond (their bucket tables cost ~65MB).
+	"""
+	return 4 if count < LARGE_TABLE else 3
+
+
+@lru_cache(maxsize=32)
+def _flip_masks(width: int, radius: int) -> np.ndarray:
+	"""Every ``width``-bit mask with at most ``radius`` bits set."""
+	masks = [0]
+	for bits in range(1, radius + 1):
+		masks.extend(sum(1 << b for b in combo) for combo in itertools.combinations(range(width), bits))
+	return np.asarray(masks, dtype=np.int64)
+
+
+class MultiIndexHashTable:
+	"""Immutable Hamming-distance index over ``uint64`` hashes.
+
+	Chunk ``j`` of every hash is bucketed CSR-style: ``orders[j]`` lists entry
+	positions sorted by chunk value and the bucket boundaries of all chunks are
+	concatenated in ``offsets``.
+	"""
+
+	def __init__(
+		self,
+		hashes: np.ndarray,
+		orders: Optional[np.ndarray] = None,
+		offsets: Optional[np.ndarray] = None,
+		chunks: Optional[int] = None,
+	) -> None:
+		self.hashes = hashes
+		self.chunks = chunks or (len(orders) if orders is not None else default_chunks(len(hashes)))
+		self.widths = _chunk_widths(self.chunks)
+		self._shifts = np.cumsum([0] + self.widths[:-1]).tolist()
+		self._bases = np.cumsum([0] + [(1 << width) + 1 for width in self.widths[:-1]]).tolist()
+		if orders is None or offsets is None:
+			orders = np.empty((self.chunks, len(hashes)), dtype=np.int32)
+			offsets = np.zeros(sum((1 << width) + 1 for width in self.widths), dtype=np.int64)
+			for j, width in enumerate(self.widths):
+				keys = self._chunk(hashes, j)
+				# Order within a bucket does not matter, so the sort need not be stable
+				orders[j] = np.argsort(keys)
+				bucket = offsets[self._bases[j]:self._bases[j] + (1 << width) + 1]
+				np.cumsum(np.bincount(keys, minlength=1 << width), out=bucket[1:])
+		self.orders = orders
+		self.offsets = offsets
+
+	def _chunk(self, hashes: np.ndarray, j: int) -> np.ndarray:
+		mask = np.uint64((1 << self.widths[j]) - 1)
+		return ((hashes >> np.uint64(self._shifts[j])) & mask).astype(np.int64)
+
+	def __len__(self) -> int:
+		return len(self.hashes)
+
+	def query(self, value: int, radius: int) -> Tuple[np.ndarray, np.ndarray]:
+		"""Positions of hashes within ``radius`` bits of ``value``, and their distances."""
+		if not len(self.hashes):
+			return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int32)
+		parts = []
+		for j, width in enumerate(self.widths):
+			keys = self._bases[j] + (((value >> self._shifts[j]) & ((1 << width) - 1)) ^ _flip_masks(width, radius // self.chunks))
+			starts, ends = self.offsets[keys], self.offsets[keys + 1]
+			lengths = ends - starts
+			total = int(lengths.sum())
+			if total:
+				# Concatenated bucket ranges without a Python loop over buckets
+				positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+				parts.append(self.orders[j][positions])
+		if not parts:
+			return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int32)
+		candidates = np.unique(np.concatenate(parts))
+		distances = popcount(self.hashes[candidates] ^ np.uint64(value))
+		keep = distances <= radius
+		return candidates[keep], distances[keep]
+
+
+class FingerprintIndex:
+	"""Stored fingerprints, searchable by Hamming distance. Safe to share between threads.
+
+	New fingerprints are scanned linearly until ``compact_every`` of them have
+	accumulated, then folded into the multi-index tables.
+	"""
+
+	def __init__(
+		self,
+		session_factory: Callable[[], Session] = SessionLocal,
+		snapshot_dir: Optional[str] = None,
+		max_distance: int = 8,
+		dhash_max_distance: int = 12,
+		compact_every: int = 100_000,
+	) -> None:
+		self._session_factory = session_factory
+		self._snapshot_dir = snapshot_dir
+		self.max_distance = max_distance
+		self.dhash_max_distance = dhash_max_distance
+		self._compact_every = max(1, compact_every)
+		self._lock = threading.RLock()
+		self._compact_lock = threading.Lock()
+		self._set_main(MultiIndexHashTable(np.empty(0, dtype=np.uint64)), np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.int64), 0)
+		self._stats = {"searches": 0, "search_seconds": 0.0, "compactions": 0}
+
+	def _set_main(self, table: MultiIndexHashTable, dhashes: np.ndarray, row_ids: np.ndarray, last_row_id: int) -> None:
+		self._table = table
+		self._dhashes = dhashes
+		self._row_ids = row_ids
+		self._last_row_id = last_row_id
+		self._pending: List[Tuple[int, int, int]] = []
+		self._pending_arrays: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+
+	def load(self) -> None:
+		"""Open the snapshot, then replay database rows added after it."""
+		started = time.perf_counter()
+		with self._session_factory() as db:
+			ImageFingerprint.metadata.create_all(bind=db.get_bind(), tables=[ImageFingerprint.__table__])
+		snapshot = self._load_snapshot() if self._snapshot_dir else None
+		with self._lock:
+			if snapshot is not None:
+				self._set_main(*snapshot)
+			else:
+				self._set_main(MultiIndexHashTable(np.empty(0, dtype=np.uint64)), np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.int64), 0)
+		replayed = 0
+		with self._session_factory() as db:
+			rows = db.execute(
+				select(ImageFingerprint.id, ImageFingerprint.phash, ImageFingerprint.dhash)
+				.where(ImageFingerprint.id > self._last_row_id)
+				.order_by(ImageFingerprint.id)
+				.execution_options(yield_per=50000)
+			)
+			for row_id, phash_value, dhash_value in rows:
+				self._remember(row_id, _to_unsigned(phash_value), _to_unsigned(dhash_value))
+				replayed += 1
+		if len(self._pending) >= self._compact_every:
+			self.compact()
+		print(f"[fingerprints] Loaded {len(self._table)} fingerprints, replayed {replayed} rows in {time.perf_counter() - started:.2f}s")
+
+	def _remember(self, row_id: int, phash_value: int, dhash_value: int) -> None:
+		with self._lock:
+			self._pending.append((row_id, phash_value, dhash_value))
+			self._pending_arrays = None
+			self._last_row_id = max(self._last_row_id, row_id)
+
+	def _pending_view(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+		if self._pending_arrays is None:
+			pending = np.asarray(self._pending, dtype=np.uint64).reshape(-1, 3)
+			self._pending_arrays = (pending[:, 0].astype(np.int64), pending[:, 1].copy(), pending[:, 2].copy())
+		return self._pending_arrays
+
+	def search(self, value: Fingerprint) -> List[Tuple[int, int, int]]:
+		"""``(row id, phash distance, dhash distance)`` of stored near duplicates, closest first."""
+		started = time.perf_counter()
+		with self._lock:
+			positions, distances = self._table.query(value.phash, self.max_distance)
+			row_ids = self._row_ids[positions]
+			dhash_distances = popcount(self._dhashes[positions] ^ np.uint64(value.dhash))
+			if self._pending:
+				pending_ids, pending_phash, pending_dhash = self._pending_view()
+				near = popcount(pending_phash ^ np.uint64(value.phash))
+				hits = np.flatnonzero(near <= self.max_distance)
+				row_ids = np.concatenate([row_ids, pending_ids[hits]])
+				distances = np.concatenate([distances, near[hits]])
+				dhash_distances = np.concatenate([dhash_distances, popcount(pending_dhash[hits] ^ np.uint64(value.dhash))])
+			self._stats["searches"] += 1
+			self._stats["search_seconds"] += time.perf_counter() - started
+		keep = dhash_distances <= self.dhash_max_distance
+		matches = zip(row_ids[keep].tolist(), distances[keep].tolist(), dhash_distances[keep].tolist())
+		return sorted(matches, key=lambda match: (match[1], match[2]))
+
+	def add(self, values: Sequence[Fingerprint], angles: Sequence[str], claim_id: Optional[str], submission_id: str) -> List[int]:
+		"""Store fingerprints of one submission; returns their row ids."""
+		now = datetime.now(timezone.utc).replace(tzinfo=None)
+		with self._session_factory() as db:
+			rows = [
+				ImageFingerprint(
+					phash=_to_signed(value.phash), dhash=_to_signed(value.dhash), claim_id=claim_id,
+					submission_id=submission_id, angle=angle, content_digest=value.digest, created_at=now,
+				)
+				for value, angle in zip(values, angles)
+			]
+			db.add_all(rows)
+			db.commit()
+			row_ids = [row.id for row in rows]
+		for row_id, value in zip(row_ids, values):
+			self._remember(row_id, value.phash, value.dhash)
+		if len(self._pending) >= self._compact_every:
+			self.compact(wait=False)
+		return row_ids
+
+	def details(self, row_ids: Sequence[int]) -> Dict[int, ImageFingerprint]:
+		if not row_ids:
+			return {}
+		with self._session_factory() as db:
+			rows = db.execute(select(ImageFingerprint).where(ImageFingerprint.id.in_(list(row_ids)))).scalars()
+			return {row.id: row for row in rows}
+
+	def screen(
+		self,
+		contents: Sequence[bytes],
+		angles: Sequence[str],
+		claim_id: Optional[str] = None,
+		submission_id: Optional[str] = None,
+	) -> Dict[str, Any]:
+		"""Fingerprint a submission, report near duplicates stored for other claims, then store it.
+
+		Photos stored without a claim id count as one unknown claim, so two
+		anonymous uploads of the same photo are not flagged against each other.
+		"""
+		submission_id = submission_id or uuid.uuid4().hex
+		values = [fingerprint(content) for content in contents]
+		found = [(angle, value, match) for value, angle in zip(values, angles) for match in self.search(value)]
+		rows = self.details([match[0] for _, _, match in found])
+		matches = []
+		for angle, value, (row_id, distance, dhash_distance) in found:
+			row = rows.get(row_id)
+			if row is None or row.claim_id == claim_id:
+				continue
+			matches.append({
+				"angle": angle,
+				"matched_claim_id": row.claim_id,
+				"matched_submission_id": row.submission_id,
+				"matched_angle": row.angle,
+				"phash_distance": distance,
+				"dhash_distance": dhash_distance,
+				"identical": row.content_digest == value.digest,
+				"seen_at": row.created_at.isoformat(),
+			})
+		self.add(values, angles, claim_id, submission_id)
+		return {
+			"flagged": bool(matches),
+			"submission_id": submission_id,
+			"matched_claims": sorted({str(match["matched_claim_id"]) for match in matches}),
+			"matches": matches,
+		}
+
+	def compact(self, wait: bool = True) -> None:
+		"""Fold pending fingerprints into the multi-index tables.
+
+		The new tables are built outside the lock, so searches keep running on the
+		old ones (plus the pending scan) meanwhile. With ``wait=False`` this returns
+		at once if another thread is already compacting.
+		"""
+		if not self._compact_lock.acquire(blocking=wait):
+			return
+		try:
+			self._fold_pending()
+		finally:
+			self._compact_lock.release()
+
+	def _fold_pending(self) -> None:
+		with self._lock:
+			if not self._pending:
+				return
+			folded = len(self._pending)
+			pending_ids, pending_phash, pending_dhash = self._pending_view()
+			table, dhashes, row_ids = self._table, self._dhashes, self._row_ids
+		table = MultiIndexHashTable(np.concatenate([table.hashes, pending_phash]))
+		dhashes = np.concatenate([dhashes, pending_dhash])
+		row_ids = np.concatenate([row_ids, pending_ids])
+		with self._lock:
+			remaining = self._pending[folded:]
+			self._set_main(table, dhashes, row_ids, self._last_row_id)
+			self._pending = remaining
+			self._stats["compactions"] += 1
+
+	def save_snapshot(self, directory: Optional[str] = None) -> Optional[str]:
+		"""Write the index next to ``directory`` and swap it in atomically."""
+		directory = directory or self._snapshot_dir
+		if not directory:
+			return None
+		self.compact()
+		with self._lock:
+			arrays = {
+				"phash": self._table.hashes,
+				"orders": self._table.orders,
+				"offsets": self._table.offsets,
+				"dhash": self._dhashes,
+				"row_ids": self._row_ids,
+			}
+			last_row_id = self._last_row_id
+		staging, retired = directory + ".tmp", directory + ".old"
+		shutil.rmtree(staging, ignore_errors=True)
+		os.makedirs(staging)
+		for name, values in arrays.items():
+			np.save(os.path.join(staging, f"{name}.npy"), values)
+		with open(os.path.join(staging, "meta.json"), "w", encoding="utf-8") as fp:
+			json.dump({"version": SNAPSHOT_VERSION, "last_row_id": last_row_id, "count": len(arrays["phash"]), "created_at": time.time()}, fp)
+		shutil.rmtree(retired, ignore_errors=True)
+		if os.path.exists(directory):
+			os.rename(directory, retired)
+		os.rename(staging, directory)
+		shutil.rmtree(retired, ignore_errors=True)
+		return directory
+
+	def _load_snapshot(self) -> Optional[Tuple[MultiIndexHashTable, np.ndarray, np.ndarray, int]]:
+		try:
+			with open(os.path.join(self._snapshot_dir, "meta.json"), "r", encoding="utf-8") as fp:
+				meta = json.load(fp)
+		except (OSError, ValueError):
+			return None
+		if meta.get("version") != SNAPSHOT_VERSION:
+			return None
+		arrays = {
+			name: np.load(os.path.join(self._snapshot_dir, f"{name}.npy"), mmap_mode="r")
+			for name in ("phash", "orders", "offsets", "dhash", "row_ids")
+		}
+		table = MultiIndexHashTable(arrays["phash"], arrays["orders"], arrays["offsets"])
+		return table, arrays["dhash"], arrays["row_ids"], int(meta.get("last_row_id", 0))
+
+	@property
+	def unsnapshotted(self) -> int:
+		return len(self._pending)
+
+	def stats(self) -> Dict[str, Any]:
+		with self._lock:
+			searches = self._stats["searches"]
+			return {
+				"fingerprints": len(self._table) + len(self._pending),
+				"pending": len(self._pending),
+				"searches": searches,
+				"avg_search_ms": round(self._stats["search_seconds"] / searches * 1000, 4) if searches else None,
+				"compactions": self._stats["compactions"],
+			}
+
+
+_fingerprint_index: Optional[FingerprintIndex] = None
+_fingerprint_index_lock = threading.Lock()
+
+
+def get_fingerprint_index() -> FingerprintIndex:
+	global _fingerprint_index
+	if _fingerprint_index is None:
+		with _fingerprint_index_lock:
+			if _fingerprint_index is None:
+				settings = get_settings()
+				index = FingerprintIndex(
+					snapshot_dir=settings.image_fingerprint_snapshot_dir,
+					max_distance=settings.image_fingerprint_max_distance,
+					dhash_max_distance=settings.image_fingerprint_dhash_max_distance,
+					compact_every=settings.image_fingerprint_compact_every,
+				)
+				index.load()
+				_fingerprint_index = index
+	return _fingerprint_index
@@ -0,0 +1,138 @@
+"""Decoding uploaded and fetched images with as few full-frame copies as possible.
+
+Handlers used to wrap the encoded bytes in ``BytesIO``, decode them with PIL,
+``convert("RGB")``, copy the result into NumPy and colour-convert it to BGR,
+holding two or three full-resolution frames at once, and re-encoded every
+photo for the vision API even when it was already a small JPEG. Here:
+
+* :func:`decode_bgr` decodes the encoded buffer (``bytes``, a ``bytearray``
+  from the fetcher or a ``memoryview``) straight into the BGR array OpenCV and
+  the detectors use: ``cv2.imdecode`` over a zero-copy NumPy view, one frame
+  allocated. PIL is only the fallback for formats OpenCV cannot read.
+* :func:`vision_payload` sends an upload's own JPEG bytes, with the EXIF, IPTC
+  and comment segments dropped, when it is already within the vision size
+  limits, and otherwise re-encodes it with
+  :func:`ai.core.image_prep.prepare_for_vision` (draft-mode decode).
+"""
+import io
+from typing import Optional, Union
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from ai.core.config import get_settings
+from ai.core.image_prep import PreparedImage, prepare_for_vision
+
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+# A JPEG above this many bits per pixel is re-encoded even if small enough in
+# pixels: the re-encode at the vision quality is usually 1-1.5, while quality
+# 95 exports run to 3-4 and would cost more upload time than the encode saves
+MAX_PASSTHROUGH_BITS_PER_PIXEL = 2.0
+EXIF_ORIENTATION = 0x0112
+
+_SOI = b"\xff\xd8"
+_SOS = 0xDA
+# APP1 (EXIF, XMP), APP13 (IPTC) and COM: location, device and editing metadata
+_METADATA_MARKERS = {0xE1, 0xED, 0xFE}
+_STANDALONE_MARKERS = {0x01, *range(0xD0, 0xD8)}
+
+
+class ImageDecodeError(ValueError):
+	"""The bytes are not an image either OpenCV or PIL can decode."""
+
+
+def decode_bgr(data: Buffer) -> np.ndarray:
+	"""Decode to a BGR ``uint8`` array, ignoring EXIF orientation like the PIL path did."""
+	encoded = np.frombuffer(data, dtype=np.uint8)
+	image = cv2.imdecode(encoded, cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION) if encoded.size else None
+	if image is not None:
+		return image
+	try:
+		with Image.open(io.BytesIO(data)) as opened:
+			rgb = np.array(opened if opened.mode == "RGB" else opened.convert("RGB"))
+	except Exception as exc:
+		raise ImageDecodeError(f"Cannot decode image: {exc}") from exc
+	# In place: no second frame for the channel swap
+	return cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR, dst=rgb)
+
+
+def strip_jpeg_metadata(data: Buffer) -> Optional[Buffer]:
+	"""The JPEG without its EXIF/XMP, IPTC and comment segments; ``None`` if it does not parse.
+
+	Only the header segments before the scan are walked; the entropy-coded data
+	is carried over as is. A file without such segments is returned unchanged.
+	"""
+	view = memoryview(data).cast("B")
+	if bytes(view[:2]) != _SOI:
+		return None
+	kept = [view[:2]]
+	dropped = False
+	position, size = 2, len(view)
+	while position + 4 <= size:
+		if view[position] != 0xFF:
+			return None
+		marker = view[position + 1]
+		if marker == 0xFF:
+			# Fill byte before a marker
+			position += 1
+			continue
+		if marker in _STANDALONE_MARKERS:
+			kept.append(view[position:position + 2])
+			position += 2
+			continue
+		if marker == _SOS:
+			if not dropped:
+				return data
+			kept.append(view[position:])
+			return b"".join(kept)
+		end = position + 2 + ((view[position + 2] << 8) | view[position + 3])
+		if end > size or end < position + 4:
+			return None
+		if marker in _METADATA_MARKERS:
+			dropped = True
+		else:
+			kept.append(view[position:end])
+		position = end
+	return None
+
+
+def _passthrough(image: Image.Image, data: Buffer, max_long_edge: int, image_format: str) -> Optional[PreparedImage]:
+	"""The upload's own JPEG bytes if a re-encode would not shrink or fix anything."""
+	if image_format != "JPEG" or image.format != "JPEG" or image.mode not in ("RGB", "L"):
+		return None
+	width, height = image.size
+	if max(width, height) > max_long_edge:
+		return None
+	if len(memoryview(data)) * 8 > width * height * MAX_PASSTHROUGH_BITS_PER_PIXEL:
+		return None
+	# Rotation lives in the EXIF segment being stripped, so only upright photos qualify
+	if image.getexif().get(EXIF_ORIENTATION, 1) != 1:
+		return None
+	stripped = strip_jpeg_metadata(data)
+	if stripped is None:
+		return None
+	return PreparedImage(data=memoryview(stripped), mime_type="image/jpeg", width=width, height=height)
+
+
+def vision_payload(
+	data: Buffer,
+	image: Optional[Image.Image] = None,
+	max_long_edge: Optional[int] = None,
+	image_format: Optional[str] = None,
+	quality: Optional[int] = None,
+) -> PreparedImage:
+	"""Encoded image for a vision model: the original JPEG when it qualifies, else re-encoded.
+
+	``image`` is ``data`` already opened (not loaded) with PIL, if the caller has it.
+	"""
+	settings = get_settings()
+	max_long_edge = max_long_edge or settings.vision_image_max_edge
+	image_format = (image_format or settings.vision_image_format).upper()
+	image = image if image is not None else Image.open(io.BytesIO(data))
+	prepared = _passthrough(image, data, max_long_edge, image_format)
+	if prepared is not None:
+		return prepared
+	return prepare_for_vision(image, max_long_edge=max_long_edge, image_format=image_format, quality=quality)
@@ -0,0 +1,71 @@
+import io
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from PIL import Image, ImageOps
+
+from ai.core.config import get_settings
+
+
+MIME_TYPES = {"JPEG": "image/jpeg", "WEBP": "image/webp", "PNG": "image/png"}
+
+
+@dataclass
+class PreparedImage:
+	"""Encoded image ready for a vision API; ``data`` is a view over the encoder buffer."""
+
+	data: memoryview
+	mime_type: str
+	width: int
+	height: int
+
+	@property
+	def size_bytes(self) -> int:
+		return self.data.nbytes
+
+	def blob(self) -> Dict[str, Any]:
+		return {"mime_type": self.mime_type, "data": self.data}
+
+
+def prepare_for_vision(
+	image: Image.Image,
+	max_long_edge: Optional[int] = None,
+	image_format: Optional[str] = None,
+	quality: Optional[int] = None,
+) -> PreparedImage:
+	"""Orient, downscale and compress an image before sending it to a vision model.
+
+	Works best on a freshly opened (not yet loaded) image: JPEGs are then decoded
+	at a reduced DCT scale via draft mode instead of at full resolution.
+	"""
+	settings = get_settings()
+	max_long_edge = max_long_edge or settings.vision_image_max_edge
+	image_format = (image_format or settings.vision_image_format).upper()
+	quality = quality or settings.vision_image_quality
+
+	# Draft picks the smallest DCT scale still at least as large as the target
+	if image.format == "JPEG" and max(image.size) > max_long_edge:
+		scale = max_long_edge / max(image.size)
+		image.draft("RGB", (int(image.size[0] * scale) + 1, int(image.size[1] * scale) + 1))
+
+	# Phone photos are often stored sideways with an EXIF rotation flag
+	ImageOps.exif_transpose(image, in_place=True)
+	if image.mode != "RGB":
+		image = image.convert("RGB")
+	if max(image.size) > max_long_edge:
+		image.thumbnail((max_long_edge, max_long_edge), Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+	buffer = io.BytesIO()
+	if image_format == "JPEG":
+		image.save(buffer, format="JPEG", quality=quality, optimize=True, progressive=True)
+	elif image_format == "WEBP":
+		image.save(buffer, format="WEBP", quality=quality, method=4)
+	else:
+		image.save(buffer, format=image_format)
+
+	return PreparedImage(
+		data=buffer.getbuffer(),
+		mime_type=MIME_TYPES.get(image_format, f"image/{image_format.lower()}"),
+		width=image.size[0],
+		height=image.size[1],
+	)
@@ -0,0 +1,299 @@
+"""Inference backends for the YOLO detectors.
+
+Every backend exposes ``names`` (class id -> name) and ``detect(images, conf)``,
+which returns one (n, 6) float32 array of ``[x1, y1, x2, y2, confidence, class]``
+rows per BGR image, in that image's pixel coordinates -- the same rows as
+Ultralytics' ``result.boxes.data``. Callers therefore do not care whether a
+model runs on PyTorch or ONNX Runtime.
+
+Export weights ahead of deployment with::
+
+    python -m ai.core.inference /app/models/yolov8n.pt [--int8] [--imgsz 640]
+"""
+import argparse
+import ast
+import contextlib
+import fcntl
+import os
+import shutil
+import tempfile
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from ai.core.box_suppression import OVERLAP_IOU, greedy_suppression
+
+
+BACKEND_TORCH = "torch"
+BACKEND_ONNX = "onnx"
+
+# Class offset that keeps boxes of different classes apart during one NMS pass
+_MAX_WH = 7680.0
+_EMPTY = np.empty((0, 6), dtype=np.float32)
+
+
+class Detector:
+	names: Dict[int, str]
+
+	def detect(self, images: Sequence[np.ndarray], conf: float = 0.25) -> List[np.ndarray]:
+		raise NotImplementedError
+
+
+class UltralyticsDetector(Detector):
+	"""The PyTorch path: an Ultralytics ``YOLO`` model."""
+
+	backend = BACKEND_TORCH
+
+	def __init__(self, model: Any) -> None:
+		self.model = model
+		self.names = dict(model.names)
+
+	def detect(self, images: Sequence[np.ndarray], conf: float = 0.25) -> List[np.ndarray]:
+		if not images:
+			return []
+		results = self.model(list(images), conf=conf, verbose=False)
+		return [
+			result.boxes.data.cpu().numpy().astype(np.float32, copy=False) if result.boxes is not None else _EMPTY
+			for result in results
+		]
+
+
+def _as_bgr(image: np.ndarray) -> np.ndarray:
+	if image.ndim == 2:
+		return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+	if image.shape[2] == 4:
+		return cv2.cvtColor(image, cv2.COLOR_BGRA2BGR)
+	return image
+
+
+def letterbox(image: np.ndarray, size: int, out: np.ndarray) -> Tuple[float, int, int]:
+	"""Resize into ``out`` (a CHW float32 slot) with centred grey padding, as Ultralytics does.
+
+	Returns ``(gain, left, top)`` to map network coordinates back to the image.
+	"""
+	image = _as_bgr(image)
+	height, width = image.shape[:2]
+	gain = min(size / height, size / width)
+	new_h, new_w = int(round(height * gain)), int(round(width * gain))
+	if (new_h, new_w) != (height, width):
+		image = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+	top, left = int(round((size - new_h) / 2 - 0.1)), int(round((size - new_w) / 2 - 0.1))
+	out.fill(114.0 / 255.0)
+	# BGR HWC uint8 -> RGB CHW [0, 1]
+	for channel in range(3):
+		np.multiply(image[:, :, 2 - channel], 1.0 / 255.0, out=out[channel, top:top + new_h, left:left + new_w], casting="unsafe")
+	return gain, left, top
+
+
+def decode_predictions(
+	prediction: np.ndarray,
+	conf: float,
+	iou: float,
+	max_det: int,
+	gain: float,
+	left: int,
+	top: int,
+	image_shape: Tuple[int, ...],
+) -> np.ndarray:
+	"""Raw YOLOv8 head output ``(4 + classes, anchors)`` -> NMS'd rows in image coordinates."""
+	scores = prediction[4:]
+	class_ids = scores.argmax(axis=0)
+	confidence = scores[class_ids, np.arange(scores.shape[1])]
+	keep = confidence > conf
+	if not keep.any():
+		return _EMPTY
+	cx, cy, w, h = prediction[:4, keep]
+	boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+	confidence = confidence[keep]
+	class_ids = class_ids[keep]
+
+	kept = greedy_suppression(boxes + class_ids[:, None] * _MAX_WH, confidence, iou, OVERLAP_IOU)[:max_det]
+	boxes = boxes[kept]
+	boxes[:, [0, 2]] = ((boxes[:, [0, 2]] - left) / gain).clip(0, image_shape[1])
+	boxes[:, [1, 3]] = ((boxes[:, [1, 3]] - top) / gain).clip(0, image_shape[0])
+	return np.concatenate([boxes, confidence[kept, None], class_ids[kept, None]], axis=1).astype(np.float32)
+
+
+def _onnx_names(session: Any) -> Dict[int, str]:
+	metadata = session.get_modelmeta().custom_metadata_map
+	try:
+		return {int(k): str(v) for k, v in ast.literal_eval(metadata["names"]).items()}
+	except (KeyError, ValueError, SyntaxError):
+		classes = session.get_outputs()[0].shape[1]
+		return {i: str(i) for i in range(classes - 4)} if isinstance(classes, int) else {}
+
+
+class OnnxDetector(Detector):
+	"""YOLOv8 exported to ONNX, run with ONNX Runtime on CPU.
+
+	``intra_op_threads`` bounds the threads one inference may use (0 lets ONNX
+	Runtime use every core; set it to the cores a worker owns when several
+	workers share a node). Pass ``providers=["OpenVINOExecutionProvider"]`` with
+	the onnxruntime-openvino build to run through OpenVINO.
+	"""
+
+	backend = BACKEND_ONNX
+
+	def __init__(
+		self,
+		path: str,
+		intra_op_threads: int = 0,
+		inter_op_threads: int = 1,
+		providers: Optional[Sequence[str]] = None,
+		iou: float = 0.7,
+		max_det: int = 300,
+	) -> None:
+		import onnxruntime as ort
+
+		options = ort.SessionOptions()
+		options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+		options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+		options.intra_op_num_threads = max(0, intra_op_threads)
+		options.inter_op_num_threads = max(0, inter_op_threads)
+		available = ort.get_available_providers()
+		chosen = [p for p in (providers or []) if p in available] or ["CPUExecutionProvider"]
+
+		self.path = path
+		self.session = ort.InferenceSession(path, sess_options=options, providers=chosen)
+		self.providers = self.session.get_providers()
+		self.iou = iou
+		self.max_det = max_det
+		self.names = _onnx_names(self.session)
+		model_input = self.session.get_inputs()[0]
+		self._input_name = model_input.name
+		batch, _, height, _ = model_input.shape
+		# Exports without --dynamic take one fixed-size image per run
+		self._batched = not isinstance(batch, int)
+		self.imgsz = height if isinstance(height, int) else 640
+
+	def detect(self, images: Sequence[np.ndarray], conf: float = 0.25) -> List[np.ndarray]:
+		if not images:
+			return []
+		if not self._batched:
+			return [self._run([image], conf)[0] for image in images]
+		return self._run(images, conf)
+
+	def _run(self, images: Sequence[np.ndarray], conf: float) -> List[np.ndarray]:
+		size = self.imgsz
+		batch = np.empty((len(images), 3, size, size), dtype=np.float32)
+		transforms = [letterbox(image, size, batch[i]) for i, image in enumerate(images)]
+		(output,) = self.session.run(None, {self._input_name: batch})[:1]
+		return [
+			decode_predictions(output[i], conf, self.iou, self.max_det, gain, left, top, image.shape)
+			for i, (image, (gain, left, top)) in enumerate(zip(images, transforms))
+		]
+
+
+def onnx_path_for(weights: str, int8: bool = False) -> str:
+	stem = os.path.splitext(weights)[0]
+	return stem + (".int8.onnx" if int8 else ".onnx")
+
+
+def _quantize(path: str, quantized: str) -> str:
+	import onnx
+	from onnxruntime.quantization import QuantType, quantize_dynamic
+
+	quantize_dynamic(path, quantized, weight_type=QuantType.QUInt8)
+	# Keep the class names Ultralytics stores in the model metadata
+	source, target = onnx.load(path), onnx.load(quantized)
+	if not target.metadata_props:
+		target.metadata_props.extend(source.metadata_props)
+		onnx.save(target, quantized)
+	return quantized
+
+
+def export_onnx(weights: str, int8: bool = False, imgsz: int = 640) -> str:
+	"""Export Ultralytics weights to ONNX (dynamic batch), optionally INT8-quantized.
+
+	The model is built in a scratch directory next to the weights and moved into
+	place with ``os.replace``, so a process loading it never sees a partial file.
+	"""
+	from ultralytics import YOLO
+
+	target = onnx_path_for(weights, int8)
+	if not os.path.exists(weights):
+		# Release names such as "yolov8n.pt" are downloaded by Ultralytics
+		weights = str(YOLO(weights).ckpt_path)
+	with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(target)), prefix=".onnx-export-") as scratch:
+		# Ultralytics writes the export next to the weights it loaded, so export a copy
+		staged = shutil.copy2(weights, os.path.join(scratch, os.path.basename(weights)))
+		exported = str(YOLO(staged).export(format="onnx", imgsz=imgsz, dynamic=True))
+		if int8:
+			exported = _quantize(exported, os.path.join(scratch, "model.int8.onnx"))
+		os.replace(exported, target)
+	return target
+
+
+@contextlib.contextmanager
+def _export_lock(path: str) -> Iterator[None]:
+	"""Exclusive across processes, so worker processes starting together export once."""
+	with open(path + ".lock", "a") as fp:
+		fcntl.flock(fp, fcntl.LOCK_EX)
+		try:
+			yield
+		finally:
+			fcntl.flock(fp, fcntl.LOCK_UN)
+
+
+def _stale(derived: str, source: str) -> bool:
+	if not os.path.exists(derived):
+		return True
+	return os.path.exists(source) and os.path.getmtime(derived) < os.path.getmtime(source)
+
+
+def load_detector(
+	weights: str,
+	backend: str = BACKEND_ONNX,
+	int8: bool = False,
+	intra_op_threads: int = 0,
+	inter_op_threads: int = 1,
+	providers: Optional[Sequence[str]] = None,
+	imgsz: int = 640,
+) -> Detector:
+	"""Load ``weights`` on the requested backend.
+
+	For ONNX the exported model next to the weights is used, and (re-)exported
+	when missing or older than the weights; concurrent loaders wait for one
+	export. If ONNX Runtime or the export is not available the PyTorch model is
+	used instead.
+	"""
+	if backend not in (BACKEND_TORCH, BACKEND_ONNX):
+		raise ValueError(f"Unknown inference backend: {backend}")
+	if weights.endswith(".onnx"):
+		return OnnxDetector(weights, intra_op_threads, inter_op_threads, providers)
+	if backend == BACKEND_ONNX:
+		try:
+			onnx_path = onnx_path_for(weights, int8)
+			if _stale(onnx_path, weights):
+				with _export_lock(onnx_path):
+					# Another process may have exported while this one waited
+					if _stale(onnx_path, weights):
+						export_onnx(weights, int8=int8, imgsz=imgsz)
+			return OnnxDetector(onnx_path, intra_op_threads, inter_op_threads, providers)
+		except Exception as exc:
+			print(f"[inference] ONNX backend unavailable for {weights}, using PyTorch: {exc}")
+	from ultralytics import YOLO
+
+	return UltralyticsDetector(YOLO(weights))
+
+
+def warm_up_detector(detector: Detector, size: int = 640) -> None:
+	"""One throwaway inference so the first real request does not pay for lazy setup."""
+	detector.detect([np.zeros((size, size, 3), dtype=np.uint8)])
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description="Export YOLO weights to ONNX for the ONNX Runtime backend")
+	parser.add_argument("weights", nargs="+", help=".pt weights to export")
+	parser.add_argument("--int8", action="store_true", help="also write a dynamically quantized INT8 model")
+	parser.add_argument("--imgsz", type=int, default=640)
+	args = parser.parse_args()
+	for weights in args.weights:
+		print(export_onnx(weights, imgsz=args.imgsz))
+		if args.int8:
+			print(export_onnx(weights, int8=True, imgsz=args.imgsz))
+
+
+if __name__ == "__main__":
+	main()
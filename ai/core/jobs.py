@@ -0,0 +1,422 @@
+"""Background jobs for long-running endpoints, persisted through SQLAlchemy.
+
+A job is submitted with JSON params and raw input files and gets an id at
+once; a bounded pool of asyncio workers in the API process runs it. Runners
+report progress with :meth:`JobContext.emit`. Events are appended to
+``job_events`` in order (one write per batch of events) and the job row keeps
+the current stage, progress and finally the result or error, so clients can
+poll ``GET /jobs/{id}`` or follow ``GET /jobs/{id}/events`` over SSE from any
+API process.
+
+Inputs are written under ``JOB_INPUT_DIR`` until the job finishes. At startup,
+queued jobs and running jobs not updated for ``JOB_STALE_SECONDS`` (their
+process died; a live one touches its row every quarter of that) are run again. Workers claim a job with a conditional update,
+so only one process runs it; a job is given up after ``JOB_MAX_ATTEMPTS``.
+"""
+import asyncio
+import json
+import os
+import re
+import shutil
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, func, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from ai.core.config import get_settings
+from ai.db.session import SessionLocal
+from ai.models.job import Job, JobEvent
+
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+FINISHED = (SUCCEEDED, FAILED)
+
+# Every job ends with exactly one of these events
+EVENT_RESULT = "result"
+EVENT_ERROR = "error"
+EVENT_STATUS = "status"
+
+_INPUT_NAME = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
+
+
+class JobQueueFull(RuntimeError):
+	"""Raised when as many jobs are waiting as the queue may hold."""
+
+
+def _now() -> datetime:
+	return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _json(value: Any) -> str:
+	return json.dumps(value, default=str)
+
+
+class JobContext:
+	"""What a runner sees of its job: params, inputs, and a way to report progress."""
+
+	def __init__(self, job_id: str, kind: str, params: Dict[str, Any], input_dir: str, attempt: int, seq: int) -> None:
+		self.id = job_id
+		self.kind = kind
+		self.params = params
+		self.attempt = attempt
+		self.stage = RUNNING
+		self.progress: Dict[str, Any] = {}
+		self._input_dir = input_dir
+		self._seq = seq
+		self._pending: List[Tuple[int, str, Any]] = []
+		self._final: Optional[Dict[str, Any]] = None
+		self._wake = asyncio.Event()
+
+	def input(self, name: str) -> bytes:
+		with open(os.path.join(self._input_dir, name), "rb") as fp:
+			return fp.read()
+
+	def emit(self, event: str, data: Any = None, stage: Optional[str] = None) -> None:
+		"""Queue a progress event (call from the event loop); ``progress`` is saved with it."""
+		if stage is not None:
+			self.stage = stage
+		self._seq += 1
+		self._pending.append((self._seq, event, data))
+		self._wake.set()
+
+	def _finish(self, values: Dict[str, Any]) -> None:
+		self._final = values
+		self._wake.set()
+
+
+Runner = Callable[[JobContext], Awaitable[Dict[str, Any]]]
+
+
+class JobManager:
+	"""Runs registered job kinds on ``workers`` concurrent asyncio workers."""
+
+	def __init__(
+		self,
+		session_factory: Callable[[], Session] = SessionLocal,
+		input_dir: str = "./data/jobs",
+		workers: int = 4,
+		max_queued: int = 100,
+		stale_seconds: float = 300.0,
+		max_attempts: int = 3,
+		retention_seconds: float = 86400.0,
+	) -> None:
+		self._session_factory = session_factory
+		self.input_dir = input_dir
+		self.workers = max(1, workers)
+		self.max_queued = max(1, max_queued)
+		self.stale_seconds = stale_seconds
+		# A running job's row is touched this often even when its runner is silent
+		self.heartbeat_seconds = max(0.1, stale_seconds / 4)
+		self.max_attempts = max(1, max_attempts)
+		self.retention_seconds = retention_seconds
+		self._runners: Dict[str, Runner] = {}
+		self._queue: Optional["asyncio.Queue[str]"] = None
+		self._queued = 0
+		self._tasks: List[asyncio.Task] = []
+		self._running: Set[str] = set()
+		self._listeners: Dict[str, Set[asyncio.Event]] = {}
+
+	def register(self, kind: str, runner: Runner) -> None:
+		self._runners[kind] = runner
+
+	def _input_path(self, job_id: str) -> str:
+		return os.path.join(self.input_dir, job_id)
+
+	async def start(self) -> None:
+		"""Create the tables, drop expired jobs, start the workers and pick up unfinished jobs."""
+		if self._tasks:
+			return
+		resumable = await asyncio.to_thread(self._prepare)
+		self._queue = asyncio.Queue()
+		self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+		for job_id in resumable:
+			self._queued += 1
+			self._queue.put_nowait(job_id)
+		if resumable:
+			print(f"[jobs] Resuming {len(resumable)} unfinished jobs")
+
+	def _prepare(self) -> List[str]:
+		os.makedirs(self.input_dir, exist_ok=True)
+		cutoff = _now() - timedelta(seconds=self.retention_seconds)
+		with self._session_factory() as db:
+			Job.metadata.create_all(bind=db.get_bind(), tables=[Job.__table__, JobEvent.__table__])
+			expired = [row[0] for row in db.execute(select(Job.id).where(Job.status.in_(FINISHED), Job.updated_at < cutoff))]
+			for first in range(0, len(expired), 500):
+				chunk = expired[first:first + 500]
+				db.execute(delete(JobEvent).where(JobEvent.job_id.in_(chunk)))
+				db.execute(delete(Job).where(Job.id.in_(chunk)))
+			db.commit()
+			return [row[0] for row in db.execute(select(Job.id).where(self._claimable()).order_by(Job.created_at))]
+
+	def _claimable(self) -> Any:
+		stale = _now() - timedelta(seconds=self.stale_seconds)
+		return or_(Job.status == QUEUED, (Job.status == RUNNING) & (Job.updated_at < stale))
+
+	async def stop(self, timeout: float = 10.0) -> None:
+		"""Stop the workers; jobs they were running go back to queued for the next start."""
+		tasks, self._tasks = self._tasks, []
+		for task in tasks:
+			task.cancel()
+		if tasks:
+			await asyncio.wait(tasks, timeout=timeout)
+
+	async def submit(self, kind: str, params: Dict[str, Any], inputs: Dict[str, bytes]) -> Dict[str, Any]:
+		"""Persist a job and its inputs and queue it; raises :class:`JobQueueFull` when saturated."""
+		if kind not in self._runners:
+			raise ValueError(f"Unknown job kind {kind!r}")
+		for name in inputs:
+			if not _INPUT_NAME.match(name):
+				raise ValueError(f"Invalid job input name {name!r}")
+		if self._queue is None:
+			raise RuntimeError("Job manager is not started")
+		if self._queued >= self.max_queued:
+			raise JobQueueFull(f"{self._queued} jobs are already waiting")
+		# Reserve the slot now: the writes below yield to other submissions
+		self._queued += 1
+		try:
+			job = await asyncio.to_thread(self._create, kind, params, inputs)
+		except BaseException:
+			self._queued -= 1
+			raise
+		self._queue.put_nowait(job["job_id"])
+		return job
+
+	def _create(self, kind: str, params: Dict[str, Any], inputs: Dict[str, bytes]) -> Dict[str, Any]:
+		job_id = uuid.uuid4().hex
+		directory = self._input_path(job_id)
+		os.makedirs(directory, exist_ok=True)
+		for name, content in inputs.items():
+			with open(os.path.join(directory, name), "wb") as fp:
+				fp.write(content)
+		now = _now()
+		row = Job(
+			id=job_id, kind=kind, status=QUEUED, stage=QUEUED, params=_json(params), progress="{}",
+			attempts=0, created_at=now, updated_at=now,
+		)
+		with self._session_factory() as db:
+			db.add(row)
+			db.commit()
+		return self._as_dict(row)
+
+	async def _worker(self) -> None:
+		while True:
+			job_id = await self._queue.get()
+			self._queued -= 1
+			try:
+				await self._run(job_id)
+			except asyncio.CancelledError:
+				raise
+			except Exception as exc:
+				print(f"[jobs] Job {job_id} could not be run: {exc}")
+
+	def _claim(self, job_id: str) -> Optional[JobContext]:
+		"""Mark the job running if no other process has; the runner's context or None."""
+		with self._session_factory() as db:
+			claimed = db.execute(
+				update(Job)
+				.where(Job.id == job_id, self._claimable(), Job.attempts < self.max_attempts)
+				.values(status=RUNNING, stage=RUNNING, attempts=Job.attempts + 1, updated_at=_now())
+			).rowcount
+			if not claimed:
+				# Still claimable means out of attempts (it crashed the process each time)
+				db.execute(
+					update(Job).where(Job.id == job_id, self._claimable())
+					.values(status=FAILED, stage=FAILED, error=f"Gave up after {self.max_attempts} attempts", updated_at=_now())
+				)
+				db.commit()
+				return None
+			db.commit()
+			job = db.get(Job, job_id)
+			seq = db.execute(select(func.coalesce(func.max(JobEvent.seq), 0)).where(JobEvent.job_id == job_id)).scalar_one()
+			return JobContext(job.id, job.kind, json.loads(job.params), self._input_path(job.id), job.attempts, seq)
+
+	async def _run(self, job_id: str) -> None:
+		claim = asyncio.ensure_future(asyncio.to_thread(self._claim, job_id))
+		try:
+			context = await asyncio.shield(claim)
+		except asyncio.CancelledError:
+			# Stopped mid-claim: the update still lands, so hand the job back
+			if await claim is not None:
+				await asyncio.to_thread(self._persist, job_id, [], QUEUED, "{}", self._requeued())
+			raise
+		if context is None:
+			return
+		self._running.add(job_id)
+		writer = asyncio.create_task(self._write(context))
+		final: Dict[str, Any] = {}
+		try:
+			runner = self._runners.get(context.kind)
+			if runner is None:
+				raise ValueError(f"No runner registered for job kind {context.kind!r}")
+			context.emit(EVENT_STATUS, {"status": RUNNING, "attempt": context.attempt})
+			result = await runner(context)
+			context.emit(EVENT_RESULT, result, stage=SUCCEEDED)
+			final = {"status": SUCCEEDED, "stage": SUCCEEDED, "result": _json(result), "error": None}
+		except asyncio.CancelledError:
+			# Shutting down: the next start runs it again from the beginning
+			final = self._requeued()
+			raise
+		except Exception as exc:
+			# HTTPException carries its message in ``detail``
+			error = str(getattr(exc, "detail", None) or exc) or type(exc).__name__
+			context.emit(EVENT_ERROR, {"error": error}, stage=FAILED)
+			final = {"status": FAILED, "stage": FAILED, "error": error}
+		finally:
+			context._finish(final)
+			await asyncio.shield(writer)
+			self._running.discard(job_id)
+			if final.get("status") in FINISHED:
+				await asyncio.to_thread(shutil.rmtree, self._input_path(job_id), True)
+
+	@staticmethod
+	def _requeued() -> Dict[str, Any]:
+		# A graceful stop does not use up one of the job's attempts
+		return {"status": QUEUED, "stage": QUEUED, "attempts": Job.attempts - 1}
+
+	async def _write(self, context: JobContext) -> None:
+		"""Persist the job's events in order, whatever has accumulated per write.
+
+		Without events for ``heartbeat_seconds`` the row is saved anyway, so a
+		runner waiting on slow calls is not taken for one whose process died.
+		"""
+		while True:
+			try:
+				await asyncio.wait_for(context._wake.wait(), self.heartbeat_seconds)
+			except asyncio.TimeoutError:
+				pass
+			context._wake.clear()
+			events, context._pending = context._pending, []
+			final = context._final
+			try:
+				await asyncio.to_thread(self._persist, context.id, events, context.stage, _json(context.progress), final)
+			except Exception as exc:
+				print(f"[jobs] Could not save progress of job {context.id}: {exc}")
+			if events or final is not None:
+				self._notify(context.id)
+			if final is not None:
+				return
+
+	def _persist(self, job_id: str, events: List[Tuple[int, str, Any]], stage: str, progress: str, final: Optional[Dict[str, Any]]) -> None:
+		now = _now()
+		values: Dict[str, Any] = {"stage": stage, "progress": progress, "updated_at": now}
+		if final:
+			values.update(final)
+		with self._session_factory() as db:
+			if events:
+				db.execute(insert(JobEvent), [
+					{"job_id": job_id, "seq": seq, "event": event, "data": _json(data), "created_at": now}
+					for seq, event, data in events
+				])
+			db.execute(update(Job).where(Job.id == job_id).values(**values))
+			db.commit()
+
+	def _notify(self, job_id: str) -> None:
+		for listener in self._listeners.get(job_id, ()):
+			listener.set()
+
+	@staticmethod
+	def _as_dict(job: Job) -> Dict[str, Any]:
+		return {
+			"job_id": job.id,
+			"kind": job.kind,
+			"status": job.status,
+			"stage": job.stage,
+			"progress": json.loads(job.progress or "{}"),
+			"result": json.loads(job.result) if job.result else None,
+			"error": job.error,
+			"attempts": job.attempts,
+			"created_at": job.created_at.isoformat() + "Z",
+			"updated_at": job.updated_at.isoformat() + "Z",
+		}
+
+	def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+		with self._session_factory() as db:
+			job = db.get(Job, job_id)
+			return self._as_dict(job) if job is not None else None
+
+	def events_after(self, job_id: str, after: int = 0, limit: int = 500) -> List[Dict[str, Any]]:
+		with self._session_factory() as db:
+			rows = db.execute(
+				select(JobEvent.seq, JobEvent.event, JobEvent.data)
+				.where(JobEvent.job_id == job_id, JobEvent.seq > after)
+				.order_by(JobEvent.seq)
+				.limit(limit)
+			)
+			return [{"seq": seq, "event": event, "data": json.loads(data)} for seq, event, data in rows]
+
+	async def follow(self, job_id: str, after: int = 0, poll_seconds: float = 1.0, keepalive_seconds: float = 15.0) -> AsyncIterator[Optional[Dict[str, Any]]]:
+		"""Events after ``after`` as they are saved, ending with the result or error event.
+
+		Yields ``None`` after ``keepalive_seconds`` without events. Jobs running
+		in this process wake the stream directly; others are polled.
+		"""
+		listener = asyncio.Event()
+		self._listeners.setdefault(job_id, set()).add(listener)
+		try:
+			idle = 0.0
+			finished = False
+			while True:
+				listener.clear()
+				events = await asyncio.to_thread(self.events_after, job_id, after)
+				for event in events:
+					after = event["seq"]
+					yield event
+					if event["event"] in (EVENT_RESULT, EVENT_ERROR):
+						return
+				if events:
+					idle = 0.0
+					continue
+				job = await asyncio.to_thread(self.get, job_id)
+				if job is None:
+					return
+				if job["status"] in FINISHED:
+					# The terminal event is saved with the status; read once more before
+					# concluding there is none (a job given up after too many attempts)
+					if not finished:
+						finished = True
+						continue
+					yield {"seq": after + 1, "event": EVENT_ERROR, "data": {"error": job["error"]}}
+					return
+				try:
+					await asyncio.wait_for(listener.wait(), poll_seconds)
+				except asyncio.TimeoutError:
+					idle += poll_seconds
+					if idle >= keepalive_seconds:
+						idle = 0.0
+						yield None
+		finally:
+			listeners = self._listeners.get(job_id)
+			if listeners is not None:
+				listeners.discard(listener)
+				if not listeners:
+					del self._listeners[job_id]
+
+	def stats(self) -> Dict[str, Any]:
+		return {"workers": len(self._tasks), "queued": self._queued, "running": len(self._running)}
+
+
+_job_manager: Optional[JobManager] = None
+_job_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+	global _job_manager
+	if _job_manager is None:
+		with _job_manager_lock:
+			if _job_manager is None:
+				settings = get_settings()
+				_job_manager = JobManager(
+					input_dir=settings.job_input_dir,
+					workers=settings.job_workers,
+					max_queued=settings.job_max_queued,
+					stale_seconds=settings.job_stale_seconds,
+					max_attempts=settings.job_max_attempts,
+					retention_seconds=settings.job_retention_seconds,
+				)
+	return _job_manager
@@ -0,0 +1,231 @@
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+# Where the Docker images keep pre-downloaded weights
+MODEL_DIR = "/app/models"
+
+
+class ModelLoadError(RuntimeError):
+	"""A registered model could not be loaded or warmed up."""
+
+
+def resolve_weights(filename: str, model_dir: str = MODEL_DIR) -> str:
+	"""Pre-downloaded weights if present, otherwise the bare name (Ultralytics downloads it)."""
+	path = os.path.join(model_dir, filename)
+	return path if os.path.exists(path) else filename
+
+
+def load_yolo(path: str) -> Any:
+	from ultralytics import YOLO
+
+	return YOLO(path)
+
+
+class _ModelSpec:
+	def __init__(self, path: str, loader: Callable[[str], Any], warmup: Optional[Callable[[Any], None]], replicas: int) -> None:
+		self.path = path
+		self.loader = loader
+		self.warmup = warmup
+		self.replicas = max(1, replicas)
+
+
+class _Generation:
+	"""One loaded set of weights: ``replicas`` instances handed out one lease at a time."""
+
+	def __init__(self, number: int, path: str, models: List[Any], mtime: Optional[float], load_seconds: float) -> None:
+		self.number = number
+		self.path = path
+		self.models = models
+		self.mtime = mtime
+		self.load_seconds = load_seconds
+		self.loaded_at = time.time()
+		self.idle: "queue.Queue[Any]" = queue.Queue()
+		for model in models:
+			self.idle.put(model)
+
+
+def _mtime(path: str) -> Optional[float]:
+	try:
+		return os.stat(path).st_mtime
+	except OSError:
+		return None
+
+
+class ModelRegistry:
+	"""Process-wide cache of loaded models.
+
+	Each registered model is loaded once, on first use or by :meth:`preload`,
+	optionally warmed up, and then shared. :meth:`lease` hands a caller exclusive
+	use of one of the model's ``replicas`` instances, since YOLO predictors are not
+	safe to call from several threads at once. :meth:`reload` loads new weights
+	next to the current ones and swaps them in; leases already held keep the old
+	instance until they finish, so nothing in flight is dropped.
+	"""
+
+	def __init__(self) -> None:
+		self._specs: Dict[str, _ModelSpec] = {}
+		self._generations: Dict[str, _Generation] = {}
+		self._load_locks: Dict[str, threading.Lock] = {}
+		self._lock = threading.Lock()
+		self._stop_event = threading.Event()
+		self._watcher: Optional[threading.Thread] = None
+		self._leases = 0
+		self._reloads = 0
+
+	def __contains__(self, name: str) -> bool:
+		return name in self._specs
+
+	def register(
+		self,
+		name: str,
+		path: str,
+		loader: Callable[[str], Any] = load_yolo,
+		warmup: Optional[Callable[[Any], None]] = None,
+		replicas: int = 1,
+	) -> bool:
+		"""Declare a model without loading it; a no-op if ``name`` is already registered."""
+		with self._lock:
+			if name in self._specs:
+				return False
+			self._specs[name] = _ModelSpec(path, loader, warmup, replicas)
+			self._load_locks[name] = threading.Lock()
+			return True
+
+	def _spec(self, name: str) -> _ModelSpec:
+		spec = self._specs.get(name)
+		if spec is None:
+			raise KeyError(f"Model {name!r} is not registered")
+		return spec
+
+	def _build(self, name: str, spec: _ModelSpec, path: str, number: int) -> _Generation:
+		start = time.perf_counter()
+		try:
+			models = []
+			for _ in range(spec.replicas):
+				model = spec.loader(path)
+				if spec.warmup is not None:
+					spec.warmup(model)
+				models.append(model)
+		except Exception as exc:
+			print(f"[model-registry] Failed to load {name} from {path}: {exc}")
+			raise ModelLoadError(f"Could not load model {name}: {exc}") from exc
+		load_seconds = time.perf_counter() - start
+		print(f"[model-registry] Loaded {name} from {path} ({spec.replicas} replica(s), {load_seconds:.2f}s)")
+		return _Generation(number, path, models, _mtime(path), load_seconds)
+
+	def _current(self, name: str) -> _Generation:
+		generation = self._generations.get(name)
+		if generation is not None:
+			return generation
+		spec = self._spec(name)
+		# Per-model lock: concurrent first callers wait for one load instead of each loading
+		with self._load_locks[name]:
+			generation = self._generations.get(name)
+			if generation is None:
+				generation = self._build(name, spec, spec.path, 1)
+				self._generations[name] = generation
+		return generation
+
+	def preload(self, names: Optional[List[str]] = None) -> None:
+		"""Load (and warm up) models now rather than on the first message."""
+		for name in names if names is not None else list(self._specs):
+			self._current(name)
+
+	def get(self, name: str) -> Any:
+		"""The current instance, for callers that already serialize their own inference."""
+		return self._current(name).models[0]
+
+	@contextmanager
+	def lease(self, name: str, timeout: Optional[float] = None) -> Iterator[Any]:
+		"""Exclusive use of one instance of ``name`` for the duration of the block."""
+		generation = self._current(name)
+		try:
+			model = generation.idle.get(timeout=timeout)
+		except queue.Empty:
+			raise TimeoutError(f"No idle instance of model {name} within {timeout}s")
+		with self._lock:
+			self._leases += 1
+		try:
+			yield model
+		finally:
+			# Back to the generation it came from; a replaced generation is then dropped
+			generation.idle.put(model)
+
+	def reload(self, name: str, path: Optional[str] = None) -> int:
+		"""Load new weights for ``name`` and swap them in; returns the new generation number."""
+		spec = self._spec(name)
+		with self._load_locks[name]:
+			current = self._generations.get(name)
+			number = current.number + 1 if current is not None else 1
+			generation = self._build(name, spec, path or spec.path, number)
+			if path:
+				spec.path = path
+			self._generations[name] = generation
+		with self._lock:
+			self._reloads += 1
+		return generation.number
+
+	def reload_changed(self) -> List[str]:
+		"""Reload every loaded model whose weights file changed on disk."""
+		reloaded = []
+		for name, generation in list(self._generations.items()):
+			mtime = _mtime(self._specs[name].path)
+			if mtime is None or mtime == generation.mtime:
+				continue
+			try:
+				self.reload(name)
+				reloaded.append(name)
+			except ModelLoadError:
+				# Keep serving the old weights; the next check retries
+				pass
+		return reloaded
+
+	def start_watcher(self, interval_seconds: float) -> None:
+		"""Check weights files every ``interval_seconds`` and hot-reload the ones that changed."""
+		if interval_seconds <= 0 or self._watcher is not None:
+			return
+		self._stop_event.clear()
+
+		def watch() -> None:
+			while not self._stop_event.wait(interval_seconds):
+				self.reload_changed()
+
+		self._watcher = threading.Thread(target=watch, name="model-registry-watcher", daemon=True)
+		self._watcher.start()
+
+	def stop_watcher(self) -> None:
+		self._stop_event.set()
+		if self._watcher is not None:
+			self._watcher.join(timeout=5)
+			self._watcher = None
+
+	def stats(self) -> Dict[str, Any]:
+		models = {}
+		for name, spec in list(self._specs.items()):
+			generation = self._generations.get(name)
+			models[name] = {
+				"path": spec.path,
+				"loaded": generation is not None,
+				"generation": generation.number if generation else 0,
+				"replicas": spec.replicas,
+				"idle": generation.idle.qsize() if generation else 0,
+				"load_seconds": round(generation.load_seconds, 3) if generation else None,
+				"loaded_at": generation.loaded_at if generation else None,
+			}
+		with self._lock:
+			return {"models": models, "leases": self._leases, "reloads": self._reloads}
+
+
+_model_registry: Optional[ModelRegistry] = None
+
+
+def get_model_registry() -> ModelRegistry:
+	global _model_registry
+	if _model_registry is None:
+		_model_registry = ModelRegistry()
+	return _model_registry
@@ -0,0 +1,182 @@
+import re
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ai.db.session import SessionLocal
+from ai.models.part_price import PartNameToken, PartPrice
+
+
+# Single-word spellings that should index as the same part
+SYNONYMS = {
+	"headlamp": "headlight",
+	"taillamp": "taillight",
+	"bonnet": "hood",
+	"windscreen": "windshield",
+	"boot": "trunk",
+	"tyre": "tire",
+	"lh": "left",
+	"rh": "right",
+	"fr": "front",
+	"rr": "rear",
+}
+
+
+def normalize_text(value: Any) -> str:
+	"""Lowercase, strip punctuation and collapse whitespace."""
+	return " ".join(re.sub(r"[^0-9a-z]+", " ", str(value or "").lower()).split())
+
+
+def _token(word: str) -> str:
+	word = SYNONYMS.get(word, word)
+	# Crude singular form so "Headlights" and "headlight" index together
+	if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+		word = word[:-1]
+	return word
+
+
+def part_tokens(part_name: Any) -> List[str]:
+	return [_token(word) for word in normalize_text(part_name).split()]
+
+
+def part_key(part_name: Any) -> str:
+	return " ".join(part_tokens(part_name))
+
+
+def year_key(value: Any) -> str:
+	match = re.search(r"\b(19|20)\d{2}\b", str(value or ""))
+	return match.group(0) if match else ""
+
+
+def _dice(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+	if not a or not b:
+		return 0.0
+	return 2 * len(a & b) / (len(a) + len(b))
+
+
+class PartsCatalog:
+	"""Price lookups against the imported parts catalog.
+
+	Part names are matched fuzzily through the ``part_name_tokens`` inverted
+	index, which is held in memory and refreshed every ``refresh_seconds`` so a
+	re-import is picked up without a restart. Prices are then read through the
+	``part_prices`` lookup index, preferring rows that match the car's make,
+	model, year and part category and falling back to more generic rows.
+	"""
+
+	def __init__(self, session_factory: Callable[[], Session] = SessionLocal, min_score: float = 0.6, refresh_seconds: float = 300.0) -> None:
+		self._session_factory = session_factory
+		self._min_score = min_score
+		self._refresh_seconds = refresh_seconds
+		self._lock = threading.Lock()
+		self._postings: Dict[str, List[str]] = {}
+		self._names: Dict[str, FrozenSet[str]] = {}
+		self._loaded_at: Optional[float] = None
+		self._lookups = 0
+		self._hits = 0
+
+	def load(self) -> None:
+		"""(Re)load the token index, creating the catalog tables if needed."""
+		with self._session_factory() as db:
+			bind = db.get_bind()
+			PartPrice.metadata.create_all(bind=bind, tables=[PartPrice.__table__, PartNameToken.__table__])
+			rows = db.execute(select(PartNameToken.token, PartNameToken.part_key)).all()
+
+		postings: Dict[str, List[str]] = {}
+		names: Dict[str, Set[str]] = {}
+		for token, key in rows:
+			postings.setdefault(token, []).append(key)
+			names.setdefault(key, set()).add(token)
+		self._postings = postings
+		self._names = {key: frozenset(tokens) for key, tokens in names.items()}
+		self._loaded_at = time.monotonic()
+
+	def _ensure_loaded(self) -> None:
+		if self._loaded_at is not None and time.monotonic() - self._loaded_at < self._refresh_seconds:
+			return
+		with self._lock:
+			if self._loaded_at is None or time.monotonic() - self._loaded_at >= self._refresh_seconds:
+				self.load()
+
+	def match_part(self, part_name: Any) -> Optional[Tuple[str, float]]:
+		"""Best catalog part key for a free-form part name, with its similarity score."""
+		self._ensure_loaded()
+		key = part_key(part_name)
+		if key in self._names:
+			return key, 1.0
+		tokens = frozenset(key.split())
+		candidates: Counter = Counter()
+		for token in tokens:
+			candidates.update(self._postings.get(token, ()))
+		best: Optional[Tuple[str, float]] = None
+		for candidate in candidates:
+			score = _dice(tokens, self._names[candidate])
+			# Ties go to the shorter, more generic name
+			if best is None or score > best[1] or (score == best[1] and len(candidate) < len(best[0])):
+				best = (candidate, score)
+		if best is None or best[1] < self._min_score:
+			return None
+		return best
+
+	def lookup(self, part_name: Any, car_make: Any = "", car_model: Any = "", car_year: Any = "", part_category: Any = "") -> Optional[Dict[str, Any]]:
+		"""Price stats for a part, or None when the catalog has nothing suitable."""
+		self._lookups += 1
+		matched = self.match_part(part_name)
+		if matched is None:
+			return None
+		key, score = matched
+		make, model, year, category = normalize_text(car_make), normalize_text(car_model), year_key(car_year), normalize_text(part_category)
+
+		with self._session_factory() as db:
+			# Exact hit on the full lookup index first, generic rows only if needed
+			rows = db.execute(select(PartPrice).where(
+				PartPrice.make_key == make,
+				PartPrice.model_key == model,
+				PartPrice.year_key == year,
+				PartPrice.category_key == category,
+				PartPrice.part_key == key,
+			)).scalars().all()
+			if not rows:
+				rows = self._closest_rows(db.execute(select(PartPrice).where(
+					PartPrice.part_key == key,
+					PartPrice.make_key.in_((make, "")),
+					PartPrice.model_key.in_((model, "")),
+					PartPrice.year_key.in_((year, "")),
+				)).scalars().all(), make, model, year, category)
+		if not rows:
+			return None
+
+		self._hits += 1
+		return {
+			"min_price": round(min(row.min_price for row in rows), 2),
+			"max_price": round(max(row.max_price for row in rows), 2),
+			"avg_price": round(sum(row.min_price + row.max_price for row in rows) / (2 * len(rows)), 2),
+			"price_count": len(rows),
+			"currency": rows[0].currency,
+			"source": "catalog",
+			"matched_part_name": rows[0].part_name,
+			"match_score": round(score, 3),
+		}
+
+	@staticmethod
+	def _closest_rows(rows: List[Any], make: str, model: str, year: str, category: str) -> List[Any]:
+		if not rows:
+			return []
+
+		def specificity(row: Any) -> Tuple[bool, bool, bool, bool]:
+			return (bool(row.make_key), bool(row.model_key), bool(row.year_key), bool(category) and row.category_key == category)
+
+		best = max(specificity(row) for row in rows)
+		return [row for row in rows if specificity(row) == best]
+
+	def stats(self) -> Dict[str, Any]:
+		return {
+			"part_names": len(self._names),
+			"tokens": len(self._postings),
+			"lookups": self._lookups,
+			"hits": self._hits,
+		}
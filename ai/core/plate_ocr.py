@@ -0,0 +1,142 @@
+"""EasyOCR plate reading, shared by the ai plate routes and the fraud video handler.
+
+One reader per process, loaded on first use. :func:`recognize_plate_crops`
+reads many crops at once: lines from every crop are recognized together in
+width-bucketed batches instead of one EasyOCR call per plate. EasyOCR is
+imported lazily, so importing this module costs nothing until a plate is read.
+"""
+import math
+import os
+import threading
+from typing import Any, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from ai.core.config import get_settings
+
+
+# Line height EasyOCR's recognizer models expect
+OCR_MODEL_HEIGHT = 64
+# Lines read below this confidence are dropped from a crop's text
+MIN_LINE_CONFIDENCE = 0.5
+
+_ocr_reader: Any = None
+# EasyOCR readers are not safe to share between threads in the thread-pool mode
+_ocr_lock = threading.Lock()
+
+
+def get_ocr_reader() -> Any:
+	"""Get or initialize the process's EasyOCR reader (English and Arabic, CPU)."""
+	global _ocr_reader
+	if _ocr_reader is None:
+		import easyocr
+
+		try:
+			# Set environment variables for EasyOCR
+			os.environ['HOME'] = '/app'
+			os.environ['EASYOCR_HOME'] = '/app/cache'
+
+			# Always use CPU in Docker for better compatibility
+			_ocr_reader = easyocr.Reader(['en', 'ar'], gpu=False)
+			print("[plate-ocr] EasyOCR reader initialized (CPU mode)")
+		except Exception as e:
+			print(f"[plate-ocr] Failed to initialize EasyOCR: {e}")
+			# Try with minimal configuration
+			try:
+				_ocr_reader = easyocr.Reader(['en'], gpu=False)
+				print("[plate-ocr] EasyOCR reader initialized with English only")
+			except Exception as e2:
+				print(f"[plate-ocr] EasyOCR initialization completely failed: {e2}")
+				# Try with even more minimal setup
+				try:
+					import tempfile
+					with tempfile.TemporaryDirectory() as temp_dir:
+						os.environ['HOME'] = temp_dir
+						_ocr_reader = easyocr.Reader(['en'], gpu=False)
+						print("[plate-ocr] EasyOCR reader initialized with temporary directory")
+				except Exception as e3:
+					print(f"[plate-ocr] All EasyOCR initialization attempts failed: {e3}")
+					raise e3
+	return _ocr_reader
+
+
+def preprocess_plate_crop(plate_region: np.ndarray) -> np.ndarray:
+	"""Grayscale, Otsu threshold and close a BGR plate crop for OCR."""
+	gray = cv2.cvtColor(plate_region, cv2.COLOR_BGR2GRAY)
+	_, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+	kernel = np.ones((2, 2), np.uint8)
+	return cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, kernel)
+
+
+def recognize_plate_crops(
+	crops: Sequence[np.ndarray],
+	plate_regions: Optional[Sequence[bool]] = None,
+	batch_size: Optional[int] = None,
+) -> List[Tuple[str, float]]:
+	"""Batched OCR over BGR plate crops, returning ``(text, confidence)`` per crop.
+
+	Crops flagged in ``plate_regions`` as tight plate regions go straight to the
+	recognizer as a single text line; the others (the default) first run
+	EasyOCR's text detector. Every resulting line, across all crops, is then
+	recognized in width-bucketed batches of ``batch_size`` (OCR_MAX_BATCH_SIZE).
+	"""
+	if not crops:
+		return []
+	from easyocr.recognition import get_text
+	from easyocr.utils import get_image_list
+
+	if plate_regions is None:
+		plate_regions = [False] * len(crops)
+	reader = get_ocr_reader()
+	batch_size = max(1, batch_size or get_settings().ocr_max_batch_size)
+	ignore_char = ''.join(set(reader.character) - set(reader.lang_char))
+
+	# (crop index, (box, grey line image resized to the model height))
+	entries = []
+	predictions = []
+	try:
+		with _ocr_lock:
+			for index, (plate_crop, plate_region) in enumerate(zip(crops, plate_regions)):
+				if plate_crop.size == 0:
+					continue
+				cleaned = preprocess_plate_crop(plate_crop)
+				height, width = cleaned.shape
+				if plate_region:
+					horizontal_list, free_list = [[0, width, 0, height]], []
+				else:
+					horizontal_list, free_list = reader.detect(cleaned)
+					horizontal_list, free_list = horizontal_list[0], free_list[0]
+				image_list, _ = get_image_list(horizontal_list, free_list, cleaned, model_height=OCR_MODEL_HEIGHT)
+				entries.extend((index, item) for item in image_list)
+
+			# Lines of similar width share a batch, so little of each batch is padding
+			predictions = [("", 0.0)] * len(entries)
+			order = sorted(range(len(entries)), key=lambda i: entries[i][1][1].shape[1])
+			for start in range(0, len(order), batch_size):
+				chunk = order[start:start + batch_size]
+				max_width = max(math.ceil(entries[i][1][1].shape[1] / OCR_MODEL_HEIGHT) for i in chunk) * OCR_MODEL_HEIGHT
+				recognized = get_text(
+					reader.character, OCR_MODEL_HEIGHT, int(max_width), reader.recognizer, reader.converter,
+					[entries[i][1] for i in chunk], ignore_char, 'greedy', 5, len(chunk),
+					0.1, 0.5, 0.003, 0, reader.device
+				)
+				for i, (_, text, confidence) in zip(chunk, recognized):
+					predictions[i] = (text, float(confidence))
+
+	except Exception as e:
+		print(f"[plate-ocr] OCR error: {str(e)}")
+		return [("", 0.0)] * len(crops)
+
+	# Combine all high-confidence lines of each crop
+	texts: List[List[str]] = [[] for _ in crops]
+	confidences: List[List[float]] = [[] for _ in crops]
+	for (index, _), (text, confidence) in zip(entries, predictions):
+		if confidence > MIN_LINE_CONFIDENCE:
+			texts[index].append(text)
+			confidences[index].append(confidence)
+
+	return [
+		(" ".join(crop_texts).strip(), float(np.mean(crop_confidences)) if crop_confidences else 0.0)
+		for crop_texts, crop_confidences in zip(texts, confidences)
+	]
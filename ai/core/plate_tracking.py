@@ -0,0 +1,254 @@
+"""Plate recognition over video: strided detection, IoU tracking and OCR voting.
+
+Detection runs on every ``stride``-th frame only; the frames in between are
+grabbed but never decoded to pixels. Detections are linked into tracks by IoU
+against each track's constant-velocity prediction, and OCR runs a handful of
+times per track (first sighting, then only on clearly larger crops or while
+the voted text is still uncertain) instead of
+on every plate in every frame. The readings of a track are voted into one text.
+
+:class:`PlateTracker` only keeps state; the caller runs detection and OCR,
+synchronously (:func:`process_plate_video`) or through async batchers.
+"""
+import re
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ai.core.box_suppression import OVERLAP_IOU, as_boxes, pairwise_overlap
+
+
+# A later crop must be this much larger than the best one read so far to be read again
+_REREAD_AREA_GAIN = 1.2
+
+
+def normalize_plate_text(text: str) -> str:
+	return re.sub(r"[^0-9A-Z]+", "", (text or "").upper())
+
+
+def vote_plate_text(readings: Sequence[Tuple[str, float]]) -> Tuple[str, float, int]:
+	"""Confidence-weighted vote over OCR readings: ``(text, mean confidence, votes)``."""
+	weights: Dict[str, float] = defaultdict(float)
+	votes: Dict[str, List[float]] = defaultdict(list)
+	for text, confidence in readings:
+		key = normalize_plate_text(text)
+		if key:
+			weights[key] += confidence
+			votes[key].append(confidence)
+	if not weights:
+		return "", 0.0, 0
+	best = max(weights, key=lambda key: (weights[key], len(votes[key])))
+	return best, float(np.mean(votes[best])), len(votes[best])
+
+
+class PlateTrack:
+	def __init__(self, track_id: int, frame_index: int, detection: Dict[str, Any]) -> None:
+		self.track_id = track_id
+		self.first_frame = frame_index
+		self.last_frame = frame_index
+		self.box = np.asarray(_track_box(detection), dtype=np.float64)
+		self.velocity = np.zeros(4, dtype=np.float64)
+		self.detection = detection
+		self.hits = 1
+		self.missed = 0
+		self.best_area = 0.0
+		self.readings: List[Tuple[str, float]] = []
+		self.text = ""
+		self.text_confidence = 0.0
+		self.votes = 0
+
+	def predict(self, frame_index: int) -> np.ndarray:
+		return self.box + self.velocity * (frame_index - self.last_frame)
+
+	def update(self, frame_index: int, detection: Dict[str, Any]) -> None:
+		box = np.asarray(_track_box(detection), dtype=np.float64)
+		elapsed = frame_index - self.last_frame
+		if elapsed > 0:
+			self.velocity = (box - self.box) / elapsed
+		self.box = box
+		self.detection = detection
+		self.last_frame = frame_index
+		self.hits += 1
+		self.missed = 0
+
+
+def _track_box(detection: Dict[str, Any]) -> List[float]:
+	# The vehicle box moves more smoothly than the plate region cut from it
+	return detection.get("vehicle_bbox") or detection["bbox"]
+
+
+def _area(bbox: Sequence[float]) -> float:
+	return max(0.0, bbox[2] - bbox[0]) * max(0.0, bbox[3] - bbox[1])
+
+
+class PlateTracker:
+	"""IoU tracker over strided detections that schedules OCR and votes its results.
+
+	Per detection frame: ``update()`` returns the ``(track_id, bbox)`` crops to
+	OCR, ``add_readings()`` returns ``plate`` events for tracks whose voted text
+	changed, and ``pop_ended()`` returns ``track_end`` events for tracks unseen for
+	more than ``max_missed`` detection frames. ``finish()`` closes the rest and
+	appends a ``summary`` event. Tracks that never produced text end silently.
+	"""
+
+	def __init__(
+		self,
+		iou_threshold: float = 0.3,
+		max_missed: int = 3,
+		ocr_max_reads: int = 3,
+		reread_below_confidence: float = 0.6,
+		fps: float = 0.0,
+	) -> None:
+		self.iou_threshold = iou_threshold
+		self.max_missed = max_missed
+		self.ocr_max_reads = ocr_max_reads
+		self.reread_below_confidence = reread_below_confidence
+		self.fps = fps
+		self._tracks: Dict[int, PlateTrack] = {}
+		self._ended: List[PlateTrack] = []
+		self._next_id = 1
+		self._last_frame = -1
+		self.counters = {"frames_detected": 0, "detections": 0, "ocr_reads": 0, "tracks": 0}
+
+	def _timestamp_ms(self, frame_index: int) -> Optional[int]:
+		return int(frame_index * 1000 / self.fps) if self.fps else None
+
+	def update(self, frame_index: int, detections: List[Dict[str, Any]]) -> List[Tuple[int, List[int]]]:
+		self.counters["frames_detected"] += 1
+		self.counters["detections"] += len(detections)
+		self._last_frame = frame_index
+		tracks = list(self._tracks.values())
+		matched_tracks, matched_detections = set(), set()
+
+		if tracks and detections:
+			predicted = as_boxes([track.predict(frame_index) for track in tracks])
+			boxes = as_boxes([_track_box(detection) for detection in detections])
+			overlap = pairwise_overlap(predicted, boxes, mode=OVERLAP_IOU)
+			# Greedy: best remaining pair first
+			for flat in np.argsort(-overlap, axis=None):
+				t, d = np.unravel_index(flat, overlap.shape)
+				if overlap[t, d] < self.iou_threshold:
+					break
+				if t in matched_tracks or d in matched_detections:
+					continue
+				matched_tracks.add(t)
+				matched_detections.add(d)
+				tracks[t].update(frame_index, detections[d])
+
+		for t, track in enumerate(tracks):
+			if t not in matched_tracks:
+				track.missed += 1
+				if track.missed > self.max_missed:
+					self._ended.append(self._tracks.pop(track.track_id))
+
+		for d, detection in enumerate(detections):
+			if d not in matched_detections:
+				track = PlateTrack(self._next_id, frame_index, detection)
+				self._tracks[track.track_id] = track
+				self._next_id += 1
+				self.counters["tracks"] += 1
+
+		requests = []
+		for track in self._tracks.values():
+			if track.last_frame != frame_index or len(track.readings) >= self.ocr_max_reads:
+				continue
+			area = _area(track.detection["bbox"])
+			uncertain = bool(track.readings) and track.text_confidence < self.reread_below_confidence
+			if area > track.best_area * _REREAD_AREA_GAIN or uncertain:
+				track.best_area = max(track.best_area, area)
+				requests.append((track.track_id, track.detection["bbox"]))
+		self.counters["ocr_reads"] += len(requests)
+		return requests
+
+	def add_readings(self, frame_index: int, readings: Sequence[Tuple[int, str, float]]) -> List[Dict[str, Any]]:
+		events = []
+		for track_id, text, confidence in readings:
+			track = self._tracks.get(track_id)
+			if track is None:
+				continue
+			track.readings.append((text, confidence))
+			voted, voted_confidence, votes = vote_plate_text(track.readings)
+			changed = voted != track.text
+			track.text, track.text_confidence, track.votes = voted, voted_confidence, votes
+			if changed and voted:
+				events.append(self._event("plate", track, frame_index))
+		return events
+
+	def pop_ended(self) -> List[Dict[str, Any]]:
+		ended, self._ended = self._ended, []
+		return [self._event("track_end", track, track.last_frame) for track in ended if track.text]
+
+	def finish(self) -> List[Dict[str, Any]]:
+		self._ended.extend(self._tracks.values())
+		self._tracks.clear()
+		events = self.pop_ended()
+		events.append({"event": "summary", "last_frame": self._last_frame, **self.counters})
+		return events
+
+	def _event(self, kind: str, track: PlateTrack, frame_index: int) -> Dict[str, Any]:
+		return {
+			"event": kind,
+			"track_id": track.track_id,
+			"text": track.text,
+			"text_confidence": round(track.text_confidence, 4),
+			"votes": track.votes,
+			"reads": len(track.readings),
+			"frame": frame_index,
+			"timestamp_ms": self._timestamp_ms(frame_index),
+			"first_frame": track.first_frame,
+			"last_frame": track.last_frame,
+			"bbox": [int(v) for v in track.detection["bbox"]],
+			"confidence": track.detection.get("confidence"),
+			"vehicle_type": track.detection.get("vehicle_type", "unknown"),
+		}
+
+
+def iter_sampled_frames(capture: Any, stride: int, max_frames: Optional[int] = None) -> Iterator[Tuple[int, np.ndarray]]:
+	"""Yield ``(frame_index, frame)`` for every ``stride``-th frame of a ``cv2.VideoCapture``.
+
+	Skipped frames are only grabbed, which avoids converting them to BGR arrays.
+	Reading stops at the end of the stream or after ``max_frames`` frames.
+	"""
+	stride = max(1, stride)
+	index = 0
+	while max_frames is None or index < max_frames:
+		if index % stride == 0:
+			ok, frame = capture.read()
+			if not ok:
+				break
+			yield index, frame
+		elif not capture.grab():
+			break
+		index += 1
+
+
+def crop(frame: np.ndarray, bbox: Sequence[int]) -> np.ndarray:
+	x1, y1, x2, y2 = (int(v) for v in bbox)
+	return frame[max(0, y1):y2, max(0, x1):x2]
+
+
+def process_plate_video(
+	capture: Any,
+	detect: Callable[[np.ndarray], List[Dict[str, Any]]],
+	recognize: Callable[[List[np.ndarray]], List[Tuple[str, float]]],
+	stride: int = 5,
+	tracker: Optional[PlateTracker] = None,
+	max_frames: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+	"""Run the pipeline synchronously over a ``cv2.VideoCapture``, yielding events as they happen."""
+	import cv2
+
+	if tracker is None:
+		tracker = PlateTracker()
+	if not tracker.fps:
+		tracker.fps = capture.get(cv2.CAP_PROP_FPS) or 0.0
+	for frame_index, frame in iter_sampled_frames(capture, stride, max_frames):
+		requests = tracker.update(frame_index, detect(frame))
+		if requests:
+			results = recognize([crop(frame, bbox) for _, bbox in requests])
+			yield from tracker.add_readings(frame_index, [
+				(track_id, text, confidence) for (track_id, _), (text, confidence) in zip(requests, results)
+			])
+		yield from tracker.pop_ended()
+	yield from tracker.finish()
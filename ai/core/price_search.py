@@ -0,0 +1,347 @@
+import asyncio
+import re
+from contextlib import aclosing
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+import httpx
+
+from ai.core.config import get_settings
+from ai.core.parts_catalog import PartsCatalog
+from ai.core.result_cache import ResultCache
+
+
+# One pass for "$1,234.50", "USD 99.99" and "Price: $45.00" (any case); group 1
+# is the amount. Leading with a plain character set, with lookbehinds to pick the
+# branch, lets the regex engine skip ahead quickly; an IGNORECASE alternation
+# is slower than the three separate patterns it replaces.
+PRICE_PATTERN = re.compile(r'[$UuPp](?:(?<=\$)|(?<=[Uu])[Ss][Dd]\s*|(?<=[Pp])[Rr][Ii][Cc][Ee]:\s*\$?)([\d,]+\.?\d*)')
+
+# Anything outside this range is almost always a shipping fee or a whole car
+MIN_PRICE = 10.0
+MAX_PRICE = 5000.0
+
+# Unmatched text kept between chunks so a price split across a boundary is
+# still seen whole; longer than any prefix plus a plausible amount
+CARRY_CHARS = 64
+
+
+class PriceSearchError(Exception):
+	"""No price source could be reached for a query."""
+
+
+class PriceStats:
+	"""Running min/max/mean over prices without keeping the prices themselves."""
+
+	__slots__ = ("count", "total", "min", "max")
+
+	def __init__(self) -> None:
+		self.count = 0
+		self.total = 0.0
+		self.min = float("inf")
+		self.max = float("-inf")
+
+	def add(self, price: float) -> None:
+		self.count += 1
+		self.total += price
+		if price < self.min:
+			self.min = price
+		if price > self.max:
+			self.max = price
+
+	def merge(self, other: "PriceStats") -> None:
+		self.count += other.count
+		self.total += other.total
+		self.min = min(self.min, other.min)
+		self.max = max(self.max, other.max)
+
+	def as_dict(self) -> Dict[str, Any]:
+		if not self.count:
+			return {"min_price": 0, "max_price": 0, "avg_price": 0, "price_count": 0, "currency": "USD"}
+		return {
+			"min_price": round(self.min, 2),
+			"max_price": round(self.max, 2),
+			"avg_price": round(self.total / self.count, 2),
+			"price_count": self.count,
+			"currency": "USD",
+		}
+
+
+class PriceExtractor:
+	"""Scan text for prices chunk by chunk as a response body arrives.
+
+	Matches that could still grow with the next chunk are held back together
+	with a short tail of unmatched text, so splitting a page anywhere gives the
+	same prices as scanning it whole. ``feed`` returns True once
+	``max_prices`` prices have been found and the rest of the body can be
+	skipped.
+	"""
+
+	def __init__(self, max_prices: Optional[int] = None, stats: Optional[PriceStats] = None) -> None:
+		self.max_prices = max_prices
+		self.stats = stats if stats is not None else PriceStats()
+		self._found = 0
+		self._carry = ""
+
+	@property
+	def done(self) -> bool:
+		return self.max_prices is not None and self._found >= self.max_prices
+
+	def feed(self, chunk: str) -> bool:
+		if self.done:
+			return True
+		text = self._carry + chunk
+		cut = max(0, len(text) - CARRY_CHARS)
+		for match in PRICE_PATTERN.finditer(text):
+			if match.end() == len(text):
+				# The amount may continue in the next chunk
+				cut = match.start()
+				break
+			cut = max(cut, match.end())
+			self._add(match.group(1))
+			if self.done:
+				break
+		self._carry = text[cut:]
+		return self.done
+
+	def finish(self) -> PriceStats:
+		if not self.done:
+			for match in PRICE_PATTERN.finditer(self._carry):
+				self._add(match.group(1))
+				if self.done:
+					break
+		self._carry = ""
+		return self.stats
+
+	def _add(self, amount: str) -> None:
+		# Whole-dollar amounts are usually ratings, counts or "$5 off" noise
+		if "." not in amount:
+			return
+		try:
+			price = float(amount.replace(",", ""))
+		except ValueError:
+			return
+		if MIN_PRICE <= price <= MAX_PRICE:
+			self.stats.add(price)
+			self._found += 1
+
+
+def extract_price_stats(text: str, max_prices: Optional[int] = None) -> PriceStats:
+	"""Price statistics for a whole page held in memory."""
+	extractor = PriceExtractor(max_prices)
+	extractor.feed(text)
+	return extractor.finish()
+
+
+def _normalize(value: Any) -> str:
+	return re.sub(r"\s+", " ", str(value or "")).strip()
+
+
+@dataclass(frozen=True)
+class PriceQuery:
+	part_name: str
+	car_make: str = ""
+	car_model: str = ""
+	car_year: str = ""
+	part_category: str = ""
+
+	@classmethod
+	def from_part(cls, part_info: Dict[str, Any]) -> "PriceQuery":
+		return cls(
+			part_name=_normalize(part_info.get("part_name")),
+			car_make=_normalize(part_info.get("car_make")),
+			car_model=_normalize(part_info.get("car_model")),
+			car_year=_normalize(part_info.get("car_year")),
+			part_category=_normalize(part_info.get("part_category")),
+		)
+
+	@property
+	def key(self) -> str:
+		# Category only steers catalog matching, so it does not split live lookups
+		return "|".join((self.part_name, self.car_make, self.car_model, self.car_year)).lower()
+
+	@property
+	def text(self) -> str:
+		terms = [term for term in (self.part_name, self.car_make, self.car_model, self.car_year) if term]
+		return " ".join(terms) + " car part price replacement cost"
+
+
+class PriceSource:
+	"""A place to look up part prices.
+
+	Subclasses implement ``stream`` as an async generator of text chunks to scan
+	for prices; any exception counts as the source being unavailable for that
+	query. The generator is closed early once enough prices have been found.
+	"""
+
+	name = "source"
+
+	def stream(self, client: httpx.AsyncClient, query: PriceQuery) -> AsyncIterator[str]:
+		raise NotImplementedError
+
+
+class SearchSiteSource(PriceSource):
+	"""Web search restricted to one retailer, e.g. ``site:rockauto.com``."""
+
+	def __init__(self, site: str, search_url: str = "https://www.google.com/search") -> None:
+		self.name = site
+		self.site = site
+		self.search_url = search_url
+
+	async def stream(self, client: httpx.AsyncClient, query: PriceQuery) -> AsyncIterator[str]:
+		async with client.stream("GET", self.search_url, params={"q": f"{query.text} site:{self.site}"}) as response:
+			if response.status_code != 200:
+				raise PriceSearchError(f"{self.name} returned HTTP {response.status_code}")
+			async for chunk in response.aiter_text():
+				yield chunk
+
+
+DEFAULT_SITES = ["autoparts.com", "rockauto.com", "partsgeek.com", "amazon.com"]
+
+
+def default_sources(search_url: str = "https://www.google.com/search") -> List[PriceSource]:
+	return [SearchSiteSource(site, search_url) for site in DEFAULT_SITES]
+
+
+class PriceSearchEngine:
+	"""Concurrent part-price lookups across several sources.
+
+	Every query fans out to all sources at once over one pooled client, with a
+	global cap on in-flight fetches shared by all requests. Price stats are
+	cached per normalized query for ``cache_ttl_seconds``; identical queries in
+	flight at the same time share one lookup. With a ``catalog``, live search
+	only runs for parts the local catalog cannot price.
+	"""
+
+	def __init__(
+		self,
+		sources: Optional[List[PriceSource]] = None,
+		max_concurrency: int = 16,
+		timeout: float = 10.0,
+		cache_ttl_seconds: float = 6 * 3600.0,
+		cache_max_entries: int = 4096,
+		transport: Optional[httpx.AsyncBaseTransport] = None,
+		catalog: Optional[PartsCatalog] = None,
+		max_prices_per_page: Optional[int] = 50,
+	) -> None:
+		self._catalog = catalog
+		self._max_prices_per_page = max_prices_per_page
+		self._sources = sources if sources is not None else default_sources()
+		self._max_concurrency = max(1, max_concurrency)
+		self._timeout = timeout
+		self._transport = transport
+		self._client: Optional[httpx.AsyncClient] = None
+		self._semaphore: Optional[asyncio.Semaphore] = None
+		self._cache = ResultCache(max_entries=cache_max_entries, ttl_seconds=cache_ttl_seconds)
+		self._fetches = 0
+		self._source_errors = 0
+		self._early_stops = 0
+
+	def _get_client(self) -> httpx.AsyncClient:
+		if self._client is None or self._client.is_closed:
+			self._client = httpx.AsyncClient(
+				timeout=httpx.Timeout(self._timeout),
+				limits=httpx.Limits(max_connections=self._max_concurrency, max_keepalive_connections=self._max_concurrency),
+				follow_redirects=True,
+				transport=self._transport,
+			)
+			self._semaphore = asyncio.Semaphore(self._max_concurrency)
+		return self._client
+
+	async def search(self, query: PriceQuery) -> Dict[str, Any]:
+		"""Price stats for one query; raises ``PriceSearchError`` if every source failed."""
+		if self._catalog is not None:
+			try:
+				stats = await asyncio.to_thread(
+					self._catalog.lookup, query.part_name, query.car_make, query.car_model, query.car_year, query.part_category
+				)
+			except Exception as exc:
+				print(f"[price-search] Catalog lookup failed for '{query.text}': {exc!r}")
+				stats = None
+			if stats is not None:
+				return stats
+		return await self._cache.get_or_compute(query.key, lambda: self._search_sources(query))
+
+	async def search_many(self, queries: List[PriceQuery], on_result: Optional[Callable[[PriceQuery, Any], None]] = None) -> List[Any]:
+		"""Stats (or the exception raised) for each query, looking up duplicates once.
+
+		``on_result(query, outcome)`` is called as each distinct query completes.
+		"""
+		unique = {query.key: query for query in queries}
+
+		async def search(query: PriceQuery) -> Any:
+			try:
+				outcome = await self.search(query)
+			except Exception as exc:
+				outcome = exc
+			if on_result is not None:
+				on_result(query, outcome)
+			return outcome
+
+		outcomes = await asyncio.gather(*(search(query) for query in unique.values()))
+		by_key = dict(zip(unique.keys(), outcomes))
+		return [by_key[query.key] for query in queries]
+
+	async def _search_sources(self, query: PriceQuery) -> Dict[str, Any]:
+		client = self._get_client()
+		pages = await asyncio.gather(*(self._fetch(client, source, query) for source in self._sources))
+		if self._sources and all(page is None for page in pages):
+			# Not cached, so the next claim retries instead of reusing the outage
+			raise PriceSearchError("All price sources failed")
+		stats = PriceStats()
+		for page in pages:
+			if page is not None:
+				stats.merge(page)
+		return {**stats.as_dict(), "source": "web_search"}
+
+	async def _fetch(self, client: httpx.AsyncClient, source: PriceSource, query: PriceQuery) -> Optional[PriceStats]:
+		assert self._semaphore is not None
+		async with self._semaphore:
+			self._fetches += 1
+			extractor = PriceExtractor(self._max_prices_per_page)
+			try:
+				async with aclosing(source.stream(client, query)) as chunks:
+					async for chunk in chunks:
+						if extractor.feed(chunk):
+							self._early_stops += 1
+							break
+			except Exception as exc:
+				self._source_errors += 1
+				print(f"[price-search] {source.name} failed for '{query.text}': {exc!r}")
+				return None
+			return extractor.finish()
+
+	async def aclose(self) -> None:
+		if self._client is not None:
+			await self._client.aclose()
+			self._client = None
+
+	def stats(self) -> Dict[str, Any]:
+		return {
+			"sources": [source.name for source in self._sources],
+			"fetches": self._fetches,
+			"source_errors": self._source_errors,
+			"early_stops": self._early_stops,
+			"max_concurrency": self._max_concurrency,
+			"cache": self._cache.stats(),
+			"catalog": self._catalog.stats() if self._catalog is not None else None,
+		}
+
+
+_price_search_engine: Optional[PriceSearchEngine] = None
+
+
+def get_price_search_engine() -> PriceSearchEngine:
+	global _price_search_engine
+	if _price_search_engine is None:
+		settings = get_settings()
+		_price_search_engine = PriceSearchEngine(
+			sources=default_sources(settings.price_search_url),
+			max_concurrency=settings.price_search_max_concurrency,
+			timeout=settings.price_search_timeout,
+			cache_ttl_seconds=settings.price_search_cache_ttl_seconds,
+			cache_max_entries=settings.price_search_cache_max_entries,
+			max_prices_per_page=settings.price_search_max_prices_per_page or None,
+			catalog=PartsCatalog(min_score=settings.parts_catalog_min_score) if settings.parts_catalog_enabled else None,
+		)
+	return _price_search_engine
@@ -0,0 +1,230 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Union
+
+from ai.core.config import get_settings
+
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+def content_digest(data: Buffer) -> str:
+	"""Hex digest identifying an image by its bytes."""
+	return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+def cache_key(endpoint: str, params: Dict[str, Any], *digests: str) -> str:
+	"""Key for one endpoint call: endpoint name, canonical params and content digests."""
+	canonical = json.dumps({"endpoint": endpoint, "params": params, "content": list(digests)}, sort_keys=True, default=str)
+	return hashlib.blake2b(canonical.encode("utf-8"), digest_size=20).hexdigest()
+
+
+class ResultCache:
+	"""Two-tier cache of JSON-serializable endpoint results with single-flight.
+
+	The memory tier is an LRU bounded by entry count. The optional disk tier
+	stores one JSON file per key under ``directory`` and evicts the oldest files
+	once ``disk_max_bytes`` is exceeded. Both tiers expire entries after
+	``ttl_seconds``. Concurrent misses for the same key share one computation.
+	A computation that raises stores nothing, and neither does a value the
+	``cacheable`` predicate rejects (e.g. a degraded answer worth retrying);
+	the callers waiting on it still get it. Cached values are shared between
+	callers and must not be mutated.
+	"""
+
+	def __init__(
+		self,
+		max_entries: int = 1024,
+		ttl_seconds: float = 3600.0,
+		directory: Optional[str] = None,
+		disk_max_bytes: int = 512 * 1024 * 1024,
+	) -> None:
+		self._max_entries = max(1, max_entries)
+		self._ttl = ttl_seconds
+		self._directory = directory
+		self._disk_max_bytes = disk_max_bytes
+		self._memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+		self._inflight: Dict[str, asyncio.Future] = {}
+		self._stats = {
+			"memory_hits": 0,
+			"disk_hits": 0,
+			"misses": 0,
+			"coalesced": 0,
+			"uncacheable": 0,
+			"memory_evictions": 0,
+			"disk_evictions": 0,
+		}
+		if directory:
+			os.makedirs(directory, exist_ok=True)
+
+	async def get_or_compute(
+		self,
+		key: str,
+		compute: Callable[[], Awaitable[Any]],
+		cacheable: Optional[Callable[[Any], bool]] = None,
+	) -> Any:
+		value = self._memory_get(key)
+		if value is not None:
+			self._stats["memory_hits"] += 1
+			return value
+
+		task = self._inflight.get(key)
+		if task is not None:
+			self._stats["coalesced"] += 1
+		else:
+			# The fill runs as its own task so one caller disconnecting does not
+			# cancel the computation the other callers are waiting on
+			task = asyncio.ensure_future(self._fill(key, compute, cacheable))
+			self._inflight[key] = task
+			task.add_done_callback(lambda done: self._finish(key, done))
+		return await asyncio.shield(task)
+
+	async def _fill(self, key: str, compute: Callable[[], Awaitable[Any]], cacheable: Optional[Callable[[Any], bool]]) -> Any:
+		value = await self._disk_get(key)
+		if value is not None:
+			self._stats["disk_hits"] += 1
+		else:
+			self._stats["misses"] += 1
+			value = await compute()
+			if cacheable is not None and not cacheable(value):
+				self._stats["uncacheable"] += 1
+				return value
+			await self._disk_put(key, value)
+		self._memory_put(key, value)
+		return value
+
+	def _finish(self, key: str, task: asyncio.Future) -> None:
+		self._inflight.pop(key, None)
+		if not task.cancelled():
+			# Mark the exception retrieved; awaiting callers still re-raise it
+			task.exception()
+
+	def _memory_get(self, key: str) -> Any:
+		entry = self._memory.get(key)
+		if entry is None:
+			return None
+		stored_at, value = entry
+		if time.time() - stored_at > self._ttl:
+			del self._memory[key]
+			return None
+		self._memory.move_to_end(key)
+		return value
+
+	def _memory_put(self, key: str, value: Any) -> None:
+		self._memory[key] = (time.time(), value)
+		self._memory.move_to_end(key)
+		while len(self._memory) > self._max_entries:
+			self._memory.popitem(last=False)
+			self._stats["memory_evictions"] += 1
+
+	def _path(self, key: str) -> str:
+		assert self._directory is not None
+		return os.path.join(self._directory, f"{key}.json")
+
+	async def _disk_get(self, key: str) -> Any:
+		if not self._directory:
+			return None
+		return await asyncio.to_thread(self._read_file, key)
+
+	def _read_file(self, key: str) -> Any:
+		path = self._path(key)
+		try:
+			if time.time() - os.path.getmtime(path) > self._ttl:
+				os.remove(path)
+				return None
+			with open(path, "r", encoding="utf-8") as fp:
+				return json.load(fp)
+		except (OSError, ValueError):
+			return None
+
+	async def _disk_put(self, key: str, value: Any) -> None:
+		if not self._directory:
+			return
+		await asyncio.to_thread(self._write_file, key, value)
+
+	def _write_file(self, key: str, value: Any) -> None:
+		path = self._path(key)
+		tmp_path = f"{path}.{os.getpid()}.tmp"
+		try:
+			with open(tmp_path, "w", encoding="utf-8") as fp:
+				json.dump(value, fp, default=str)
+			os.replace(tmp_path, path)
+		except (OSError, TypeError, ValueError) as exc:
+			print(f"[result-cache] Could not persist {key}: {exc}")
+			try:
+				os.remove(tmp_path)
+			except OSError:
+				pass
+			return
+		self._evict_disk()
+
+	def _evict_disk(self) -> None:
+		assert self._directory is not None
+		entries = []
+		total = 0
+		now = time.time()
+		for entry in os.scandir(self._directory):
+			if not entry.name.endswith(".json"):
+				continue
+			stat = entry.stat()
+			if now - stat.st_mtime > self._ttl:
+				self._remove(entry.path)
+				continue
+			entries.append((stat.st_mtime, stat.st_size, entry.path))
+			total += stat.st_size
+		entries.sort()
+		for _, size, path in entries:
+			if total <= self._disk_max_bytes:
+				break
+			self._remove(path)
+			total -= size
+
+	def _remove(self, path: str) -> None:
+		try:
+			os.remove(path)
+			self._stats["disk_evictions"] += 1
+		except OSError:
+			pass
+
+	def stats(self) -> Dict[str, Any]:
+		lookups = self._stats["memory_hits"] + self._stats["disk_hits"] + self._stats["misses"] + self._stats["coalesced"]
+		hits = lookups - self._stats["misses"]
+		return {
+			**self._stats,
+			"hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+			"memory_entries": len(self._memory),
+			"disk_enabled": bool(self._directory),
+		}
+
+
+_result_cache: Optional[ResultCache] = None
+
+
+def get_result_cache() -> ResultCache:
+	global _result_cache
+	if _result_cache is None:
+		settings = get_settings()
+		_result_cache = ResultCache(
+			max_entries=settings.result_cache_max_entries,
+			ttl_seconds=settings.result_cache_ttl_seconds,
+			directory=settings.result_cache_dir,
+			disk_max_bytes=settings.result_cache_disk_max_bytes,
+		)
+	return _result_cache
+
+
+async def cached(
+	endpoint: str,
+	params: Dict[str, Any],
+	digests: Tuple[str, ...],
+	compute: Callable[[], Awaitable[Any]],
+	cacheable: Optional[Callable[[Any], bool]] = None,
+) -> Any:
+	"""Run ``compute`` through the shared result cache unless caching is disabled."""
+	if not get_settings().result_cache_enabled:
+		return await compute()
+	return await get_result_cache().get_or_compute(cache_key(endpoint, params, *digests), compute, cacheable)
@@ -0,0 +1,20 @@
+"""Wire formats for incremental responses: server-sent events and NDJSON."""
+import json
+from typing import Any, Optional
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SSE_MEDIA_TYPE = "text/event-stream"
+# Headers that keep proxies from buffering or caching a stream
+STREAM_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+# SSE comment line: keeps proxies from closing an idle stream
+SSE_KEEPALIVE = ": keepalive\n\n"
+
+
+def sse_message(event: str, data: Any, event_id: Optional[int] = None) -> str:
+	prefix = f"id: {event_id}\n" if event_id is not None else ""
+	return f"{prefix}event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def ndjson_line(event: str, data: Any) -> str:
+	return json.dumps({"event": event, "data": data}, default=str) + "\n"
@@ -0,0 +1,185 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from ai.core.config import get_settings
+
+
+# (shared memory name, shape, dtype) describing one image placed in shared memory
+SharedImageHandle = Tuple[str, Tuple[int, ...], str]
+
+
+class WorkerPoolBusy(RuntimeError):
+	"""Raised when the pool already has as many jobs in flight as it may queue."""
+
+
+def _init_worker(initializer: Optional[Callable[[], None]], threads_per_worker: int) -> None:
+	# Each worker gets a slice of the cores; letting every process spin up
+	# cpu_count() OpenMP/torch threads just oversubscribes the machine.
+	try:
+		import cv2
+		cv2.setNumThreads(threads_per_worker)
+	except Exception:
+		pass
+	try:
+		import torch
+		torch.set_num_threads(threads_per_worker)
+	except Exception:
+		pass
+	if initializer is not None:
+		initializer()
+
+
+def _noop() -> int:
+	return os.getpid()
+
+
+def _call_with_shared_images(fn: Callable[..., Any], handles: Sequence[SharedImageHandle], batched: bool, args: tuple) -> Any:
+	"""Worker-side: attach to shared images, run ``fn`` on ndarray views, detach."""
+	blocks = []
+	images = []
+	try:
+		for name, shape, dtype in handles:
+			block = shared_memory.SharedMemory(name=name)
+			blocks.append(block)
+			images.append(np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf))
+		if batched:
+			return fn(images, *args)
+		return fn(images[0], *args)
+	finally:
+		# Views must be released before the mapping can be closed
+		del images
+		for block in blocks:
+			try:
+				block.close()
+			except BufferError:
+				pass
+
+
+class WorkerPool:
+	"""Bounded execution layer for CPU-bound CV work.
+
+	With ``workers > 0`` jobs run in a process pool whose workers call
+	``initializer`` once (to preload models) and receive images through shared
+	memory instead of pickled copies. With ``workers == 0`` jobs run on a thread
+	pool in this process. Either way at most ``workers + queue_size`` jobs may be
+	in flight; further submissions raise :class:`WorkerPoolBusy`.
+	"""
+
+	def __init__(
+		self,
+		workers: int = 0,
+		queue_size: int = 16,
+		threads_per_worker: int = 1,
+		initializer: Optional[Callable[[], None]] = None,
+		start_method: str = "spawn",
+	) -> None:
+		self._workers = max(0, int(workers))
+		self._capacity = max(1, self._workers) + max(0, int(queue_size))
+		self._threads_per_worker = max(1, int(threads_per_worker))
+		self._initializer = initializer
+		self._start_method = start_method
+		self._executor: Optional[Executor] = None
+		self._in_flight = 0
+		self._completed = 0
+		self._rejected = 0
+		self._failed = 0
+
+	@property
+	def uses_processes(self) -> bool:
+		return self._workers > 0
+
+	def start(self) -> None:
+		if self._executor is not None:
+			return
+		if self.uses_processes:
+			self._executor = ProcessPoolExecutor(
+				max_workers=self._workers,
+				mp_context=multiprocessing.get_context(self._start_method),
+				initializer=_init_worker,
+				initargs=(self._initializer, self._threads_per_worker),
+			)
+			# Spawn every worker now so model preloading happens at startup
+			for _ in range(self._workers):
+				self._executor.submit(_noop)
+		else:
+			self._executor = ThreadPoolExecutor(max_workers=max(1, os.cpu_count() or 1), thread_name_prefix="cv-worker")
+
+	def shutdown(self, wait: bool = True) -> None:
+		if self._executor is not None:
+			self._executor.shutdown(wait=wait, cancel_futures=True)
+			self._executor = None
+
+	async def run(self, fn: Callable[..., Any], images: Union[np.ndarray, List[np.ndarray]], *args: Any) -> Any:
+		"""Run ``fn(images, *args)`` on the pool.
+
+		``images`` is a single ndarray or a list of them; ``fn`` receives the same
+		shape of argument. ``fn`` must be a module-level function when the pool
+		uses processes, and its result must not reference the images.
+		"""
+		if self._in_flight >= self._capacity:
+			self._rejected += 1
+			raise WorkerPoolBusy(f"CV worker pool is saturated ({self._in_flight} jobs in flight)")
+		self.start()
+		assert self._executor is not None
+		loop = asyncio.get_running_loop()
+		batched = isinstance(images, list)
+		self._in_flight += 1
+		blocks: List[shared_memory.SharedMemory] = []
+		try:
+			if not self.uses_processes:
+				result = await loop.run_in_executor(self._executor, lambda: fn(images, *args))
+			else:
+				handles = []
+				for image in (images if batched else [images]):
+					block = shared_memory.SharedMemory(create=True, size=max(1, image.nbytes))
+					blocks.append(block)
+					np.ndarray(image.shape, dtype=image.dtype, buffer=block.buf)[...] = image
+					handles.append((block.name, image.shape, image.dtype.str))
+				result = await loop.run_in_executor(self._executor, _call_with_shared_images, fn, handles, batched, args)
+		except Exception:
+			self._failed += 1
+			raise
+		finally:
+			self._in_flight -= 1
+			for block in blocks:
+				block.close()
+				block.unlink()
+		self._completed += 1
+		return result
+
+	def stats(self) -> Dict[str, Any]:
+		return {
+			"mode": "process" if self.uses_processes else "thread",
+			"workers": self._workers,
+			"capacity": self._capacity,
+			"in_flight": self._in_flight,
+			"completed": self._completed,
+			"failed": self._failed,
+			"rejected": self._rejected,
+		}
+
+
+_worker_pool: Optional[WorkerPool] = None
+
+
+def get_worker_pool() -> WorkerPool:
+	global _worker_pool
+	if _worker_pool is None:
+		settings = get_settings()
+		initializer = None
+		if settings.cv_workers > 0 and settings.cv_worker_preload_models:
+			from ai.api.routes.license_plate import preload_models
+			initializer = preload_models
+		_worker_pool = WorkerPool(
+			workers=settings.cv_workers,
+			queue_size=settings.cv_worker_queue_size,
+			threads_per_worker=settings.cv_worker_threads,
+			initializer=initializer,
+		)
+	return _worker_pool
@@ -0,0 +1,142 @@
+"""Bulk import of part price sheets into the parts catalog.
+
+    python -m ai.crud.part_prices sheets/*.csv sheets/*.jsonl [--replace]
+
+Sheets are CSV (with a header row) or JSON Lines with the columns ``make``,
+``model``, ``year``, ``part_category``, ``part_name`` and either ``price`` or
+``min_price``/``max_price``; ``currency`` and ``source`` are optional. Empty
+make/model/year mean the price applies to any car. ``year`` may be a range
+such as ``2015-2018``.
+"""
+import argparse
+import csv
+import json
+import os
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from ai.core.parts_catalog import normalize_text, part_key, year_key
+from ai.db.session import SessionLocal
+from ai.models.part_price import PartNameToken, PartPrice
+
+
+# A year range wider than this is treated as "any year"
+MAX_YEAR_SPAN = 40
+
+
+def read_price_sheet(path: str) -> Iterator[Dict[str, Any]]:
+	"""Raw rows of one CSV or JSONL sheet."""
+	if path.endswith((".jsonl", ".ndjson")):
+		with open(path, "r", encoding="utf-8") as fp:
+			for line in fp:
+				if line.strip():
+					yield json.loads(line)
+	else:
+		with open(path, "r", encoding="utf-8", newline="") as fp:
+			yield from csv.DictReader(fp)
+
+
+def _price(value: Any) -> Optional[float]:
+	if value is None or value == "":
+		return None
+	try:
+		return float(re.sub(r"[^\d.]", "", str(value)))
+	except ValueError:
+		return None
+
+
+def _years(value: Any) -> List[str]:
+	years = re.findall(r"\b(?:19|20)\d{2}\b", str(value or ""))
+	if len(years) == 2 and "-" in str(value) and 0 <= int(years[1]) - int(years[0]) <= MAX_YEAR_SPAN:
+		return [str(year) for year in range(int(years[0]), int(years[1]) + 1)]
+	return [year_key(value)]
+
+
+def catalog_rows(rows: Iterable[Dict[str, Any]], source: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+	"""Normalized ``part_prices`` rows; sheet rows without a part name or price are skipped."""
+	for row in rows:
+		name = str(row.get("part_name") or "").strip()
+		low = _price(row.get("min_price"))
+		high = _price(row.get("max_price"))
+		single = _price(row.get("price"))
+		low = low if low is not None else single
+		high = high if high is not None else single
+		if not name or low is None or high is None:
+			continue
+		make = str(row.get("make") or "").strip()
+		model = str(row.get("model") or "").strip()
+		category = str(row.get("part_category") or "").strip()
+		for year in _years(row.get("year")):
+			yield {
+				"make": make,
+				"model": model,
+				"year": year,
+				"part_category": category,
+				"part_name": name,
+				"make_key": normalize_text(make),
+				"model_key": normalize_text(model),
+				"year_key": year,
+				"category_key": normalize_text(category),
+				"part_key": part_key(name),
+				"min_price": min(low, high),
+				"max_price": max(low, high),
+				"currency": str(row.get("currency") or "USD").upper()[:3],
+				"source": row.get("source") or source,
+			}
+
+
+def rebuild_token_index(db: Session) -> int:
+	"""Recompute ``part_name_tokens`` from the distinct part names in the catalog."""
+	db.execute(delete(PartNameToken))
+	keys = db.execute(select(PartPrice.part_key).distinct()).scalars().all()
+	tokens = [{"token": token, "part_key": key} for key in keys for token in set(key.split())]
+	if tokens:
+		db.execute(insert(PartNameToken), tokens)
+	return len(keys)
+
+
+def import_price_sheets(paths: List[str], replace: bool = False, chunk_size: int = 5000, db: Optional[Session] = None) -> int:
+	"""Load price sheets in one transaction and refresh the token index; returns rows inserted."""
+	own_session = db is None
+	db = db or SessionLocal()
+	try:
+		PartPrice.metadata.create_all(bind=db.get_bind(), tables=[PartPrice.__table__, PartNameToken.__table__])
+		if replace:
+			db.execute(delete(PartPrice))
+		inserted = 0
+		for path in paths:
+			chunk: List[Dict[str, Any]] = []
+			for row in catalog_rows(read_price_sheet(path), source=os.path.basename(path)):
+				chunk.append(row)
+				if len(chunk) >= chunk_size:
+					db.execute(insert(PartPrice), chunk)
+					inserted += len(chunk)
+					chunk = []
+			if chunk:
+				db.execute(insert(PartPrice), chunk)
+				inserted += len(chunk)
+		rebuild_token_index(db)
+		db.commit()
+		return inserted
+	except Exception:
+		db.rollback()
+		raise
+	finally:
+		if own_session:
+			db.close()
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	parser.add_argument("paths", nargs="+", help="CSV or JSONL price sheets")
+	parser.add_argument("--replace", action="store_true", help="drop existing catalog rows first")
+	args = parser.parse_args()
+	inserted = import_price_sheets(args.paths, replace=args.replace)
+	print(f"[parts-catalog] Imported {inserted} price rows from {len(args.paths)} sheet(s)")
+
+
+if __name__ == "__main__":
+	main()
@@ -1,8 +1,16 @@
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from ai.api import api_router
+from ai.core import fraud_alerts, image_fingerprint
 from ai.core.config import get_settings
+from ai.core.gemini import get_gemini_client
+from ai.core.image_fetch import get_image_fetcher
+from ai.core.jobs import get_job_manager
+from ai.core.price_search import get_price_search_engine
+from ai.core.workers import get_worker_pool
 
 
 def create_application() -> FastAPI:
@@ -16,6 +24,36 @@ def create_application() -> FastAPI:
 		allow_headers=["*"],
 	)
 	application.include_router(api_router)
+
+	@application.on_event("startup")
+	async def _start_worker_pool() -> None:
+		if not settings.gemini_api_key:
+			print("[ai] GEMINI_API_KEY is not set; damage estimation and license card OCR will answer 503")
+		get_worker_pool().start()
+		# Resumes jobs a previous process left unfinished
+		await get_job_manager().start()
+		if settings.image_fingerprint_enabled:
+			try:
+				# Maps the snapshot and replays newer rows before the first upload
+				await asyncio.to_thread(image_fingerprint.get_fingerprint_index)
+			except Exception as exc:
+				print(f"[ai] Image fingerprint index load failed: {exc}")
+
+	@application.on_event("shutdown")
+	async def _stop_worker_pool() -> None:
+		# Unfinished jobs go back to the queue before their clients are closed
+		await get_job_manager().stop()
+		get_worker_pool().shutdown()
+		await get_image_fetcher().aclose()
+		await get_gemini_client().aclose()
+		await get_price_search_engine().aclose()
+		index = image_fingerprint._fingerprint_index
+		if index is not None and index.unsnapshotted:
+			try:
+				await asyncio.to_thread(index.save_snapshot)
+			except Exception as exc:
+				print(f"[ai] Image fingerprint snapshot failed: {exc}")
+		await asyncio.to_thread(fraud_alerts.close)
 	return application
 
 
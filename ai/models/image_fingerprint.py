@@ -0,0 +1,31 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import BigInteger, DateTime, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ai.db.base import Base
+
+
+class ImageFingerprint(Base):
+	"""Perceptual hashes of one uploaded claim photo.
+
+	``phash``/``dhash`` are 64-bit hashes stored as signed integers (the bits of
+	the unsigned value); see ``ai.core.image_fingerprint``. Photos uploaded
+	together share a ``submission_id``.
+	"""
+
+	__tablename__ = "image_fingerprints"
+
+	id: Mapped[int] = mapped_column(Integer, primary_key=True)
+	phash: Mapped[int] = mapped_column(BigInteger)
+	dhash: Mapped[int] = mapped_column(BigInteger)
+	claim_id: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+	submission_id: Mapped[str] = mapped_column(String(64))
+	angle: Mapped[str] = mapped_column(String(16), default="")
+	content_digest: Mapped[str] = mapped_column(String(40))
+	created_at: Mapped[datetime] = mapped_column(DateTime)
+
+	__table_args__ = (
+		Index("ix_image_fingerprints_claim_id", "claim_id"),
+	)
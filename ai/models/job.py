@@ -0,0 +1,50 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, Index, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ai.db.base import Base
+
+
+class Job(Base):
+	"""A background job (see ``ai.core.jobs``).
+
+	``params``, ``progress`` and ``result`` are JSON text. Uploaded inputs live
+	on disk under the job input directory until the job finishes.
+	"""
+
+	__tablename__ = "jobs"
+
+	id: Mapped[str] = mapped_column(String(32), primary_key=True)
+	kind: Mapped[str] = mapped_column(String(64))
+	status: Mapped[str] = mapped_column(String(16))
+	stage: Mapped[str] = mapped_column(String(32), default="")
+	params: Mapped[str] = mapped_column(Text, default="{}")
+	progress: Mapped[str] = mapped_column(Text, default="{}")
+	result: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+	error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+	attempts: Mapped[int] = mapped_column(Integer, default=0)
+	created_at: Mapped[datetime] = mapped_column(DateTime)
+	updated_at: Mapped[datetime] = mapped_column(DateTime)
+
+	__table_args__ = (
+		Index("ix_jobs_status_updated_at", "status", "updated_at"),
+	)
+
+
+class JobEvent(Base):
+	"""One progress event of a job, numbered from 1 per job (the SSE event id)."""
+
+	__tablename__ = "job_events"
+
+	id: Mapped[int] = mapped_column(Integer, primary_key=True)
+	job_id: Mapped[str] = mapped_column(String(32))
+	seq: Mapped[int] = mapped_column(Integer)
+	event: Mapped[str] = mapped_column(String(32))
+	data: Mapped[str] = mapped_column(Text)
+	created_at: Mapped[datetime] = mapped_column(DateTime)
+
+	__table_args__ = (
+		Index("ix_job_events_job_id_seq", "job_id", "seq", unique=True),
+	)
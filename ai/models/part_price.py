@@ -0,0 +1,47 @@
+from typing import Optional
+
+from sqlalchemy import Float, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ai.db.base import Base
+
+
+class PartPrice(Base):
+	"""One row of an imported price sheet.
+
+	The ``*_key`` columns hold normalized values and back the lookup index; the
+	other text columns keep the sheet's original spelling for display. An empty
+	key means the price applies to any make, model or year.
+	"""
+
+	__tablename__ = "part_prices"
+
+	id: Mapped[int] = mapped_column(Integer, primary_key=True)
+	make: Mapped[str] = mapped_column(String(64), default="")
+	model: Mapped[str] = mapped_column(String(64), default="")
+	year: Mapped[str] = mapped_column(String(16), default="")
+	part_category: Mapped[str] = mapped_column(String(64), default="")
+	part_name: Mapped[str] = mapped_column(String(128))
+	make_key: Mapped[str] = mapped_column(String(64), default="")
+	model_key: Mapped[str] = mapped_column(String(64), default="")
+	year_key: Mapped[str] = mapped_column(String(4), default="")
+	category_key: Mapped[str] = mapped_column(String(64), default="")
+	part_key: Mapped[str] = mapped_column(String(128))
+	min_price: Mapped[float] = mapped_column(Float)
+	max_price: Mapped[float] = mapped_column(Float)
+	currency: Mapped[str] = mapped_column(String(3), default="USD")
+	source: Mapped[Optional[str]] = mapped_column(String(128), nullable=True)
+
+	__table_args__ = (
+		Index("ix_part_prices_lookup", "make_key", "model_key", "year_key", "category_key", "part_key"),
+		Index("ix_part_prices_part_key", "part_key"),
+	)
+
+
+class PartNameToken(Base):
+	"""Inverted index from a part-name token to the normalized part names containing it."""
+
+	__tablename__ = "part_name_tokens"
+
+	token: Mapped[str] = mapped_column(String(64), primary_key=True)
+	part_key: Mapped[str] = mapped_column(String(128), primary_key=True)
@@ -9,7 +9,9 @@ from .damage_estimation import (
     DamageSeverity,
     PartCategory,
     ImageInfo,
-    PriceSearchError
+    PriceSearchError,
+    AnalysisMode,
+    StreamFormat
 )
 
 __all__ = [
@@ -23,5 +25,7 @@ __all__ = [
     "DamageSeverity",
     "PartCategory",
     "ImageInfo",
-    "PriceSearchError"
+    "PriceSearchError",
+    "AnalysisMode",
+    "StreamFormat"
 ]
@@ -21,6 +21,16 @@ class PartCategory(str, Enum):
     OTHER = "Other"
 
 
+class AnalysisMode(str, Enum):
+    PER_ANGLE = "per_angle"
+    COMBINED = "combined"
+
+
+class StreamFormat(str, Enum):
+    NDJSON = "ndjson"
+    SSE = "sse"
+
+
 class CarDetails(BaseModel):
     make: Optional[str] = Field(None, description="Car make (e.g., Toyota, Honda)")
     model: Optional[str] = Field(None, description="Car model (e.g., Camry, Civic)")
@@ -33,6 +43,7 @@ class PriceSearchResults(BaseModel):
     avg_price: float = Field(..., description="Average price in USD")
     price_count: int = Field(..., description="Number of prices found")
     currency: str = Field(default="USD", description="Currency code")
+    source: Optional[str] = Field(None, description="Where the prices came from (catalog or web_search)")
 
 
 class DamagedPart(BaseModel):
@@ -0,0 +1,42 @@
+import glob
+import os
+import time
+from typing import Callable, List, Optional
+
+import numpy as np
+
+
+def load_images(directory: Optional[str], count: int, shape=(720, 1280, 3), seed: int = 0) -> List[np.ndarray]:
+    """Load BGR images from a directory, or synthesize noise frames when none is given"""
+    if directory:
+        import cv2
+
+        paths = sorted(
+            path for pattern in ("*.jpg", "*.jpeg", "*.png")
+            for path in glob.glob(os.path.join(directory, pattern))
+        )
+        images = [cv2.imread(path) for path in paths[:count]]
+        images = [image for image in images if image is not None]
+        if images:
+            return images
+    rng = np.random.default_rng(seed)
+    return [rng.integers(0, 256, size=shape, dtype=np.uint8) for _ in range(count)]
+
+
+def timeit(fn: Callable[[], object], repeat: int = 5, warmup: int = 1) -> float:
+    """Return the best wall-clock time in seconds over ``repeat`` runs"""
+    for _ in range(warmup):
+        fn()
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def print_table(headers: List[str], rows: List[List[object]]) -> None:
+    widths = [max(len(str(h)), *(len(str(r[i])) for r in rows)) if rows else len(str(h)) for i, h in enumerate(headers)]
+    print("  ".join(str(h).rjust(w) for h, w in zip(headers, widths)))
+    for row in rows:
+        print("  ".join(str(c).rjust(w) for c, w in zip(row, widths)))
@@ -0,0 +1,69 @@
+"""Plate de-duplication: original nested loop vs the vectorized suppression module.
+
+    python -m benchmarks.bench_box_suppression
+"""
+import numpy as np
+
+from ai.core.box_suppression import OVERLAP_IOU, suppress_detections
+from benchmarks._common import print_table, timeit
+
+
+def legacy_filter(all_plates):
+    """The nested-loop merge previously inlined in detect_license_plates_from_url"""
+    filtered_plates = []
+    for plate in all_plates:
+        is_duplicate = False
+        for existing_plate in filtered_plates:
+            bbox1 = plate['bbox']
+            bbox2 = existing_plate['bbox']
+            x1 = max(bbox1[0], bbox2[0])
+            y1 = max(bbox1[1], bbox2[1])
+            x2 = min(bbox1[2], bbox2[2])
+            y2 = min(bbox1[3], bbox2[3])
+            if x1 < x2 and y1 < y2:
+                overlap_area = (x2 - x1) * (y2 - y1)
+                area1 = (bbox1[2] - bbox1[0]) * (bbox1[3] - bbox1[1])
+                area2 = (bbox2[2] - bbox2[0]) * (bbox2[3] - bbox2[1])
+                if overlap_area / min(area1, area2) > 0.5:
+                    is_duplicate = True
+                    if plate['confidence'] > existing_plate['confidence']:
+                        filtered_plates.remove(existing_plate)
+                        filtered_plates.append(plate)
+                    break
+        if not is_duplicate:
+            filtered_plates.append(plate)
+    return filtered_plates
+
+
+def make_plates(count, seed=0):
+    rng = np.random.default_rng(seed)
+    # Scale the canvas with the count so the density of overlaps stays realistic
+    extent = int(400 * max(1.0, np.sqrt(count / 10)))
+    xy = rng.integers(0, extent, size=(count, 2))
+    wh = rng.integers(40, 220, size=(count, 2))
+    confidence = rng.random(count)
+    return [
+        {'bbox': [int(x), int(y), int(x + w), int(y + h)], 'confidence': float(c)}
+        for (x, y), (w, h), c in zip(xy, wh, confidence)
+    ]
+
+
+def main():
+    rows = []
+    for count in (10, 100, 1_000, 10_000):
+        plates = make_plates(count)
+        repeat = 3 if count >= 1_000 else 20
+        vectorized = timeit(lambda: suppress_detections(plates), repeat=repeat)
+        greedy = timeit(lambda: suppress_detections(plates, mode=OVERLAP_IOU, sort_by_confidence=True), repeat=repeat)
+        if count <= 1_000:
+            legacy = timeit(lambda: legacy_filter(plates), repeat=repeat)
+            assert [id(p) for p in legacy_filter(plates)] == [id(p) for p in suppress_detections(plates)]
+            legacy_ms = f"{legacy * 1000:.2f}"
+        else:
+            legacy_ms = "skipped"
+        rows.append([count, legacy_ms, f"{vectorized * 1000:.2f}", f"{greedy * 1000:.2f}"])
+    print_table(["boxes", "legacy_ms", "sequential_ms", "greedy_iou_ms"], rows)
+
+
+if __name__ == "__main__":
+    main()
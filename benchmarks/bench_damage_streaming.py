@@ -0,0 +1,137 @@
+"""Multi-angle estimate: time to first byte and to each result, buffered vs streamed.
+
+    python -m benchmarks.bench_damage_streaming [--vision-ms 3000] [--price-ms 1500] [--parts-per-angle 3] [--repeat 3]
+
+Gemini and the price search are replaced by stubs with randomized latency
+(so the numbers reflect the response shape, not the network), and the app is
+driven as a raw ASGI callable so every body chunk is timestamped when the
+server sends it. Reports when the client sees its first byte, the first
+identified parts, the first priced part and the complete result.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import cv2
+import httpx
+import numpy as np
+from fastapi import FastAPI
+
+from ai.api.routes import damage_estimation
+from ai.core.config import get_settings
+from benchmarks._common import load_images, print_table
+
+ANGLES = ["front", "back", "left", "right"]
+
+
+class StubGemini:
+    def __init__(self, latency_ms, parts_per_angle):
+        self.latency_ms = latency_ms
+        self.parts_per_angle = parts_per_angle
+
+    async def generate(self, parts):
+        await asyncio.sleep(random.uniform(0.5, 1.5) * self.latency_ms / 1000)
+        angle = next((angle for angle in ANGLES if f"viewing angle: {angle}" in str(parts[0])), "front")
+        body = {"damaged_parts": [{"part_name": f"{angle} part {i}"} for i in range(self.parts_per_angle)]}
+        return json.dumps(body)
+
+
+class StubPriceSearch:
+    def __init__(self, latency_ms):
+        self.latency_ms = latency_ms
+
+    async def search_many(self, queries, on_result=None):
+        async def search(query):
+            await asyncio.sleep(random.uniform(0.5, 1.5) * self.latency_ms / 1000)
+            outcome = {"min_price": 100.0, "max_price": 200.0, "avg_price": 150.0, "price_count": 2, "currency": "USD"}
+            if on_result is not None:
+                on_result(query, outcome)
+            return outcome
+
+        unique = {query.key: query for query in queries}
+        outcomes = dict(zip(unique, await asyncio.gather(*(search(query) for query in unique.values()))))
+        return [outcomes[query.key] for query in queries]
+
+
+def upload_body(seed):
+    images = load_images(None, len(ANGLES), shape=(480, 640, 3), seed=seed)
+    files = {}
+    for angle, image in zip(ANGLES, images):
+        files[f"{angle}_image"] = (f"{angle}.jpg", cv2.imencode(".jpg", image)[1].tobytes(), "image/jpeg")
+    request = httpx.Request("POST", "http://bench/", files=files)
+    return request.read(), [(name.lower().encode(), value.encode()) for name, value in request.headers.items()]
+
+
+async def timed_request(app, path, body, headers):
+    """(seconds until each non-empty body chunk, full body)"""
+    scope = {
+        "type": "http", "http_version": "1.1", "method": "POST", "scheme": "http", "root_path": "",
+        "path": path, "raw_path": path.encode(), "query_string": b"", "headers": headers,
+        "server": ("bench", 80), "client": ("bench", 1),
+    }
+    received = False
+
+    async def receive():
+        nonlocal received
+        if not received:
+            received = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await asyncio.Event().wait()
+
+    start = time.perf_counter()
+    stamps, chunks = [], []
+
+    async def send(message):
+        if message["type"] == "http.response.body" and message.get("body"):
+            stamps.append(time.perf_counter() - start)
+            chunks.append(message["body"])
+
+    await app(scope, receive, send)
+    return stamps, b"".join(chunks)
+
+
+def milestones(stamps, body, streamed):
+    if not streamed:
+        return stamps[0], stamps[-1], stamps[-1], stamps[-1]
+    events = [json.loads(line)["event"] for line in body.decode().splitlines()]
+    # Chunks and NDJSON lines correspond one to one
+    first = {event: stamps[events.index(event)] for event in ("vision", "price") if event in events}
+    return stamps[0], first.get("vision", stamps[-1]), first.get("price", stamps[-1]), stamps[-1]
+
+
+async def run(args):
+    settings = get_settings()
+    settings.image_fingerprint_enabled = False
+    settings.result_cache_enabled = False
+    damage_estimation.get_gemini_client = lambda: StubGemini(args.vision_ms, args.parts_per_angle)
+    damage_estimation.get_price_search_engine = lambda: StubPriceSearch(args.price_ms)
+    app = FastAPI()
+    app.include_router(damage_estimation.router, prefix="/damage")
+
+    results = {"buffered": [], "streamed": []}
+    for i in range(args.repeat):
+        body, headers = upload_body(seed=i)
+        for label, path in (("buffered", "/damage/search-multi-angle-prices"), ("streamed", "/damage/search-multi-angle-prices/stream")):
+            stamps, content = await timed_request(app, path, body, headers)
+            results[label].append(milestones(stamps, content, label == "streamed"))
+    return {label: np.mean(np.asarray(rows), axis=0) * 1000 for label, rows in results.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--vision-ms", type=float, default=3000.0)
+    parser.add_argument("--price-ms", type=float, default=1500.0)
+    parser.add_argument("--parts-per-angle", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    means = asyncio.run(run(args))
+    rows = [[label, *(f"{value:.0f}" for value in values)] for label, values in means.items()]
+    print(f"Mean over {args.repeat} estimates (vision ~{args.vision_ms:.0f} ms, price ~{args.price_ms:.0f} ms, {args.parts_per_angle} parts/angle)")
+    print_table(["response", "first_byte_ms", "first_parts_ms", "first_price_ms", "complete_ms"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Fraud event encoding: legacy JSON vs the binary envelope.
+
+    python -m benchmarks.bench_event_encoding [--detections 20] [--repeat 2000]
+
+Reports the encoded size, full encode/decode time, and the cost of reading
+only the header (what routing needs) for one detection event.
+"""
+import argparse
+import json
+import random
+
+from benchmarks._common import print_table, timeit
+from fraud.kafka.events import EVENT_PLATE_DETECT, decode_event, detections_body, encode_event
+
+
+def make_detections(count):
+    rng = random.Random(0)
+    detections = []
+    for _ in range(count):
+        x, y = rng.uniform(0, 1800), rng.uniform(0, 1000)
+        detections.append({
+            "bbox": [x, y, x + rng.uniform(60, 200), y + rng.uniform(20, 60)],
+            "confidence": rng.random(),
+            "text": "".join(rng.choice("ABCDEFGHJKLMNPRSTUVWXYZ0123456789") for _ in range(7)),
+        })
+    return detections
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--detections", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    detections = make_detections(args.detections)
+    image_ref = "s3://fraud-frames/2024/05/01/frame-000123.jpg"
+    legacy = {"image_ref": image_ref, "detections": detections}
+    body = detections_body(detections, image_ref=image_ref)
+
+    json_raw = json.dumps(legacy).encode("utf-8")
+    envelope_raw = encode_event(EVENT_PLATE_DETECT, body)
+
+    def per_call_us(fn):
+        return timeit(lambda: [fn() for _ in range(args.repeat)], repeat=5, warmup=1) / args.repeat * 1e6
+
+    rows = [
+        [
+            "json",
+            len(json_raw),
+            f"{per_call_us(lambda: json.dumps(legacy).encode('utf-8')):.1f}",
+            f"{per_call_us(lambda: json.loads(json_raw)):.1f}",
+            f"{per_call_us(lambda: json.loads(json_raw)):.1f}",
+        ],
+        [
+            "envelope",
+            len(envelope_raw),
+            f"{per_call_us(lambda: encode_event(EVENT_PLATE_DETECT, detections_body(detections, image_ref=image_ref))):.1f}",
+            f"{per_call_us(lambda: decode_event(envelope_raw).body):.1f}",
+            f"{per_call_us(lambda: decode_event(envelope_raw).header):.1f}",
+        ],
+    ]
+    print(f"{args.detections} detections per event")
+    print_table(["format", "bytes", "encode_us", "decode_us", "route_us"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Multi-angle Gemini latency, sequential vs concurrent, against a local stub.
+
+    python -m benchmarks.bench_gemini_multi_angle [--latency-ms 800] [--rate-limit-every 0]
+
+The stub replaces the generateContent endpoint through an httpx mock
+transport, with a randomized per-call latency and optional 429 responses.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import httpx
+
+from ai.core.gemini import GeminiClient
+from benchmarks._common import print_table
+
+ANGLES = ["front", "back", "left", "right"]
+
+
+def make_stub(latency_ms, rate_limit_every):
+    calls = {"count": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls["count"] += 1
+        if rate_limit_every and calls["count"] % rate_limit_every == 0:
+            return httpx.Response(429, headers={"retry-after": "0.1"}, text="quota exceeded")
+        await asyncio.sleep(random.uniform(0.5, 1.5) * latency_ms / 1000)
+        body = {"damaged_parts": [{"part_name": "Front Bumper", "part_category": "Bumper"}]}
+        return httpx.Response(200, json={"candidates": [{"content": {"parts": [{"text": json.dumps(body)}]}}]})
+
+    return httpx.MockTransport(handler), calls
+
+
+async def run(concurrent, latency_ms, rate_limit_every, repeat):
+    transport, calls = make_stub(latency_ms, rate_limit_every)
+    client = GeminiClient(api_key="stub", transport=transport, backoff_base=0.05)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        if concurrent:
+            await asyncio.gather(*(client.generate([f"angle {angle}", {"mime_type": "image/jpeg", "data": b"x"}]) for angle in ANGLES))
+        else:
+            for angle in ANGLES:
+                await client.generate([f"angle {angle}", {"mime_type": "image/jpeg", "data": b"x"}])
+        timings.append(time.perf_counter() - start)
+    await client.aclose()
+    return sum(timings) / len(timings), client.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency-ms", type=float, default=800.0)
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="answer every Nth call with 429")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = []
+    for concurrent in (False, True):
+        mean, stats = asyncio.run(run(concurrent, args.latency_ms, args.rate_limit_every, args.repeat))
+        rows.append(["concurrent" if concurrent else "sequential", f"{mean * 1000:.0f}", stats["retries"]])
+    print_table(["mode", "claim_latency_ms", "retries"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Reused-photo lookups at scale: multi-index hashing vs a full Hamming scan.
+
+    python -m benchmarks.bench_image_fingerprint [--sizes 1000000,10000000] [--queries 200] [--radii 6,8]
+
+Stored pHashes are synthetic with biased bits (``--skew``), since real
+perceptual hashes are far from uniform and that is what fills the buckets of
+a multi-index table unevenly. Each query is a stored hash with a few bits
+flipped, so every query has a known match; recall must be 1.0. The scan
+baseline is a vectorized popcount over every stored hash.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from ai.core.image_fingerprint import MultiIndexHashTable, popcount
+from benchmarks._common import print_table
+
+
+def synthetic_hashes(count, skew, seed=0):
+    rng = np.random.default_rng(seed)
+    probabilities = rng.uniform(0.5 - skew, 0.5 + skew, 64)
+    hashes = np.zeros(count, dtype=np.uint64)
+    for bit, probability in enumerate(probabilities):
+        hashes |= (rng.random(count) < probability).astype(np.uint64) << np.uint64(bit)
+    return hashes
+
+
+def flip_bits(value, bits, rng):
+    for bit in rng.choice(64, size=bits, replace=False):
+        value ^= 1 << int(bit)
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="1000000,10000000")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--radii", default="6,8")
+    parser.add_argument("--skew", type=float, default=0.2, help="bit probabilities are drawn from 0.5 +/- skew")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    radii = [int(r) for r in args.radii.split(",")]
+    rows = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        hashes = synthetic_hashes(size, args.skew)
+        start = time.perf_counter()
+        table = MultiIndexHashTable(hashes)
+        build_s = time.perf_counter() - start
+        bytes_per_entry = (table.hashes.nbytes + table.orders.nbytes + table.offsets.nbytes) / size
+        targets = rng.integers(0, size, args.queries)
+
+        start = time.perf_counter()
+        for target in targets[:20]:
+            np.flatnonzero(popcount(hashes ^ hashes[target]) <= radii[-1])
+        scan_ms = (time.perf_counter() - start) / 20 * 1000
+
+        for radius in radii:
+            queries = [flip_bits(int(hashes[target]), radius, rng) for target in targets]
+            found = 0
+            start = time.perf_counter()
+            for target, query in zip(targets, queries):
+                positions, _ = table.query(query, radius)
+                found += int(target in positions)
+            elapsed_ms = (time.perf_counter() - start) / len(queries) * 1000
+            rows.append([
+                f"{size:,}", radius, f"{build_s:.1f}", f"{bytes_per_entry:.0f}",
+                f"{elapsed_ms:.3f}", f"{scan_ms:.1f}", f"{scan_ms / elapsed_ms:.0f}x", f"{found / len(queries):.3f}",
+            ])
+        del hashes, table
+    print(f"{args.queries} queries per row, bit skew {args.skew}")
+    print_table(["stored", "radius", "build_s", "bytes/hash", "mih_ms", "scan_ms", "speedup", "recall"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Image ingest: peak RSS and time per request, previous decode paths vs ai.core.image_ingest.
+
+    python -m benchmarks.bench_image_ingest [--images DIR] [--repeat 3]
+
+Every measurement runs in a fresh interpreter, because peak RSS is a
+high-water mark for the whole process: the child reads the upload, records
+its peak RSS, handles the upload once and reports how far the peak rose. That
+is the extra memory one request needs on top of the bytes it was sent.
+
+Inputs are a 12MP phone photo, a photo already within the vision size limit
+(which the new path sends as is) and a PNG screenshot-style image.
+"""
+import argparse
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from benchmarks._common import print_table
+from benchmarks.bench_vision_payload import load_uploads
+
+
+def plate_decode_before(content):
+    """The previous license plate path: PIL decode, RGB convert, NumPy copy, BGR copy"""
+    pil_image = Image.open(io.BytesIO(content))
+    pil_image = pil_image.convert("RGB")
+    return cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
+
+
+def plate_decode_after(content):
+    from ai.core.image_ingest import decode_bgr
+    return decode_bgr(content)
+
+
+def vision_before(content):
+    """The previous damage/OCR path: always re-encode"""
+    from ai.core.image_prep import prepare_for_vision
+    return prepare_for_vision(Image.open(io.BytesIO(content))).data
+
+
+def vision_after(content):
+    from ai.core.image_ingest import vision_payload
+    return vision_payload(content).data
+
+
+VARIANTS = {
+    "plate decode": (plate_decode_before, plate_decode_after),
+    "vision payload": (vision_before, vision_after),
+}
+
+
+def peak_rss_mb():
+    # VmHWM starts afresh at exec; ru_maxrss would carry over the parent's peak
+    try:
+        with open("/proc/self/status") as fp:
+            return next(int(line.split()[1]) for line in fp if line.startswith("VmHWM:")) / 1024
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def child(task, which, path):
+    fn = VARIANTS[task][which == "after"]
+    # Load the codecs and the imported modules on a tiny image first
+    warmup = io.BytesIO()
+    Image.new("RGB", (32, 32)).save(warmup, format="JPEG")
+    fn(warmup.getvalue())
+    with open(path, "rb") as fp:
+        content = fp.read()
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    output = fn(content)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"rss_mb": peak_rss_mb() - baseline, "ms": elapsed * 1000, "output_bytes": memoryview(output).nbytes}))
+
+
+def run_child(task, which, path):
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_image_ingest", "--child", task, which, path],
+        check=True, capture_output=True, text=True,
+    )
+    return json.loads(completed.stdout.splitlines()[-1])
+
+
+def synthetic_inputs():
+    photo = load_uploads(None, 1)[0]
+    # A photo a phone app already resized: smooth content at a typical quality
+    rng = np.random.default_rng(1)
+    yy, xx = np.mgrid[0:960, 0:1280]
+    base = np.stack([(xx / 6) % 256, (yy / 5) % 256, ((xx + yy) / 10) % 256], axis=-1)
+    small = np.clip(base + rng.normal(0, 3, base.shape), 0, 255).astype(np.uint8)
+    small_jpeg = io.BytesIO()
+    Image.fromarray(small).save(small_jpeg, format="JPEG", quality=85)
+    png = io.BytesIO()
+    Image.fromarray(cv2.resize(small, (2560, 1440))).save(png, format="PNG")
+    return {"12MP jpeg": photo, "1280px jpeg": small_jpeg.getvalue(), "1440p png": png.getvalue()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--images", help="directory of .jpg/.png files to use instead of synthetic ones")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--child", nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(*args.child)
+        return
+
+    if args.images:
+        inputs = {os.path.basename(path): open(os.path.join(args.images, path), "rb").read() for path in sorted(os.listdir(args.images))}
+    else:
+        inputs = synthetic_inputs()
+
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        for name, content in inputs.items():
+            path = os.path.join(directory, "upload")
+            with open(path, "wb") as fp:
+                fp.write(content)
+            for task in VARIANTS:
+                measured = {}
+                for which in ("before", "after"):
+                    runs = [run_child(task, which, path) for _ in range(args.repeat)]
+                    measured[which] = {key: float(np.median([run[key] for run in runs])) for key in runs[0]}
+                before, after = measured["before"], measured["after"]
+                rows.append([
+                    name, task,
+                    f"{before['rss_mb']:.1f}", f"{after['rss_mb']:.1f}",
+                    f"{before['ms']:.1f}", f"{after['ms']:.1f}",
+                    f"{before['output_bytes'] / 1024:.0f}", f"{after['output_bytes'] / 1024:.0f}",
+                ])
+    print(f"Median over {args.repeat} fresh processes; peak RSS rise per request in MB")
+    print_table(
+        ["input", "path", "rss_before", "rss_after", "ms_before", "ms_after", "out_kb_before", "out_kb_after"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
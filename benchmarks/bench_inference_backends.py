@@ -0,0 +1,105 @@
+"""CPU latency/throughput of the detector backends, and their accuracy parity.
+
+    python -m benchmarks.bench_inference_backends --images DIR [--count 32] [--int8] [--threads 1,2,4]
+
+Compares Ultralytics PyTorch against ONNX Runtime (FP32 and, with ``--int8``,
+dynamically quantized) on the same images. Parity matches every ONNX box to a
+PyTorch box of the same class at IoU >= 0.5. Use real photos for parity: noise
+frames produce almost no boxes. tests/test_inference_parity.py asserts parity
+for the FP32 model.
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from ai.core.box_suppression import OVERLAP_IOU, pairwise_overlap
+from ai.core.inference import BACKEND_TORCH, OnnxDetector, export_onnx, load_detector, onnx_path_for
+from ai.core.model_registry import resolve_weights
+from benchmarks._common import load_images, print_table
+
+CONF = 0.25
+
+
+def latency(detector, images, batch_size):
+    detector.detect(images[:batch_size], conf=CONF)
+    per_batch = []
+    start = time.perf_counter()
+    for offset in range(0, len(images), batch_size):
+        batch_start = time.perf_counter()
+        detector.detect(images[offset:offset + batch_size], conf=CONF)
+        per_batch.append((time.perf_counter() - batch_start) * 1000)
+    elapsed = time.perf_counter() - start
+    return float(np.median(per_batch)), len(images) / elapsed
+
+
+def parity(reference, candidate, images):
+    matched = total_ref = total_cand = 0
+    ious, conf_diffs = [], []
+    for expected, actual in zip(reference.detect(images, conf=CONF), candidate.detect(images, conf=CONF)):
+        total_ref += len(expected)
+        total_cand += len(actual)
+        if not len(expected) or not len(actual):
+            continue
+        overlap = pairwise_overlap(expected[:, :4].astype(np.float64), actual[:, :4].astype(np.float64), mode=OVERLAP_IOU)
+        overlap[expected[:, 5][:, None] != actual[:, 5][None, :]] = 0
+        used = set()
+        for i in np.argsort(-expected[:, 4]):
+            j = int(np.argmax(overlap[i]))
+            if overlap[i, j] >= 0.5 and j not in used:
+                used.add(j)
+                matched += 1
+                ious.append(overlap[i, j])
+                conf_diffs.append(abs(float(expected[i, 4]) - float(actual[j, 4])))
+    return {
+        "recall": matched / total_ref if total_ref else 1.0,
+        "precision": matched / total_cand if total_cand else 1.0,
+        "mean_iou": float(np.mean(ious)) if ious else 1.0,
+        "max_conf_diff": max(conf_diffs) if conf_diffs else 0.0,
+        "boxes": total_ref,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--weights", default=resolve_weights("yolov8n.pt"))
+    parser.add_argument("--images", help="directory of street photos (defaults to synthetic frames)")
+    parser.add_argument("--count", type=int, default=32)
+    parser.add_argument("--batch-sizes", default="1,8")
+    parser.add_argument("--threads", default="0", help="ONNX Runtime intra-op thread counts to compare")
+    parser.add_argument("--int8", action="store_true", help="also benchmark the INT8 model")
+    args = parser.parse_args()
+
+    images = load_images(args.images, args.count)
+    torch_detector = load_detector(args.weights, backend=BACKEND_TORCH)
+    variants = [("fp32", False)] + ([("int8", True)] if args.int8 else [])
+    onnx_paths = {}
+    for name, int8 in variants:
+        path = onnx_path_for(args.weights, int8)
+        onnx_paths[name] = path if os.path.exists(path) else export_onnx(args.weights, int8=int8)
+
+    rows = []
+    for name in onnx_paths:
+        result = parity(torch_detector, OnnxDetector(onnx_paths[name]), images)
+        rows.append([name, result["boxes"], f"{result['recall']:.3f}", f"{result['precision']:.3f}", f"{result['mean_iou']:.3f}", f"{result['max_conf_diff']:.3f}"])
+    print("Parity against PyTorch")
+    print_table(["onnx", "torch_boxes", "recall", "precision", "mean_iou", "max_conf_diff"], rows)
+
+    rows = []
+    batch_sizes = [int(b) for b in args.batch_sizes.split(",")]
+    for batch_size in batch_sizes:
+        median, throughput = latency(torch_detector, images, batch_size)
+        rows.append(["torch", "-", batch_size, f"{median:.1f}", f"{throughput:.1f}"])
+    for name, path in onnx_paths.items():
+        for threads in (int(t) for t in args.threads.split(",")):
+            detector = OnnxDetector(path, intra_op_threads=threads)
+            for batch_size in batch_sizes:
+                median, throughput = latency(detector, images, batch_size)
+                rows.append([f"onnx {name}", threads or "all", batch_size, f"{median:.1f}", f"{throughput:.1f}"])
+    print(f"\nCPU latency ({len(images)} images)")
+    print_table(["backend", "threads", "batch", "median_batch_ms", "images/sec"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Fraud producer throughput: send+flush per message vs batched async publish.
+
+    python -m benchmarks.bench_kafka_producer [--messages 20000] [--round-trip-ms 1.0]
+    python -m benchmarks.bench_kafka_producer --bootstrap localhost:9092 [--compression lz4]
+
+Without ``--bootstrap`` the producer is the in-memory stand-in, which batches
+like KafkaProducer and charges one simulated broker round trip per request.
+With a broker address both modes use a real KafkaProducer.
+"""
+import argparse
+import json
+import os
+import time
+
+from benchmarks._common import print_table
+from fraud.kafka import producer as fraud_producer
+from fraud.kafka.memory import InMemoryBroker
+
+
+def make_producer(args, linger_ms, batch_size, compression):
+    if args.bootstrap:
+        from kafka import KafkaProducer
+
+        return KafkaProducer(
+            bootstrap_servers=args.bootstrap,
+            value_serializer=fraud_producer._serialize,
+            linger_ms=linger_ms,
+            batch_size=batch_size,
+            compression_type=fraud_producer._compression_type(compression),
+        )
+    return InMemoryBroker(default_partitions=8).producer(
+        value_serializer=fraud_producer._serialize,
+        linger_ms=linger_ms,
+        batch_size=batch_size,
+        round_trip_ms=args.round_trip_ms,
+    )
+
+
+def run(args, payloads, flush_each, linger_ms, batch_size, compression):
+    fraud_producer.use_producer(make_producer(args, linger_ms, batch_size, compression))
+    start = time.perf_counter()
+    for payload in payloads:
+        fraud_producer.publish(payload, topic=args.topic)
+        if flush_each:
+            fraud_producer.flush()
+    fraud_producer.flush()
+    elapsed = time.perf_counter() - start
+    fraud_producer.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bootstrap", help="Kafka bootstrap servers (in-memory stand-in if omitted)")
+    parser.add_argument("--topic", default="bench_fraud_events")
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--size", type=int, default=512, help="approximate JSON payload bytes")
+    parser.add_argument("--round-trip-ms", type=float, default=1.0, help="stand-in broker round trip")
+    parser.add_argument("--linger-ms", type=int, default=5)
+    parser.add_argument("--batch-kib", type=int, default=64)
+    parser.add_argument("--compression", default="lz4")
+    args = parser.parse_args()
+
+    # Flushing every message makes the legacy mode slow; keep its run short
+    legacy_count = min(args.messages, 2000)
+    payloads = [
+        {"event": "plate_detect", "seq": i, "blob": os.urandom(args.size // 2).hex()}
+        for i in range(args.messages)
+    ]
+    print(f"payload ~{len(json.dumps(payloads[0]))} bytes, {'broker ' + args.bootstrap if args.bootstrap else 'in-memory stand-in'}")
+
+    rows = []
+    modes = [
+        ("send+flush each", payloads[:legacy_count], True, 0, 16 * 1024, None),
+        ("async, linger 0", payloads, False, 0, args.batch_kib * 1024, None),
+        (f"async, linger {args.linger_ms}ms", payloads, False, args.linger_ms, args.batch_kib * 1024, None),
+    ]
+    if args.bootstrap:
+        modes.append((f"async, linger {args.linger_ms}ms, {args.compression}", payloads, False, args.linger_ms, args.batch_kib * 1024, args.compression))
+    for name, batch, flush_each, linger_ms, batch_size, compression in modes:
+        elapsed = run(args, batch, flush_each, linger_ms, batch_size, compression)
+        rows.append([name, len(batch), f"{elapsed * 1000:.0f}", f"{len(batch) / elapsed:,.0f}"])
+    print_table(["mode", "messages", "total_ms", "msgs_per_s"], rows)
+
+
+if __name__ == "__main__":
+    main()
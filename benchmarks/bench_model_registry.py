@@ -0,0 +1,52 @@
+"""Per-message latency of the fraud driver-license detector: load per call vs the registry.
+
+    python -m benchmarks.bench_model_registry [--images DIR] [--count 8]
+
+"load per call" is the old behaviour (``YOLO("yolov8n.pt")`` inside every
+detection); "registry" leases the preloaded, warmed-up shared model.
+"""
+import argparse
+import time
+
+from ai.core.model_registry import load_yolo, resolve_weights
+from benchmarks._common import load_images, print_table
+from fraud.models.detect_driver_license import detect_driver_license
+from fraud.models.registry import YOLO_MODEL, register_models
+
+
+def per_message_ms(fn, images):
+    latencies = []
+    for image in images:
+        start = time.perf_counter()
+        fn(image)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return latencies[len(latencies) // 2], latencies[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--images", help="directory of images (defaults to synthetic frames)")
+    parser.add_argument("--count", type=int, default=8)
+    args = parser.parse_args()
+
+    images = load_images(args.images, args.count)
+    weights = resolve_weights("yolov8n.pt")
+
+    def load_per_call(image):
+        load_yolo(weights)(image, conf=0.6, verbose=False)
+
+    start = time.perf_counter()
+    register_models().preload([YOLO_MODEL])
+    startup_ms = (time.perf_counter() - start) * 1000
+
+    rows = []
+    for name, fn in [("load per call", load_per_call), ("registry", detect_driver_license)]:
+        median, worst = per_message_ms(fn, images)
+        rows.append([name, f"{median:.1f}", f"{worst:.1f}"])
+    print(f"registry preload + warm-up: {startup_ms:.0f} ms (once per process)")
+    print_table(["mode", "median_ms", "max_ms"], rows)
+
+
+if __name__ == "__main__":
+    main()
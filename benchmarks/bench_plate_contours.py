@@ -0,0 +1,126 @@
+"""Contour plate detector: original loop vs box pre-filter and shared edge density (and pyramid levels).
+
+    python -m benchmarks.bench_plate_contours [--images DIR] [--count 24]
+
+Times the original ``_detect_license_plates_advanced`` loop against the current
+one and checks parity: every original box must be found at full resolution
+(IoU >= 0.9) with a confidence within 0.05. The "integral" row forces the
+integral-image density path so it is checked too. Pyramid levels are timed and
+their recall reported, since downscaling trades some small plates for speed.
+"""
+import argparse
+
+import cv2
+import numpy as np
+
+from ai.api.routes.license_plate import _detect_license_plates_advanced
+from ai.core.box_suppression import OVERLAP_IOU, as_boxes, pairwise_overlap
+from benchmarks._common import load_images, print_table, timeit
+
+
+def legacy_detect(image):
+    """The contour detector as it was: approxPolyDP on every contour, Canny per ROI"""
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+    edges = cv2.Canny(blurred, 50, 150)
+    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    license_plates = []
+    for contour in contours:
+        epsilon = 0.02 * cv2.arcLength(contour, True)
+        approx = cv2.approxPolyDP(contour, epsilon, True)
+        if len(approx) == 4:
+            x, y, w, h = cv2.boundingRect(contour)
+            aspect_ratio = w / h
+            if 2.0 <= aspect_ratio <= 5.0 and w > 100 and h > 30:
+                roi = gray[y:y+h, x:x+w]
+                roi_edges = cv2.Canny(roi, 50, 150)
+                edge_density = np.sum(roi_edges > 0) / (w * h)
+                if edge_density > 0.1:
+                    license_plates.append({
+                        'bbox': [x, y, x + w, y + h],
+                        'confidence': min(edge_density * 2, 1.0),
+                        'detection_method': 'cv_contours',
+                        'aspect_ratio': aspect_ratio
+                    })
+    return license_plates
+
+
+def street_images(count, seed=0):
+    """Textured scenes with buildings, cars and plate-like text boxes"""
+    rng = np.random.default_rng(seed)
+    images = []
+    for _ in range(count):
+        image = rng.normal(110, 25, size=(720, 1280, 3)).clip(0, 255).astype(np.uint8)
+        for _ in range(40):
+            x, y = rng.integers(0, 1200), rng.integers(0, 650)
+            color = tuple(int(c) for c in rng.integers(0, 255, 3))
+            cv2.rectangle(image, (int(x), int(y)), (int(x + rng.integers(20, 300)), int(y + rng.integers(20, 200))), color, -1)
+        # Clutter (foliage, signs, windows) is what produces most of the contours
+        for _ in range(1500):
+            x, y = int(rng.integers(0, 1280)), int(rng.integers(0, 720))
+            color = tuple(int(c) for c in rng.integers(0, 255, 3))
+            cv2.line(image, (x, y), (x + int(rng.integers(-15, 15)), y + int(rng.integers(-15, 15))), color, 1)
+        for _ in range(int(rng.integers(1, 4))):
+            x, y = int(rng.integers(0, 1000)), int(rng.integers(0, 640))
+            w = int(rng.integers(140, 260))
+            h = int(w / rng.uniform(2.5, 4.5))
+            cv2.rectangle(image, (x, y), (x + w, y + h), (235, 235, 235), -1)
+            cv2.rectangle(image, (x, y), (x + w, y + h), (20, 20, 20), 3)
+            text = "".join(rng.choice(list("ABCDEFGHKLMNPRSTXYZ0123456789"), 7))
+            cv2.putText(image, text, (x + 8, y + int(h * 0.75)), cv2.FONT_HERSHEY_SIMPLEX, w / 260, (10, 10, 10), 2)
+        images.append(cv2.GaussianBlur(image, (3, 3), 0))
+    return images
+
+
+def match(expected, actual, min_iou):
+    """(recall of expected boxes in actual, worst confidence difference over matches)"""
+    if not expected:
+        return 1.0, 0.0
+    if not actual:
+        return 0.0, 0.0
+    overlap = pairwise_overlap(as_boxes([p['bbox'] for p in expected]), as_boxes([p['bbox'] for p in actual]), mode=OVERLAP_IOU)
+    best = overlap.argmax(axis=1)
+    found = overlap[np.arange(len(expected)), best] >= min_iou
+    diffs = [abs(expected[i]['confidence'] - actual[best[i]]['confidence']) for i in np.flatnonzero(found)]
+    return found.mean(), max(diffs, default=0.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--images", help="directory of street photos (defaults to synthetic scenes)")
+    parser.add_argument("--count", type=int, default=24)
+    args = parser.parse_args()
+
+    images = load_images(args.images, args.count) if args.images else street_images(args.count)
+    legacy = [legacy_detect(image) for image in images]
+
+    rows = []
+    legacy_s = timeit(lambda: [legacy_detect(image) for image in images], repeat=3)
+    rows.append(["legacy", f"{legacy_s / len(images) * 1000:.1f}", "1.00x", sum(map(len, legacy)), "1.000", "0.000"])
+    failed = False
+    modes = [
+        ("pre-filter", 0, 1.0, 0.9),
+        ("pre-filter, integral", 0, 0.0, 0.9),
+        ("pre-filter, pyramid 1", 1, 1.0, 0.7),
+    ]
+    for name, levels, coverage, min_iou in modes:
+        detect = lambda image: _detect_license_plates_advanced(image, levels, coverage)
+        elapsed = timeit(lambda: [detect(image) for image in images], repeat=3)
+        current = [detect(image) for image in images]
+        scores = [match(e, a, min_iou) for e, a in zip(legacy, current)]
+        recall = float(np.mean([s[0] for s in scores]))
+        worst = max(s[1] for s in scores)
+        if levels == 0 and (recall < 1.0 or worst > 0.05):
+            failed = True
+        rows.append([
+            name, f"{elapsed / len(images) * 1000:.1f}", f"{legacy_s / elapsed:.2f}x",
+            sum(map(len, current)), f"{recall:.3f}", f"{worst:.3f}",
+        ])
+    print(f"{len(images)} images")
+    print_table(["mode", "ms/image", "speedup", "plates", "recall", "max_conf_diff"], rows)
+    if failed:
+        print("PARITY FAILED at full resolution")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Plate registry at scale: bulk indexing, snapshot load and fuzzy lookup latency.
+
+    python -m benchmarks.bench_plate_registry [--sightings 1000000] [--lookups 5000] [--import-rows 200000]
+
+Synthetic plates (digits and letters, with repeat sightings across claims)
+are indexed with ``PlateIndex.build``, written as a snapshot and memory-mapped
+back. Lookups are timed for exact hits, one-edit OCR variants and misses, and
+against a linear edit-distance scan over a sample of the plates, which is what
+answering the question without an index costs. ``--import-rows`` also times
+the CSV bulk import into a throwaway SQLite database.
+"""
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from benchmarks._common import print_table
+from fraud.core.plate_registry import (
+    PlateIndex,
+    PlateRegistry,
+    edit_distance_at_most_one,
+    import_sightings,
+    normalize_plate,
+)
+
+LETTERS = "ACDEFGHJKLMNPRTUVWXY"
+
+
+def synthetic_plates(count, seed=0):
+    rng = random.Random(seed)
+    return [f"{rng.randrange(100000):05d}{rng.choice(LETTERS)}{rng.randrange(100):02d}" for _ in range(count)]
+
+
+def synthetic_sightings(count, seed=0):
+    """About 10% of sightings repeat an earlier plate on another claim"""
+    rng = random.Random(seed)
+    plates = synthetic_plates(int(count * 0.9), seed)
+    for i in range(count):
+        plate = plates[i] if i < len(plates) else rng.choice(plates)
+        yield normalize_plate(plate), f"claim-{i}", 1700000000000 + i * 1000, f"{i:064x}"
+
+
+def ocr_variant(plate, rng):
+    i = rng.randrange(len(plate))
+    return plate[:i] + rng.choice(LETTERS) + plate[i + 1:]
+
+
+def time_lookups(registry, queries):
+    start = time.perf_counter()
+    hits = sum(1 for query in queries if registry.lookup(query))
+    return (time.perf_counter() - start) / len(queries) * 1e6, hits / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sightings", type=int, default=1000000)
+    parser.add_argument("--lookups", type=int, default=5000)
+    parser.add_argument("--scan-sample", type=int, default=100000, help="plates the linear scan baseline checks")
+    parser.add_argument("--import-rows", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    with tempfile.TemporaryDirectory() as workdir:
+        rows = []
+        start = time.perf_counter()
+        index = PlateIndex.build(synthetic_sightings(args.sightings))
+        build_s = time.perf_counter() - start
+        rows.append(["build index", f"{build_s:.1f}s", f"{args.sightings / build_s:,.0f} sightings/s"])
+
+        snapshot = os.path.join(workdir, "snapshot")
+        start = time.perf_counter()
+        index.save(snapshot)
+        rows.append(["write snapshot", f"{time.perf_counter() - start:.2f}s", ""])
+
+        engine = create_engine(f"sqlite:///{os.path.join(workdir, 'registry.db')}")
+        session_factory = sessionmaker(bind=engine, expire_on_commit=False, class_=Session)
+        registry = PlateRegistry(session_factory=session_factory, snapshot_dir=snapshot)
+        start = time.perf_counter()
+        registry.load()
+        rows.append(["load snapshot", f"{(time.perf_counter() - start) * 1000:.0f}ms", f"{index.plate_count:,} plates"])
+        print(f"{args.sightings:,} sightings")
+        print_table(["step", "time", "notes"], rows)
+
+        plates = [index.plate(i) for i in rng.sample(range(index.plate_count), args.lookups)]
+        queries = [
+            ("exact", plates),
+            ("one-edit OCR variant", [ocr_variant(plate, rng) for plate in plates]),
+            ("miss", [f"ZZ{rng.randrange(10 ** 6):06d}" for _ in plates]),
+        ]
+        rows = []
+        for name, batch in queries:
+            micros, hit_rate = time_lookups(registry, batch)
+            rows.append([name, f"{micros:.1f}", f"{hit_rate:.3f}"])
+
+        sample = [index.plate(i) for i in range(min(args.scan_sample, index.plate_count))]
+        scanned = plates[:20]
+        start = time.perf_counter()
+        for query in scanned:
+            [plate for plate in sample if edit_distance_at_most_one(query, plate) is not None]
+        scan_us = (time.perf_counter() - start) / len(scanned) * 1e6 * index.plate_count / len(sample)
+        rows.append(["linear scan (extrapolated)", f"{scan_us:.0f}", "-"])
+        print(f"\nLookup latency ({args.lookups} queries each)")
+        print_table(["query", "us/lookup", "hit_rate"], rows)
+
+        if args.import_rows:
+            path = os.path.join(workdir, "plates.csv")
+            with open(path, "w", newline="", encoding="utf-8") as fp:
+                writer = csv.writer(fp)
+                writer.writerow(["plate", "claim_id", "seen_at", "image_hash"])
+                for key, claim_id, epoch_ms, image_hash in synthetic_sightings(args.import_rows, seed=2):
+                    writer.writerow([key, claim_id, epoch_ms / 1000, image_hash])
+            start = time.perf_counter()
+            with session_factory() as db:
+                inserted = import_sightings([path], replace=True, db=db)
+            elapsed = time.perf_counter() - start
+            print(f"\nCSV import into SQLite: {inserted:,} rows in {elapsed:.1f}s ({inserted / elapsed:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
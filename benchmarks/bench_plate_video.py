@@ -0,0 +1,125 @@
+"""Compute per clip: per-frame detect+OCR vs strided detection with tracking and OCR voting.
+
+    python -m benchmarks.bench_plate_video [--frames 750] [--vehicles 6] [--stride 5]
+    python -m benchmarks.bench_plate_video --video clip.mp4 [--stride 5]
+
+Without ``--video`` a synthetic scene (vehicles crossing a 25 fps frame) is
+scored with a cost model: each detector pass and each OCR crop is charged
+``--detect-ms``/``--ocr-ms``. With ``--video`` the real YOLO detector and
+EasyOCR run and wall time is measured.
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from ai.core.plate_tracking import PlateTracker, crop, process_plate_video
+from benchmarks._common import print_table
+
+
+class SyntheticCapture:
+    """Vehicles crossing the frame; frames are tiny since the detector is simulated"""
+
+    def __init__(self, frames, vehicles, seed=0):
+        rng = random.Random(seed)
+        self.frames = frames
+        self.index = 0
+        self.vehicles = []
+        for _ in range(vehicles):
+            start = rng.randrange(0, frames - 100)
+            self.vehicles.append((start, start + rng.randrange(100, 300), rng.uniform(2, 6), rng.uniform(100, 500)))
+
+    def get(self, _prop):
+        return 25.0
+
+    def grab(self):
+        self.index += 1
+        return self.index <= self.frames
+
+    def read(self):
+        if not self.grab():
+            return False, None
+        return True, np.full((1, 1), self.index - 1, dtype=np.int32)
+
+    def boxes(self, frame_index):
+        detections = []
+        for start, end, speed, y in self.vehicles:
+            if start <= frame_index < end:
+                x = 20 + (frame_index - start) * speed
+                growth = (frame_index - start) * 0.1
+                detections.append({
+                    "bbox": [int(x), int(y + 60), int(x + 60 + growth), int(y + 80 + growth / 3)],
+                    "vehicle_bbox": [int(x), int(y), int(x + 120 + growth), int(y + 90 + growth / 3)],
+                    "confidence": 0.9,
+                })
+        return detections
+
+
+def synthetic(args):
+    rows = []
+    for name, stride, tracked in [("per-frame detect+OCR", 1, False), (f"stride {args.stride} + tracking", args.stride, True)]:
+        capture = SyntheticCapture(args.frames, args.vehicles)
+        counts = {"detect": 0, "ocr": 0}
+
+        def detect(frame):
+            counts["detect"] += 1
+            detections = capture.boxes(int(frame[0, 0]))
+            if not tracked:
+                counts["ocr"] += len(detections)
+            return detections
+
+        def recognize(crops):
+            counts["ocr"] += len(crops)
+            return [("AB123", 0.9) for _ in crops]
+
+        tracker = PlateTracker() if tracked else PlateTracker(ocr_max_reads=0)
+        events = list(process_plate_video(capture, detect, recognize, stride=stride, tracker=tracker))
+        cost = counts["detect"] * args.detect_ms + counts["ocr"] * args.ocr_ms
+        tracks = events[-1]["tracks"]
+        rows.append([name, counts["detect"], counts["ocr"], tracks, f"{cost / 1000:.1f}"])
+    print(f"{args.frames} frames, {args.vehicles} vehicles, detect {args.detect_ms}ms, OCR {args.ocr_ms}ms per crop")
+    print_table(["mode", "detector_runs", "ocr_crops", "tracks", "modelled_s"], rows)
+
+
+def real(args):
+    import cv2
+
+    from ai.api.routes.license_plate import _detect_license_plates_yolo
+    from ai.core.plate_ocr import recognize_plate_crops as recognize
+
+    def per_frame(capture):
+        for _, frame in iter(lambda: capture.read(), (False, None)):
+            plates = _detect_license_plates_yolo(frame)
+            recognize([crop(frame, plate["bbox"]) for plate in plates])
+
+    rows = []
+    for name, run in [
+        ("per-frame detect+OCR", per_frame),
+        (f"stride {args.stride} + tracking", lambda capture: list(process_plate_video(capture, _detect_license_plates_yolo, recognize, stride=args.stride))),
+    ]:
+        capture = cv2.VideoCapture(args.video)
+        start = time.perf_counter()
+        run(capture)
+        rows.append([name, f"{time.perf_counter() - start:.1f}"])
+        capture.release()
+    print_table(["mode", "seconds"], rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--video", help="clip to run the real models on")
+    parser.add_argument("--frames", type=int, default=750)
+    parser.add_argument("--vehicles", type=int, default=6)
+    parser.add_argument("--stride", type=int, default=5)
+    parser.add_argument("--detect-ms", type=float, default=60.0)
+    parser.add_argument("--ocr-ms", type=float, default=25.0)
+    args = parser.parse_args()
+    if args.video:
+        real(args)
+    else:
+        synthetic(args)
+
+
+if __name__ == "__main__":
+    main()
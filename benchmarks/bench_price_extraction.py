@@ -0,0 +1,137 @@
+"""Price extraction from search result pages: three findall passes vs one streaming pass.
+
+    python -m benchmarks.bench_price_extraction [--pages DIR] [--chunk-kib 16] [--max-prices 50]
+
+Pages come from a directory of saved HTML files, or are synthesized (markup
+with sparse prices) when none is given. Each page is pre-split into chunks as
+``aiter_text`` would deliver them; the legacy path joins them back into one
+string like ``response.text`` does. Also checks that streaming over chunks
+finds the same prices as scanning each page whole.
+"""
+import argparse
+import glob
+import os
+import random
+import re
+import tracemalloc
+
+from ai.core.price_search import PriceExtractor, extract_price_stats
+from benchmarks._common import print_table, timeit
+
+LEGACY_PATTERNS = [
+    r'\$[\d,]+\.?\d*',
+    r'USD\s*[\d,]+\.?\d*',
+    r'Price:\s*\$?[\d,]+\.?\d*',
+]
+
+
+def legacy_extract(chunks):
+    content = "".join(chunks)
+    prices = []
+    for pattern in LEGACY_PATTERNS:
+        for match in re.findall(pattern, content, re.IGNORECASE):
+            price_str = re.sub(r'[^\d.]', '', match)
+            if price_str and '.' in price_str:
+                try:
+                    price = float(price_str)
+                    if 10 <= price <= 5000:
+                        prices.append(price)
+                except ValueError:
+                    continue
+    return prices
+
+
+def streaming_extract(chunks, max_prices=None):
+    extractor = PriceExtractor(max_prices)
+    for chunk in chunks:
+        if extractor.feed(chunk):
+            break
+    return extractor.finish()
+
+
+def synthesize_pages(count, size_kib, seed=0):
+    rng = random.Random(seed)
+    filler = [
+        '<div class="g"><a href="https://example.com/item">',
+        "Genuine OEM replacement part, fits 2015-2019 models. ",
+        '<span class="rating">4.5 stars (1,204 reviews)</span>',
+        "</a></div>\n",
+        "Free shipping on orders over $35 ",
+        "<script>var x = {a: 1, b: [2, 3]};</script>",
+    ]
+    pages = []
+    for _ in range(count):
+        parts, size = [], 0
+        while size < size_kib * 1024:
+            piece = rng.choice(filler)
+            if rng.random() < 0.05:
+                piece += rng.choice(["${:,.2f} ", "USD {:.2f} ", "Price: ${:.2f} "]).format(rng.uniform(5, 6000))
+            parts.append(piece)
+            size += len(piece)
+        pages.append("".join(parts))
+    return pages
+
+
+def load_pages(directory, count, size_kib):
+    if directory:
+        paths = sorted(glob.glob(os.path.join(directory, "*.htm*")))[:count]
+        pages = []
+        for path in paths:
+            with open(path, "r", encoding="utf-8", errors="replace") as fp:
+                pages.append(fp.read())
+        if pages:
+            return pages
+    return synthesize_pages(count, size_kib)
+
+
+def peak_kib(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", help="directory of saved search result pages (*.html)")
+    parser.add_argument("--count", type=int, default=40)
+    parser.add_argument("--size-kib", type=int, default=300, help="size of synthesized pages")
+    parser.add_argument("--chunk-kib", type=int, default=16)
+    parser.add_argument("--max-prices", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages, args.count, args.size_kib)
+    step = args.chunk_kib * 1024
+    chunked = [[page[i:i + step] for i in range(0, len(page), step)] for page in pages]
+
+    for page, chunks in zip(pages, chunked):
+        whole = extract_price_stats(page)
+        streamed = streaming_extract(chunks)
+        assert (whole.count, whole.min, whole.max) == (streamed.count, streamed.min, streamed.max), "chunked scan diverged"
+
+    variants = {
+        "legacy_3x_findall": legacy_extract,
+        "streaming": streaming_extract,
+        f"streaming_stop_{args.max_prices}": lambda chunks: streaming_extract(chunks, args.max_prices),
+    }
+    rows = []
+    total_kib = sum(len(page) for page in pages) / 1024
+    for name, extract in variants.items():
+        elapsed = timeit(lambda: [extract(chunks) for chunks in chunked], repeat=args.repeat)
+        # Memory held by one extraction on top of the already-received chunks
+        peak = max(peak_kib(lambda: extract(chunks)) for chunks in chunked)
+        rows.append([
+            name,
+            f"{elapsed / len(pages) * 1000:.2f}",
+            f"{total_kib / 1024 / elapsed:.1f}",
+            f"{peak:.0f}",
+        ])
+    print(f"{len(pages)} pages, {total_kib / len(pages):.0f} KiB avg")
+    print_table(["variant", "ms_per_page", "MiB_per_s", "peak_kib"], rows)
+
+
+if __name__ == "__main__":
+    main()
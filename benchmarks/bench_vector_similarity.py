@@ -0,0 +1,114 @@
+"""Similar-submission search: embedding throughput, bulk ingest and query latency.
+
+    python -m benchmarks.bench_vector_similarity [--vectors 50000] [--queries 500] [--images DIR] [--qdrant-url http://localhost:6333]
+
+Embeddings are timed on ``--embed-count`` photos (from ``--images`` or
+synthetic) with the configured embedder. Ingest and query use synthetic
+clustered vectors of the same dimension so the collection can be large:
+ingest is timed in ``--batch-size`` upserts, queries report p50/p99 latency
+and recall@k against an exact brute-force scan, with and without excluding
+the query's own claim. The local HNSW store is always measured; Qdrant too
+when ``--qdrant-url`` is given (its collection is dropped afterwards).
+"""
+import argparse
+import time
+import uuid
+
+import numpy as np
+
+from benchmarks._common import load_images, print_table
+from fraud.core.embeddings import load_embedder
+from fraud.core.hnsw import normalize_rows
+from fraud.core.vector_store import LocalVectorStore, QdrantVectorStore
+
+
+def clustered_vectors(count, dim, clusters=2000, seed=0):
+    """Unit vectors around ``clusters`` centres, like photos of the same few thousand cars"""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=count)
+    return normalize_rows(centres[labels] + 0.6 * rng.standard_normal((count, dim)).astype(np.float32))
+
+
+def bench_ingest(store, name, vectors, claims, batch_size):
+    store.ensure_collection(name, vectors.shape[1])
+    ids = [f"submission-{i}" for i in range(len(vectors))]
+    start = time.perf_counter()
+    for first in range(0, len(vectors), batch_size):
+        last = first + batch_size
+        store.upsert(name, ids[first:last], vectors[first:last], [{"claim_id": claim} for claim in claims[first:last]])
+    return time.perf_counter() - start
+
+
+def bench_queries(store, name, vectors, claims, queries, k, exclude_claim):
+    latencies, recalls = [], []
+    for i, query in zip(queries, vectors[queries]):
+        exclude = {"claim_id": claims[i]} if exclude_claim else None
+        start = time.perf_counter()
+        hits = store.search(name, query, k, exclude=exclude)
+        latencies.append(time.perf_counter() - start)
+        similarities = vectors @ query
+        if exclude_claim:
+            similarities[np.asarray(claims) == claims[i]] = -np.inf
+        truth = {f"submission-{j}" for j in np.argsort(-similarities)[:k].tolist()}
+        recalls.append(len(truth & {hit.id for hit in hits}) / k)
+    latencies = np.asarray(latencies) * 1000
+    return np.percentile(latencies, 50), np.percentile(latencies, 99), float(np.mean(recalls))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--vectors", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--images", help="directory of photos for the embedding timing")
+    parser.add_argument("--embed-count", type=int, default=200)
+    parser.add_argument("--model", help="ONNX embedding model (default: model-free features)")
+    parser.add_argument("--qdrant-url")
+    args = parser.parse_args()
+
+    embedder = load_embedder(args.model)
+    images = load_images(args.images, args.embed_count, shape=(720, 1280, 3))
+    embedder.embed(images[:2])
+    start = time.perf_counter()
+    embedder.embed(images)
+    elapsed = time.perf_counter() - start
+    print(f"Embedding ({embedder.name}, dim {embedder.dim}): {len(images) / elapsed:,.0f} images/s, {elapsed / len(images) * 1000:.1f} ms/image")
+
+    vectors = clustered_vectors(args.vectors, embedder.dim)
+    # A few submissions per claim, so excluding the claim changes the answer
+    claims = [f"claim-{i // 3}" for i in range(args.vectors)]
+    queries = np.random.default_rng(1).choice(args.vectors, size=min(args.queries, args.vectors), replace=False)
+
+    stores = [("local HNSW", LocalVectorStore())]
+    if args.qdrant_url:
+        stores.append(("qdrant", QdrantVectorStore(args.qdrant_url, batch_size=args.batch_size)))
+
+    ingest_rows, query_rows = [], []
+    for label, store in stores:
+        name = f"bench_{uuid.uuid4().hex[:8]}"
+        try:
+            elapsed = bench_ingest(store, name, vectors, claims, args.batch_size)
+            ingest_rows.append([label, f"{elapsed:.1f}s", f"{args.vectors / elapsed:,.0f}"])
+            for exclude_claim in (False, True):
+                p50, p99, recall = bench_queries(store, name, vectors, claims, queries, args.k, exclude_claim)
+                query_rows.append([label, "other claims" if exclude_claim else "all", f"{p50:.2f}", f"{p99:.2f}", f"{recall:.3f}"])
+        finally:
+            if isinstance(store, QdrantVectorStore):
+                store.client.delete_collection(name)
+            store.close()
+
+    start = time.perf_counter()
+    for query in vectors[queries[:100]]:
+        np.argpartition(-(vectors @ query), args.k)[:args.k]
+    brute_ms = (time.perf_counter() - start) / min(100, len(queries)) * 1000
+
+    print(f"\nBulk ingest ({args.vectors:,} vectors, batches of {args.batch_size})")
+    print_table(["store", "time", "vectors/s"], ingest_rows)
+    print(f"\nQuery latency (top-{args.k}, {len(queries)} queries; brute-force NumPy scan {brute_ms:.2f} ms)")
+    print_table(["store", "candidates", "p50 ms", "p99 ms", f"recall@{args.k}"], query_rows)
+
+
+if __name__ == "__main__":
+    main()
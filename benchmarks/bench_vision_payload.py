@@ -0,0 +1,119 @@
+"""Vision upload payload: full-size PNG vs downscaled JPEG/WebP.
+
+    python -m benchmarks.bench_vision_payload [--images DIR] [--count 4] [--uplink-mbps 20]
+
+Each variant starts from the uploaded file bytes, prepares the image and sends
+it through GeminiClient to a local stub whose response time grows with the
+request body, so the end-to-end column reflects encode time plus upload time
+for the given uplink bandwidth.
+"""
+import argparse
+import asyncio
+import glob
+import io
+import json
+import os
+import time
+
+import httpx
+import numpy as np
+from PIL import Image
+
+from ai.core.gemini import GeminiClient
+from ai.core.image_prep import PreparedImage, prepare_for_vision
+from benchmarks._common import print_table, timeit
+
+
+def load_uploads(directory, count, seed=0):
+    """Raw file bytes from a directory, or synthetic 12MP phone-style JPEGs"""
+    if directory:
+        paths = sorted(
+            path for pattern in ("*.jpg", "*.jpeg", "*.png")
+            for path in glob.glob(os.path.join(directory, pattern))
+        )
+        uploads = []
+        for path in paths[:count]:
+            with open(path, "rb") as fp:
+                uploads.append(fp.read())
+        if uploads:
+            return uploads
+
+    # Smooth gradients plus sensor-like noise compress roughly like a real photo
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:3024, 0:4032]
+    uploads = []
+    for i in range(count):
+        base = np.stack([(xx / (12 + i)) % 256, (yy / (9 + i)) % 256, ((xx + yy) / 20) % 256], axis=-1)
+        noisy = np.clip(base + rng.normal(0, 6, base.shape), 0, 255).astype(np.uint8)
+        buffer = io.BytesIO()
+        Image.fromarray(noisy).save(buffer, format="JPEG", quality=92)
+        uploads.append(buffer.getvalue())
+    return uploads
+
+
+def prepare_png(content):
+    """The previous path: full resolution, lossless PNG"""
+    image = Image.open(io.BytesIO(content)).convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return PreparedImage(data=buffer.getbuffer(), mime_type="image/png", width=image.size[0], height=image.size[1])
+
+
+VARIANTS = {
+    "png_full": prepare_png,
+    "jpeg": lambda content: prepare_for_vision(Image.open(io.BytesIO(content)), image_format="JPEG"),
+    "webp": lambda content: prepare_for_vision(Image.open(io.BytesIO(content)), image_format="WEBP"),
+}
+
+
+def make_stub(uplink_mbps, latency_ms):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        upload = len(request.content) * 8 / (uplink_mbps * 1_000_000)
+        await asyncio.sleep(latency_ms / 1000 + upload)
+        body = {"damaged_parts": []}
+        return httpx.Response(200, json={"candidates": [{"content": {"parts": [{"text": json.dumps(body)}]}}]})
+
+    return httpx.MockTransport(handler)
+
+
+async def end_to_end(prepare, uploads, uplink_mbps, latency_ms):
+    client = GeminiClient(api_key="stub", transport=make_stub(uplink_mbps, latency_ms))
+    start = time.perf_counter()
+    prepared = await asyncio.gather(*(asyncio.to_thread(prepare, content) for content in uploads))
+    await asyncio.gather(*(client.generate(["describe the damage", image.blob()]) for image in prepared))
+    elapsed = time.perf_counter() - start
+    await client.aclose()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--images", help="directory of sample photos (synthetic 12MP images if omitted)")
+    parser.add_argument("--count", type=int, default=4)
+    parser.add_argument("--uplink-mbps", type=float, default=20.0)
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="fixed model latency of the stub")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    uploads = load_uploads(args.images, args.count)
+    rows = []
+    for name, prepare in VARIANTS.items():
+        sample = prepare(uploads[0])
+        encode = timeit(lambda: [prepare(content) for content in uploads], repeat=args.repeat) / len(uploads)
+        payload = sum(prepare(content).size_bytes for content in uploads) / len(uploads)
+        total = min(
+            asyncio.run(end_to_end(prepare, uploads, args.uplink_mbps, args.latency_ms))
+            for _ in range(args.repeat)
+        )
+        rows.append([
+            name,
+            f"{sample.width}x{sample.height}",
+            f"{encode * 1000:.0f}",
+            f"{payload / 1024:.0f}",
+            f"{total * 1000:.0f}",
+        ])
+    print_table(["variant", "size", "prepare_ms", "payload_kib", "end_to_end_ms"], rows)
+
+
+if __name__ == "__main__":
+    main()
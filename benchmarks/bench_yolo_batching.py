@@ -0,0 +1,65 @@
+"""Throughput of the license-plate YOLO path against batch size.
+
+    python -m benchmarks.bench_yolo_batching [--images DIR] [--count 64]
+
+Measures images/sec for direct batched forward passes and for concurrent
+requests coalesced by the micro-batcher.
+"""
+import argparse
+import asyncio
+import time
+
+from ai.api.routes.license_plate import _detect_license_plates_yolo_batch, _get_yolo_model
+from ai.core.batching import MicroBatcher
+from benchmarks._common import load_images, print_table, timeit
+
+
+def bench_direct(images, batch_sizes):
+    rows = []
+    for batch_size in batch_sizes:
+        def run():
+            for start in range(0, len(images), batch_size):
+                _detect_license_plates_yolo_batch(images[start:start + batch_size])
+        elapsed = timeit(run, repeat=3)
+        rows.append([batch_size, f"{elapsed:.3f}", f"{len(images) / elapsed:.1f}"])
+    print_table(["batch_size", "seconds", "images/sec"], rows)
+
+
+async def _concurrent(images, batch_size, wait_ms):
+    batcher = MicroBatcher(_detect_license_plates_yolo_batch, max_batch_size=batch_size, max_wait_ms=wait_ms)
+    start = time.perf_counter()
+    await asyncio.gather(*(batcher.submit(image) for image in images))
+    elapsed = time.perf_counter() - start
+    stats = batcher.stats()
+    await batcher.aclose()
+    return elapsed, stats
+
+
+def bench_concurrent(images, batch_sizes, wait_ms):
+    rows = []
+    for batch_size in batch_sizes:
+        elapsed, stats = asyncio.run(_concurrent(images, batch_size, wait_ms))
+        rows.append([batch_size, stats["avg_batch_size"], f"{elapsed:.3f}", f"{len(images) / elapsed:.1f}"])
+    print_table(["max_batch", "avg_batch", "seconds", "images/sec"], rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--images", help="directory of street images (defaults to synthetic frames)")
+    parser.add_argument("--count", type=int, default=64)
+    parser.add_argument("--wait-ms", type=float, default=10.0)
+    parser.add_argument("--batch-sizes", default="1,2,4,8,16")
+    args = parser.parse_args()
+
+    batch_sizes = [int(b) for b in args.batch_sizes.split(",")]
+    images = load_images(args.images, args.count)
+    _get_yolo_model()
+
+    print(f"Direct batched inference ({len(images)} images)")
+    bench_direct(images, batch_sizes)
+    print(f"\nConcurrent requests through MicroBatcher (wait={args.wait_ms}ms)")
+    bench_concurrent(images, batch_sizes, args.wait_ms)
+
+
+if __name__ == "__main__":
+    main()
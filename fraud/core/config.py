@@ -1,5 +1,5 @@
 from functools import lru_cache
-from typing import Optional
+from typing import Dict, List, Optional
 
 from pydantic import AnyUrl
 from pydantic import Field
@@ -8,7 +8,8 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
-	model_config = SettingsConfigDict(env_file=".env", env_ignore_empty=True, extra="ignore")
+	# MODEL_DIR, MODEL_REPLICAS, ... are settings, not pydantic internals
+	model_config = SettingsConfigDict(env_file=".env", env_ignore_empty=True, extra="ignore", protected_namespaces=())
 
 	app_name: str = Field(default="Caravanes API")
 	environment: str = Field(default="development")
@@ -24,12 +25,71 @@ class Settings(BaseSettings):
 
 	# Vector DB
 	vector_db_url: Optional[str] = Field(default="http://qdrant:6333", alias="VECTOR_DB_URL")
+	# Similar-submission search (see fraud.core.similarity): "qdrant", or "local" for the in-process HNSW index
+	vector_backend: str = Field(default="qdrant", alias="VECTOR_BACKEND")
+	vector_local_path: Optional[str] = Field(default="./data/vectors", alias="VECTOR_LOCAL_PATH")
+	# The local store logs every upsert and snapshots after this many points
+	vector_local_snapshot_every: int = Field(default=10000, alias="VECTOR_LOCAL_SNAPSHOT_EVERY")
+	vector_upsert_batch_size: int = Field(default=256, alias="VECTOR_UPSERT_BATCH_SIZE")
+	vector_search_top_k: int = Field(default=5, alias="VECTOR_SEARCH_TOP_K")
+	# ONNX image model for embeddings; unset uses the model-free feature descriptor
+	embedding_model_path: Optional[str] = Field(default=None, alias="EMBEDDING_MODEL_PATH")
 
 	# Kafka (external cluster defaults)
 	kafka_bootstrap_servers: str = Field(default="10.103.44.199:19092", alias="KAFKA_BOOTSTRAP_SERVERS")
 	kafka_rest_url: Optional[str] = Field(default="http://10.103.44.199:8080", alias="KAFKA_REST_URL")
 	# Kafka topic
 	kafka_topic: str = "plate_detect"
+	# Consumer: input topic -> handler name (see fraud.kafka.consumer.HANDLERS)
+	kafka_topic_handlers: Dict[str, str] = Field(
+		default_factory=lambda: {"plate_detect": "plate_detect", "license_id_detect": "license_id", "car_damage_detect": "car_damage", "plate_video_detect": "plate_video"},
+		alias="KAFKA_TOPIC_HANDLERS",
+	)
+	kafka_group_id: str = Field(default="fraud-service-group", alias="KAFKA_GROUP_ID")
+	kafka_worker_threads: int = Field(default=4, alias="KAFKA_WORKER_THREADS")
+	kafka_max_inflight: int = Field(default=500, alias="KAFKA_MAX_INFLIGHT")
+	kafka_poll_timeout_ms: int = Field(default=1000, alias="KAFKA_POLL_TIMEOUT_MS")
+	kafka_poll_max_records: int = Field(default=100, alias="KAFKA_POLL_MAX_RECORDS")
+	kafka_commit_interval_ms: float = Field(default=1000.0, alias="KAFKA_COMMIT_INTERVAL_MS")
+	kafka_commit_batch_size: int = Field(default=200, alias="KAFKA_COMMIT_BATCH_SIZE")
+	kafka_handler_max_retries: int = Field(default=2, alias="KAFKA_HANDLER_MAX_RETRIES")
+	kafka_retry_backoff_ms: float = Field(default=5000.0, alias="KAFKA_RETRY_BACKOFF_MS")
+	kafka_dead_letter_topic: Optional[str] = Field(default="fraud_dead_letter", alias="KAFKA_DEAD_LETTER_TOPIC")
+	# Producer batching: messages wait up to linger_ms to share a compressed batch
+	kafka_producer_linger_ms: int = Field(default=5, alias="KAFKA_PRODUCER_LINGER_MS")
+	kafka_producer_batch_size: int = Field(default=64 * 1024, alias="KAFKA_PRODUCER_BATCH_SIZE")
+	kafka_producer_compression: Optional[str] = Field(default="lz4", alias="KAFKA_PRODUCER_COMPRESSION")
+	kafka_producer_acks: str = Field(default="1", alias="KAFKA_PRODUCER_ACKS")
+	kafka_producer_max_in_flight: int = Field(default=5, alias="KAFKA_PRODUCER_MAX_IN_FLIGHT")
+	# Wire format for published events: "msgpack" envelope, or "json" while old readers remain
+	kafka_event_format: str = Field(default="msgpack", alias="KAFKA_EVENT_FORMAT")
+
+	# Plate video scanning (see ai.core.plate_tracking)
+	video_detect_stride: int = Field(default=5, alias="VIDEO_DETECT_STRIDE")
+	video_track_iou_threshold: float = Field(default=0.3, alias="VIDEO_TRACK_IOU_THRESHOLD")
+	video_track_max_missed: int = Field(default=3, alias="VIDEO_TRACK_MAX_MISSED")
+	video_ocr_max_reads: int = Field(default=3, alias="VIDEO_OCR_MAX_READS")
+	kafka_plate_video_result_topic: str = Field(default="plate_video_results", alias="KAFKA_PLATE_VIDEO_RESULT_TOPIC")
+
+	# Plate registry (see fraud.core.plate_registry)
+	plate_registry_snapshot_dir: str = Field(default="./data/plate_registry", alias="PLATE_REGISTRY_SNAPSHOT_DIR")
+	# Edit distance at which two normalized plates still count as the same plate (0 or 1)
+	plate_registry_max_distance: int = Field(default=1, alias="PLATE_REGISTRY_MAX_DISTANCE")
+	kafka_fraud_alert_topic: str = Field(default="fraud_alerts", alias="KAFKA_FRAUD_ALERT_TOPIC")
+
+	# Models (see ai.core.model_registry)
+	model_dir: str = Field(default="/app/models", alias="MODEL_DIR")
+	model_warmup: bool = Field(default=True, alias="MODEL_WARMUP")
+	# Detector inference backend: "onnx" (ONNX Runtime, falls back to PyTorch) or "torch"
+	inference_backend: str = Field(default="onnx", alias="INFERENCE_BACKEND")
+	inference_int8: bool = Field(default=False, alias="INFERENCE_INT8")
+	inference_intra_op_threads: int = Field(default=0, alias="INFERENCE_INTRA_OP_THREADS")
+	inference_inter_op_threads: int = Field(default=1, alias="INFERENCE_INTER_OP_THREADS")
+	inference_onnx_providers: List[str] = Field(default_factory=lambda: ["CPUExecutionProvider"], alias="INFERENCE_ONNX_PROVIDERS")
+	# Instances per model; each consumer worker leases one for an inference
+	model_replicas: int = Field(default=1, alias="MODEL_REPLICAS")
+	# Hot-reload weights whose file changed, checked at this interval (0 disables)
+	model_reload_interval_seconds: float = Field(default=0.0, alias="MODEL_RELOAD_INTERVAL_SECONDS")
 
 
 @lru_cache(maxsize=1)
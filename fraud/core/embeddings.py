@@ -0,0 +1,132 @@
+"""CPU image embeddings for similar-submission search.
+
+Two embedders share one interface, ``embed(images) -> (n, dim)`` L2-normalized
+``float32`` rows compared by cosine similarity:
+
+* :class:`FeatureEmbedder` needs no model file: a colour histogram, a grid of
+  gradient-orientation histograms and a coarse grayscale layout. It finds
+  re-submitted, re-shot and lightly edited photos, not semantic look-alikes.
+* :class:`OnnxEmbedder` runs an image model exported to ONNX (an ImageNet
+  backbone with its classifier removed, for instance) through ONNX Runtime.
+
+Vectors from different embedders are not comparable; collections record the
+embedder name and dimension they were built with.
+"""
+from typing import List, Optional, Sequence
+
+import cv2
+import numpy as np
+
+from fraud.core.hnsw import normalize_rows
+
+
+_IMAGENET_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+_IMAGENET_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+
+
+class Embedder:
+	name = "embedder"
+	dim = 0
+
+	def embed(self, images: Sequence[np.ndarray]) -> np.ndarray:
+		raise NotImplementedError
+
+
+class FeatureEmbedder(Embedder):
+	"""Handcrafted global descriptor of a BGR image (528 dimensions).
+
+	Three blocks, each L2-normalized and weighted equally: an 8x4x4 HSV
+	histogram, 9-bin gradient orientation histograms over a 4x4 grid, and the
+	mean-centred 16x16 grayscale thumbnail.
+	"""
+
+	name = "features-v1"
+	dim = 128 + 144 + 256
+	size = 128
+
+	def _describe(self, image: np.ndarray) -> np.ndarray:
+		if image.ndim == 2:
+			image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+		small = cv2.resize(image, (self.size, self.size), interpolation=cv2.INTER_AREA)
+		hsv = cv2.cvtColor(small, cv2.COLOR_BGR2HSV)
+		colour = cv2.calcHist([hsv], [0, 1, 2], None, [8, 4, 4], [0, 180, 0, 256, 0, 256]).ravel()
+		# Square roots damp dominant bins (Hellinger kernel)
+		colour = np.sqrt(colour)
+
+		gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY).astype(np.float32)
+		magnitude, angle = cv2.cartToPolar(cv2.Sobel(gray, cv2.CV_32F, 1, 0), cv2.Sobel(gray, cv2.CV_32F, 0, 1))
+		bins = np.minimum((angle % np.pi) / np.pi * 9, 8).astype(np.int64)
+		cell = self.size // 4
+		cells = (np.arange(self.size) // cell)
+		cell_index = cells[:, None] * 4 + cells[None, :]
+		gradients = np.bincount((cell_index * 9 + bins).ravel(), weights=magnitude.ravel(), minlength=144)
+		gradients = np.sqrt(gradients)
+
+		layout = cv2.resize(gray, (16, 16), interpolation=cv2.INTER_AREA).ravel()
+		layout -= layout.mean()
+
+		blocks = [normalize_rows(block) for block in (colour, gradients, layout)]
+		return np.concatenate(blocks) / np.sqrt(len(blocks))
+
+	def embed(self, images: Sequence[np.ndarray]) -> np.ndarray:
+		if not len(images):
+			return np.empty((0, self.dim), dtype=np.float32)
+		return np.stack([self._describe(image) for image in images]).astype(np.float32)
+
+
+class OnnxEmbedder(Embedder):
+	"""An ONNX image model whose first output is (or pools to) one vector per image.
+
+	Inputs are RGB, ``input_size`` square, ImageNet-normalized NCHW.
+	"""
+
+	def __init__(
+		self,
+		path: str,
+		input_size: int = 224,
+		intra_op_threads: int = 0,
+		providers: Optional[Sequence[str]] = None,
+	) -> None:
+		import onnxruntime as ort
+
+		options = ort.SessionOptions()
+		options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+		options.intra_op_num_threads = max(0, intra_op_threads)
+		available = ort.get_available_providers()
+		chosen = [p for p in (providers or []) if p in available] or ["CPUExecutionProvider"]
+		self.session = ort.InferenceSession(path, sess_options=options, providers=chosen)
+		self.input_size = input_size
+		model_input = self.session.get_inputs()[0]
+		self._input_name = model_input.name
+		self._batched = not isinstance(model_input.shape[0], int)
+		self.name = f"onnx:{path.rsplit('/', 1)[-1]}"
+		self.dim = int(self.embed([np.zeros((input_size, input_size, 3), dtype=np.uint8)]).shape[1])
+
+	def _run(self, images: Sequence[np.ndarray]) -> np.ndarray:
+		size = self.input_size
+		batch = np.empty((len(images), 3, size, size), dtype=np.float32)
+		for i, image in enumerate(images):
+			if image.ndim == 2:
+				image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+			rgb = cv2.cvtColor(cv2.resize(image, (size, size), interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2RGB)
+			batch[i] = ((rgb.astype(np.float32) / 255.0 - _IMAGENET_MEAN) / _IMAGENET_STD).transpose(2, 0, 1)
+		output = self.session.run(None, {self._input_name: batch})[0]
+		# Feature maps (n, c, h, w) are average-pooled to (n, c)
+		return output.reshape(len(images), output.shape[1], -1).mean(axis=2) if output.ndim > 2 else output
+
+	def embed(self, images: Sequence[np.ndarray]) -> np.ndarray:
+		if not len(images):
+			return np.empty((0, getattr(self, "dim", 0)), dtype=np.float32)
+		outputs: List[np.ndarray] = [self._run(images)] if self._batched else [self._run([image]) for image in images]
+		return normalize_rows(np.concatenate(outputs))
+
+
+def load_embedder(
+	model_path: Optional[str] = None,
+	intra_op_threads: int = 0,
+	providers: Optional[Sequence[str]] = None,
+) -> Embedder:
+	"""The ONNX model at ``model_path`` if given, else the model-free :class:`FeatureEmbedder`."""
+	if not model_path:
+		return FeatureEmbedder()
+	return OnnxEmbedder(model_path, intra_op_threads=intra_op_threads, providers=providers)
@@ -0,0 +1,267 @@
+"""Hierarchical navigable small world (HNSW) graph over a NumPy vector store.
+
+In-process approximate nearest-neighbour search by cosine similarity, for
+tests, offline runs and deployments without Qdrant. Vectors live in one
+growable ``float32`` array (L2-normalized, so similarity is a dot product)
+and each node keeps its neighbour list per layer, following Malkov &
+Yashunin: greedy descent through the sparse upper layers, then a beam search
+of width ``ef`` on layer 0, with the neighbour-diversity heuristic when
+linking new nodes. Nodes are linked as they are added, so no search ever
+pays for building the graph; small indexes are still searched by exact scan.
+"""
+import heapq
+import itertools
+import json
+import math
+import os
+import random
+import threading
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+_NO_LINKS = np.empty(0, dtype=np.int32)
+# Candidates expanded per step of the beam search
+_EXPAND_BATCH = 8
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+	vectors = np.asarray(vectors, dtype=np.float32)
+	norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+	return vectors / np.maximum(norms, 1e-12)
+
+
+class HnswIndex:
+	"""Cosine-similarity HNSW index; nodes are numbered in insertion order. Thread-safe."""
+
+	def __init__(
+		self,
+		dim: int,
+		m: int = 32,
+		ef_construction: int = 200,
+		ef_search: int = 64,
+		capacity: int = 1024,
+		seed: int = 0,
+		full_scan_threshold: int = 20000,
+	) -> None:
+		self.dim = dim
+		self.full_scan_threshold = full_scan_threshold
+		self.m = m
+		self.ef_construction = ef_construction
+		self.ef_search = ef_search
+		self._level_mult = 1 / math.log(m)
+		self._rng = random.Random(seed)
+		self._vectors = np.zeros((max(1, capacity), dim), dtype=np.float32)
+		self._count = 0
+		self._visit_marks = np.zeros(max(1, capacity), dtype=np.uint32)
+		self._visit_tag = 0
+		self._links: List[List[np.ndarray]] = []
+		self._entry = -1
+		self._max_level = -1
+		self._lock = threading.Lock()
+
+	def __len__(self) -> int:
+		return self._count
+
+	@property
+	def vectors(self) -> np.ndarray:
+		return self._vectors[:self._count]
+
+	def _search_layer(self, query: np.ndarray, entry_points: Sequence[int], ef: int, level: int) -> List[Tuple[float, int]]:
+		"""The ``ef`` nodes closest to ``query`` on one layer, as sorted ``(distance, node)``."""
+		vectors = self._vectors
+		# Visited nodes carry the current tag, which saves clearing a mask per search
+		self._visit_tag += 1
+		tag, marks = self._visit_tag, self._visit_marks
+		entry = np.asarray(entry_points, dtype=np.int64)
+		marks[entry] = tag
+		candidates = list(zip((1.0 - vectors[entry] @ query).tolist(), entry.tolist()))
+		heapq.heapify(candidates)
+		results = [(-distance, node) for distance, node in heapq.nsmallest(ef, candidates)]
+		heapq.heapify(results)
+		links = self._links
+		while candidates:
+			# Expand the closest few candidates together: one gather and one
+			# matrix-vector product instead of one per node
+			bound = -results[0][0]
+			full = len(results) >= ef
+			batch = []
+			while candidates and len(batch) < _EXPAND_BATCH and not (full and candidates[0][0] > bound):
+				batch.append(links[heapq.heappop(candidates)[1]][level])
+			if not batch:
+				break
+			neighbours = np.concatenate(batch) if len(batch) > 1 else batch[0]
+			neighbours = neighbours[marks[neighbours] != tag]
+			if not len(neighbours):
+				continue
+			neighbours = np.unique(neighbours)
+			marks[neighbours] = tag
+			distances = 1.0 - vectors[neighbours] @ query
+			if full:
+				closer = distances < bound
+				neighbours, distances = neighbours[closer], distances[closer]
+			for distance, neighbour in zip(distances.tolist(), neighbours.tolist()):
+				if len(results) < ef or distance < -results[0][0]:
+					heapq.heappush(candidates, (distance, neighbour))
+					heapq.heappush(results, (-distance, neighbour))
+					if len(results) > ef:
+						heapq.heappop(results)
+		return sorted((-distance, node) for distance, node in results)
+
+	def _select_neighbours(self, candidates: List[Tuple[float, int]], m: int) -> np.ndarray:
+		"""Keep a candidate only if it is closer to the base than to every neighbour kept so far."""
+		nodes = np.asarray([node for _, node in candidates], dtype=np.int32)
+		if len(nodes) <= 1:
+			return nodes
+		limits = [1.0 - distance for distance, _ in candidates]
+		candidate_vectors = self._vectors[nodes]
+		similarities = candidate_vectors @ candidate_vectors.T
+		# Highest similarity of each candidate to any neighbour selected so far
+		closest = np.full(len(nodes), -np.inf, dtype=np.float32)
+		selected = []
+		for i in range(len(nodes)):
+			if closest[i] > limits[i]:
+				continue
+			selected.append(i)
+			if len(selected) >= m:
+				break
+			np.maximum(closest, similarities[i], out=closest)
+		return nodes[selected]
+
+	def add(self, vector: np.ndarray) -> int:
+		return self.add_batch(np.asarray(vector)[None, :])[0]
+
+	def add_batch(self, vectors: np.ndarray) -> List[int]:
+		"""Store vectors and link each one into the graph."""
+		vectors = normalize_rows(vectors)
+		with self._lock:
+			if self._count + len(vectors) > len(self._vectors):
+				grown = np.zeros((max(2 * len(self._vectors), self._count + len(vectors)), self.dim), dtype=np.float32)
+				grown[:self._count] = self._vectors[:self._count]
+				self._vectors = grown
+				self._visit_marks = np.zeros(len(grown), dtype=np.uint32)
+				self._visit_tag = 0
+			first = self._count
+			self._vectors[first:first + len(vectors)] = vectors
+			self._count += len(vectors)
+			for node in range(first, self._count):
+				self._link(node)
+			return list(range(first, self._count))
+
+	def _link(self, node: int) -> None:
+		vector = self._vectors[node]
+		level = int(-math.log(1.0 - self._rng.random()) * self._level_mult)
+		self._links.append([_NO_LINKS] * (level + 1))
+		if self._entry < 0:
+			self._entry, self._max_level = node, level
+			return
+
+		entry_points = [self._entry]
+		for layer in range(self._max_level, level, -1):
+			entry_points = [self._search_layer(vector, entry_points, 1, layer)[0][1]]
+		for layer in range(min(level, self._max_level), -1, -1):
+			found = self._search_layer(vector, entry_points, self.ef_construction, layer)
+			max_links = 2 * self.m if layer == 0 else self.m
+			neighbours = self._select_neighbours(found, self.m)
+			self._links[node][layer] = neighbours
+			for neighbour in neighbours.tolist():
+				links = np.append(self._links[neighbour][layer], np.int32(node))
+				if len(links) > max_links:
+					distances = 1.0 - self._vectors[links] @ self._vectors[neighbour]
+					order = np.argsort(distances)
+					links = self._select_neighbours(list(zip(distances[order].tolist(), links[order].tolist())), max_links)
+				self._links[neighbour][layer] = links
+			entry_points = [n for _, n in found]
+		if level > self._max_level:
+			self._entry, self._max_level = node, level
+
+	def search(
+		self,
+		vector: np.ndarray,
+		k: int,
+		ef: Optional[int] = None,
+		accept: Optional[Callable[[int], bool]] = None,
+	) -> Tuple[np.ndarray, np.ndarray]:
+		"""``(nodes, cosine similarities)`` of the ``k`` nearest accepted nodes, best first.
+
+		Up to ``full_scan_threshold`` vectors the search is an exact scan. When
+		``accept`` rejects many of the nearest nodes the beam is widened until
+		``k`` are found or the whole graph has been searched.
+		"""
+		query = normalize_rows(vector)
+		ef = max(ef or self.ef_search, k)
+		with self._lock:
+			if k <= 0 or not self._count:
+				return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+			if self._count <= self.full_scan_threshold:
+				return self._scan(query, k, accept)
+			entry_points = [self._entry]
+			for layer in range(self._max_level, 0, -1):
+				entry_points = [self._search_layer(query, entry_points, 1, layer)[0][1]]
+			while True:
+				found = self._search_layer(query, entry_points, ef, 0)
+				if accept is not None:
+					found = [(distance, node) for distance, node in found if accept(node)]
+				if len(found) >= k or ef >= self._count:
+					break
+				ef *= 4
+		found = found[:k]
+		return (
+			np.asarray([node for _, node in found], dtype=np.int64),
+			np.asarray([1.0 - distance for distance, _ in found], dtype=np.float32),
+		)
+
+	def _scan(self, query: np.ndarray, k: int, accept: Optional[Callable[[int], bool]]) -> Tuple[np.ndarray, np.ndarray]:
+		similarities = self._vectors[:self._count] @ query
+		if accept is None and k < self._count:
+			top = np.argpartition(-similarities, k - 1)[:k]
+			order = top[np.argsort(-similarities[top])]
+		else:
+			order = np.argsort(-similarities)
+		if accept is not None:
+			order = np.fromiter(itertools.islice((node for node in order.tolist() if accept(node)), k), dtype=np.int64)
+		nodes = order[:k].astype(np.int64)
+		return nodes, similarities[nodes]
+
+	def save(self, path: str) -> None:
+		"""Write ``<path>.npz`` (vectors and flattened links) and ``<path>.json`` (parameters)."""
+		with self._lock:
+			lengths = [len(links) for node in self._links for links in node]
+			flat = np.concatenate([links for node in self._links for links in node]) if lengths else _NO_LINKS
+			np.savez(
+				path + ".npz",
+				vectors=self._vectors[:self._count],
+				levels=np.asarray([len(node) - 1 for node in self._links], dtype=np.int32),
+				lengths=np.asarray(lengths, dtype=np.int32),
+				links=np.asarray(flat, dtype=np.int32),
+			)
+			meta = {
+				"dim": self.dim, "m": self.m, "ef_construction": self.ef_construction,
+				"ef_search": self.ef_search, "full_scan_threshold": self.full_scan_threshold,
+				"entry": self._entry, "max_level": self._max_level,
+			}
+		with open(path + ".json", "w", encoding="utf-8") as fp:
+			json.dump(meta, fp)
+
+	@classmethod
+	def load(cls, path: str) -> Optional["HnswIndex"]:
+		if not os.path.exists(path + ".json"):
+			return None
+		with open(path + ".json", "r", encoding="utf-8") as fp:
+			meta = json.load(fp)
+		arrays = np.load(path + ".npz")
+		index = cls(
+			meta["dim"], m=meta["m"], ef_construction=meta["ef_construction"], ef_search=meta["ef_search"],
+			capacity=len(arrays["vectors"]), full_scan_threshold=meta["full_scan_threshold"],
+		)
+		index._vectors[:len(arrays["vectors"])] = arrays["vectors"]
+		index._visit_marks = np.zeros(len(index._vectors), dtype=np.uint32)
+		index._count = len(arrays["vectors"])
+		links = np.split(arrays["links"], np.cumsum(arrays["lengths"])[:-1]) if len(arrays["lengths"]) else []
+		position = 0
+		for level in arrays["levels"].tolist():
+			index._links.append([links[position + layer] for layer in range(level + 1)])
+			position += level + 1
+		index._entry, index._max_level = meta["entry"], meta["max_level"]
+		return index
@@ -0,0 +1,597 @@
+"""Registry of recognized plates, for "has this plate appeared in other claims?".
+
+Every sighting (plate, claim, time, image hash) is stored in ``plate_sightings``;
+lookups are answered from memory. Plates are normalized so common OCR
+confusions (O/0, I/1, Z/2, S/5, B/8, Arabic-Indic digits) compare equal, and
+indexed by their single-deletion variants: two plates within edit distance 1
+always share a variant, so a fuzzy lookup is a dozen binary searches over a
+sorted ``uint64`` array plus an exact check of the few candidates.
+
+The index is rebuilt from a snapshot directory of ``.npy`` files (memory
+mapped, so startup does not re-read millions of rows) and then caught up with
+the rows added since the snapshot was taken.
+
+    python -m fraud.core.plate_registry import plates.csv [more.jsonl ...] [--replace]
+    python -m fraud.core.plate_registry snapshot
+
+Import files are CSV (with a header) or JSON Lines with ``plate``,
+``claim_id``, ``seen_at`` (ISO 8601 or epoch seconds) and optional
+``image_hash`` and ``source``.
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import unicodedata
+from array import array
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from fraud.core.config import get_settings
+from fraud.db.session import SessionLocal
+from fraud.models.plate_sighting import PlateSighting
+
+
+SNAPSHOT_VERSION = 1
+# Shorter reads are OCR fragments, longer ones whole lines of text, not plates
+MIN_PLATE_LENGTH = 3
+MAX_PLATE_LENGTH = 32
+
+_ARABIC_INDIC_DIGITS = str.maketrans("٠١٢٣٤٥٦٧٨٩۰۱۲۳۴۵۶۷۸۹", "0123456789" * 2)
+# Letters OCR mistakes for digits are folded onto the digit
+_OCR_CONFUSIONS = str.maketrans("OQIZSB", "001258")
+_SYMBOLS = {symbol: value for value, symbol in enumerate("0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ", start=1)}
+# Up to 12 symbols pack exactly into 63 bits (37**12 < 2**63); longer keys are hashed above that
+_EXACT_LENGTH = 12
+_HASHED = 1 << 63
+
+# (normalized plate, claim id, seen at in epoch ms, image hash)
+Sighting = Tuple[str, str, int, Optional[str]]
+
+
+def normalize_plate(text: Any) -> str:
+	"""Uppercase ASCII letters and digits, with OCR-confusable letters folded onto digits."""
+	text = unicodedata.normalize("NFKC", str(text or "")).translate(_ARABIC_INDIC_DIGITS).upper()
+	return re.sub(r"[^0-9A-Z]+", "", text).translate(_OCR_CONFUSIONS)
+
+
+def _code(key: str) -> int:
+	if len(key) <= _EXACT_LENGTH:
+		code = 0
+		for symbol in key:
+			code = code * 37 + _SYMBOLS[symbol]
+		return code
+	return int.from_bytes(hashlib.blake2b(key.encode("ascii"), digest_size=8).digest(), "big") | _HASHED
+
+
+def variant_codes(key: str) -> Set[int]:
+	"""Codes of ``key`` and of every string one deletion away from it."""
+	return {_code(key)} | {_code(key[:i] + key[i + 1:]) for i in range(len(key))}
+
+
+_SYMBOL_VALUES = np.zeros(256, dtype=np.uint64)
+for _symbol, _value in _SYMBOLS.items():
+	_SYMBOL_VALUES[ord(_symbol)] = _value
+
+
+def variant_arrays(plates: Any, first_id: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+	"""``variant_codes`` for many plates at once: ``(codes, plate ids)``, vectorized over plates.
+
+	Deleting any character of a run of equal characters gives the same string, so
+	only the last position of each run is kept, which matches the set semantics.
+	"""
+	plates = np.asarray(plates, dtype="S")
+	if not len(plates):
+		return np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.int32)
+	chars = np.frombuffer(plates.tobytes(), dtype=np.uint8).reshape(len(plates), plates.dtype.itemsize)
+	values = _SYMBOL_VALUES[chars]
+	lengths = (chars > 0).sum(axis=1)
+	ids = np.arange(first_id, first_id + len(plates), dtype=np.int32)
+	exact = lengths <= _EXACT_LENGTH
+
+	def horner(columns: np.ndarray) -> np.ndarray:
+		# Trailing NUL padding has value 0 and leaves the code untouched
+		code = np.zeros(len(columns), dtype=np.uint64)
+		for column in columns.T:
+			code = np.where(column > 0, code * np.uint64(37) + column, code)
+		return code
+
+	codes, owners = [horner(values[exact])], [ids[exact]]
+	for i in range(chars.shape[1]):
+		keep = exact & (lengths > i)
+		if i + 1 < chars.shape[1]:
+			keep &= chars[:, i] != chars[:, i + 1]
+		if keep.any():
+			codes.append(horner(np.delete(values[keep], i, axis=1)))
+			owners.append(ids[keep])
+	for plate_id in np.flatnonzero(~exact):
+		variants = variant_codes(plates[plate_id].decode("ascii"))
+		codes.append(np.fromiter(variants, dtype=np.uint64, count=len(variants)))
+		owners.append(np.full(len(variants), first_id + plate_id, dtype=np.int32))
+	return np.concatenate(codes), np.concatenate(owners)
+
+
+def edit_distance_at_most_one(a: str, b: str) -> Optional[int]:
+	"""0 or 1 if ``a`` and ``b`` are that many edits apart, else None."""
+	if a == b:
+		return 0
+	if len(a) == len(b):
+		return 1 if sum(x != y for x, y in zip(a, b)) == 1 else None
+	if abs(len(a) - len(b)) != 1:
+		return None
+	if len(a) > len(b):
+		a, b = b, a
+	i = 0
+	while i < len(a) and a[i] == b[i]:
+		i += 1
+	return 1 if a[i:] == b[i + 1:] else None
+
+
+def _is_plate(key: str) -> bool:
+	return MIN_PLATE_LENGTH <= len(key) <= MAX_PLATE_LENGTH
+
+
+def _epoch_ms(value: Any) -> int:
+	if value is None or value == "":
+		return int(time.time() * 1000)
+	if isinstance(value, datetime):
+		moment = value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+		return int(moment.timestamp() * 1000)
+	try:
+		return int(float(value) * 1000)
+	except (TypeError, ValueError):
+		return _epoch_ms(datetime.fromisoformat(str(value).replace("Z", "+00:00")))
+
+
+def _iso(epoch_ms: int) -> str:
+	return datetime.fromtimestamp(epoch_ms / 1000, tz=timezone.utc).isoformat()
+
+
+class PlateIndex:
+	"""Immutable columnar index: plates, their sorted variant codes, and sightings grouped by plate."""
+
+	_ARRAYS = ("plates", "variant_codes", "variant_plates", "offsets", "sighting_claims", "seen_at", "image_hashes", "claims")
+
+	def __init__(self, arrays: Dict[str, np.ndarray], last_row_id: int = 0) -> None:
+		self.plates = arrays["plates"]
+		self.variant_codes = arrays["variant_codes"]
+		self.variant_plates = arrays["variant_plates"]
+		self.offsets = arrays["offsets"]
+		self.sighting_claims = arrays["sighting_claims"]
+		self.seen_at = arrays["seen_at"]
+		self.image_hashes = arrays["image_hashes"]
+		self.claims = arrays["claims"]
+		self.last_row_id = last_row_id
+
+	@property
+	def plate_count(self) -> int:
+		return len(self.plates)
+
+	@property
+	def sighting_count(self) -> int:
+		return len(self.seen_at)
+
+	@classmethod
+	def empty(cls) -> "PlateIndex":
+		return cls.assemble([], [], [], [], [], [], [])
+
+	@classmethod
+	def build(cls, sightings: Iterable[Sighting], last_row_id: int = 0) -> "PlateIndex":
+		"""Index sightings in bulk (millions of rows: a few seconds per million)."""
+		plate_ids: Dict[str, int] = {}
+		claim_ids: Dict[str, int] = {}
+		sighting_plates, sighting_claims, seen_at = array("i"), array("i"), array("q")
+		image_hashes: List[bytes] = []
+		for key, claim_id, epoch_ms, image_hash in sightings:
+			sighting_plates.append(plate_ids.setdefault(key, len(plate_ids)))
+			sighting_claims.append(claim_ids.setdefault(claim_id, len(claim_ids)))
+			seen_at.append(epoch_ms)
+			image_hashes.append((image_hash or "").encode("utf-8"))
+		codes, owners = variant_arrays(list(plate_ids))
+		claims = [claim_id.encode("utf-8") for claim_id in claim_ids]
+		index = cls.assemble(list(plate_ids), codes, owners, sighting_plates, claims, seen_at, image_hashes, sighting_claims)
+		index.last_row_id = last_row_id
+		return index
+
+	@classmethod
+	def assemble(
+		cls,
+		plates: Any,
+		codes: Any,
+		owners: Any,
+		sighting_plates: Any,
+		claims: Any,
+		seen_at: Any,
+		image_hashes: Any,
+		sighting_claims: Any = None,
+	) -> "PlateIndex":
+		"""Sort variant codes and group sightings by plate (CSR offsets)."""
+		plates = np.asarray(plates, dtype="S") if len(plates) else np.empty(0, dtype="S1")
+		codes = np.asarray(codes, dtype=np.uint64)
+		owners = np.asarray(owners, dtype=np.int32)
+		order = np.argsort(codes, kind="stable")
+		sighting_plates = np.asarray(sighting_plates, dtype=np.int32)
+		by_plate = np.argsort(sighting_plates, kind="stable")
+		offsets = np.zeros(len(plates) + 1, dtype=np.int64)
+		np.cumsum(np.bincount(sighting_plates, minlength=len(plates)), out=offsets[1:])
+		return cls({
+			"plates": plates,
+			"variant_codes": codes[order],
+			"variant_plates": owners[order],
+			"offsets": offsets,
+			"sighting_claims": np.asarray(sighting_claims if sighting_claims is not None else [], dtype=np.int32)[by_plate],
+			"seen_at": np.asarray(seen_at, dtype=np.int64)[by_plate],
+			"image_hashes": (np.asarray(image_hashes, dtype="S") if len(image_hashes) else np.empty(0, dtype="S1"))[by_plate],
+			"claims": np.asarray(claims, dtype="S") if len(claims) else np.empty(0, dtype="S1"),
+		})
+
+	def candidates(self, code: int) -> np.ndarray:
+		key = np.uint64(code)
+		lo = np.searchsorted(self.variant_codes, key, side="left")
+		hi = np.searchsorted(self.variant_codes, key, side="right")
+		return self.variant_plates[lo:hi]
+
+	def plate(self, plate_id: int) -> str:
+		return self.plates[plate_id].decode("ascii")
+
+	def sightings(self, plate_id: int) -> Iterator[Tuple[str, int, Optional[str]]]:
+		for i in range(self.offsets[plate_id], self.offsets[plate_id + 1]):
+			image_hash = self.image_hashes[i].decode("utf-8")
+			yield self.claims[self.sighting_claims[i]].decode("utf-8"), int(self.seen_at[i]), image_hash or None
+
+	def save(self, directory: str) -> None:
+		"""Write the snapshot next to ``directory`` and swap it in atomically."""
+		staging, retired = directory + ".tmp", directory + ".old"
+		shutil.rmtree(staging, ignore_errors=True)
+		os.makedirs(staging)
+		for name in self._ARRAYS:
+			np.save(os.path.join(staging, f"{name}.npy"), getattr(self, name))
+		with open(os.path.join(staging, "meta.json"), "w", encoding="utf-8") as fp:
+			json.dump({
+				"version": SNAPSHOT_VERSION,
+				"last_row_id": self.last_row_id,
+				"plates": self.plate_count,
+				"sightings": self.sighting_count,
+				"created_at": time.time(),
+			}, fp)
+		shutil.rmtree(retired, ignore_errors=True)
+		if os.path.exists(directory):
+			os.rename(directory, retired)
+		os.rename(staging, directory)
+		shutil.rmtree(retired, ignore_errors=True)
+
+	@classmethod
+	def load(cls, directory: str) -> Optional["PlateIndex"]:
+		"""Memory-map a snapshot; None if there is none or it is from another version."""
+		try:
+			with open(os.path.join(directory, "meta.json"), "r", encoding="utf-8") as fp:
+				meta = json.load(fp)
+		except (OSError, ValueError):
+			return None
+		if meta.get("version") != SNAPSHOT_VERSION:
+			return None
+		arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r") for name in cls._ARRAYS}
+		return cls(arrays, last_row_id=int(meta.get("last_row_id", 0)))
+
+
+class PlateRegistry:
+	"""Plate sightings in the database, fuzzy-searchable in memory.
+
+	New sightings go to the database and to a small in-memory overlay on top of
+	the snapshot index; :meth:`save_snapshot` folds the overlay into a new
+	snapshot. Safe to share between consumer threads.
+	"""
+
+	def __init__(
+		self,
+		session_factory: Callable[[], Session] = SessionLocal,
+		snapshot_dir: Optional[str] = None,
+		max_distance: int = 1,
+	) -> None:
+		if max_distance not in (0, 1):
+			raise ValueError("The plate index supports edit distances of 0 or 1")
+		self._session_factory = session_factory
+		self._snapshot_dir = snapshot_dir
+		self._max_distance = max_distance
+		self._lock = threading.RLock()
+		self._index = PlateIndex.empty()
+		self._reset_overlay()
+		self._lookups = 0
+		self._lookup_seconds = 0.0
+
+	def _reset_overlay(self) -> None:
+		self._new_plates: List[str] = []
+		self._new_variants: Dict[int, List[int]] = {}
+		self._new_sightings: Dict[int, List[Tuple[str, int, Optional[str]]]] = {}
+		self._new_sighting_count = 0
+		self._last_row_id = self._index.last_row_id
+
+	def load(self) -> None:
+		"""Open the snapshot, then replay database rows added after it."""
+		started = time.perf_counter()
+		with self._session_factory() as db:
+			PlateSighting.metadata.create_all(bind=db.get_bind(), tables=[PlateSighting.__table__])
+		index = PlateIndex.load(self._snapshot_dir) if self._snapshot_dir else None
+		with self._lock:
+			self._index = index or PlateIndex.empty()
+			self._reset_overlay()
+		replayed = 0
+		with self._session_factory() as db:
+			rows = db.execute(
+				select(PlateSighting.id, PlateSighting.plate_key, PlateSighting.claim_id, PlateSighting.seen_at, PlateSighting.image_hash)
+				.where(PlateSighting.id > self._last_row_id)
+				.order_by(PlateSighting.id)
+				.execution_options(yield_per=10000)
+			)
+			for row_id, key, claim_id, seen_at, image_hash in rows:
+				self._remember(key, claim_id, _epoch_ms(seen_at), image_hash, row_id)
+				replayed += 1
+		print(
+			f"[plate-registry] Loaded {self._index.sighting_count} sightings from snapshot, "
+			f"replayed {replayed} rows in {time.perf_counter() - started:.2f}s"
+		)
+
+	def _plate_id(self, key: str) -> Optional[int]:
+		code = _code(key)
+		for plate_id in self._index.candidates(code):
+			if self._index.plate(int(plate_id)) == key:
+				return int(plate_id)
+		for plate_id in self._new_variants.get(code, ()):
+			if self._plate_text(plate_id) == key:
+				return plate_id
+		return None
+
+	def _plate_text(self, plate_id: int) -> str:
+		if plate_id < self._index.plate_count:
+			return self._index.plate(plate_id)
+		return self._new_plates[plate_id - self._index.plate_count]
+
+	def _remember(self, key: str, claim_id: str, epoch_ms: int, image_hash: Optional[str], row_id: int) -> None:
+		with self._lock:
+			plate_id = self._plate_id(key)
+			if plate_id is None:
+				plate_id = self._index.plate_count + len(self._new_plates)
+				self._new_plates.append(key)
+				for code in variant_codes(key):
+					self._new_variants.setdefault(code, []).append(plate_id)
+			self._new_sightings.setdefault(plate_id, []).append((claim_id, epoch_ms, image_hash))
+			self._new_sighting_count += 1
+			self._last_row_id = max(self._last_row_id, row_id)
+
+	def add(
+		self,
+		plate_text: str,
+		claim_id: str,
+		image_hash: Optional[str] = None,
+		seen_at: Optional[datetime] = None,
+		source: Optional[str] = None,
+	) -> Optional[str]:
+		"""Record a sighting; returns the normalized plate, or None if the text is not a plate."""
+		key = normalize_plate(plate_text)
+		if not _is_plate(key):
+			return None
+		seen_at = seen_at or datetime.now(timezone.utc).replace(tzinfo=None)
+		with self._session_factory() as db:
+			row = PlateSighting(
+				plate_key=key, plate_text=str(plate_text)[:64], claim_id=str(claim_id),
+				seen_at=seen_at, image_hash=image_hash, source=source,
+			)
+			db.add(row)
+			db.commit()
+			row_id = row.id
+		self._remember(key, str(claim_id), _epoch_ms(seen_at), image_hash, row_id)
+		return key
+
+	def lookup(self, plate_text: str, exclude_claim: Optional[str] = None, max_distance: Optional[int] = None) -> List[Dict[str, Any]]:
+		"""Sightings of plates within ``max_distance`` edits of ``plate_text``, closest first."""
+		started = time.perf_counter()
+		max_distance = self._max_distance if max_distance is None else min(max_distance, self._max_distance)
+		key = normalize_plate(plate_text)
+		if not _is_plate(key):
+			return []
+		matches: Dict[int, int] = {}
+		with self._lock:
+			codes = [_code(key)] if max_distance == 0 else variant_codes(key)
+			for code in codes:
+				for plate_id in [*self._index.candidates(code).tolist(), *self._new_variants.get(code, ())]:
+					if plate_id in matches:
+						continue
+					distance = edit_distance_at_most_one(key, self._plate_text(plate_id))
+					if distance is not None and distance <= max_distance:
+						matches[plate_id] = distance
+
+			results = []
+			for plate_id, distance in sorted(matches.items(), key=lambda item: item[1]):
+				plate = self._plate_text(plate_id)
+				sightings = list(self._index.sightings(plate_id)) if plate_id < self._index.plate_count else []
+				sightings.extend(self._new_sightings.get(plate_id, ()))
+				for claim_id, epoch_ms, image_hash in sightings:
+					if claim_id == exclude_claim:
+						continue
+					results.append({
+						"plate": plate,
+						"distance": distance,
+						"claim_id": claim_id,
+						"seen_at": _iso(epoch_ms),
+						"image_hash": image_hash,
+					})
+			self._lookups += 1
+			self._lookup_seconds += time.perf_counter() - started
+		return results
+
+	def other_claims(self, plate_text: str, claim_id: Optional[str]) -> List[Dict[str, Any]]:
+		"""Sightings of this plate (or a one-edit OCR variant) on claims other than ``claim_id``."""
+		return self.lookup(plate_text, exclude_claim=None if claim_id is None else str(claim_id))
+
+	def compact(self) -> PlateIndex:
+		"""Fold the overlay into a new index and make it current."""
+		with self._lock:
+			base = self._index
+			if not self._new_sighting_count:
+				return base
+			plate_ids = np.repeat(np.arange(base.plate_count, dtype=np.int32), np.diff(base.offsets))
+			new_plate_ids, new_claims, new_seen, new_hashes = array("i"), [], array("q"), []
+			for plate_id, sightings in self._new_sightings.items():
+				for claim_id, epoch_ms, image_hash in sightings:
+					new_plate_ids.append(plate_id)
+					new_claims.append(claim_id.encode("utf-8"))
+					new_seen.append(epoch_ms)
+					new_hashes.append((image_hash or "").encode("utf-8"))
+			codes, owners = variant_arrays(self._new_plates, first_id=base.plate_count)
+
+			index = PlateIndex.assemble(
+				np.concatenate([base.plates, np.asarray(self._new_plates, dtype="S")]) if self._new_plates else base.plates,
+				np.concatenate([base.variant_codes, codes]),
+				np.concatenate([base.variant_plates, owners]),
+				np.concatenate([plate_ids, np.asarray(new_plate_ids, dtype=np.int32)]),
+				np.concatenate([base.claims, np.asarray(new_claims, dtype="S")]),
+				np.concatenate([base.seen_at, np.asarray(new_seen, dtype=np.int64)]),
+				np.concatenate([base.image_hashes, np.asarray(new_hashes, dtype="S")]),
+				np.concatenate([base.sighting_claims, np.arange(len(base.claims), len(base.claims) + len(new_claims), dtype=np.int32)]),
+			)
+			index.last_row_id = self._last_row_id
+			self._index = index
+			self._reset_overlay()
+			return index
+
+	def save_snapshot(self, directory: Optional[str] = None) -> Optional[str]:
+		directory = directory or self._snapshot_dir
+		if not directory:
+			return None
+		self.compact().save(directory)
+		return directory
+
+	def stats(self) -> Dict[str, Any]:
+		with self._lock:
+			return {
+				"plates": self._index.plate_count + len(self._new_plates),
+				"sightings": self._index.sighting_count + self._new_sighting_count,
+				"unsnapshotted_sightings": self._new_sighting_count,
+				"lookups": self._lookups,
+				"avg_lookup_ms": round(self._lookup_seconds / self._lookups * 1000, 4) if self._lookups else None,
+			}
+
+
+_plate_registry: Optional[PlateRegistry] = None
+_plate_registry_lock = threading.Lock()
+
+
+def get_plate_registry() -> PlateRegistry:
+	global _plate_registry
+	if _plate_registry is None:
+		with _plate_registry_lock:
+			if _plate_registry is None:
+				settings = get_settings()
+				registry = PlateRegistry(
+					snapshot_dir=settings.plate_registry_snapshot_dir,
+					max_distance=settings.plate_registry_max_distance,
+				)
+				registry.load()
+				_plate_registry = registry
+	return _plate_registry
+
+
+def read_sightings(path: str) -> Iterator[Dict[str, Any]]:
+	"""Raw rows of one CSV or JSONL import file."""
+	if path.endswith((".jsonl", ".ndjson")):
+		with open(path, "r", encoding="utf-8") as fp:
+			for line in fp:
+				if line.strip():
+					yield json.loads(line)
+	else:
+		with open(path, "r", encoding="utf-8", newline="") as fp:
+			yield from csv.DictReader(fp)
+
+
+def import_sightings(paths: List[str], replace: bool = False, chunk_size: int = 20000, db: Optional[Session] = None) -> int:
+	"""Bulk-insert historical sightings in one transaction; returns rows inserted."""
+	own_session = db is None
+	db = db or SessionLocal()
+	try:
+		PlateSighting.metadata.create_all(bind=db.get_bind(), tables=[PlateSighting.__table__])
+		if replace:
+			db.execute(delete(PlateSighting))
+		inserted = 0
+		chunk: List[Dict[str, Any]] = []
+		for path in paths:
+			for row in read_sightings(path):
+				key = normalize_plate(row.get("plate"))
+				if not _is_plate(key) or not row.get("claim_id"):
+					continue
+				chunk.append({
+					"plate_key": key,
+					"plate_text": str(row.get("plate"))[:64],
+					"claim_id": str(row["claim_id"]),
+					"seen_at": datetime.fromtimestamp(_epoch_ms(row.get("seen_at")) / 1000, tz=timezone.utc).replace(tzinfo=None),
+					"image_hash": row.get("image_hash") or None,
+					"source": row.get("source") or os.path.basename(path),
+				})
+				if len(chunk) >= chunk_size:
+					db.execute(insert(PlateSighting), chunk)
+					inserted += len(chunk)
+					chunk = []
+		if chunk:
+			db.execute(insert(PlateSighting), chunk)
+			inserted += len(chunk)
+		db.commit()
+		return inserted
+	except Exception:
+		db.rollback()
+		raise
+	finally:
+		if own_session:
+			db.close()
+
+
+def build_snapshot(directory: str, session_factory: Callable[[], Session] = SessionLocal) -> PlateIndex:
+	"""Index every stored sighting from scratch and write the snapshot."""
+	with session_factory() as db:
+		last_row_id = 0
+
+		def rows() -> Iterator[Sighting]:
+			nonlocal last_row_id
+			result = db.execute(
+				select(PlateSighting.id, PlateSighting.plate_key, PlateSighting.claim_id, PlateSighting.seen_at, PlateSighting.image_hash)
+				.order_by(PlateSighting.id)
+				.execution_options(yield_per=50000)
+			)
+			for row_id, key, claim_id, seen_at, image_hash in result:
+				last_row_id = row_id
+				yield key, claim_id, _epoch_ms(seen_at), image_hash
+
+		index = PlateIndex.build(rows())
+		index.last_row_id = last_row_id
+	index.save(directory)
+	return index
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	commands = parser.add_subparsers(dest="command", required=True)
+	importer = commands.add_parser("import", help="load historical sightings, then rebuild the snapshot")
+	importer.add_argument("paths", nargs="+", help="CSV or JSONL files")
+	importer.add_argument("--replace", action="store_true", help="drop existing sightings first")
+	commands.add_parser("snapshot", help="rebuild the snapshot from the database")
+	args = parser.parse_args()
+
+	directory = get_settings().plate_registry_snapshot_dir
+	if args.command == "import":
+		started = time.perf_counter()
+		inserted = import_sightings(args.paths, replace=args.replace)
+		print(f"[plate-registry] Imported {inserted} sightings in {time.perf_counter() - started:.1f}s")
+	started = time.perf_counter()
+	index = build_snapshot(directory)
+	print(f"[plate-registry] Indexed {index.sighting_count} sightings of {index.plate_count} plates into {directory} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+	main()
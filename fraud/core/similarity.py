@@ -0,0 +1,242 @@
+"""Similar prior submissions for damage photos and license cards.
+
+Each photo is embedded on CPU (see :mod:`fraud.core.embeddings`) and stored
+in a vector collection per kind, keyed by claim and submission.
+Handlers ask for the top-k most similar photos from *other* claims before
+adding the new one. Qdrant is the production store; ``VECTOR_BACKEND=local``
+(or an unreachable Qdrant) uses the in-process HNSW store instead.
+
+Historical photos are bulk-loaded with::
+
+    python -m fraud.core.similarity ingest damage_photos manifest.csv
+
+where the manifest (CSV or JSONL) has ``image_path``, ``claim_id`` and
+``submission_id`` columns.
+"""
+import argparse
+import csv
+import hashlib
+import json
+import re
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from fraud.core.config import get_settings
+from fraud.core.embeddings import Embedder, load_embedder
+from fraud.core.vector_store import LocalVectorStore, QdrantVectorStore, VectorStore
+
+DAMAGE_PHOTOS = "damage_photos"
+LICENSE_CARDS = "license_cards"
+KINDS = (DAMAGE_PHOTOS, LICENSE_CARDS)
+
+
+def decode_image(value: Any) -> Optional[np.ndarray]:
+	"""A BGR image from an array, encoded bytes or a file path; ``None`` if unreadable."""
+	if value is None:
+		return None
+	if isinstance(value, np.ndarray):
+		return value
+	if isinstance(value, (bytes, bytearray, memoryview)):
+		return cv2.imdecode(np.frombuffer(value, dtype=np.uint8), cv2.IMREAD_COLOR)
+	return cv2.imread(str(value), cv2.IMREAD_COLOR)
+
+
+def point_key(submission_id: str, claim_id: Optional[str] = None) -> str:
+	"""Store key of one photo: the same submission id on two claims is two points."""
+	return f"{claim_id}/{submission_id}" if claim_id is not None else str(submission_id)
+
+
+class SimilarityIndex:
+	"""Embeds photos and finds their nearest neighbours in the vector store."""
+
+	def __init__(self, store: VectorStore, embedder: Embedder, top_k: int = 5) -> None:
+		self.store = store
+		self.embedder = embedder
+		self.top_k = top_k
+		self._ready: set = set()
+
+	def collection(self, kind: str) -> str:
+		"""Collection name for ``kind``; vectors of different embedders never share one."""
+		if kind not in KINDS:
+			raise ValueError(f"Unknown similarity kind {kind!r}")
+		name = f"{kind}__{re.sub(r'[^A-Za-z0-9_.-]', '_', self.embedder.name)}"
+		if name not in self._ready:
+			self.store.ensure_collection(name, self.embedder.dim)
+			self._ready.add(name)
+		return name
+
+	def embed(self, images: Sequence[np.ndarray]) -> np.ndarray:
+		return self.embedder.embed(images)
+
+	def similar(self, kind: str, vector: np.ndarray, k: Optional[int] = None, exclude_claim: Optional[str] = None) -> List[Dict[str, Any]]:
+		"""Top-k prior submissions as ``{"submission_id", "claim_id", "score", ...payload}``, best first."""
+		exclude = {"claim_id": str(exclude_claim)} if exclude_claim is not None else None
+		hits = self.store.search(self.collection(kind), vector, k or self.top_k, exclude=exclude)
+		results = []
+		for hit in hits:
+			payload = {key: value for key, value in hit.payload.items() if key != "point_id"}
+			results.append({**payload, "submission_id": payload.get("submission_id", hit.id), "score": round(hit.score, 4)})
+		return results
+
+	def add(self, kind: str, ids: Sequence[str], vectors: np.ndarray, payloads: Sequence[Dict[str, Any]]) -> None:
+		self.store.upsert(self.collection(kind), [str(point_id) for point_id in ids], vectors, payloads)
+
+	def screen(
+		self,
+		kind: str,
+		image: np.ndarray,
+		submission_id: str,
+		claim_id: Optional[str] = None,
+		k: Optional[int] = None,
+		**payload: Any,
+	) -> List[Dict[str, Any]]:
+		"""Similar submissions from other claims, then store this one."""
+		vector = self.embed([image])[0]
+		k = k or self.top_k
+		claim = str(claim_id) if claim_id is not None else None
+		# One extra in case a redelivered message finds its own earlier upsert.
+		# Only a point with the same submission *and* claim is this photo: the
+		# same image sent on another claim is exactly the match to report
+		matches = self.similar(kind, vector, k=k + 1, exclude_claim=claim)
+		matches = [
+			match for match in matches
+			if match["submission_id"] != str(submission_id) or match.get("claim_id") != claim
+		][:k]
+		record = {"submission_id": str(submission_id), "created_at": time.time(), **payload}
+		if claim is not None:
+			record["claim_id"] = claim
+		self.add(kind, [point_key(submission_id, claim)], vector[None, :], [record])
+		return matches
+
+	def ingest(self, kind: str, records: Iterable[Tuple[str, np.ndarray, Dict[str, Any]]], batch_size: int = 256) -> int:
+		"""Embed and upsert ``(submission_id, image, payload)`` records ``batch_size`` at a time."""
+		ingested = 0
+		batch: List[Tuple[str, np.ndarray, Dict[str, Any]]] = []
+		for record in records:
+			batch.append(record)
+			if len(batch) >= batch_size:
+				ingested += self._ingest_batch(kind, batch)
+				batch = []
+		if batch:
+			ingested += self._ingest_batch(kind, batch)
+		return ingested
+
+	def _ingest_batch(self, kind: str, batch: List[Tuple[str, np.ndarray, Dict[str, Any]]]) -> int:
+		vectors = self.embed([image for _, image, _ in batch])
+		self.add(
+			kind,
+			[point_key(submission_id, payload.get("claim_id")) for submission_id, _, payload in batch],
+			vectors,
+			[{**payload, "submission_id": str(submission_id)} for submission_id, _, payload in batch],
+		)
+		return len(batch)
+
+	def count(self, kind: str) -> int:
+		return self.store.count(self.collection(kind))
+
+	def close(self) -> None:
+		self.store.close()
+
+
+def create_vector_store() -> VectorStore:
+	settings = get_settings()
+	if settings.vector_backend == "qdrant" and settings.vector_db_url:
+		try:
+			store = QdrantVectorStore(settings.vector_db_url, batch_size=settings.vector_upsert_batch_size)
+			# The client connects lazily; fail over now rather than on the first claim
+			store.client.get_collections()
+			return store
+		except Exception as exc:
+			print(f"[similarity] Qdrant at {settings.vector_db_url} unavailable, using the local index: {exc}")
+	return LocalVectorStore(settings.vector_local_path, snapshot_every=settings.vector_local_snapshot_every)
+
+
+_similarity_index: Optional[SimilarityIndex] = None
+_similarity_index_lock = threading.Lock()
+
+
+def get_similarity_index() -> SimilarityIndex:
+	global _similarity_index
+	if _similarity_index is None:
+		with _similarity_index_lock:
+			if _similarity_index is None:
+				settings = get_settings()
+				embedder = load_embedder(
+					settings.embedding_model_path,
+					intra_op_threads=settings.inference_intra_op_threads,
+					providers=settings.inference_onnx_providers,
+				)
+				_similarity_index = SimilarityIndex(create_vector_store(), embedder, top_k=settings.vector_search_top_k)
+	return _similarity_index
+
+
+def similar_submissions(kind: str, image: np.ndarray, request: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+	"""Screen a handler's photo (ids from ``claim_id``/``submission_id`` in ``request``).
+
+	Without a ``submission_id`` the content digest is used. Points are keyed by
+	claim and submission, so a redelivered message updates its own point while
+	the same photo on another claim gets its own point and is reported as a
+	match. Returns ``None`` instead of raising when the vector store is
+	unavailable, so detection results still go out.
+	"""
+	submission_id = request.get("submission_id") or hashlib.sha256(np.ascontiguousarray(image).data).hexdigest()[:32]
+	try:
+		return get_similarity_index().screen(
+			kind,
+			image,
+			submission_id=str(submission_id),
+			claim_id=request.get("claim_id"),
+			image_ref=request.get("image_ref") or request.get("image_path"),
+		)
+	except Exception as exc:
+		print(f"[similarity] {kind} search failed for {submission_id}: {exc}")
+		return None
+
+
+def read_manifest(path: str) -> Iterator[Dict[str, Any]]:
+	if path.endswith((".jsonl", ".ndjson")):
+		with open(path, "r", encoding="utf-8") as fp:
+			for line in fp:
+				if line.strip():
+					yield json.loads(line)
+	else:
+		with open(path, "r", encoding="utf-8", newline="") as fp:
+			yield from csv.DictReader(fp)
+
+
+def _manifest_records(paths: List[str]) -> Iterator[Tuple[str, np.ndarray, Dict[str, Any]]]:
+	for path in paths:
+		for row in read_manifest(path):
+			image = decode_image(row.get("image_path"))
+			if image is None:
+				print(f"[similarity] Skipping unreadable image {row.get('image_path')}")
+				continue
+			submission_id = row.get("submission_id") or row["image_path"]
+			payload = {key: value for key, value in row.items() if key not in ("submission_id", "image_path") and value not in (None, "")}
+			yield str(submission_id), image, payload
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	commands = parser.add_subparsers(dest="command", required=True)
+	ingest = commands.add_parser("ingest", help="embed and upsert historical photos")
+	ingest.add_argument("kind", choices=KINDS)
+	ingest.add_argument("paths", nargs="+", help="CSV or JSONL manifests")
+	args = parser.parse_args()
+
+	index = get_similarity_index()
+	started = time.perf_counter()
+	try:
+		ingested = index.ingest(args.kind, _manifest_records(args.paths), batch_size=get_settings().vector_upsert_batch_size)
+	finally:
+		index.close()
+	elapsed = time.perf_counter() - started
+	print(f"[similarity] Ingested {ingested} {args.kind} in {elapsed:.1f}s ({ingested / max(elapsed, 1e-9):.0f}/s)")
+
+
+if __name__ == "__main__":
+	main()
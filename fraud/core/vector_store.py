@@ -0,0 +1,268 @@
+"""Vector collections behind one small interface: Qdrant, or in-process HNSW.
+
+Points carry a string id (submission and image), a vector and a JSON payload.
+``search`` returns the top-k by cosine similarity, optionally skipping points
+whose payload matches ``exclude`` (e.g. the same claim).
+"""
+import json
+import os
+import threading
+import uuid
+from dataclasses import dataclass, field
+from typing import IO, Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from fraud.core.hnsw import HnswIndex
+
+
+@dataclass
+class VectorHit:
+	id: str
+	score: float
+	payload: Dict[str, Any] = field(default_factory=dict)
+
+
+class VectorStore:
+	def ensure_collection(self, name: str, dim: int) -> None:
+		raise NotImplementedError
+
+	def upsert(self, name: str, ids: Sequence[str], vectors: np.ndarray, payloads: Sequence[Dict[str, Any]]) -> None:
+		raise NotImplementedError
+
+	def search(self, name: str, vector: np.ndarray, k: int, exclude: Optional[Dict[str, Any]] = None) -> List[VectorHit]:
+		raise NotImplementedError
+
+	def count(self, name: str) -> int:
+		raise NotImplementedError
+
+	def close(self) -> None:
+		pass
+
+
+def _point_id(point_id: str) -> str:
+	# Qdrant ids must be integers or UUIDs; derive a stable UUID and keep the original in the payload
+	return str(uuid.uuid5(uuid.NAMESPACE_URL, point_id))
+
+
+class QdrantVectorStore(VectorStore):
+	"""Collections in a Qdrant server; upserts are sent ``batch_size`` points at a time."""
+
+	def __init__(self, url: str, batch_size: int = 256, timeout: int = 30) -> None:
+		from qdrant_client import QdrantClient
+
+		self.client = QdrantClient(url=url, timeout=timeout)
+		self.batch_size = max(1, batch_size)
+		self._known: Dict[str, int] = {}
+
+	def ensure_collection(self, name: str, dim: int) -> None:
+		from qdrant_client import models
+
+		if self._known.get(name) == dim:
+			return
+		if not self.client.collection_exists(name):
+			self.client.create_collection(
+				collection_name=name,
+				vectors_config=models.VectorParams(size=dim, distance=models.Distance.COSINE),
+			)
+			# Excluding a claim filters on this field on every search
+			self.client.create_payload_index(name, field_name="claim_id", field_schema=models.PayloadSchemaType.KEYWORD)
+		self._known[name] = dim
+
+	def upsert(self, name: str, ids: Sequence[str], vectors: np.ndarray, payloads: Sequence[Dict[str, Any]]) -> None:
+		from qdrant_client import models
+
+		vectors = np.asarray(vectors, dtype=np.float32)
+		for start in range(0, len(ids), self.batch_size):
+			end = start + self.batch_size
+			self.client.upsert(
+				collection_name=name,
+				points=models.Batch(
+					ids=[_point_id(point_id) for point_id in ids[start:end]],
+					vectors=vectors[start:end].tolist(),
+					payloads=[{**payload, "point_id": point_id} for point_id, payload in zip(ids[start:end], payloads[start:end])],
+				),
+				# Only the last batch waits, so earlier ones are indexed while the rest upload
+				wait=end >= len(ids),
+			)
+
+	def search(self, name: str, vector: np.ndarray, k: int, exclude: Optional[Dict[str, Any]] = None) -> List[VectorHit]:
+		from qdrant_client import models
+
+		query_filter = None
+		if exclude:
+			query_filter = models.Filter(must_not=[
+				models.FieldCondition(key=key, match=models.MatchValue(value=value)) for key, value in exclude.items()
+			])
+		points = self.client.search(
+			collection_name=name,
+			query_vector=np.asarray(vector, dtype=np.float32).tolist(),
+			query_filter=query_filter,
+			limit=k,
+			with_payload=True,
+		)
+		return [
+			VectorHit(id=str((point.payload or {}).get("point_id", point.id)), score=float(point.score), payload=dict(point.payload or {}))
+			for point in points
+		]
+
+	def count(self, name: str) -> int:
+		return int(self.client.count(name, exact=True).count)
+
+	def close(self) -> None:
+		self.client.close()
+
+
+class _LocalCollection:
+	def __init__(self, index: HnswIndex, ids: List[str], payloads: List[Dict[str, Any]]) -> None:
+		self.index = index
+		self.ids = ids
+		self.payloads = payloads
+		self.positions = {point_id: node for node, point_id in enumerate(ids)}
+		# Append-only record of the upserts since the last snapshot
+		self.log: Optional[IO[str]] = None
+		self.unsaved = 0
+
+	def apply(self, ids: Sequence[str], vectors: np.ndarray, payloads: Sequence[Dict[str, Any]]) -> None:
+		fresh = []
+		for i, (point_id, payload) in enumerate(zip(ids, payloads)):
+			node = self.positions.get(point_id)
+			if node is None:
+				fresh.append(i)
+			else:
+				self.payloads[node] = dict(payload)
+		if not fresh:
+			return
+		nodes = self.index.add_batch(np.asarray(vectors, dtype=np.float32)[fresh])
+		for i, node in zip(fresh, nodes):
+			self.ids.append(ids[i])
+			self.payloads.append(dict(payloads[i]))
+			self.positions[ids[i]] = node
+
+
+class LocalVectorStore(VectorStore):
+	"""In-process collections on :class:`~fraud.core.hnsw.HnswIndex`, optionally saved under ``directory``.
+
+	Upserting an existing id replaces its payload only; the graph keeps the
+	first vector, since HNSW nodes cannot be moved cheaply. With a
+	``directory``, every upsert is appended to ``<collection>.log`` before it
+	returns, and the collection is snapshotted (and the log emptied) every
+	``snapshot_every`` upserted points and on close. Loading replays the log
+	over the snapshot, so a crash loses nothing that was acknowledged.
+	"""
+
+	def __init__(
+		self,
+		directory: Optional[str] = None,
+		m: int = 32,
+		ef_construction: int = 200,
+		ef_search: int = 64,
+		snapshot_every: int = 10_000,
+	) -> None:
+		self.directory = directory
+		self.snapshot_every = max(1, snapshot_every)
+		self._params = {"m": m, "ef_construction": ef_construction, "ef_search": ef_search}
+		self._collections: Dict[str, _LocalCollection] = {}
+		self._lock = threading.Lock()
+
+	def _path(self, name: str) -> Optional[str]:
+		return os.path.join(self.directory, name) if self.directory else None
+
+	def ensure_collection(self, name: str, dim: int) -> None:
+		with self._lock:
+			if name in self._collections:
+				return
+			path = self._path(name)
+			index = HnswIndex.load(path) if path else None
+			ids: List[str] = []
+			payloads: List[Dict[str, Any]] = []
+			if index is not None and index.dim == dim and os.path.exists(path + ".jsonl"):
+				with open(path + ".jsonl", "r", encoding="utf-8") as fp:
+					for line in fp:
+						record = json.loads(line)
+						ids.append(record["id"])
+						payloads.append(record["payload"])
+			if index is None or index.dim != dim or len(ids) != len(index):
+				index, ids, payloads = HnswIndex(dim, **self._params), [], []
+			collection = _LocalCollection(index, ids, payloads)
+			if path and os.path.exists(path + ".log"):
+				collection.unsaved = self._replay(collection, path + ".log")
+			self._collections[name] = collection
+
+	@staticmethod
+	def _replay(collection: _LocalCollection, path: str) -> int:
+		replayed = 0
+		with open(path, "r", encoding="utf-8") as fp:
+			for line in fp:
+				try:
+					record = json.loads(line)
+				except ValueError:
+					# A line cut short by a crash mid-write
+					continue
+				vector = np.asarray(record["vector"], dtype=np.float32)
+				if vector.shape != (collection.index.dim,):
+					continue
+				collection.apply([record["id"]], vector[None, :], [record["payload"]])
+				replayed += 1
+		return replayed
+
+	def upsert(self, name: str, ids: Sequence[str], vectors: np.ndarray, payloads: Sequence[Dict[str, Any]]) -> None:
+		collection = self._collections[name]
+		vectors = np.asarray(vectors, dtype=np.float32)
+		with self._lock:
+			collection.apply(ids, vectors, payloads)
+			path = self._path(name)
+			if not path:
+				return
+			if collection.log is None:
+				os.makedirs(self.directory, exist_ok=True)
+				collection.log = open(path + ".log", "a", encoding="utf-8")
+			for point_id, vector, payload in zip(ids, vectors, payloads):
+				collection.log.write(json.dumps({"id": point_id, "payload": payload, "vector": vector.tolist()}, default=str) + "\n")
+			collection.log.flush()
+			collection.unsaved += len(ids)
+			if collection.unsaved >= self.snapshot_every:
+				self._save_collection(name, collection)
+
+	def search(self, name: str, vector: np.ndarray, k: int, exclude: Optional[Dict[str, Any]] = None) -> List[VectorHit]:
+		collection = self._collections[name]
+		accept = None
+		if exclude:
+			payloads = collection.payloads
+			accept = lambda node: not any(payloads[node].get(key) == value for key, value in exclude.items())
+		nodes, scores = collection.index.search(vector, k, accept=accept)
+		return [
+			VectorHit(id=collection.ids[node], score=float(score), payload=dict(collection.payloads[node]))
+			for node, score in zip(nodes.tolist(), scores.tolist())
+		]
+
+	def count(self, name: str) -> int:
+		collection = self._collections.get(name)
+		return len(collection.ids) if collection else 0
+
+	def save(self) -> None:
+		"""Write every collection to ``directory`` (graph and vectors, plus ids and payloads as JSON Lines)."""
+		if not self.directory:
+			return
+		os.makedirs(self.directory, exist_ok=True)
+		with self._lock:
+			for name, collection in self._collections.items():
+				self._save_collection(name, collection)
+
+	def _save_collection(self, name: str, collection: _LocalCollection) -> None:
+		path = self._path(name)
+		collection.index.save(path)
+		with open(path + ".jsonl.tmp", "w", encoding="utf-8") as fp:
+			for point_id, payload in zip(collection.ids, collection.payloads):
+				fp.write(json.dumps({"id": point_id, "payload": payload}, default=str) + "\n")
+		os.replace(path + ".jsonl.tmp", path + ".jsonl")
+		# Everything logged is in the snapshot now
+		if collection.log is not None:
+			collection.log.close()
+			collection.log = None
+		if os.path.exists(path + ".log"):
+			os.remove(path + ".log")
+		collection.unsaved = 0
+
+	def close(self) -> None:
+		self.save()
@@ -1,8 +1,23 @@
-from fraud.kafka.producer import publish
+from typing import Any, Dict, Union
+
+from fraud.core.similarity import DAMAGE_PHOTOS, decode_image, similar_submissions
+from fraud.kafka.events import EVENT_CAR_DAMAGE
+from fraud.kafka.producer import publish_event
 class CarDamageDetectionHandler:
     def __init__(self):
         pass
     @staticmethod
-    def handle(car_dammaged_detection: str) -> bool:
-        publish({"car_dammaged_detection": car_dammaged_detection}, topic="car_dammaged_detection")
-        return True
\ No newline at end of file
+    def handle(car_dammaged_detection: Union[str, Dict[str, Any]]) -> bool:
+        """Forward a damage detection; a dict with ``image``/``image_path`` (and optional
+        ``claim_id``/``submission_id``) also gets the most similar damage photos from
+        other claims attached as ``similar_submissions``"""
+        if not isinstance(car_dammaged_detection, dict):
+            publish_event(EVENT_CAR_DAMAGE, {"car_dammaged_detection": car_dammaged_detection}, topic="car_dammaged_detection")
+            return True
+        body = {key: value for key, value in car_dammaged_detection.items() if key != "image"}
+        source = car_dammaged_detection.get("image")
+        image = decode_image(source if source is not None else car_dammaged_detection.get("image_path"))
+        if image is not None:
+            body["similar_submissions"] = similar_submissions(DAMAGE_PHOTOS, image, car_dammaged_detection)
+        publish_event(EVENT_CAR_DAMAGE, body, topic="car_dammaged_detection")
+        return True
@@ -1,11 +1,35 @@
-from fraud.kafka.producer import publish
+from typing import Any, Dict, List, Union
+
+from fraud.core.similarity import LICENSE_CARDS, decode_image, similar_submissions
+from fraud.kafka.events import EVENT_LICENSE_ID, detections_body
+from fraud.kafka.producer import publish_event
 import numpy as np
 from fraud.models.detect_driver_license import detect_driver_license
 class LicenseIdHandler:
     def __init__(self):
         pass
     @staticmethod
-    def handle(image: np.array) -> bool:
-        LicenseId=detect_driver_license(license_id)
-        publish({"license_id": LicenseId}, topic="license_id")
-        return LicenseId
\ No newline at end of file
+    def handle(request: Union[np.ndarray, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Detect the license card in an image, or in a dict with ``image``/``image_path`` and
+        optional ``claim_id``/``submission_id``; a dict also gets the most similar license
+        cards from other claims attached as ``similar_submissions``"""
+        if not isinstance(request, dict):
+            LicenseId=detect_driver_license(request)
+            publish_event(EVENT_LICENSE_ID, detections_body(LicenseId), topic="license_id")
+            return LicenseId
+        image = decode_image(request.get("image") if request.get("image") is not None else request.get("image_path"))
+        if image is None:
+            raise ValueError("License id request needs a readable image or image_path")
+        LicenseId=detect_driver_license(image)
+        publish_event(
+            EVENT_LICENSE_ID,
+            detections_body(
+                LicenseId,
+                image_ref=request.get("image_ref") or request.get("image_path"),
+                claim_id=request.get("claim_id"),
+                submission_id=request.get("submission_id"),
+                similar_submissions=similar_submissions(LICENSE_CARDS, image, request),
+            ),
+            topic="license_id",
+        )
+        return LicenseId
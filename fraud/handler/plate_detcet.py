@@ -1,8 +1,52 @@
-from fraud.models.plate_detect import LicensePlateDetector
-import numpy as np
+from typing import Any, Dict
+
+from fraud.core.config import get_settings
+from fraud.core.plate_registry import get_plate_registry
+from fraud.kafka.events import EVENT_PLATE_REUSE
+from fraud.kafka.producer import publish_event
+
+# Sightings attached to one alert; the full history stays queryable in the registry
+MAX_ALERT_MATCHES = 50
+
+
 class PlateDetectHandler:
     def __init__(self):
         pass
     @staticmethod
-    def handle(plate_detection:np.array) -> None:
-     print(f"Handling plate detection: {plate_detection}")
\ No newline at end of file
+    def handle(plate_detection: Dict[str, Any]) -> int:
+        """Record the plates read on a claim (``claim_id`` plus ``license_plates``, or a
+        single plate with ``text``/``extracted_text``) and publish a plate reuse alert
+        for each one already seen on other claims"""
+        claim_id = plate_detection.get("claim_id")
+        if claim_id is None:
+            print(f"Handling plate detection without claim_id: {plate_detection}")
+            return 0
+        settings = get_settings()
+        registry = get_plate_registry()
+        alerts = 0
+        for plate in plate_detection.get("license_plates") or [plate_detection]:
+            text = plate.get("text") or plate.get("extracted_text")
+            if not text:
+                continue
+            matches = registry.other_claims(text, claim_id)
+            key = registry.add(
+                text,
+                claim_id,
+                image_hash=plate.get("image_hash") or plate_detection.get("image_hash"),
+                source=plate_detection.get("source") or "plate_detect",
+            )
+            if key and matches:
+                publish_event(
+                    EVENT_PLATE_REUSE,
+                    {
+                        "claim_id": str(claim_id),
+                        "plate": key,
+                        "text": text,
+                        "other_claims": sorted({match["claim_id"] for match in matches}),
+                        "matches": matches[:MAX_ALERT_MATCHES],
+                    },
+                    topic=settings.kafka_fraud_alert_topic,
+                    key=str(claim_id).encode("utf-8"),
+                )
+                alerts += 1
+        return alerts
@@ -0,0 +1,51 @@
+from typing import Any, Dict
+
+import cv2
+
+from ai.core.plate_ocr import recognize_plate_crops
+from ai.core.plate_tracking import PlateTracker, process_plate_video
+from fraud.core.config import get_settings
+from fraud.kafka.events import EVENT_PLATE_VIDEO_RESULT
+from fraud.kafka.producer import publish_event
+from fraud.models.plate_detetct import LicensePlateDetector
+
+
+class PlateVideoHandler:
+    def __init__(self):
+        pass
+    @staticmethod
+    def handle(request: Dict[str, Any]) -> int:
+        """Scan a clip (``video_url`` or ``video_path``, optional ``stride``/``request_id``)
+        and publish each plate track result as soon as it is known"""
+        source = request.get("video_url") or request.get("video_path")
+        if not source:
+            raise ValueError("Plate video request needs a video_url or video_path")
+        settings = get_settings()
+        capture = cv2.VideoCapture(source)
+        if not capture.isOpened():
+            raise ValueError(f"Could not open video {source}")
+        tracker = PlateTracker(
+            iou_threshold=settings.video_track_iou_threshold,
+            max_missed=settings.video_track_max_missed,
+            ocr_max_reads=settings.video_ocr_max_reads,
+        )
+        key = str(request.get("request_id") or source).encode("utf-8")
+        published = 0
+        try:
+            for event in process_plate_video(
+                capture,
+                LicensePlateDetector._detect_license_plates_yolo,
+                recognize_plate_crops,
+                stride=request.get("stride") or settings.video_detect_stride,
+                tracker=tracker,
+            ):
+                publish_event(
+                    EVENT_PLATE_VIDEO_RESULT,
+                    {**event, "video": source, "request_id": request.get("request_id")},
+                    topic=settings.kafka_plate_video_result_topic,
+                    key=key,
+                )
+                published += 1
+        finally:
+            capture.release()
+        return published
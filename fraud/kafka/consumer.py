@@ -1,67 +1,430 @@
+import base64
+import importlib
 import threading
 import time
-from typing import Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Set
 
 from kafka import KafkaConsumer
+from kafka.consumer.subscription_state import ConsumerRebalanceListener
+from kafka.structs import OffsetAndMetadata, TopicPartition
+
 from fraud.core.config import get_settings
+from fraud.kafka.events import decode_event
+
+
+# Handler names used in KAFKA_TOPIC_HANDLERS, resolved lazily so one broken
+# handler module only affects its own topic
+HANDLERS = {
+	"plate_detect": "fraud.handler.plate_detcet:PlateDetectHandler",
+	"license_id": "fraud.handler.license_id:LicenseIdHandler",
+	"car_damage": "fraud.handler.car_dammaged_detction:CarDamageDetectionHandler",
+	"plate_video": "fraud.handler.plate_video:PlateVideoHandler",
+}
+
+
+def _load_handler(path: str) -> Any:
+	module_name, _, attribute = path.partition(":")
+	return getattr(importlib.import_module(module_name), attribute)
+
+
+class _PartitionLane:
+	"""Messages of one partition waiting to be handled, strictly in order."""
+
+	__slots__ = ("queue", "running", "failed_offset", "resume_from", "paused_until")
 
-class FraudKafkaConsumer:
 	def __init__(self) -> None:
+		self.queue: Deque[Any] = deque()
+		self.running = False
+		self.failed_offset: Optional[int] = None
+		self.resume_from: Optional[int] = None
+		self.paused_until: Optional[float] = None
+
+
+class _RebalanceListener(ConsumerRebalanceListener):
+	def __init__(self, owner: "FraudKafkaConsumer") -> None:
+		self._owner = owner
+
+	def on_partitions_revoked(self, revoked) -> None:
+		self._owner._on_revoked(set(revoked))
+
+	def on_partitions_assigned(self, assigned) -> None:
+		pass
+
+
+class FraudKafkaConsumer:
+	"""Multi-topic consumer that dispatches messages to fraud handlers.
+
+	One thread owns the Kafka client: it polls, hands records to per-partition
+	lanes and commits. Lanes run on a bounded thread pool, so partitions are
+	processed in parallel while each partition stays strictly ordered. Offsets
+	are committed manually, in batches, and only up to the last message that
+	was handled (or dead-lettered). A message that keeps failing stalls its
+	partition: the consumer seeks back and retries it after a backoff. When the
+	number of buffered messages passes ``max_inflight`` every partition is
+	paused until the workers catch up.
+
+	Messages are decoded with ``fraud.kafka.events.decode_event``: envelope
+	events are routed by their header type, legacy JSON messages by topic, and
+	handlers receive the decoded body. ``consumer_factory`` returns a
+	``KafkaConsumer``-like object and ``handlers`` maps event types or topics
+	to objects with a ``handle(body)`` method;
+	``fraud.kafka.memory.InMemoryBroker`` provides a stand-in for tests.
+	"""
+
+	def __init__(
+		self,
+		consumer_factory: Optional[Callable[[], Any]] = None,
+		handlers: Optional[Dict[str, Any]] = None,
+		dead_letter: Optional[Callable[[Any, Exception], None]] = None,
+		topics: Optional[List[str]] = None,
+		worker_threads: Optional[int] = None,
+		max_inflight: Optional[int] = None,
+		commit_interval_ms: Optional[float] = None,
+		commit_batch_size: Optional[int] = None,
+		handler_max_retries: Optional[int] = None,
+		retry_backoff_ms: Optional[float] = None,
+	) -> None:
 		self._settings = get_settings()
-		self._consumer: Optional[KafkaConsumer] = None
+		settings = self._settings
+		self._consumer_factory = consumer_factory or self._kafka_consumer
+		self._handlers = handlers
+		self._loaded: Dict[str, Any] = {}
+		self._dead_letter = dead_letter if dead_letter is not None else self._default_dead_letter()
+		self._topics = topics or list(handlers.keys() if handlers else settings.kafka_topic_handlers.keys())
+		self._worker_threads = max(1, worker_threads or settings.kafka_worker_threads)
+		self._max_inflight = max(1, max_inflight or settings.kafka_max_inflight)
+		self._commit_interval = (commit_interval_ms if commit_interval_ms is not None else settings.kafka_commit_interval_ms) / 1000.0
+		self._commit_batch_size = max(1, commit_batch_size or settings.kafka_commit_batch_size)
+		self._handler_max_retries = handler_max_retries if handler_max_retries is not None else settings.kafka_handler_max_retries
+		self._retry_backoff = (retry_backoff_ms if retry_backoff_ms is not None else settings.kafka_retry_backoff_ms) / 1000.0
+
+		self._consumer: Optional[Any] = None
+		self._executor: Optional[ThreadPoolExecutor] = None
 		self._thread: Optional[threading.Thread] = None
 		self._stop_event = threading.Event()
+		self._lock = threading.Lock()
+		self._idle = threading.Condition(self._lock)
+		self._lanes: Dict[TopicPartition, _PartitionLane] = {}
+		self._done: Dict[TopicPartition, int] = {}
+		self._inflight = 0
+		self._uncommitted = 0
+		self._last_commit = time.monotonic()
+		self._backpressure = False
+		self._stats = {"processed": 0, "failed": 0, "retried": 0, "dead_lettered": 0, "commits": 0, "redelivered": 0}
+
+	# Lifecycle
+
 	def start(self) -> None:
 		if self._thread and self._thread.is_alive():
 			return
 		self._stop_event.clear()
+		self._executor = ThreadPoolExecutor(max_workers=self._worker_threads, thread_name_prefix="fraud-handler")
 		self._thread = threading.Thread(target=self._run_loop, name="fraud-kafka-consumer", daemon=True)
 		self._thread.start()
 
-	def stop(self) -> None:
+	def stop(self, timeout: float = 10.0) -> None:
 		self._stop_event.set()
-		if self._consumer is not None:
-			try:
-				self._consumer.close()
-			except Exception:
-				pass
 		if self._thread is not None:
-			self._thread.join(timeout=5)
+			self._thread.join(timeout=timeout)
+		if self._executor is not None:
+			self._executor.shutdown(wait=False, cancel_futures=True)
+			self._executor = None
+
+	def _kafka_consumer(self) -> KafkaConsumer:
+		settings = self._settings
+		print(f"[fraud-consumer] Initializing consumer to {settings.kafka_bootstrap_servers} topics={self._topics}")
+		return KafkaConsumer(
+			bootstrap_servers=settings.kafka_bootstrap_servers,
+			client_id="fraud-consumer",
+			group_id=settings.kafka_group_id,
+			auto_offset_reset="earliest",
+			enable_auto_commit=False,
+			max_poll_records=settings.kafka_poll_max_records,
+			security_protocol="PLAINTEXT",
+		)
 
-	def _ensure_consumer(self) -> None:
+	def _ensure_consumer(self) -> Any:
 		if self._consumer is None:
-			print(f"[fraud-consumer] Initializing consumer to {self._settings.kafka_bootstrap_servers} topic={self._settings.kafka_topic}")
-			self._consumer = KafkaConsumer(
-				self._settings.kafka_topic,
-				bootstrap_servers=self._settings.kafka_bootstrap_servers,
-				client_id="fraud-consumer",
-				group_id="fraud-service-group",
-				auto_offset_reset="earliest",
-				enable_auto_commit=True,
-				value_deserializer=lambda v: v.decode("utf-8", errors="ignore"),
-				security_protocol="PLAINTEXT",
-			)
+			consumer = self._consumer_factory()
+			consumer.subscribe(self._topics, listener=_RebalanceListener(self))
+			self._consumer = consumer
+		return self._consumer
+
+	def _close_consumer(self) -> None:
+		if self._consumer is None:
+			return
+		try:
+			self._consumer.close(autocommit=False)
+		except Exception:
+			pass
+		self._consumer = None
+		with self._lock:
+			# Running lanes see an empty queue and stop after their current message
+			for lane in self._lanes.values():
+				lane.queue.clear()
+			self._lanes.clear()
+			self._done.clear()
+			self._inflight = 0
+			self._uncommitted = 0
+			self._backpressure = False
+
+	# Poll thread
 
 	def _run_loop(self) -> None:
 		while not self._stop_event.is_set():
 			try:
-				
-				self._ensure_consumer()
-				assert self._consumer is not None
-				records = self._consumer.poll(timeout_ms=1000, max_records=100)
-				if not records:
-					continue
-				for tp, msgs in records.items():
-					for message in msgs:
-						if self._stop_event.is_set():
-							break
-						print(f"[fraud-consumer] topic={message.topic} partition={message.partition} offset={message.offset} value={message.value}")
+				consumer = self._ensure_consumer()
+				self._service_lanes(consumer)
+				records = consumer.poll(timeout_ms=self._settings.kafka_poll_timeout_ms, max_records=self._settings.kafka_poll_max_records)
+				for tp, messages in records.items():
+					self._enqueue(tp, messages)
+				self._maybe_commit(consumer)
 			except Exception as exc:
-				# Backoff on error
+				# Backoff on error; uncommitted messages are redelivered to the new client
 				print(f"[fraud-consumer] Error: {exc}. Retrying in 5s...")
-				time.sleep(5)
+				self._close_consumer()
+				self._stop_event.wait(5)
+		self._shutdown()
 
+	def _shutdown(self) -> None:
+		if self._consumer is None:
+			return
+		# Let running handlers finish their current message, then commit what is done
+		with self._lock:
+			for lane in self._lanes.values():
+				self._inflight -= len(lane.queue)
+				lane.queue.clear()
+			deadline = time.monotonic() + 10.0
+			while any(lane.running for lane in self._lanes.values()) and time.monotonic() < deadline:
+				self._idle.wait(deadline - time.monotonic())
+		try:
+			self._commit(self._consumer)
+		except Exception as exc:
+			print(f"[fraud-consumer] Final commit failed: {exc}")
+		self._close_consumer()
 
-consumer = FraudKafkaConsumer()
+	def _enqueue(self, tp: TopicPartition, messages: List[Any]) -> None:
+		executor = self._executor
+		assert executor is not None
+		with self._lock:
+			lane = self._lanes.setdefault(tp, _PartitionLane())
+			if lane.failed_offset is not None:
+				# Waiting for the seek; anything fetched now would overtake the failed message
+				return
+			if lane.resume_from is not None:
+				messages = [message for message in messages if message.offset >= lane.resume_from]
+				if not messages:
+					return
+				lane.resume_from = None
+			lane.queue.extend(messages)
+			self._inflight += len(messages)
+			if not lane.running:
+				lane.running = True
+				executor.submit(self._drain, tp, lane)
+
+	def _service_lanes(self, consumer: Any) -> None:
+		now = time.monotonic()
+		to_pause: List[TopicPartition] = []
+		to_resume: List[TopicPartition] = []
+		with self._lock:
+			for tp, lane in self._lanes.items():
+				if lane.failed_offset is not None and not lane.running:
+					consumer.seek(tp, lane.failed_offset)
+					lane.resume_from = lane.failed_offset
+					lane.failed_offset = None
+					lane.paused_until = now + self._retry_backoff
+					self._stats["redelivered"] += 1
+					to_pause.append(tp)
+				elif lane.paused_until is not None and now >= lane.paused_until:
+					lane.paused_until = None
+					if not self._backpressure:
+						to_resume.append(tp)
+
+			if not self._backpressure and self._inflight >= self._max_inflight:
+				self._backpressure = True
+				to_pause.extend(consumer.assignment())
+			elif self._backpressure and self._inflight <= self._max_inflight // 2:
+				self._backpressure = False
+				to_resume.extend(tp for tp in consumer.assignment() if self._lanes.get(tp) is None or self._lanes[tp].paused_until is None)
+		if to_pause:
+			consumer.pause(*to_pause)
+		if to_resume:
+			consumer.resume(*to_resume)
+
+	def _maybe_commit(self, consumer: Any) -> None:
+		if self._uncommitted >= self._commit_batch_size or (self._uncommitted and time.monotonic() - self._last_commit >= self._commit_interval):
+			self._commit(consumer)
+
+	def _commit(self, consumer: Any, partitions: Optional[Set[TopicPartition]] = None) -> None:
+		with self._lock:
+			offsets = {
+				tp: OffsetAndMetadata(offset, None) for tp, offset in self._done.items()
+				if partitions is None or tp in partitions
+			}
+			for tp in offsets:
+				del self._done[tp]
+			self._uncommitted = 0 if partitions is None else self._uncommitted
+		self._last_commit = time.monotonic()
+		if not offsets:
+			return
+		try:
+			consumer.commit(offsets=offsets)
+		except Exception:
+			# Keep the offsets for the next attempt unless newer ones arrived meanwhile
+			with self._lock:
+				for tp, meta in offsets.items():
+					self._done.setdefault(tp, meta.offset)
+			raise
+		self._stats["commits"] += 1
+
+	def _on_revoked(self, revoked: Set[TopicPartition]) -> None:
+		# Runs inside poll on this thread: finish in-flight work, commit, forget the lanes
+		with self._lock:
+			for tp in revoked:
+				lane = self._lanes.get(tp)
+				if lane is not None:
+					self._inflight -= len(lane.queue)
+					lane.queue.clear()
+			deadline = time.monotonic() + 10.0
+			while any(self._lanes[tp].running for tp in revoked if tp in self._lanes) and time.monotonic() < deadline:
+				self._idle.wait(deadline - time.monotonic())
+		if self._consumer is not None:
+			try:
+				self._commit(self._consumer, revoked)
+			except Exception as exc:
+				print(f"[fraud-consumer] Commit on revoke failed: {exc}")
+		with self._lock:
+			for tp in revoked:
+				self._lanes.pop(tp, None)
+				self._done.pop(tp, None)
+
+	# Worker threads
+
+	def _drain(self, tp: TopicPartition, lane: _PartitionLane) -> None:
+		while True:
+			with self._lock:
+				if not lane.queue or self._stop_event.is_set():
+					lane.running = False
+					self._idle.notify_all()
+					return
+				message = lane.queue[0]
+			if self._process(message):
+				with self._lock:
+					if lane.queue and lane.queue[0] is message:
+						lane.queue.popleft()
+						self._inflight -= 1
+					if self._lanes.get(tp) is lane:
+						self._done[tp] = message.offset + 1
+						self._uncommitted += 1
+			else:
+				with self._lock:
+					# Drop the rest of the lane; it is fetched again after the seek
+					self._inflight -= len(lane.queue)
+					lane.queue.clear()
+					lane.failed_offset = message.offset
+					lane.running = False
+					self._idle.notify_all()
+				return
+
+	def _process(self, message: Any) -> bool:
+		try:
+			# Only the envelope header is parsed here; the body on first access
+			event = decode_event(message.value)
+			handler = self._handler_for(message.topic, event.header.type)
+			if handler is None:
+				raise LookupError(f"No handler for topic={message.topic} type={event.header.type}")
+		except Exception as exc:
+			# Retrying cannot fix an undecodable or unroutable message
+			self._count("failed")
+			print(f"[fraud-consumer] Unprocessable message topic={message.topic} partition={message.partition} offset={message.offset}: {exc!r}")
+			return self._send_dead_letter(message, exc)
 
+		attempt = 0
+		while True:
+			try:
+				handler.handle(event.body)
+				self._count("processed")
+				return True
+			except Exception as exc:
+				if attempt < self._handler_max_retries and not self._stop_event.is_set():
+					attempt += 1
+					self._count("retried")
+					time.sleep(min(2.0, 0.1 * (2 ** attempt)))
+					continue
+				self._count("failed")
+				print(f"[fraud-consumer] Handler failed topic={message.topic} partition={message.partition} offset={message.offset}: {exc!r}")
+				return self._send_dead_letter(message, exc)
+
+	def _handler_for(self, topic: str, event_type: Optional[str]) -> Any:
+		"""Handler for an event: by envelope type when known, otherwise by topic."""
+		if self._handlers is not None:
+			return self._handlers.get(event_type) or self._handlers.get(topic)
+		name = event_type if event_type in HANDLERS else self._settings.kafka_topic_handlers.get(topic)
+		if name is None or name not in HANDLERS:
+			return None
+		handler = self._loaded.get(name)
+		if handler is None:
+			try:
+				handler = _load_handler(HANDLERS[name])
+			except Exception as exc:
+				print(f"[fraud-consumer] Could not load handler {name}: {exc!r}")
+				return None
+			self._loaded[name] = handler
+		return handler
+
+	def _send_dead_letter(self, message: Any, exc: Exception) -> bool:
+		if self._dead_letter is None:
+			return False
+		try:
+			self._dead_letter(message, exc)
+		except Exception as dead_letter_exc:
+			print(f"[fraud-consumer] Dead-letter publish failed: {dead_letter_exc!r}")
+			return False
+		self._count("dead_lettered")
+		return True
+
+	def _count(self, name: str) -> None:
+		with self._lock:
+			self._stats[name] += 1
 
+	def _default_dead_letter(self) -> Optional[Callable[[Any, Exception], None]]:
+		topic = self._settings.kafka_dead_letter_topic
+		if not topic:
+			return None
+
+		def publish_dead_letter(message: Any, exc: Exception) -> None:
+			from fraud.kafka.producer import publish
+
+			value = message.value
+			if isinstance(value, (bytes, bytearray)):
+				# Binary envelopes do not survive a text round trip
+				value = bytes(value)
+				try:
+					value = value.decode("utf-8")
+				except UnicodeDecodeError:
+					value = {"base64": base64.b64encode(value).decode("ascii")}
+			# Wait for the ack: the offset is committed as soon as this returns
+			publish({
+				"topic": message.topic,
+				"partition": message.partition,
+				"offset": message.offset,
+				"value": value,
+				"error": repr(exc),
+			}, topic=topic).get(timeout=30)
+
+		return publish_dead_letter
+
+	def stats(self) -> Dict[str, Any]:
+		with self._lock:
+			return {
+				**self._stats,
+				"inflight": self._inflight,
+				"partitions": len(self._lanes),
+				"backpressure": self._backpressure,
+				"topics": list(self._topics),
+			}
+
+
+consumer = FraudKafkaConsumer()
@@ -0,0 +1,182 @@
+import json
+import struct
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+import msgpack
+import numpy as np
+
+
+# Binary envelope layout:
+#   MAGIC (3 bytes) | format version (1 byte) | header length (uint16, big endian)
+#   | header (msgpack map) | body (msgpack map)
+# The header is small and fixed-shape so routing can read it without touching
+# the body. Anything not starting with MAGIC is read as a legacy JSON message.
+MAGIC = b"FRD"
+FORMAT_VERSION = 1
+_PREFIX = struct.Struct(">3sBH")
+
+# msgpack ext type for float32 numpy arrays: uint16 column count + raw little-endian data
+EXT_FLOAT32_ARRAY = 1
+_COLUMNS = struct.Struct("<H")
+
+EVENT_PLATE_DETECT = "plate_detect"
+EVENT_LICENSE_ID = "license_id"
+EVENT_CAR_DAMAGE = "car_damage"
+# A clip to scan (video_url or video_path) and the per-track results it produces
+EVENT_PLATE_VIDEO = "plate_video"
+EVENT_PLATE_VIDEO_RESULT = "plate_video_result"
+# A plate read on one claim was already seen on other claims
+EVENT_PLATE_REUSE = "plate_reuse"
+# Published by the ai service (as JSON) when claim photos were already used on other claims
+EVENT_IMAGE_REUSE = "image_reuse"
+
+# Body schema version per event type; bump when a field changes meaning
+SCHEMA_VERSIONS = {
+	EVENT_PLATE_DETECT: 1,
+	EVENT_LICENSE_ID: 1,
+	EVENT_CAR_DAMAGE: 1,
+	EVENT_PLATE_VIDEO: 1,
+	EVENT_PLATE_VIDEO_RESULT: 1,
+	EVENT_PLATE_REUSE: 1,
+	EVENT_IMAGE_REUSE: 1,
+}
+
+
+class EventDecodeError(ValueError):
+	"""A message is neither a valid envelope nor valid UTF-8 JSON."""
+
+
+@dataclass(frozen=True)
+class EventHeader:
+	type: Optional[str]
+	version: int
+	event_id: Optional[str]
+	timestamp_ms: Optional[int]
+	source: Optional[str]
+
+
+def _pack_default(value: Any) -> Any:
+	if isinstance(value, np.ndarray):
+		array = np.ascontiguousarray(value, dtype="<f4")
+		columns = array.shape[1] if array.ndim == 2 else 0
+		return msgpack.ExtType(EXT_FLOAT32_ARRAY, _COLUMNS.pack(columns) + array.tobytes())
+	if isinstance(value, np.generic):
+		return value.item()
+	raise TypeError(f"Cannot serialize {type(value).__name__} in an event")
+
+
+def _ext_hook(code: int, data: bytes) -> Any:
+	if code == EXT_FLOAT32_ARRAY:
+		(columns,) = _COLUMNS.unpack_from(data)
+		array = np.frombuffer(data, dtype="<f4", offset=_COLUMNS.size)
+		return array.reshape(-1, columns) if columns else array
+	return msgpack.ExtType(code, data)
+
+
+def _json_default(value: Any) -> Any:
+	if isinstance(value, np.ndarray):
+		return value.tolist()
+	if isinstance(value, np.generic):
+		return value.item()
+	raise TypeError(f"Cannot serialize {type(value).__name__} in an event")
+
+
+def encode_event(
+	event_type: str,
+	body: Dict[str, Any],
+	event_id: Optional[str] = None,
+	source: Optional[str] = None,
+	wire_format: str = "msgpack",
+) -> bytes:
+	"""Serialize an event; ``wire_format="json"`` writes the legacy plain-JSON body."""
+	if wire_format == "json":
+		return json.dumps(body, default=_json_default).encode("utf-8")
+	header = msgpack.packb({
+		"t": event_type,
+		"v": SCHEMA_VERSIONS.get(event_type, 1),
+		"id": event_id or uuid.uuid4().hex,
+		"ts": int(time.time() * 1000),
+		"src": source,
+	})
+	payload = msgpack.packb(body, default=_pack_default, use_bin_type=True)
+	return _PREFIX.pack(MAGIC, FORMAT_VERSION, len(header)) + header + payload
+
+
+class Event:
+	"""A received message; the header is parsed eagerly, the body on first access."""
+
+	__slots__ = ("header", "_raw", "_offset", "_body", "_decoded")
+
+	def __init__(self, header: EventHeader, raw: Any, offset: int, body: Any = None, decoded: bool = False) -> None:
+		self.header = header
+		self._raw = raw
+		self._offset = offset
+		self._body = body
+		self._decoded = decoded
+
+	@property
+	def is_legacy(self) -> bool:
+		return self.header.version == 0
+
+	@property
+	def body(self) -> Any:
+		if not self._decoded:
+			try:
+				self._body = msgpack.unpackb(memoryview(self._raw)[self._offset:], ext_hook=_ext_hook, raw=False)
+			except Exception as exc:
+				raise EventDecodeError(f"Invalid event body: {exc}") from exc
+			self._decoded = True
+			self._raw = None
+		return self._body
+
+
+def decode_event(raw: Any) -> Event:
+	"""Parse a message header, falling back to legacy JSON for non-envelope values."""
+	if isinstance(raw, str):
+		raw = raw.encode("utf-8")
+	if not isinstance(raw, (bytes, bytearray, memoryview)):
+		raise EventDecodeError(f"Unsupported message value type {type(raw).__name__}")
+	if bytes(raw[:3]) != MAGIC:
+		return _decode_legacy(raw)
+	if len(raw) < _PREFIX.size:
+		raise EventDecodeError("Truncated event envelope")
+	_, format_version, header_length = _PREFIX.unpack_from(raw)
+	if format_version > FORMAT_VERSION:
+		raise EventDecodeError(f"Unsupported envelope version {format_version}")
+	end = _PREFIX.size + header_length
+	try:
+		fields = msgpack.unpackb(memoryview(raw)[_PREFIX.size:end], raw=False)
+	except Exception as exc:
+		raise EventDecodeError(f"Invalid event header: {exc}") from exc
+	header = EventHeader(
+		type=fields.get("t"),
+		version=fields.get("v", 1),
+		event_id=fields.get("id"),
+		timestamp_ms=fields.get("ts"),
+		source=fields.get("src"),
+	)
+	return Event(header, raw, end)
+
+
+def _decode_legacy(raw: Any) -> Event:
+	try:
+		text = bytes(raw).decode("utf-8")
+	except UnicodeDecodeError as exc:
+		raise EventDecodeError(f"Message is not an event envelope or UTF-8 text: {exc}") from exc
+	try:
+		body = json.loads(text)
+	except ValueError:
+		body = text
+	return Event(EventHeader(type=None, version=0, event_id=None, timestamp_ms=None, source=None), None, 0, body, True)
+
+
+def detections_body(detections: Sequence[Dict[str, Any]], image_ref: Optional[str] = None, **fields: Any) -> Dict[str, Any]:
+	"""Body for detection events: boxes and scores as packed arrays, the image by reference."""
+	boxes = np.asarray([detection["bbox"] for detection in detections], dtype=np.float32).reshape(-1, 4)
+	scores = np.asarray([detection.get("confidence", 0.0) for detection in detections], dtype=np.float32)
+	keys = {key for detection in detections for key in detection if key not in ("bbox", "confidence")}
+	extra: Dict[str, List[Any]] = {key: [detection.get(key) for detection in detections] for key in sorted(keys)}
+	return {"image_ref": image_ref, "boxes": boxes, "scores": scores, **extra, **fields}
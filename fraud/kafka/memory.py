@@ -0,0 +1,362 @@
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from kafka.consumer.fetcher import ConsumerRecord
+from kafka.future import Future
+from kafka.producer.future import RecordMetadata
+from kafka.structs import OffsetAndMetadata, TopicPartition
+
+
+class InMemoryBroker:
+	"""Thread-safe stand-in for a Kafka cluster, for tests and benchmarks.
+
+	Topics are lists of partitions holding ``ConsumerRecord`` tuples. Consumers
+	from ``consumer()`` implement the subset of ``KafkaConsumer`` the fraud
+	service uses (subscribe with a rebalance listener, poll, pause/resume, seek,
+	manual commit); consumers in the same group split the partitions between
+	them and are rebalanced whenever one joins or leaves.
+	"""
+
+	def __init__(self, default_partitions: int = 4) -> None:
+		self._default_partitions = default_partitions
+		self._cond = threading.Condition()
+		self._logs: Dict[TopicPartition, List[ConsumerRecord]] = {}
+		self._topics: Dict[str, int] = {}
+		self._committed: Dict[Tuple[str, TopicPartition], int] = {}
+		self._groups: Dict[str, List["InMemoryConsumer"]] = {}
+		self._round_robin = 0
+
+	def create_topic(self, topic: str, partitions: Optional[int] = None) -> None:
+		with self._cond:
+			if topic in self._topics:
+				return
+			self._topics[topic] = partitions or self._default_partitions
+			for partition in range(self._topics[topic]):
+				self._logs[TopicPartition(topic, partition)] = []
+			for group in self._groups:
+				self._rebalance(group)
+
+	def partitions_for(self, topic: str) -> Set[int]:
+		with self._cond:
+			return set(range(self._topics.get(topic, 0)))
+
+	def produce(
+		self,
+		topic: str,
+		value: Any,
+		key: Optional[bytes] = None,
+		partition: Optional[int] = None,
+		headers: Optional[List[Tuple[str, bytes]]] = None,
+	) -> ConsumerRecord:
+		self.create_topic(topic)
+		with self._cond:
+			count = self._topics[topic]
+			if partition is None:
+				if key is not None:
+					partition = zlib.crc32(key) % count
+				else:
+					partition = self._round_robin % count
+					self._round_robin += 1
+			tp = TopicPartition(topic, partition)
+			log = self._logs[tp]
+			record = ConsumerRecord(
+				topic, partition, len(log), int(time.time() * 1000), 0, key, value, headers or [], None,
+				len(key) if key is not None else -1, len(value) if value is not None else -1, -1,
+			)
+			log.append(record)
+			self._cond.notify_all()
+			return record
+
+	def consumer(self, group_id: str = "default", value_deserializer=None, **_: Any) -> "InMemoryConsumer":
+		return InMemoryConsumer(self, group_id, value_deserializer)
+
+	def producer(self, value_serializer=None, linger_ms: float = 0, batch_size: int = 16384, round_trip_ms: float = 0.0, **_: Any) -> "InMemoryProducer":
+		return InMemoryProducer(self, value_serializer, linger_ms, batch_size, round_trip_ms)
+
+	def committed(self, group_id: str, tp: TopicPartition) -> Optional[int]:
+		with self._cond:
+			return self._committed.get((group_id, tp))
+
+	def end_offset(self, tp: TopicPartition) -> int:
+		with self._cond:
+			return len(self._logs.get(tp, ()))
+
+	def lag(self, group_id: str, topics: Optional[Iterable[str]] = None) -> int:
+		with self._cond:
+			wanted = set(topics) if topics is not None else set(self._topics)
+			return sum(
+				len(log) - self._committed.get((group_id, tp), 0)
+				for tp, log in self._logs.items() if tp.topic in wanted
+			)
+
+	# Called by consumers with the condition held
+
+	def _join(self, consumer: "InMemoryConsumer") -> None:
+		members = self._groups.setdefault(consumer.group_id, [])
+		if consumer not in members:
+			members.append(consumer)
+		self._rebalance(consumer.group_id)
+
+	def _leave(self, consumer: "InMemoryConsumer") -> None:
+		members = self._groups.get(consumer.group_id, [])
+		if consumer in members:
+			members.remove(consumer)
+			self._rebalance(consumer.group_id)
+
+	def _rebalance(self, group_id: str) -> None:
+		members = self._groups.get(group_id, [])
+		topics = sorted({topic for member in members for topic in member._topics if topic in self._topics})
+		partitions = [TopicPartition(topic, p) for topic in topics for p in range(self._topics[topic])]
+		assignments: Dict["InMemoryConsumer", Set[TopicPartition]] = {member: set() for member in members}
+		eligible = {member: [tp for tp in partitions if tp.topic in member._topics] for member in members}
+		for index, tp in enumerate(partitions):
+			candidates = [member for member in members if tp in eligible[member]]
+			if candidates:
+				assignments[candidates[index % len(candidates)]].add(tp)
+		for member, assigned in assignments.items():
+			member._pending_assignment = assigned
+		self._cond.notify_all()
+
+
+class InMemoryConsumer:
+	def __init__(self, broker: InMemoryBroker, group_id: str, value_deserializer=None) -> None:
+		self._broker = broker
+		self.group_id = group_id
+		self._deserializer = value_deserializer
+		self._topics: Set[str] = set()
+		self._listener = None
+		self._assignment: Set[TopicPartition] = set()
+		self._pending_assignment: Optional[Set[TopicPartition]] = None
+		self._positions: Dict[TopicPartition, int] = {}
+		self._paused: Set[TopicPartition] = set()
+		self._next_partition = 0
+		self._closed = False
+
+	def subscribe(self, topics: Sequence[str] = (), listener=None) -> None:
+		with self._broker._cond:
+			self._topics = set(topics)
+			self._listener = listener
+			self._broker._join(self)
+
+	def assignment(self) -> Set[TopicPartition]:
+		return set(self._assignment)
+
+	def _apply_rebalance(self) -> None:
+		# Listener callbacks run outside the broker lock, like in KafkaConsumer.poll
+		with self._broker._cond:
+			new = self._pending_assignment
+			self._pending_assignment = None
+		if new is None:
+			return
+		revoked = self._assignment - new
+		if revoked and self._listener is not None:
+			self._listener.on_partitions_revoked(revoked)
+		with self._broker._cond:
+			self._assignment = set(new)
+			for tp in revoked:
+				self._positions.pop(tp, None)
+				self._paused.discard(tp)
+			for tp in new:
+				if tp not in self._positions:
+					self._positions[tp] = self._broker._committed.get((self.group_id, tp), 0)
+		if self._listener is not None:
+			self._listener.on_partitions_assigned(set(new))
+
+	def poll(self, timeout_ms: int = 0, max_records: int = 500) -> Dict[TopicPartition, List[ConsumerRecord]]:
+		if self._closed:
+			raise RuntimeError("Consumer is closed")
+		self._apply_rebalance()
+		deadline = time.monotonic() + timeout_ms / 1000.0
+		with self._broker._cond:
+			while True:
+				batch = self._take(max_records)
+				remaining = deadline - time.monotonic()
+				if batch or remaining <= 0 or self._pending_assignment is not None:
+					return batch
+				self._broker._cond.wait(remaining)
+
+	def _take(self, max_records: int) -> Dict[TopicPartition, List[ConsumerRecord]]:
+		batch: Dict[TopicPartition, List[ConsumerRecord]] = {}
+		ready = [tp for tp in sorted(self._assignment - self._paused) if self._positions[tp] < len(self._broker._logs[tp])]
+		if not ready:
+			return batch
+		# Spread each poll across partitions, starting where the last one stopped
+		self._next_partition = (self._next_partition + 1) % len(ready)
+		ready = ready[self._next_partition:] + ready[:self._next_partition]
+		share = max(1, max_records // len(ready))
+		budget = max_records
+		for tp in ready:
+			if budget <= 0:
+				break
+			log = self._broker._logs[tp]
+			start = self._positions[tp]
+			records = log[start:start + min(share, budget)]
+			if not records:
+				continue
+			if self._deserializer is not None:
+				records = [record._replace(value=self._deserializer(record.value)) for record in records]
+			batch[tp] = records
+			self._positions[tp] = start + len(records)
+			budget -= len(records)
+		return batch
+
+	def commit(self, offsets: Optional[Dict[TopicPartition, OffsetAndMetadata]] = None) -> None:
+		with self._broker._cond:
+			if offsets is None:
+				offsets = {tp: OffsetAndMetadata(position, None) for tp, position in self._positions.items()}
+			for tp, meta in offsets.items():
+				if tp not in self._assignment:
+					raise RuntimeError(f"Commit for unassigned partition {tp}")
+				self._broker._committed[(self.group_id, tp)] = meta.offset
+
+	def committed(self, tp: TopicPartition) -> Optional[int]:
+		return self._broker.committed(self.group_id, tp)
+
+	def pause(self, *partitions: TopicPartition) -> None:
+		self._paused.update(tp for tp in partitions if tp in self._assignment)
+
+	def resume(self, *partitions: TopicPartition) -> None:
+		self._paused.difference_update(partitions)
+		with self._broker._cond:
+			self._broker._cond.notify_all()
+
+	def paused(self) -> Set[TopicPartition]:
+		return set(self._paused)
+
+	def seek(self, partition: TopicPartition, offset: int) -> None:
+		with self._broker._cond:
+			if partition not in self._assignment:
+				raise RuntimeError(f"Seek on unassigned partition {partition}")
+			self._positions[partition] = offset
+
+	def position(self, partition: TopicPartition) -> int:
+		return self._positions[partition]
+
+	def close(self, autocommit: bool = True) -> None:
+		if self._closed:
+			return
+		self._closed = True
+		with self._broker._cond:
+			self._broker._leave(self)
+
+
+class _DeliveryFuture(Future):
+	"""``kafka.future.Future`` with the blocking ``get`` of ``FutureRecordMetadata``."""
+
+	def __init__(self) -> None:
+		super().__init__()
+		self._event = threading.Event()
+
+	def success(self, value: Any) -> "_DeliveryFuture":
+		super().success(value)
+		self._event.set()
+		return self
+
+	def failure(self, error: Exception) -> "_DeliveryFuture":
+		super().failure(error)
+		self._event.set()
+		return self
+
+	def get(self, timeout: Optional[float] = None) -> Any:
+		if not self._event.wait(timeout):
+			raise TimeoutError("Timed out waiting for delivery")
+		if self.failed():
+			raise self.exception
+		return self.value
+
+
+class InMemoryProducer:
+	"""Stand-in for ``KafkaProducer`` that batches the way the real client does.
+
+	Sends accumulate until ``batch_size`` bytes are pending or the oldest has
+	waited ``linger_ms``; a sender thread then ships everything pending as one
+	request, paying ``round_trip_ms``, appends it to the broker and completes
+	the futures. ``flush`` ships immediately and waits for delivery.
+	"""
+
+	def __init__(self, broker: InMemoryBroker, value_serializer=None, linger_ms: float = 0, batch_size: int = 16384, round_trip_ms: float = 0.0) -> None:
+		self._broker = broker
+		self._serializer = value_serializer
+		self._linger = linger_ms / 1000.0
+		self._batch_size = batch_size
+		self._round_trip = round_trip_ms / 1000.0
+		self._cond = threading.Condition()
+		self._pending: List[Tuple[str, Optional[bytes], Any, Any, _DeliveryFuture]] = []
+		self._pending_bytes = 0
+		self._oldest: Optional[float] = None
+		self._in_flight = 0
+		self._flushing = 0
+		self._closed = False
+		self.requests = 0
+		self._sender = threading.Thread(target=self._run, name="in-memory-producer", daemon=True)
+		self._sender.start()
+
+	def send(self, topic: str, value: Any = None, key: Optional[bytes] = None, headers: Optional[List[Tuple[str, bytes]]] = None) -> _DeliveryFuture:
+		if self._closed:
+			raise RuntimeError("Producer is closed")
+		if self._serializer is not None:
+			value = self._serializer(value)
+		future = _DeliveryFuture()
+		with self._cond:
+			self._pending.append((topic, key, value, headers, future))
+			self._pending_bytes += len(value) if value is not None else 0
+			if self._oldest is None:
+				self._oldest = time.monotonic()
+			self._cond.notify_all()
+		return future
+
+	def _ready(self) -> bool:
+		if not self._pending:
+			return False
+		if self._flushing or self._closed or self._pending_bytes >= self._batch_size:
+			return True
+		return self._oldest is not None and time.monotonic() - self._oldest >= self._linger
+
+	def _run(self) -> None:
+		while True:
+			with self._cond:
+				while not self._ready():
+					if self._closed and not self._pending:
+						return
+					wait = None
+					if self._pending and self._oldest is not None:
+						wait = max(0.0, self._linger - (time.monotonic() - self._oldest))
+					self._cond.wait(wait)
+				batch, self._pending = self._pending, []
+				self._pending_bytes = 0
+				self._oldest = None
+				self._in_flight += len(batch)
+			if self._round_trip:
+				time.sleep(self._round_trip)
+			self.requests += 1
+			for topic, key, value, headers, future in batch:
+				record = self._broker.produce(topic, value, key=key, headers=headers)
+				future.success(RecordMetadata(
+					topic, record.partition, TopicPartition(topic, record.partition), record.offset,
+					record.timestamp, -1, None, record.serialized_key_size, record.serialized_value_size, -1,
+				))
+			with self._cond:
+				self._in_flight -= len(batch)
+				self._cond.notify_all()
+
+	def flush(self, timeout: Optional[float] = None) -> None:
+		deadline = None if timeout is None else time.monotonic() + timeout
+		with self._cond:
+			self._flushing += 1
+			self._cond.notify_all()
+			try:
+				while self._pending or self._in_flight:
+					remaining = None if deadline is None else deadline - time.monotonic()
+					if remaining is not None and remaining <= 0:
+						raise TimeoutError("Timed out flushing producer")
+					self._cond.wait(remaining)
+			finally:
+				self._flushing -= 1
+
+	def close(self, timeout: Optional[float] = None) -> None:
+		with self._cond:
+			self._closed = True
+			self._cond.notify_all()
+		self._sender.join(timeout)
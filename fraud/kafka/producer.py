@@ -1,33 +1,143 @@
 import json
-from typing import Optional, Union
+import threading
+from typing import Any, Callable, Dict, Optional, Union
 
 from kafka import KafkaProducer
+from kafka.codec import has_gzip, has_lz4, has_snappy, has_zstd
 
 from fraud.core.config import get_settings
+from fraud.kafka.events import encode_event
 
 
-_producer: Optional[KafkaProducer] = None
+_producer: Optional[Any] = None
+_producer_lock = threading.Lock()
+_stats = {"sent": 0, "delivered": 0, "failed": 0}
+_stats_lock = threading.Lock()
 
+_CODECS = {"gzip": has_gzip, "snappy": has_snappy, "lz4": has_lz4, "zstd": has_zstd}
 
-def _get_producer() -> KafkaProducer:
+
+def _serialize(value: Any) -> bytes:
+	if isinstance(value, (bytes, bytearray)):
+		return bytes(value)
+	if isinstance(value, str):
+		return value.encode("utf-8")
+	return json.dumps(value).encode("utf-8")
+
+
+def _compression_type(name: Optional[str]) -> Optional[str]:
+	if not name or name == "none":
+		return None
+	check = _CODECS.get(name)
+	if check is None:
+		raise RuntimeError(f"Unknown Kafka compression type: {name}")
+	if check():
+		return name
+	# The codec library is optional; fall back rather than failing every send
+	print(f"[fraud-producer] {name} codec is not installed, falling back to gzip")
+	return "gzip"
+
+
+def _get_producer() -> Any:
 	global _producer
 	if _producer is None:
-		settings = get_settings()
-		_producer = KafkaProducer(
-			bootstrap_servers=settings.kafka_bootstrap_servers,
-			client_id="fraud-producer",
-			value_serializer=lambda v: v if isinstance(v, (bytes, bytearray)) else json.dumps(v).encode("utf-8"),
-			security_protocol="PLAINTEXT",
-		)
+		with _producer_lock:
+			if _producer is None:
+				settings = get_settings()
+				_producer = KafkaProducer(
+					bootstrap_servers=settings.kafka_bootstrap_servers,
+					client_id="fraud-producer",
+					value_serializer=_serialize,
+					acks=settings.kafka_producer_acks if settings.kafka_producer_acks == "all" else int(settings.kafka_producer_acks),
+					linger_ms=settings.kafka_producer_linger_ms,
+					batch_size=settings.kafka_producer_batch_size,
+					compression_type=_compression_type(settings.kafka_producer_compression),
+					max_in_flight_requests_per_connection=settings.kafka_producer_max_in_flight,
+					security_protocol="PLAINTEXT",
+				)
 	return _producer
 
 
-def publish(value: Union[str, bytes, dict], topic: Optional[str] = None) -> None:
+def use_producer(producer: Optional[Any]) -> None:
+	"""Replace the shared producer, e.g. with ``InMemoryBroker.producer()`` in tests."""
+	global _producer
+	with _producer_lock:
+		_producer = producer
+
+
+def _count(name: str) -> None:
+	with _stats_lock:
+		_stats[name] += 1
+
+
+def _on_delivered(_metadata: Any) -> None:
+	_count("delivered")
+
+
+def _on_failed(topic: str) -> Callable[[Exception], None]:
+	def errback(exc: Exception) -> None:
+		_count("failed")
+		print(f"[fraud-producer] Delivery to {topic} failed: {exc!r}")
+	return errback
+
+
+def publish(
+	value: Union[str, bytes, dict],
+	topic: Optional[str] = None,
+	key: Optional[bytes] = None,
+	on_success: Optional[Callable[[Any], None]] = None,
+	on_error: Optional[Callable[[Exception], None]] = None,
+) -> Any:
+	"""Queue a message for sending and return its delivery future.
+
+	Does not wait for the broker: the client batches messages per partition
+	(``linger_ms``/``batch_size``) and compresses each batch. Call
+	``.get(timeout)`` on the returned future to block until the message is
+	acknowledged; callbacks run on the client's I/O thread and must be quick.
+	"""
 	settings = get_settings()
 	producer = _get_producer()
 	topic_name = topic or settings.kafka_topic
-	producer.send(topic_name, value)
-	producer.flush()
+	future = producer.send(topic_name, value, key=key)
+	_count("sent")
+	future.add_callback(_on_delivered)
+	future.add_errback(_on_failed(topic_name))
+	if on_success is not None:
+		future.add_callback(on_success)
+	if on_error is not None:
+		future.add_errback(on_error)
+	return future
+
 
+def publish_event(
+	event_type: str,
+	body: Dict[str, Any],
+	topic: Optional[str] = None,
+	key: Optional[bytes] = None,
+	on_success: Optional[Callable[[Any], None]] = None,
+	on_error: Optional[Callable[[Exception], None]] = None,
+) -> Any:
+	"""Publish a typed event in the configured wire format (see ``fraud.kafka.events``)."""
+	value = encode_event(event_type, body, source="fraud-service", wire_format=get_settings().kafka_event_format)
+	return publish(value, topic=topic, key=key, on_success=on_success, on_error=on_error)
+
+
+def flush(timeout: Optional[float] = None) -> None:
+	"""Block until every queued message has been sent."""
+	if _producer is not None:
+		_producer.flush(timeout=timeout)
+
+
+def close(timeout: Optional[float] = None) -> None:
+	"""Flush and close the shared producer; the next publish opens a new one."""
+	global _producer
+	with _producer_lock:
+		producer, _producer = _producer, None
+	if producer is not None:
+		producer.flush(timeout=timeout)
+		producer.close(timeout=timeout)
 
 
+def stats() -> Dict[str, Any]:
+	with _stats_lock:
+		return {**_stats, "pending": _stats["sent"] - _stats["delivered"] - _stats["failed"]}
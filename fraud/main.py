@@ -1,7 +1,12 @@
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fraud.kafka import producer
 from fraud.kafka.consumer import consumer
 from fraud.core.config import get_settings
+from fraud.core import plate_registry, similarity
+from fraud.models.registry import register_models
 
 
 def create_application() -> FastAPI:
@@ -18,11 +23,40 @@ def create_application() -> FastAPI:
 
 	@application.on_event("startup")
 	async def _start_consumer() -> None:
+		# Load and warm the models before the first message arrives
+		registry = register_models()
+		try:
+			await asyncio.to_thread(registry.preload)
+		except Exception as exc:
+			# Handlers retry the load on first use; do not block startup on it
+			print(f"[fraud] Model preload failed: {exc}")
+		registry.start_watcher(settings.model_reload_interval_seconds)
+		try:
+			# Maps the snapshot and replays newer rows, so the first lookup is not slow
+			await asyncio.to_thread(plate_registry.get_plate_registry)
+		except Exception as exc:
+			print(f"[fraud] Plate registry load failed: {exc}")
 		consumer.start()
 
 	@application.on_event("shutdown")
 	async def _stop_consumer() -> None:
 		consumer.stop()
+		register_models().stop_watcher()
+		registry = plate_registry._plate_registry
+		if registry is not None and registry.stats()["unsnapshotted_sightings"]:
+			try:
+				await asyncio.to_thread(registry.save_snapshot)
+			except Exception as exc:
+				print(f"[fraud] Plate registry snapshot failed: {exc}")
+		index = similarity._similarity_index
+		if index is not None:
+			try:
+				# Persists the local index; closes the Qdrant client
+				await asyncio.to_thread(index.close)
+			except Exception as exc:
+				print(f"[fraud] Similarity index close failed: {exc}")
+		# Deliver whatever the handlers queued before the process exits
+		producer.close(timeout=10)
 	return application
 
 
@@ -1,61 +1,74 @@
+from typing import Any, Dict, List
+
+import numpy as np
+
+from ai.core.box_suppression import OVERLAP_MIN, suppress_detections
+from fraud.core.plate_registry import get_plate_registry
+from fraud.models.registry import yolo_model
+
+
 class LicensePlateDetector:
     def __init__(self):
         pass
     @staticmethod
     def _detect_license_plates_yolo(image: np.ndarray) -> List[Dict[str, Any]]:
         """Detect license plates using YOLO model"""
-        model = _get_yolo_model()
-        
-        # Run YOLO inference
-        results = model(image, conf=0.5)  # confidence threshold
+        # Run YOLO inference on the shared, already loaded model
+        with yolo_model() as detector:
+            (data,) = detector.detect([image], conf=0.5)  # confidence threshold
+            names = detector.names
         
         license_plates = []
         
-        for result in results:
-            boxes = result.boxes
-            if boxes is not None:
-                for box in boxes:
-                    # Get class name
-                    class_id = int(box.cls[0])
-                    class_name = model.names[class_id]
-                    confidence = float(box.conf[0])
-                    
-                    # Filter for objects that might be license plates
-                    # YOLO doesn't have a specific license plate class, so we'll look for:
-                    # - cars (class 2) and extract regions that might contain license plates
-                    # - or use a more general approach
-                    if class_name in ['car', 'truck', 'bus', 'motorcycle'] and confidence > 0.6:
-                        # Get bounding box coordinates
-                        x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                    
-                    # Extract the region that might contain license plate
-                    # License plates are typically in the lower portion of vehicles
-                    height = y2 - y1
-                    width = x2 - x1
-                    
-                    # Focus on lower 30% of the vehicle for license plate detection
-                    license_plate_y1 = int(y1 + height * 0.7)
-                    license_plate_y2 = int(y2)
-                    license_plate_x1 = int(x1)
-                    license_plate_x2 = int(x2)
-                    
-                    # Ensure coordinates are within image bounds
-                    license_plate_y1 = max(0, license_plate_y1)
-                    license_plate_y2 = min(image.shape[0], license_plate_y2)
-                    license_plate_x1 = max(0, license_plate_x1)
-                    license_plate_x2 = min(image.shape[1], license_plate_x2)
-                    
-                    if license_plate_y2 > license_plate_y1 and license_plate_x2 > license_plate_x1:
-                        license_plates.append({
-                            'bbox': [license_plate_x1, license_plate_y1, license_plate_x2, license_plate_y2],
-                            'confidence': confidence,
-                            'vehicle_type': class_name,
-                            'vehicle_bbox': [int(x1), int(y1), int(x2), int(y2)]
-                        })
+        for x1, y1, x2, y2, confidence, class_id in data:
+            class_name = names[int(class_id)]
+            confidence = float(confidence)
+            
+            # Filter for objects that might be license plates
+            # YOLO doesn't have a specific license plate class, so we'll look for:
+            # - cars (class 2) and extract regions that might contain license plates
+            # - or use a more general approach
+            if class_name not in ['car', 'truck', 'bus', 'motorcycle'] or confidence <= 0.6:
+                continue
+            
+            # Extract the region that might contain license plate
+            # License plates are typically in the lower portion of vehicles
+            height = y2 - y1
+            width = x2 - x1
+            
+            # Focus on lower 30% of the vehicle for license plate detection
+            license_plate_y1 = int(y1 + height * 0.7)
+            license_plate_y2 = int(y2)
+            license_plate_x1 = int(x1)
+            license_plate_x2 = int(x2)
+            
+            # Ensure coordinates are within image bounds
+            license_plate_y1 = max(0, license_plate_y1)
+            license_plate_y2 = min(image.shape[0], license_plate_y2)
+            license_plate_x1 = max(0, license_plate_x1)
+            license_plate_x2 = min(image.shape[1], license_plate_x2)
+            
+            if license_plate_y2 > license_plate_y1 and license_plate_x2 > license_plate_x1:
+                license_plates.append({
+                    'bbox': [license_plate_x1, license_plate_y1, license_plate_x2, license_plate_y2],
+                    'confidence': confidence,
+                    'vehicle_type': class_name,
+                    'vehicle_bbox': [int(x1), int(y1), int(x2), int(y2)]
+                })
 
         return license_plates
 
+    @staticmethod
+    def filter_duplicate_plates(license_plates: List[Dict[str, Any]], threshold: float = 0.5) -> List[Dict[str, Any]]:
+        """Drop overlapping plate candidates, keeping the more confident one"""
+        return suppress_detections(license_plates, threshold=threshold, mode=OVERLAP_MIN)
+
     @staticmethod
     def check_license_plate(license_plate: Dict[str, Any]) -> bool:
-        return True
+        """False when the plate (or a one-character OCR variant of it) was already
+        seen on a claim other than ``claim_id``"""
+        text = license_plate.get('text') or license_plate.get('extracted_text')
+        if not text:
+            return True
+        return not get_plate_registry().other_claims(text, license_plate.get('claim_id'))
         
\ No newline at end of file
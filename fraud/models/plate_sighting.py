@@ -0,0 +1,30 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from fraud.db.base import Base
+
+
+class PlateSighting(Base):
+	"""One recognized plate on one claim image.
+
+	``plate_key`` is the OCR-normalized plate (see ``fraud.core.plate_registry``)
+	and backs fuzzy cross-claim lookups; ``plate_text`` keeps what OCR read.
+	"""
+
+	__tablename__ = "plate_sightings"
+
+	id: Mapped[int] = mapped_column(Integer, primary_key=True)
+	plate_key: Mapped[str] = mapped_column(String(32))
+	plate_text: Mapped[str] = mapped_column(String(64), default="")
+	claim_id: Mapped[str] = mapped_column(String(64))
+	seen_at: Mapped[datetime] = mapped_column(DateTime)
+	image_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+	source: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+
+	__table_args__ = (
+		Index("ix_plate_sightings_plate_key", "plate_key"),
+		Index("ix_plate_sightings_claim_id", "claim_id"),
+	)
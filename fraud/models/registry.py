@@ -0,0 +1,34 @@
+import functools
+from typing import ContextManager
+
+from ai.core.inference import Detector, load_detector, warm_up_detector
+from ai.core.model_registry import ModelRegistry, get_model_registry, resolve_weights
+from fraud.core.config import get_settings
+
+YOLO_MODEL = "yolov8n"
+
+
+def register_models() -> ModelRegistry:
+    """Declare the fraud service's models in the shared registry (safe to call repeatedly)"""
+    settings = get_settings()
+    registry = get_model_registry()
+    registry.register(
+        YOLO_MODEL,
+        resolve_weights("yolov8n.pt", settings.model_dir),
+        loader=functools.partial(
+            load_detector,
+            backend=settings.inference_backend,
+            int8=settings.inference_int8,
+            intra_op_threads=settings.inference_intra_op_threads,
+            inter_op_threads=settings.inference_inter_op_threads,
+            providers=settings.inference_onnx_providers,
+        ),
+        warmup=warm_up_detector if settings.model_warmup else None,
+        replicas=settings.model_replicas,
+    )
+    return registry
+
+
+def yolo_model() -> ContextManager[Detector]:
+    """Lease the shared YOLO detector: ``with yolo_model() as detector: detector.detect([image])``"""
+    return register_models().lease(YOLO_MODEL)
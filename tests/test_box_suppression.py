@@ -0,0 +1,80 @@
+"""suppress_detections must keep exactly what the original plate merge loop kept, in the same order."""
+import numpy as np
+import pytest
+
+from ai.core.box_suppression import suppress_detections
+
+
+def legacy_merge(all_plates):
+    """The duplicate filter of the baseline license_plate.py, verbatim"""
+    filtered_plates = []
+    for plate in all_plates:
+        is_duplicate = False
+        for existing_plate in filtered_plates:
+            bbox1 = plate['bbox']
+            bbox2 = existing_plate['bbox']
+
+            x1 = max(bbox1[0], bbox2[0])
+            y1 = max(bbox1[1], bbox2[1])
+            x2 = min(bbox1[2], bbox2[2])
+            y2 = min(bbox1[3], bbox2[3])
+
+            if x1 < x2 and y1 < y2:
+                overlap_area = (x2 - x1) * (y2 - y1)
+                area1 = (bbox1[2] - bbox1[0]) * (bbox1[3] - bbox1[1])
+                area2 = (bbox2[2] - bbox2[0]) * (bbox2[3] - bbox2[1])
+
+                overlap_ratio = overlap_area / min(area1, area2)
+                if overlap_ratio > 0.5:
+                    is_duplicate = True
+                    if plate['confidence'] > existing_plate['confidence']:
+                        filtered_plates.remove(existing_plate)
+                        filtered_plates.append(plate)
+                    break
+
+        if not is_duplicate:
+            filtered_plates.append(plate)
+    return filtered_plates
+
+
+def random_plates(rng, count, extent):
+    plates = []
+    for index in range(count):
+        x1, y1 = (int(value) for value in rng.integers(0, extent, 2))
+        width, height = (int(value) for value in rng.integers(1, 40, 2))
+        plates.append({
+            # Unique per plate, so the legacy list.remove() cannot match another plate
+            'plate_index': index,
+            'bbox': [x1, y1, x1 + width, y1 + height],
+            # Few distinct values: many duplicates tie on confidence
+            'confidence': float(rng.choice([0.3, 0.5, 0.5, 0.7, 0.9])),
+        })
+    return plates
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_matches_legacy_merge_loop(seed):
+    rng = np.random.default_rng(seed)
+    # A small canvas crowds the boxes, so chains of replacements are common
+    plates = random_plates(rng, int(rng.integers(1, 40)), int(rng.choice([30, 60, 150])))
+
+    expected = [plate['plate_index'] for plate in legacy_merge(plates)]
+    actual = [plate['plate_index'] for plate in suppress_detections(plates)]
+
+    assert actual == expected
+
+
+def test_replacement_moves_to_the_end_and_ties_keep_the_first():
+    plates = [
+        {'plate_index': 0, 'bbox': [0, 0, 10, 10], 'confidence': 0.5},
+        {'plate_index': 1, 'bbox': [100, 0, 110, 10], 'confidence': 0.5},
+        # Duplicate of 0 with a higher score: replaces it, at the end of the list
+        {'plate_index': 2, 'bbox': [1, 1, 11, 11], 'confidence': 0.8},
+        # Duplicate of 1 with an equal score: dropped
+        {'plate_index': 3, 'bbox': [101, 1, 111, 11], 'confidence': 0.5},
+        # Overlaps both 1 and 2; only the first in list order (1) is compared
+        {'plate_index': 4, 'bbox': [5, 0, 106, 10], 'confidence': 0.6},
+    ]
+
+    assert [plate['plate_index'] for plate in legacy_merge(plates)] == [2, 4]
+    assert [plate['plate_index'] for plate in suppress_detections(plates)] == [2, 4]
@@ -0,0 +1,113 @@
+"""Multi-index hashing must find exactly what a brute-force Hamming scan finds, compaction or not."""
+import threading
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from ai.core import image_fingerprint
+from ai.core.image_fingerprint import Fingerprint, FingerprintIndex, MultiIndexHashTable, popcount
+
+
+def flip_bits(rng, value, bits):
+    for bit in rng.choice(64, size=bits, replace=False).tolist():
+        value ^= 1 << bit
+    return value
+
+
+def random_hashes(rng, count):
+    return rng.integers(0, np.iinfo(np.uint64).max, size=count, dtype=np.uint64, endpoint=True)
+
+
+@pytest.fixture(scope="module")
+def hashes():
+    rng = np.random.default_rng(0)
+    stored = random_hashes(rng, 4000)
+    # Near duplicates of a few stored hashes, so queries have many close neighbours
+    near = [flip_bits(rng, int(stored[i % 50]), int(rng.integers(0, 12))) for i in range(1000)]
+    return np.concatenate([stored, np.asarray(near, dtype=np.uint64)])
+
+
+@pytest.mark.parametrize("chunks", [3, 4])
+@pytest.mark.parametrize("radius", [0, 5, 7, 10])
+def test_query_matches_brute_force(hashes, chunks, radius):
+    rng = np.random.default_rng(chunks * 100 + radius)
+    table = MultiIndexHashTable(hashes, chunks=chunks)
+    queries = [flip_bits(rng, int(hashes[rng.integers(len(hashes))]), int(rng.integers(0, radius + 3))) for _ in range(200)]
+    queries += [int(value) for value in random_hashes(rng, 20)]
+
+    for query in queries:
+        distances = popcount(hashes ^ np.uint64(query))
+        expected = np.flatnonzero(distances <= radius)
+
+        positions, found = table.query(query, radius)
+
+        order = np.argsort(positions)
+        np.testing.assert_array_equal(positions[order], expected)
+        np.testing.assert_array_equal(found[order], distances[expected])
+
+
+def test_query_on_a_loaded_table_matches_the_built_one(hashes):
+    table = MultiIndexHashTable(hashes, chunks=3)
+    loaded = MultiIndexHashTable(hashes, table.orders, table.offsets)
+
+    assert loaded.chunks == 3
+    for query in hashes[:50].tolist():
+        np.testing.assert_array_equal(np.sort(loaded.query(query, 8)[0]), np.sort(table.query(query, 8)[0]))
+
+
+@pytest.fixture
+def index(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fingerprints.db'}", future=True)
+    factory = sessionmaker(bind=engine, autocommit=False, autoflush=False, expire_on_commit=False, class_=Session)
+    index = FingerprintIndex(session_factory=factory, snapshot_dir=str(tmp_path / "snapshot"), compact_every=10**6)
+    index.load()
+    yield index
+    engine.dispose()
+
+
+def fingerprints(rng, count):
+    pairs = zip(random_hashes(rng, count).tolist(), random_hashes(rng, count).tolist())
+    return [Fingerprint(phash=phash, dhash=dhash, digest=f"d{i}") for i, (phash, dhash) in enumerate(pairs)]
+
+
+def test_search_sees_fingerprints_added_during_a_compaction(index, monkeypatch):
+    rng = np.random.default_rng(1)
+    stored = fingerprints(rng, 200)
+    index.add(stored, ["front"] * len(stored), "claim-1", "sub-1")
+    started, release = threading.Event(), threading.Event()
+
+    class SlowTable(MultiIndexHashTable):
+        def __init__(self, *args, **kwargs):
+            started.set()
+            assert release.wait(10)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(image_fingerprint, "MultiIndexHashTable", SlowTable)
+    compaction = threading.Thread(target=index.compact)
+    compaction.start()
+    try:
+        assert started.wait(10)
+        late = Fingerprint(phash=flip_bits(rng, stored[0].phash, 3), dhash=stored[0].dhash, digest="late")
+        late_row = index.add([late], ["back"], "claim-2", "sub-2")[0]
+        # While the new tables are being built
+        assert late_row in [row_id for row_id, _, _ in index.search(late)]
+    finally:
+        release.set()
+        compaction.join()
+
+    assert index.stats()["compactions"] == 1
+    assert index.unsnapshotted == 1
+    assert late_row in [row_id for row_id, _, _ in index.search(late)]
+    # The folded fingerprints are found through the new tables
+    assert index.search(stored[0])[0][1:] == (0, 0)
+
+    # The next compaction folds it in, and a snapshot keeps it
+    monkeypatch.setattr(image_fingerprint, "MultiIndexHashTable", MultiIndexHashTable)
+    index.save_snapshot()
+    assert index.unsnapshotted == 0
+    index.load()
+    assert len(index._table) == 201
+    assert late_row in [row_id for row_id, _, _ in index.search(late)]
+
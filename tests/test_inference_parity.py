@@ -0,0 +1,76 @@
+"""The ONNX Runtime backend must find the same boxes as Ultralytics on PyTorch.
+
+Skipped unless onnxruntime, onnx and ultralytics are installed and the
+yolov8n weights are in MODEL_DIR or can be downloaded.
+"""
+import os
+import shutil
+
+import cv2
+import numpy as np
+import pytest
+
+pytest.importorskip("onnx")
+pytest.importorskip("onnxruntime")
+ultralytics = pytest.importorskip("ultralytics")
+
+from ai.core.inference import BACKEND_ONNX, BACKEND_TORCH, OnnxDetector, load_detector  # noqa: E402
+from ai.core.model_registry import resolve_weights  # noqa: E402
+from benchmarks.bench_inference_backends import CONF, parity  # noqa: E402
+
+# Photos Ultralytics ships with the package: people, a bus, cars
+ASSETS = os.path.join(os.path.dirname(ultralytics.__file__), "assets")
+
+
+@pytest.fixture(scope="module")
+def weights(tmp_path_factory):
+    source = resolve_weights("yolov8n.pt")
+    if not os.path.exists(source):
+        try:
+            source = str(ultralytics.YOLO(source).ckpt_path)
+        except Exception as exc:
+            pytest.skip(f"yolov8n.pt is not available: {exc}")
+    # The ONNX export lands next to the weights, so work on a copy
+    return shutil.copy2(source, tmp_path_factory.mktemp("models") / "yolov8n.pt")
+
+
+@pytest.fixture(scope="module")
+def images():
+    photos = [cv2.imread(os.path.join(ASSETS, name)) for name in sorted(os.listdir(ASSETS)) if name.endswith(".jpg")]
+    photos = [photo for photo in photos if photo is not None]
+    if not photos:
+        pytest.skip("no sample photos in the ultralytics package")
+    # Other aspect ratios and sizes exercise the letterbox and the coordinate mapping
+    return photos + [cv2.flip(photo, 1) for photo in photos] + [cv2.resize(photo, None, fx=0.5, fy=0.8) for photo in photos]
+
+
+@pytest.fixture(scope="module")
+def torch_detector(weights):
+    return load_detector(str(weights), backend=BACKEND_TORCH)
+
+
+@pytest.fixture(scope="module")
+def onnx_detector(weights):
+    detector = load_detector(str(weights), backend=BACKEND_ONNX)
+    # load_detector falls back to PyTorch quietly; that would make the test vacuous
+    assert isinstance(detector, OnnxDetector)
+    return detector
+
+
+def test_onnx_boxes_match_pytorch(torch_detector, onnx_detector, images):
+    result = parity(torch_detector, onnx_detector, images)
+
+    assert result["boxes"] > 0
+    assert result["recall"] >= 0.95
+    assert result["precision"] >= 0.95
+    assert result["mean_iou"] >= 0.9
+    assert result["max_conf_diff"] <= 0.05
+
+
+def test_onnx_batch_matches_single_images(onnx_detector, images):
+    batched = onnx_detector.detect(images, conf=CONF)
+    single = [onnx_detector.detect([image], conf=CONF)[0] for image in images]
+
+    for expected, actual in zip(single, batched):
+        assert expected.shape == actual.shape
+        np.testing.assert_allclose(actual, expected, atol=1e-3)
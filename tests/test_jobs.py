@@ -0,0 +1,54 @@
+"""Background jobs: a silent runner must not look like one whose process died."""
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from ai.core.jobs import RUNNING, SUCCEEDED, JobManager
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}", future=True)
+    yield sessionmaker(bind=engine, autocommit=False, autoflush=False, expire_on_commit=False, class_=Session)
+    engine.dispose()
+
+
+def test_silent_runner_is_not_claimed_as_stale(session_factory, tmp_path):
+    stale_seconds = 0.8
+    manager = JobManager(session_factory, input_dir=str(tmp_path / "inputs"), workers=1, stale_seconds=stale_seconds)
+    other = JobManager(session_factory, input_dir=str(tmp_path / "inputs"), workers=1, stale_seconds=stale_seconds)
+
+    async def silent(job):
+        # Like slow Gemini retries: no events for several times the stale window
+        await asyncio.sleep(3 * stale_seconds)
+        return {"done": True}
+
+    manager.register("silent", silent)
+
+    async def scenario():
+        await manager.start()
+        try:
+            job = await manager.submit("silent", {}, {"photo": b"bytes"})
+            started = time.monotonic()
+            claimable = []
+            while time.monotonic() - started < 2.5 * stale_seconds:
+                await asyncio.sleep(stale_seconds / 4)
+                status = (await asyncio.to_thread(manager.get, job["job_id"]))["status"]
+                # What another process starting now would pick up
+                if status == RUNNING:
+                    claimable.append(job["job_id"] in await asyncio.to_thread(other._prepare))
+            while (await asyncio.to_thread(manager.get, job["job_id"]))["status"] == RUNNING:
+                await asyncio.sleep(0.05)
+            return job["job_id"], claimable
+        finally:
+            await manager.stop()
+
+    job_id, claimable = asyncio.run(scenario())
+
+    assert claimable and not any(claimable)
+    finished = manager.get(job_id)
+    assert finished["status"] == SUCCEEDED
+    assert finished["attempts"] == 1
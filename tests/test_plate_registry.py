@@ -0,0 +1,180 @@
+"""Plate normalization, the one-edit variant index, and the registry's overlay, compaction and snapshots."""
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from fraud.core.plate_registry import (
+    PlateIndex,
+    PlateRegistry,
+    edit_distance_at_most_one,
+    normalize_plate,
+    variant_arrays,
+    variant_codes,
+)
+
+ALPHABET = "0123456789ACDEFGHJKLMNPRTUVWXY"
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'plates.db'}", future=True)
+    yield sessionmaker(bind=engine, autocommit=False, autoflush=False, expire_on_commit=False, class_=Session)
+    engine.dispose()
+
+
+def registry(session_factory, snapshot_dir=None):
+    plates = PlateRegistry(session_factory=session_factory, snapshot_dir=snapshot_dir)
+    plates.load()
+    return plates
+
+
+def random_plate(rng, low=3, high=18):
+    # A short alphabet makes runs of equal characters, which variant_arrays de-duplicates
+    return "".join(rng.choice(ALPHABET[:rng.choice([4, len(ALPHABET)])]) for _ in range(rng.randint(low, high)))
+
+
+def one_edit(rng, plate):
+    i = rng.randrange(len(plate))
+    edit = rng.choice(["substitute", "insert", "delete"])
+    if edit == "substitute":
+        return plate[:i] + rng.choice(ALPHABET.replace(plate[i], "")) + plate[i + 1:]
+    if edit == "insert":
+        return plate[:i] + rng.choice(ALPHABET) + plate[i:]
+    return plate[:i] + plate[i + 1:]
+
+
+@pytest.mark.parametrize("text, key", [
+    ("12-ab 345", "12A8345"),
+    ("o1z", "012"),
+    ("QIS", "015"),
+    ("  dz 4 ", "D24"),
+    ("١٢٣ أ ٤٥", "12345"),
+    ("۱۲۳۴", "1234"),
+    ("１２３ＡＢ", "123A8"),
+    (None, ""),
+])
+def test_normalize_plate(text, key):
+    assert normalize_plate(text) == key
+
+
+def test_ocr_confusions_compare_equal():
+    assert normalize_plate("B0S 12O") == normalize_plate("8O5-I20") == normalize_plate("٨٠٥ ١٢٠")
+
+
+def test_variant_arrays_match_variant_codes():
+    rng = random.Random(0)
+    plates = [random_plate(rng, 1, 20) for _ in range(500)] + ["AAAA", "A", "0000000000000", "ABABABABABABAB"]
+
+    codes, owners = variant_arrays(plates, first_id=7)
+
+    assert owners.min() >= 7
+    for plate_id, plate in enumerate(plates):
+        found = codes[owners == plate_id + 7].tolist()
+        # Each variant once: runs of equal characters give one deletion variant
+        assert len(found) == len(set(found))
+        assert set(found) == variant_codes(plate), plate
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_one_edit_always_shares_a_variant(seed):
+    rng = random.Random(seed)
+    for _ in range(2000):
+        # Lengths either side of 12 symbols, where codes switch from exact to hashed
+        plate = random_plate(rng, 3, 16)
+        edited = one_edit(rng, plate)
+        assert edit_distance_at_most_one(plate, edited) is not None
+        assert variant_codes(plate) & variant_codes(edited), (plate, edited)
+
+
+def test_edit_distance_at_most_one():
+    assert edit_distance_at_most_one("ABC123", "ABC123") == 0
+    assert edit_distance_at_most_one("ABC123", "ABD123") == 1
+    assert edit_distance_at_most_one("ABC123", "ABC1234") == 1
+    assert edit_distance_at_most_one("ABC123", "AC123") == 1
+    assert edit_distance_at_most_one("ABC123", "ACB123") is None
+    assert edit_distance_at_most_one("ABC123", "ABC12345") is None
+
+
+def test_lookup_matches_one_edit_and_excludes_the_claim(session_factory):
+    plates = registry(session_factory)
+    plates.add("12-ABC-345", "claim-1")
+    plates.add("12ABC345", "claim-2")
+    plates.add("99 XYZ 999", "claim-3")
+
+    def found(text, exclude_claim=None):
+        return sorted((match["plate"], match["distance"], match["claim_id"]) for match in plates.lookup(text, exclude_claim))
+
+    exact = [("12A8C345", 0, "claim-1"), ("12A8C345", 0, "claim-2")]
+    assert found("12 A8C 345") == exact
+    # OCR confusions are not edits
+    assert found("I2ABC345") == exact
+    assert found("12ABD345") == [("12A8C345", 1, "claim-1"), ("12A8C345", 1, "claim-2")]
+    assert found("12ABC3456") == [("12A8C345", 1, "claim-1"), ("12A8C345", 1, "claim-2")]
+    assert found("2ABC345") == [("12A8C345", 1, "claim-1"), ("12A8C345", 1, "claim-2")]
+    assert found("12ABD346") == []
+    assert found("12ABC345", exclude_claim="claim-1") == [("12A8C345", 0, "claim-2")]
+    assert [match["claim_id"] for match in plates.other_claims("99XYZ999", "claim-3")] == []
+    assert plates.lookup("12ABD345", max_distance=0) == []
+    # Too short to be a plate
+    assert plates.add("7", "claim-4") is None
+    assert plates.lookup("7") == []
+
+
+def lookups(plates, queries):
+    return {
+        query: sorted((m["plate"], m["distance"], m["claim_id"], m["seen_at"], m["image_hash"]) for m in plates.lookup(query))
+        for query in queries
+    }
+
+
+def test_overlay_compact_snapshot_and_load_answer_alike(session_factory, tmp_path):
+    rng = random.Random(1)
+    snapshot_dir = str(tmp_path / "snapshot")
+    plates = registry(session_factory, snapshot_dir)
+    stored = [random_plate(rng, 3, 16) for _ in range(300)]
+    start = datetime(2024, 1, 1)
+    for i in range(900):
+        plate = rng.choice(stored)
+        plates.add(plate, f"claim-{rng.randrange(200)}", image_hash=f"h{i}" if i % 3 else None, seen_at=start + timedelta(minutes=i))
+    queries = stored[:100] + [one_edit(rng, plate) for plate in stored[100:300]] + [random_plate(rng) for _ in range(50)]
+
+    in_overlay = lookups(plates, queries)
+    assert sum(map(len, in_overlay.values())) > 900
+    plates.save_snapshot()
+    assert plates.stats()["unsnapshotted_sightings"] == 0
+    assert lookups(plates, queries) == in_overlay
+
+    reloaded = registry(session_factory, snapshot_dir)
+    assert isinstance(reloaded._index.variant_codes, np.memmap)
+    assert reloaded.stats()["sightings"] == 900
+    assert lookups(reloaded, queries) == in_overlay
+
+    # Rows added after the snapshot are replayed on load, then folded into the next one
+    plates.add(stored[0], "claim-late", seen_at=start)
+    plates.add("LATE 1234", "claim-late", seen_at=start)
+    expected = lookups(plates, queries + ["LATE1234"])
+    caught_up = registry(session_factory, snapshot_dir)
+    assert caught_up.stats()["unsnapshotted_sightings"] == 2
+    assert lookups(caught_up, queries + ["LATE1234"]) == expected
+    caught_up.save_snapshot()
+    assert lookups(registry(session_factory, snapshot_dir), queries + ["LATE1234"]) == expected
+
+
+def test_build_matches_compacted_overlay(session_factory):
+    rng = random.Random(2)
+    plates = registry(session_factory)
+    sightings = [(random_plate(rng), f"claim-{i % 40}", 1_700_000_000_000 + i, None) for i in range(400)]
+    for key, claim_id, epoch_ms, _ in sightings:
+        plates._remember(normalize_plate(key), claim_id, epoch_ms, None, 0)
+    compacted = plates.compact()
+    built = PlateIndex.build((normalize_plate(key), claim_id, epoch_ms, image_hash) for key, claim_id, epoch_ms, image_hash in sightings)
+
+    np.testing.assert_array_equal(compacted.plates, built.plates)
+    np.testing.assert_array_equal(compacted.variant_codes, built.variant_codes)
+    np.testing.assert_array_equal(compacted.offsets, built.offsets)
+    for plate_id in range(built.plate_count):
+        assert list(compacted.sightings(plate_id)) == list(built.sightings(plate_id))
@@ -0,0 +1,142 @@
+"""Failed and degraded computations must not be served from the result cache."""
+import asyncio
+import io
+import json
+
+import pytest
+from fastapi import HTTPException
+from PIL import Image
+
+from ai.api.routes import damage_estimation
+from ai.core import result_cache
+from ai.core.config import get_settings
+from ai.core.gemini import GeminiError
+from ai.core.price_search import PriceStats
+from ai.core.result_cache import ResultCache
+from ai.schema.damage_estimation import AnalysisMode
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def computation(outcomes):
+    """A compute function returning (or raising) ``outcomes`` in turn, counting its calls"""
+    calls = []
+
+    async def compute():
+        calls.append(len(calls))
+        outcome = outcomes[len(calls) - 1]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    return compute, calls
+
+
+@pytest.mark.parametrize("on_disk", [False, True])
+def test_failed_compute_is_not_cached(tmp_path, on_disk):
+    cache = ResultCache(directory=str(tmp_path) if on_disk else None)
+    compute, calls = computation([RuntimeError("timed out"), {"parts": 2}, {"parts": 3}])
+
+    with pytest.raises(RuntimeError):
+        run(cache.get_or_compute("key", compute))
+    assert run(cache.get_or_compute("key", compute)) == {"parts": 2}
+    assert run(cache.get_or_compute("key", compute)) == {"parts": 2}
+    assert len(calls) == 2
+    assert not on_disk or len(list(tmp_path.glob("*.json"))) == 1
+
+
+@pytest.mark.parametrize("on_disk", [False, True])
+def test_uncacheable_value_is_returned_but_not_stored(tmp_path, on_disk):
+    cache = ResultCache(directory=str(tmp_path) if on_disk else None)
+    compute, calls = computation([{"complete": False}, {"complete": True}, {"complete": False}])
+    complete = lambda value: value["complete"]
+
+    assert run(cache.get_or_compute("key", compute, complete)) == {"complete": False}
+    assert not list(tmp_path.glob("*.json"))
+    assert run(cache.get_or_compute("key", compute, complete)) == {"complete": True}
+    assert run(cache.get_or_compute("key", compute, complete)) == {"complete": True}
+    assert len(calls) == 2
+    assert cache.stats()["uncacheable"] == 1
+
+
+def test_coalesced_callers_share_an_uncacheable_value():
+    cache = ResultCache()
+    compute, calls = computation([{"complete": False}, {"complete": True}])
+
+    async def together():
+        return await asyncio.gather(*(cache.get_or_compute("key", compute, lambda value: value["complete"]) for _ in range(3)))
+
+    assert run(together()) == [{"complete": False}] * 3
+    assert len(calls) == 1
+    assert run(cache.get_or_compute("key", compute)) == {"complete": True}
+
+
+class FakeGemini:
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+
+    async def generate(self, parts):
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+class FakePriceSearch:
+    def __init__(self, fail):
+        self.fail = fail
+
+    async def search_many(self, queries, on_result=None):
+        outcomes = []
+        for query in queries:
+            stats = PriceStats()
+            stats.add(100.0)
+            outcomes.append(RuntimeError("price site down") if self.fail else stats.as_dict())
+        return outcomes
+
+
+@pytest.fixture
+def estimate(monkeypatch):
+    """Run the multi-angle estimate through a fresh result cache, with Gemini and pricing faked"""
+    monkeypatch.setattr(get_settings(), "result_cache_enabled", True)
+    monkeypatch.setattr(get_settings(), "image_fingerprint_enabled", False)
+    monkeypatch.setattr(result_cache, "_result_cache", ResultCache())
+    photo = io.BytesIO()
+    Image.new("RGB", (64, 48), (120, 30, 30)).save(photo, format="JPEG")
+    contents = [photo.getvalue()] * len(damage_estimation.VIEW_ANGLES)
+    uploads = [("photo.jpg", "image/jpeg")] * len(contents)
+
+    def estimate(gemini, prices):
+        monkeypatch.setattr(damage_estimation, "get_gemini_client", lambda: gemini)
+        monkeypatch.setattr(damage_estimation, "get_price_search_engine", lambda: prices)
+        return run(damage_estimation._estimate_with_reuse_check(
+            uploads, damage_estimation.VIEW_ANGLES, contents, AnalysisMode.COMBINED, "claim-1"
+        ))
+
+    return estimate
+
+
+DAMAGE = json.dumps({"damaged_parts": [{"part_name": "Front Bumper", "severity": "moderate", "viewing_angle": "front"}]})
+
+
+def test_estimate_after_a_gemini_failure_is_not_the_cached_failure(estimate):
+    with pytest.raises(HTTPException) as raised:
+        estimate(FakeGemini([GeminiError("Gemini request failed: ReadTimeout")]), FakePriceSearch(fail=False))
+    assert raised.value.status_code == 502
+
+    result = estimate(FakeGemini([DAMAGE]), FakePriceSearch(fail=False))
+    assert result["parts_found"] == 1
+    assert result["successful_price_searches"] == 1
+    # Now cached: no Gemini call is left to make
+    assert estimate(FakeGemini([]), FakePriceSearch(fail=False)) == result
+
+
+def test_estimate_with_a_failed_price_lookup_is_not_cached(estimate):
+    failed = estimate(FakeGemini([DAMAGE]), FakePriceSearch(fail=True))
+    assert failed["price_searches"][0]["error"].startswith(damage_estimation.PRICE_SEARCH_FAILED)
+
+    result = estimate(FakeGemini([DAMAGE]), FakePriceSearch(fail=False))
+    assert result["successful_price_searches"] == 1
+    assert estimate(FakeGemini([]), FakePriceSearch(fail=False)) == result
@@ -0,0 +1,124 @@
+"""The in-process HNSW index and the similar-submission screen on top of it."""
+import numpy as np
+import pytest
+
+from fraud.core.embeddings import FeatureEmbedder
+from fraud.core.hnsw import HnswIndex
+from fraud.core.similarity import DAMAGE_PHOTOS, SimilarityIndex
+from fraud.core.vector_store import LocalVectorStore
+
+DIM = 32
+
+
+@pytest.fixture(scope="module")
+def vectors():
+    return np.random.default_rng(0).normal(size=(3000, DIM)).astype(np.float32)
+
+
+@pytest.fixture(scope="module")
+def index(vectors):
+    # Threshold 0: every search goes through the graph, never the exact scan
+    index = HnswIndex(DIM, full_scan_threshold=0)
+    for start in range(0, len(vectors), 256):
+        index.add_batch(vectors[start:start + 256])
+    return index
+
+
+def recall(index, queries, k, accept=None):
+    found = expected = 0
+    for query in queries:
+        nodes, _ = index.search(query, k, accept=accept)
+        exact, _ = index._scan(query / np.linalg.norm(query), k, accept)
+        found += len(set(nodes.tolist()) & set(exact.tolist()))
+        expected += len(exact)
+    return found / expected
+
+
+def test_graph_search_recall_against_exact_scan(index):
+    queries = np.random.default_rng(1).normal(size=(100, DIM)).astype(np.float32)
+
+    assert recall(index, queries, 10) >= 0.95
+
+
+def test_graph_search_recall_with_filter(index):
+    queries = np.random.default_rng(2).normal(size=(50, DIM)).astype(np.float32)
+    even = lambda node: node % 2 == 0
+
+    assert recall(index, queries, 10, accept=even) >= 0.95
+    nodes, _ = index.search(queries[0], 10, accept=even)
+    assert len(nodes) == 10 and all(node % 2 == 0 for node in nodes.tolist())
+
+
+def test_search_finds_stored_vector_first(index, vectors):
+    for node in (0, 1234, len(vectors) - 1):
+        nodes, similarities = index.search(vectors[node], 1)
+        assert nodes.tolist() == [node]
+        assert similarities[0] == pytest.approx(1.0, abs=1e-5)
+
+
+def test_save_load_round_trip(index, vectors, tmp_path):
+    path = str(tmp_path / "index")
+    index.save(path)
+    loaded = HnswIndex.load(path)
+
+    assert len(loaded) == len(index)
+    assert (loaded.m, loaded.ef_construction, loaded.ef_search) == (index.m, index.ef_construction, index.ef_search)
+    np.testing.assert_array_equal(loaded.vectors, index.vectors)
+    for query in np.random.default_rng(3).normal(size=(20, DIM)).astype(np.float32):
+        expected_nodes, expected_scores = index.search(query, 10)
+        nodes, scores = loaded.search(query, 10)
+        np.testing.assert_array_equal(nodes, expected_nodes)
+        np.testing.assert_allclose(scores, expected_scores)
+
+    # The loaded graph keeps growing like the original
+    loaded.add(vectors[0] + 0.01)
+    assert loaded.search(vectors[0] + 0.01, 1)[0].tolist() == [len(index)]
+
+
+def test_local_store_replays_upserts_after_a_crash(tmp_path):
+    vectors = np.random.default_rng(4).normal(size=(25, DIM)).astype(np.float32)
+    store = LocalVectorStore(str(tmp_path), snapshot_every=10)
+    store.ensure_collection("photos", DIM)
+    for i, vector in enumerate(vectors):
+        store.upsert("photos", [f"p{i}"], vector[None, :], [{"claim_id": str(i % 3)}])
+    store.upsert("photos", ["p3"], vectors[3][None, :], [{"claim_id": "moved"}])
+
+    # No close(): the last points are only in the log
+    reopened = LocalVectorStore(str(tmp_path))
+    reopened.ensure_collection("photos", DIM)
+
+    assert reopened.count("photos") == len(vectors)
+    assert [hit.id for hit in reopened.search("photos", vectors[22], 1)] == ["p22"]
+    assert reopened.search("photos", vectors[3], 1)[0].payload == {"claim_id": "moved"}
+    hits = reopened.search("photos", vectors[5], 5, exclude={"claim_id": "2"})
+    assert len(hits) == 5 and all(hit.payload["claim_id"] != "2" for hit in hits)
+
+
+def photo(seed):
+    rng = np.random.default_rng(seed)
+    image = np.zeros((240, 320, 3), dtype=np.uint8)
+    for _ in range(12):
+        x, y = rng.integers(0, 300), rng.integers(0, 220)
+        image[y:y + rng.integers(10, 80), x:x + rng.integers(10, 80)] = rng.integers(0, 256, 3)
+    return image
+
+
+def test_screen_excludes_the_claim_but_reports_the_submission_on_another_claim():
+    similarity = SimilarityIndex(LocalVectorStore(), FeatureEmbedder(), top_k=3)
+    similarity.screen(DAMAGE_PHOTOS, photo(1), submission_id="other", claim_id="claim-b")
+    image = photo(0)
+
+    assert similarity.screen(DAMAGE_PHOTOS, image, submission_id="sub-1", claim_id="claim-a")[0]["claim_id"] == "claim-b"
+    # The same submission id and photo, sent on another claim
+    matches = similarity.screen(DAMAGE_PHOTOS, image, submission_id="sub-1", claim_id="claim-c")
+
+    assert matches[0]["claim_id"] == "claim-a"
+    assert matches[0]["submission_id"] == "sub-1"
+    assert matches[0]["score"] == pytest.approx(1.0, abs=1e-3)
+    assert similarity.count(DAMAGE_PHOTOS) == 3
+
+    # A redelivery on claim-a skips claim-a, including its own earlier point
+    matches = similarity.screen(DAMAGE_PHOTOS, image, submission_id="sub-1", claim_id="claim-a")
+
+    assert {match["claim_id"] for match in matches} == {"claim-b", "claim-c"}
+    assert similarity.count(DAMAGE_PHOTOS) == 3